@@ -3,12 +3,14 @@ Chat agent for recommendation discussions.
 Uses LangGraph for orchestration with tool-calling LLM.
 """
 
+import asyncio
 import logging
 import json
-from typing import List, Dict, Any, Optional
+from contextlib import aclosing
+from typing import List, Dict, Any, Optional, Tuple, AsyncIterator
 from datetime import datetime
 
-from agent_service.llm.gateway import get_llm_client
+from agent_service.llm.gateway import LLMGateway
 from agent_service.llm.chat_prompts import build_chat_system_prompt, build_chat_system_prompt_for_analytics
 from agent_service.tools.recommendation_tools import RecommendationTools
 from agent_service.tools.analytics_tools import AnalyticsTools
@@ -21,6 +23,12 @@ class ChatAgent:
     """
     Chat agent for discussing recommendations with users.
     Powered by LLM with read-only tools access.
+    
+    One instance serves every WebSocket session, so per-message state (user,
+    scenario) is passed through calls rather than stored on the agent. LLM
+    completions are streamed from the async gateway client and tools
+    (blocking DB work) run in worker threads, keeping the event loop free
+    for other sessions.
     """
     
     def __init__(self, flask_app):
@@ -34,15 +42,7 @@ class ChatAgent:
         self.tools = RecommendationTools(flask_app)
         self.analytics_tools = AnalyticsTools(flask_app)
         self.vision_tools = VisionTools()
-        self.llm_client = None
-        self.current_scenario: Optional[str] = None
-        self.current_context: Optional[Dict[str, Any]] = None
-        
-    def _get_llm_client(self):
-        """Get or create LLM client."""
-        if self.llm_client is None:
-            self.llm_client = get_llm_client()
-        return self.llm_client
+        self.llm = LLMGateway()
         
     def _get_tool_definitions(self, scenario: str) -> List[Dict]:
         """Return scenario-specific tool definitions."""
@@ -292,20 +292,21 @@ class ChatAgent:
 
         return tools
         
-    def _execute_tool(self, tool_name: str, arguments: Dict) -> Any:
+    def _execute_tool(self, tool_name: str, arguments: Dict, user_id: Optional[int]) -> Any:
         """
-        Execute a tool call.
+        Execute a tool call (blocking; called from a worker thread).
         
         Args:
             tool_name: Name of the tool to execute
             arguments: Tool arguments dict
+            user_id: User the conversation belongs to
             
         Returns:
             Tool execution result
         """
         try:
             # Add user_id to all tool calls for ownership verification
-            arguments_with_user = {**arguments, 'user_id': getattr(self, 'current_user_id', None)}
+            arguments_with_user = {**arguments, 'user_id': user_id}
             
             if tool_name == "get_recommendation_details":
                 return self.tools.get_recommendation_details(**arguments_with_user)
@@ -336,126 +337,191 @@ class ChatAgent:
         except Exception as e:
             logger.error(f"Error executing tool {tool_name}: {e}", exc_info=True)
             return {"error": f"Tool execution error: {str(e)}"}
-            
-    async def process_message(
-        self,
-        user_message: str,
-        user_id: int,
-        scenario: str,
-        recommendation_id: Optional[int] = None,
-        context: Optional[Dict[str, Any]] = None,
-        chat_history: Optional[List[Dict]] = None
-    ) -> tuple[str, int]:
+
+    async def _run_tool_calls(self, tool_calls: List[Dict[str, Any]], user_id: int) -> List[Dict[str, Any]]:
         """
-        Process user message and generate response.
+        Execute the tool calls of one assistant turn concurrently.
         
         Args:
-            user_message: User's message
-            user_id: User ID (supports impersonation - from JWT token)
-            scenario: Chat scenario identifier
-            recommendation_id: Recommendation ID (for recommendation scenario)
-            context: Optional scenario-specific context (e.g. time range)
-            chat_history: Previous messages [{role, content}, ...]
+            tool_calls: Assembled tool calls from the streamed assistant turn
+            user_id: User the conversation belongs to
             
         Returns:
-            Tuple of (assistant_response, tokens_used)
+            Tool messages in the order of the calls
         """
-        try:
-            # Store user_id for tool execution context
-            self.current_user_id = user_id
-            self.current_scenario = scenario
-            self.current_context = context or {}
+        async def run(tool_call) -> Dict[str, Any]:
+            tool_name = tool_call['function']['name']
+            tool_args = json.loads(tool_call['function']['arguments'] or '{}')
 
-            messages: List[Dict[str, str]] = []
-            tools = []
+            logger.info("Executing tool: %s with args: %s", tool_name, tool_args)
+            tool_result = await asyncio.to_thread(self._execute_tool, tool_name, tool_args, user_id)
 
-            if scenario == 'recommendation':
-                if recommendation_id is None:
-                    return "Ошибка: отсутствует ID рекомендации", 0
+            return {
+                "role": "tool",
+                "tool_call_id": tool_call['id'],
+                "name": tool_name,
+                "content": json.dumps(tool_result, ensure_ascii=False) if isinstance(tool_result, (dict, list)) else str(tool_result)
+            }
 
-                rec_details = self.tools.get_recommendation_details(recommendation_id)
-                if 'error' in rec_details:
-                    return f"Ошибка: {rec_details['error']}", 0
+        return list(await asyncio.gather(*(run(tool_call) for tool_call in tool_calls)))
 
-                system_prompt = build_chat_system_prompt(
-                    recommendation_id=recommendation_id,
-                    recommendation_title=rec_details.get('title', 'Рекомендация'),
-                    estimated_savings=rec_details.get('estimated_monthly_savings', 0),
-                    resource_name=rec_details.get('resource', {}).get('name') if rec_details.get('resource') else None
-                )
-                tools = self._get_tool_definitions('recommendation')
-            elif scenario == 'analytics':
-                time_range = (context or {}).get('time_range_days', 30)
-                snapshot = self.analytics_tools.build_context_snapshot(
-                    user_id=user_id,
-                    time_range_days=time_range
-                )
-                system_prompt = build_chat_system_prompt_for_analytics(snapshot)
-                tools = self._get_tool_definitions('analytics')
-            else:
-                return "Извините, этот сценарий пока не поддерживается.", 0
+    async def _build_conversation(
+        self,
+        user_message: str,
+        user_id: int,
+        scenario: str,
+        recommendation_id: Optional[int],
+        context: Optional[Dict[str, Any]],
+        chat_history: Optional[List[Dict]]
+    ) -> Tuple[Optional[List[Dict[str, Any]]], List[Dict], Optional[str]]:
+        """
+        Build the LLM messages and tools for a scenario.
+        
+        Returns:
+            Tuple of (messages, tools, error_reply); messages is None when the
+            scenario cannot be served and error_reply should be sent instead
+        """
+        if scenario == 'recommendation':
+            if recommendation_id is None:
+                return None, [], "Ошибка: отсутствует ID рекомендации"
 
-            messages.append({"role": "system", "content": system_prompt})
+            rec_details = await asyncio.to_thread(self.tools.get_recommendation_details, recommendation_id)
+            if 'error' in rec_details:
+                return None, [], f"Ошибка: {rec_details['error']}"
 
-            if chat_history:
-                for msg in chat_history[-10:]:
-                    messages.append({
-                        "role": msg['role'],
-                        "content": msg['content']
-                    })
+            system_prompt = build_chat_system_prompt(
+                recommendation_id=recommendation_id,
+                recommendation_title=rec_details.get('title', 'Рекомендация'),
+                estimated_savings=rec_details.get('estimated_monthly_savings', 0),
+                resource_name=rec_details.get('resource', {}).get('name') if rec_details.get('resource') else None
+            )
+            tools = self._get_tool_definitions('recommendation')
+        elif scenario == 'analytics':
+            time_range = (context or {}).get('time_range_days', 30)
+            snapshot = await asyncio.to_thread(
+                self.analytics_tools.build_context_snapshot,
+                user_id=user_id,
+                time_range_days=time_range
+            )
+            system_prompt = build_chat_system_prompt_for_analytics(snapshot)
+            tools = self._get_tool_definitions('analytics')
+        else:
+            return None, [], "Извините, этот сценарий пока не поддерживается."
 
-            messages.append({"role": "user", "content": user_message})
+        messages: List[Dict[str, Any]] = [{"role": "system", "content": system_prompt}]
 
-            client = self._get_llm_client()
+        if chat_history:
+            for msg in chat_history[-10:]:
+                messages.append({
+                    "role": msg['role'],
+                    "content": msg['content']
+                })
 
-            from agent_service.core.config import settings
-            text_model = settings.LLM_MODEL_TEXT
-            logger.info("Using text model for %s chat: %s", scenario, text_model)
+        messages.append({"role": "user", "content": user_message})
+        return messages, tools, None
 
-            response = client.chat.completions.create(
-                model=text_model,
-                messages=messages,
-                tools=tools,
-                tool_choice="auto" if tools else None,
-                temperature=0.7,
-                max_tokens=1000
+    async def stream_message(
+        self,
+        user_message: str,
+        user_id: int,
+        scenario: str,
+        recommendation_id: Optional[int] = None,
+        context: Optional[Dict[str, Any]] = None,
+        chat_history: Optional[List[Dict]] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Generate a response, yielding text as the model produces it.
+        
+        Args: same as process_message
+        
+        Yields:
+            {'type': 'delta', 'content': str} chunks, then one
+            {'type': 'done', 'content': full_response, 'tokens': tokens_used}.
+            When the model calls tools, they run between the two completions
+            and the answer is streamed from the second one; text streamed
+            before the tool calls is withdrawn with a {'type': 'reset'} event
+            and is not part of the final content.
+        """
+        streamed: List[str] = []
+        tokens_used = 0
+        try:
+            messages, tools, error_reply = await self._build_conversation(
+                user_message, user_id, scenario, recommendation_id, context, chat_history
             )
+            if messages is None:
+                yield {'type': 'done', 'content': error_reply, 'tokens': 0}
+                return
 
-            assistant_message = response.choices[0].message
-            tokens_used = response.usage.total_tokens if hasattr(response, 'usage') else 0
+            logger.info("Using text model for %s chat: %s", scenario, self.llm.text_model)
 
-            if assistant_message.tool_calls:
-                messages.append(assistant_message)
+            # aclosing: if our consumer stops early, the LLM stream is closed right away
+            turn = None
+            async with aclosing(self.llm.stream_chat(messages, tools=tools, temperature=0.7, max_tokens=1000)) as events:
+                async for event in events:
+                    if event['type'] == 'delta':
+                        streamed.append(event['content'])
+                        yield event
+                    else:
+                        turn = event
+            tokens_used += turn['tokens']
 
-                for tool_call in assistant_message.tool_calls:
-                    tool_name = tool_call.function.name
-                    tool_args = json.loads(tool_call.function.arguments)
+            if turn['tool_calls']:
+                messages.append({
+                    "role": "assistant",
+                    "content": turn['content'] or None,
+                    "tool_calls": turn['tool_calls']
+                })
+                if streamed:
+                    # The answer is the post-tool completion only: drop any preamble
+                    streamed = []
+                    yield {'type': 'reset'}
+                messages.extend(await self._run_tool_calls(turn['tool_calls'], user_id))
 
-                    logger.info("Executing tool: %s with args: %s", tool_name, tool_args)
-                    tool_result = self._execute_tool(tool_name, tool_args)
+                async with aclosing(self.llm.stream_chat(messages, temperature=0.7, max_tokens=1000)) as events:
+                    async for event in events:
+                        if event['type'] == 'delta':
+                            streamed.append(event['content'])
+                            yield event
+                        else:
+                            tokens_used += event['tokens']
 
-                    messages.append({
-                        "role": "tool",
-                        "tool_call_id": tool_call.id,
-                        "name": tool_name,
-                        "content": json.dumps(tool_result, ensure_ascii=False) if isinstance(tool_result, (dict, list)) else str(tool_result)
-                    })
+            yield {'type': 'done', 'content': ''.join(streamed), 'tokens': tokens_used}
 
-                final_response = client.chat.completions.create(
-                    model=text_model,
-                    messages=messages,
-                    temperature=0.7,
-                    max_tokens=1000
-                )
-
-                final_message = final_response.choices[0].message.content
-                tokens_used += final_response.usage.total_tokens if hasattr(final_response, 'usage') else 0
-
-                return final_message, tokens_used
-
-            return assistant_message.content, tokens_used
-                
         except Exception as e:
             logger.error(f"Error processing message: {e}", exc_info=True)
-            return f"Извините, произошла ошибка при обработке сообщения: {str(e)}", 0
+            yield {
+                'type': 'done',
+                'content': f"Извините, произошла ошибка при обработке сообщения: {str(e)}",
+                'tokens': tokens_used
+            }
 
+    async def process_message(
+        self,
+        user_message: str,
+        user_id: int,
+        scenario: str,
+        recommendation_id: Optional[int] = None,
+        context: Optional[Dict[str, Any]] = None,
+        chat_history: Optional[List[Dict]] = None
+    ) -> tuple[str, int]:
+        """
+        Process user message and generate response.
+        
+        Args:
+            user_message: User's message
+            user_id: User ID (supports impersonation - from JWT token)
+            scenario: Chat scenario identifier
+            recommendation_id: Recommendation ID (for recommendation scenario)
+            context: Optional scenario-specific context (e.g. time range)
+            chat_history: Previous messages [{role, content}, ...]
+            
+        Returns:
+            Tuple of (assistant_response, tokens_used)
+        """
+        response, tokens_used = '', 0
+        async for event in self.stream_message(
+            user_message, user_id, scenario, recommendation_id, context, chat_history
+        ):
+            if event['type'] == 'done':
+                response, tokens_used = event['content'], event['tokens']
+        return response, tokens_used
@@ -1,13 +1,17 @@
 """
 Recommendations API endpoints
 """
+import asyncio
 import logging
-from typing import Dict, Any
+import time
+from datetime import datetime
+from typing import Dict, Any, List
 from fastapi import APIRouter, HTTPException, Depends
 from fastapi.responses import JSONResponse
 from pydantic import BaseModel
 
 from app.core.database import db
+from agent_service.core.config import settings
 from agent_service.core.recommendation_generator import RecommendationGenerator
 
 router = APIRouter()
@@ -29,6 +33,16 @@ class GenerateRecommendationResponse(BaseModel):
     error: str = None
 
 
+class GenerateRecommendationBatchRequest(BaseModel):
+    """Request to generate texts for many recommendations"""
+    recommendation_ids: List[int]
+    persist: bool = True
+
+
+# Bounds concurrent LLM calls across all batch requests
+_batch_semaphore = asyncio.Semaphore(settings.AI_TEXT_BATCH_CONCURRENCY)
+
+
 def get_flask_app():
     """Get Flask app from FastAPI state"""
     from agent_service.main import app as fastapi_app
@@ -64,3 +78,64 @@ async def generate_recommendation_text(request: GenerateRecommendationRequest) -
             detail=f"Failed to generate recommendation text: {str(e)}"
         )
 
+
+def _generate_and_store(flask_app, recommendation_id: int, persist: bool) -> Dict[str, Any]:
+    """Generate text for one recommendation in its own app context (and DB session)"""
+    from app.core.models.recommendations import OptimizationRecommendation
+    
+    with flask_app.app_context():
+        try:
+            result = RecommendationGenerator(db.session).generate(recommendation_id)
+            if persist and not result.get('error'):
+                rec = OptimizationRecommendation.query.get(recommendation_id)
+                if rec is not None:
+                    rec.ai_short_description = result['short_description_html']
+                    rec.ai_detailed_description = result['detailed_description_html']
+                    rec.ai_generated_at = datetime.utcnow()
+                    db.session.commit()
+            return result
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"Failed to generate text for recommendation {recommendation_id}: {e}", exc_info=True)
+            return {"recommendation_id": recommendation_id, "error": str(e)}
+        finally:
+            db.session.remove()
+
+
+@router.post("/generate/recommendation-text/batch")
+async def generate_recommendation_text_batch(request: GenerateRecommendationBatchRequest) -> Dict[str, Any]:
+    """
+    Generate (and by default store) recommendation texts for many recommendations
+    
+    LLM calls run concurrently, bounded by AI_TEXT_BATCH_CONCURRENCY. Each call
+    runs in a worker thread so the event loop stays free for chat sessions.
+    """
+    recommendation_ids = list(dict.fromkeys(request.recommendation_ids))
+    logger.info(f"Generating text for batch of {len(recommendation_ids)} recommendations")
+    started = time.monotonic()
+    
+    flask_app = get_flask_app()
+    
+    async def generate_one(recommendation_id: int) -> Dict[str, Any]:
+        async with _batch_semaphore:
+            return await asyncio.to_thread(_generate_and_store, flask_app, recommendation_id, request.persist)
+    
+    results = await asyncio.gather(*(generate_one(rec_id) for rec_id in recommendation_ids))
+    failed = [r for r in results if r.get('error')]
+    
+    return {
+        "requested": len(recommendation_ids),
+        "generated": len(results) - len(failed),
+        "failed": len(failed),
+        "persisted": request.persist,
+        "duration_seconds": round(time.monotonic() - started, 2),
+        "results": [
+            {
+                "recommendation_id": r.get("recommendation_id"),
+                "error": r.get("error"),
+                "model": r.get("model"),
+                "tokens": r.get("tokens")
+            }
+            for r in results
+        ]
+    }
@@ -2,10 +2,13 @@
 WebSocket API for recommendation chat.
 """
 
+import asyncio
 import logging
 import json
 import re
+import time
 import uuid
+from contextlib import aclosing
 from datetime import datetime
 from typing import Optional, List, Tuple, Dict, Any
 
@@ -14,6 +17,7 @@ from pydantic import BaseModel
 
 from agent_service.auth import validate_jwt_token
 from agent_service.core.connection_manager import manager
+from agent_service.core.chat_metrics import chat_metrics
 from agent_service.core.session_manager import SessionManager
 from agent_service.agents import ChatAgent
 
@@ -84,7 +88,9 @@ async def _handle_chat_connection(
     context_payload = context or {}
 
     try:
-        session_id, message_history = session_manager.get_or_create_session(
+        # Session storage and vision calls block: run them in worker threads, off the event loop
+        session_id, message_history = await asyncio.to_thread(
+            session_manager.get_or_create_session,
             user_id=user_id,
             recommendation_id=recommendation_id,
             scenario=scenario,
@@ -133,7 +139,7 @@ async def _handle_chat_connection(
                         question = cleaned_message if cleaned_message else (
                             "Что на этом изображении? Какие выводы по расходам или инфраструктуре?"
                         )
-                        result = vision_tools.analyze_screenshot(image_id, question, user_id)
+                        result = await asyncio.to_thread(vision_tools.analyze_screenshot, image_id, question, user_id)
 
                         if result.get('success'):
                             image_context += f"\n\n[Анализ загруженного изображения]:\n{result['analysis']}\n"
@@ -146,29 +152,76 @@ async def _handle_chat_connection(
                 if image_context:
                     cleaned_message = f"{image_context}\n\n{cleaned_message if cleaned_message else 'Пользователь загрузил изображение для анализа.'}"
 
-            session_manager.save_message(session_id, 'user', message)
+            await asyncio.to_thread(session_manager.save_message, session_id, 'user', message)
 
             await manager.send_message(session_id, {
                 'type': 'typing',
                 'timestamp': datetime.utcnow().isoformat()
             })
 
-            response, tokens = await chat_agent.process_message(
+            # Stream the answer: assistant_delta frames as text arrives, then the
+            # complete message once (it replaces the streamed text client-side)
+            message_id = str(uuid.uuid4())
+            started = time.monotonic()
+            first_token_at = None
+            streamed: List[str] = []
+            response, tokens = None, 0
+
+            async with aclosing(chat_agent.stream_message(
                 user_message=cleaned_message,
                 user_id=user_id,
                 scenario=scenario,
                 recommendation_id=recommendation_id,
                 context=context_payload,
                 chat_history=message_history
+            )) as events:
+                async for event in events:
+                    if event['type'] == 'done':
+                        response, tokens = event['content'], event['tokens']
+                        continue
+                    if event['type'] == 'reset':
+                        # Tool round started: the text streamed so far is not part of the answer
+                        streamed.clear()
+                        await manager.send_message(session_id, {
+                            'type': 'assistant_reset',
+                            'message_id': message_id
+                        })
+                        continue
+                    if first_token_at is None:
+                        first_token_at = time.monotonic()
+                    streamed.append(event['content'])
+                    await manager.send_message(session_id, {
+                        'type': 'assistant_delta',
+                        'message_id': message_id,
+                        'content': event['content']
+                    })
+                    if not manager.is_connected(session_id):
+                        # Client went away: stop generating, keep what was produced
+                        break
+
+            if response is None:
+                response = ''.join(streamed)
+
+            total_seconds = time.monotonic() - started
+            time_to_first_token = first_token_at - started if first_token_at is not None else None
+            chat_metrics.record(scenario, time_to_first_token, total_seconds, tokens)
+            logger.info(
+                "Chat answer: session=%s ttft=%s total=%.2fs tokens=%s",
+                session_id,
+                f"{time_to_first_token:.2f}s" if time_to_first_token is not None else 'n/a',
+                total_seconds,
+                tokens
             )
 
             await manager.send_message(session_id, {
                 'type': 'assistant',
+                'message_id': message_id,
                 'content': response,
                 'timestamp': datetime.utcnow().isoformat()
             })
 
-            session_manager.save_message(session_id, 'assistant', response, tokens=tokens)
+            if response:
+                await asyncio.to_thread(session_manager.save_message, session_id, 'assistant', response, tokens=tokens)
 
             message_history.append({
                 'role': 'user',
@@ -286,3 +339,12 @@ async def get_connection_count():
         'timestamp': datetime.utcnow().isoformat()
     }
 
+
+@router.get("/v1/chat/metrics")
+async def get_chat_metrics():
+    """Get time-to-first-token and response time percentiles of recent chat answers."""
+    return {
+        **chat_metrics.stats(),
+        'timestamp': datetime.utcnow().isoformat()
+    }
+
@@ -0,0 +1,66 @@
+"""
+In-process latency metrics for chat responses.
+"""
+
+import threading
+from collections import deque
+from typing import Deque, Dict, Optional, Tuple
+
+
+def _percentile(ordered, fraction: float) -> Optional[float]:
+    if not ordered:
+        return None
+    return round(ordered[min(len(ordered) - 1, int(len(ordered) * fraction))], 3)
+
+
+class ChatMetrics:
+    """
+    Rolling window of chat response timings.
+    
+    Time to first token is measured from the user's message arriving to the
+    first streamed chunk sent to the client (it includes context building and
+    any tool round-trip); total time runs until the final message is sent.
+    """
+    
+    def __init__(self, window: int = 500):
+        # (scenario, time_to_first_token or None, total_seconds, tokens)
+        self._samples: Deque[Tuple[str, Optional[float], float, int]] = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self._count = 0
+        
+    def record(self, scenario: str, time_to_first_token: Optional[float], total_seconds: float, tokens: int):
+        """Record one answered message."""
+        with self._lock:
+            self._samples.append((scenario, time_to_first_token, total_seconds, tokens or 0))
+            self._count += 1
+            
+    def stats(self) -> Dict:
+        """Percentiles over the window, overall and per scenario."""
+        with self._lock:
+            samples = list(self._samples)
+            count = self._count
+            
+        def summarize(rows) -> Dict:
+            ttft = sorted(row[1] for row in rows if row[1] is not None)
+            total = sorted(row[2] for row in rows)
+            return {
+                'messages': len(rows),
+                'time_to_first_token_p50': _percentile(ttft, 0.5),
+                'time_to_first_token_p95': _percentile(ttft, 0.95),
+                'total_seconds_p50': _percentile(total, 0.5),
+                'total_seconds_p95': _percentile(total, 0.95),
+                'tokens': sum(row[3] for row in rows)
+            }
+            
+        return {
+            'messages_total': count,
+            'window': summarize(samples),
+            'by_scenario': {
+                scenario: summarize([row for row in samples if row[0] == scenario])
+                for scenario in sorted({row[0] for row in samples})
+            }
+        }
+
+
+# Global singleton instance
+chat_metrics = ChatMetrics()
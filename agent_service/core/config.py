@@ -36,6 +36,9 @@ class Settings(BaseSettings):
     OPENAI_API_KEY: str = os.getenv("OPENAI_API_KEY", "")
     ANTHROPIC_API_KEY: str = os.getenv("ANTHROPIC_API_KEY", "")
     
+    # Concurrent LLM calls for batch recommendation text generation
+    AI_TEXT_BATCH_CONCURRENCY: int = int(os.getenv("AI_TEXT_BATCH_CONCURRENCY", "5"))
+    
     # Redis/Session store
     REDIS_URL: str = os.getenv("REDIS_URL", "redis://127.0.0.1:6379/0")
     
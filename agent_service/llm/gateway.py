@@ -3,7 +3,7 @@ LLM Gateway - Provider-agnostic interface to language models
 Supports OpenRouter, direct providers, and local models
 """
 import logging
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, AsyncIterator
 import json
 
 from agent_service.core.config import settings
@@ -135,6 +135,87 @@ class LLMGateway:
             'provider': 'openai'
         }
     
+    async def stream_chat(
+        self,
+        messages: List[Dict[str, Any]],
+        tools: Optional[List[Dict]] = None,
+        temperature: float = 0.7,
+        max_tokens: int = 1000,
+        model_override: Optional[str] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Stream a chat completion as it is generated
+        
+        Chat always goes through the OpenRouter client (get_async_llm_client),
+        whatever LLM_PROVIDER is set to, so model names are OpenRouter ones.
+        
+        Args:
+            messages: Chat messages (OpenAI format)
+            tools: Tool definitions the model may call
+            temperature: Sampling temperature (0.0-1.0)
+            max_tokens: Maximum tokens to generate
+            model_override: Override default model
+            
+        Yields:
+            {'type': 'delta', 'content': str} for each text chunk, then one
+            {'type': 'done', 'content', 'tool_calls', 'tokens', 'model', 'finish_reason'}.
+            Tool calls arrive in fragments and are only returned, assembled, in 'done'.
+        """
+        model = model_override or self.text_model
+        kwargs: Dict[str, Any] = {
+            'model': model,
+            'messages': messages,
+            'temperature': temperature,
+            'max_tokens': max_tokens,
+            'stream': True,
+            'stream_options': {'include_usage': True}
+        }
+        if tools:
+            kwargs.update(tools=tools, tool_choice='auto')
+        
+        stream = await get_async_llm_client().chat.completions.create(**kwargs)
+        parts: List[str] = []
+        tool_calls: Dict[int, Dict[str, Any]] = {}
+        tokens = 0
+        finish_reason = None
+        try:
+            async for chunk in stream:
+                if getattr(chunk, 'usage', None):
+                    tokens = chunk.usage.total_tokens or tokens
+                if not chunk.choices:
+                    continue
+                choice = chunk.choices[0]
+                finish_reason = choice.finish_reason or finish_reason
+                delta = choice.delta
+                if delta is None:
+                    continue
+                if delta.content:
+                    parts.append(delta.content)
+                    yield {'type': 'delta', 'content': delta.content}
+                for fragment in delta.tool_calls or []:
+                    call = tool_calls.setdefault(fragment.index, {
+                        'id': None,
+                        'type': 'function',
+                        'function': {'name': '', 'arguments': ''}
+                    })
+                    if fragment.id:
+                        call['id'] = fragment.id
+                    if fragment.function is not None:
+                        call['function']['name'] += fragment.function.name or ''
+                        call['function']['arguments'] += fragment.function.arguments or ''
+        finally:
+            # Stops the HTTP stream when the consumer gives up early (e.g. client disconnected)
+            await stream.close()
+        
+        yield {
+            'type': 'done',
+            'content': ''.join(parts),
+            'tool_calls': [tool_calls[index] for index in sorted(tool_calls)],
+            'tokens': tokens,
+            'model': model,
+            'finish_reason': finish_reason
+        }
+    
     def _generate_anthropic(
         self,
         prompt: str,
@@ -165,3 +246,22 @@ def get_llm_client():
             base_url="https://openrouter.ai/api/v1"
         )
     return _llm_client_instance
+
+
+_async_llm_client_instance = None
+
+def get_async_llm_client():
+    """
+    Get or create a singleton AsyncOpenAI client configured for OpenRouter.
+    Same API as get_llm_client(), but chat.completions.create() is awaitable,
+    so a slow completion does not block other WebSocket sessions.
+    """
+    global _async_llm_client_instance
+    if _async_llm_client_instance is None:
+        from openai import AsyncOpenAI
+        
+        _async_llm_client_instance = AsyncOpenAI(
+            api_key=settings.OPENROUTER_API_KEY,
+            base_url="https://openrouter.ai/api/v1"
+        )
+    return _async_llm_client_instance
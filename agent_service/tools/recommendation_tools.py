@@ -202,41 +202,36 @@ class RecommendationTools:
             
         Returns:
             Список SKU с ценами (топ 10 по возрастанию цены):
-            - sku, name, description
+            - sku
             - monthly_price (₽/мес)
             - specs (CPU, RAM, Storage)
             - region
         """
         try:
             with self.flask_app.app_context():
-                from app.core.models import ProviderPrice
+                from app.core.recommendations.price_catalog import price_catalog
                 
-                prices = ProviderPrice.query.filter_by(
-                    provider=provider.lower(),
-                    resource_type=resource_type.lower()
-                ).order_by(ProviderPrice.monthly_price.asc()).limit(10).all()
-                
-                if not prices:
+                entries = price_catalog.entries(provider.lower(), resource_type.lower())
+                if not entries:
                     return []
                 
+                # Cheapest first; rows without a monthly price go last
+                entries = sorted(entries, key=lambda e: (e.sku.monthly_cost is None, e.sku.monthly_cost or 0.0))[:10]
+                
                 result = []
-                for price in prices:
-                    # Parse specs
-                    specs = {}
-                    if price.specs:
-                        try:
-                            specs = json.loads(price.specs) if isinstance(price.specs, str) else price.specs
-                        except:
-                            pass
-                    
+                for entry in entries:
+                    sku = entry.sku
                     result.append({
-                        'sku': price.sku,
-                        'name': price.name,
-                        'description': price.description,
-                        'monthly_price': float(price.monthly_price) if price.monthly_price else 0,
-                        'specs': specs,
-                        'region': price.region,
-                        'currency': price.currency
+                        'sku': sku.sku_id,
+                        'monthly_price': sku.monthly_cost or 0,
+                        'specs': {
+                            'cpu_cores': sku.vcpu,
+                            'ram_gb': sku.memory_gib,
+                            'storage_gb': sku.storage_included_gib,
+                            'storage_type': sku.storage_type,
+                        },
+                        'region': sku.region,
+                        'currency': sku.currency
                     })
                 
                 return result
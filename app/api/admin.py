@@ -910,9 +910,12 @@ def get_pricing_statistics():
         
         statistics = price_update_service.get_pricing_statistics()
         
+        from app.core.recommendations.price_catalog import price_catalog
+        
         return jsonify({
             'success': True,
-            'statistics': statistics
+            'statistics': statistics,
+            'catalog_cache': price_catalog.stats()
         })
             
     except Exception as e:
@@ -922,6 +925,20 @@ def get_pricing_statistics():
             'error': f'Failed to get pricing statistics: {str(e)}'
         })
 
+@admin_bp.route('/analytics/cache', methods=['GET'])
+def get_analytics_cache_statistics():
+    """Get analytics response cache statistics (admin only)"""
+    admin_check = require_admin()
+    if admin_check:
+        return admin_check
+    
+    from app.core.services.analytics_cache import analytics_cache
+    
+    return jsonify({
+        'success': True,
+        'analytics_cache': analytics_cache.stats()
+    })
+
 @admin_bp.route('/providers/<int:provider_id>/pricing', methods=['GET'])
 def get_provider_pricing(provider_id):
     """Get pricing data for a specific provider (admin only)"""
@@ -1370,14 +1387,15 @@ def bulk_sync_all_users():
         
         # Get sync type from request (default: manual when triggered from admin)
         sync_type = request.json.get('sync_type', 'manual') if request.is_json else 'manual'
+        max_workers = request.json.get('max_workers') if request.is_json else None
         
-        logger.info(f"Admin initiated bulk sync for all users (sync_type: {sync_type})")
+        logger.info(f"Admin initiated bulk sync for all users (sync_type: {sync_type}, max_workers: {max_workers})")
         
         # Create bulk sync service
         bulk_sync_service = BulkSyncService()
         
         # Execute bulk sync
-        result = bulk_sync_service.sync_all_users(sync_type=sync_type)
+        result = bulk_sync_service.sync_all_users(sync_type=sync_type, max_workers=max_workers)
         
         if result.get('success'):
             return jsonify({
@@ -1388,6 +1406,7 @@ def bulk_sync_all_users():
                 'failed_users': result.get('failed_users'),
                 'skipped_users': result.get('skipped_users'),
                 'duration_seconds': result.get('duration_seconds'),
+                'throughput': result.get('throughput'),
                 'user_results': result.get('user_results', [])
             })
         else:
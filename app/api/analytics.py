@@ -5,26 +5,50 @@ from flask import Blueprint, request, jsonify, session
 from datetime import datetime, timedelta
 
 from app.core.services.analytics_service import AnalyticsService
+from app.core.services.analytics_cache import analytics_cache
 
 analytics_bp = Blueprint('analytics', __name__)
 
 
+def _cached_response(build, recommendations: bool = False):
+    """
+    Serve `build(service)` for the current user from the analytics cache
+    
+    Payloads are cached per user, path and query string, versioned by the
+    user's latest complete sync (and recommendation changes when
+    `recommendations` is set). Responses carry an ETag and answer a matching
+    If-None-Match with 304.
+    """
+    if 'user' not in session:
+        return jsonify({'success': False, 'error': 'Authentication required'}), 401
+    
+    user_id = int(float(session['user']['id']))
+    analytics_service = AnalyticsService(user_id)
+    version = analytics_service.data_version(include_recommendations=recommendations)
+    key = (request.path, tuple(sorted(request.args.items(multi=True))))
+    
+    cached = analytics_cache.get(user_id, key, version)
+    if cached is None:
+        cached = analytics_cache.put(user_id, key, version, build(analytics_service))
+    etag, payload = cached
+    
+    response = jsonify({
+        'success': True,
+        'data': payload
+    })
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    response = response.make_conditional(request)
+    if response.status_code == 304:
+        analytics_cache.record_not_modified()
+    return response
+
+
 @analytics_bp.route('/api/analytics/summary', methods=['GET'])
 def get_executive_summary():
     """Get executive summary KPIs"""
     try:
-        if 'user' not in session:
-            return jsonify({'success': False, 'error': 'Authentication required'}), 401
-        
-        user_id = int(float(session['user']['id']))
-        analytics_service = AnalyticsService(user_id)
-        
-        summary = analytics_service.get_executive_summary()
-        
-        return jsonify({
-            'success': True,
-            'data': summary
-        })
+        return _cached_response(lambda service: service.get_executive_summary(), recommendations=True)
     except Exception as e:
         return jsonify({
             'success': False,
@@ -36,36 +60,26 @@ def get_executive_summary():
 def get_main_trends():
     """Get main spending trends for primary chart"""
     try:
-        if 'user' not in session:
-            return jsonify({'success': False, 'error': 'Authentication required'}), 401
-        
-        user_id = int(float(session['user']['id']))
-        analytics_service = AnalyticsService(user_id)
-        
         # Get parameters
         days = request.args.get('days', 30, type=int)
-        provider = request.args.get('provider', None)
         
-        # Get chart data
-        trends_data = analytics_service.get_main_spending_trends(days)
-        
-        # Format data for Chart.js
-        chart_data = {
-            'labels': [item['date'] for item in trends_data],
-            'datasets': [{
-                'label': 'Общие расходы',
-                'data': [item['total_cost'] for item in trends_data],
-                'borderColor': '#1e40af',
-                'backgroundColor': 'rgba(30, 64, 175, 0.1)',
-                'tension': 0.4,
-                'fill': True
-            }]
-        }
+        def build(analytics_service):
+            trends_data = analytics_service.get_main_spending_trends(days)
+            
+            # Format data for Chart.js
+            return {
+                'labels': [item['date'] for item in trends_data],
+                'datasets': [{
+                    'label': 'Общие расходы',
+                    'data': [item['total_cost'] for item in trends_data],
+                    'borderColor': '#1e40af',
+                    'backgroundColor': 'rgba(30, 64, 175, 0.1)',
+                    'tension': 0.4,
+                    'fill': True
+                }]
+            }
         
-        return jsonify({
-            'success': True,
-            'data': chart_data
-        })
+        return _cached_response(build)
     except Exception as e:
         return jsonify({
             'success': False,
@@ -77,25 +91,20 @@ def get_main_trends():
 def get_service_breakdown():
     """Get service analysis for bar chart"""
     try:
-        user_id = int(float(session['user']['id']))
-        analytics_service = AnalyticsService(user_id)
-        
-        service_data = analytics_service.get_service_analysis()
-        
-        # Format data for Chart.js bar chart
-        chart_data = {
-            'labels': [service['name'] for service in service_data['services']],
-            'datasets': [{
-                'label': 'Стоимость (₽/день)',
-                'data': [service['cost'] for service in service_data['services']],
-                'backgroundColor': ['#1e40af', '#10b981', '#f59e0b', '#ef4444', '#8b5cf6']
-            }]
-        }
+        def build(analytics_service):
+            service_data = analytics_service.get_service_analysis()
+            
+            # Format data for Chart.js bar chart
+            return {
+                'labels': [service['name'] for service in service_data['services']],
+                'datasets': [{
+                    'label': 'Стоимость (₽/день)',
+                    'data': [service['cost'] for service in service_data['services']],
+                    'backgroundColor': ['#1e40af', '#10b981', '#f59e0b', '#ef4444', '#8b5cf6']
+                }]
+            }
         
-        return jsonify({
-            'success': True,
-            'data': chart_data
-        })
+        return _cached_response(build)
     except Exception as e:
         return jsonify({
             'success': False,
@@ -107,25 +116,20 @@ def get_service_breakdown():
 def get_provider_breakdown():
     """Get provider breakdown for pie chart"""
     try:
-        user_id = int(float(session['user']['id']))
-        analytics_service = AnalyticsService(user_id)
-        
-        provider_data = analytics_service.get_provider_breakdown()
-        
-        # Format data for Chart.js doughnut chart
-        chart_data = {
-            'labels': [provider['name'] for provider in provider_data['providers']],
-            'datasets': [{
-                'label': 'Стоимость (₽/день)',
-                'data': [provider['cost'] for provider in provider_data['providers']],
-                'backgroundColor': ['#1e40af', '#10b981', '#f59e0b', '#ef4444', '#8b5cf6']
-            }]
-        }
+        def build(analytics_service):
+            provider_data = analytics_service.get_provider_breakdown()
+            
+            # Format data for Chart.js doughnut chart
+            return {
+                'labels': [provider['name'] for provider in provider_data['providers']],
+                'datasets': [{
+                    'label': 'Стоимость (₽/день)',
+                    'data': [provider['cost'] for provider in provider_data['providers']],
+                    'backgroundColor': ['#1e40af', '#10b981', '#f59e0b', '#ef4444', '#8b5cf6']
+                }]
+            }
         
-        return jsonify({
-            'success': True,
-            'data': chart_data
-        })
+        return _cached_response(build)
     except Exception as e:
         return jsonify({
             'success': False,
@@ -137,31 +141,26 @@ def get_provider_breakdown():
 def get_provider_trends(provider_id):
     """Get individual provider spending trends"""
     try:
-        user_id = int(float(session['user']['id']))
-        analytics_service = AnalyticsService(user_id)
-        
         # Get parameters
         days = request.args.get('days', 30, type=int)
         
-        trends_data = analytics_service.get_provider_trends(provider_id, days)
-        
-        # Format data for Chart.js line chart
-        chart_data = {
-            'labels': [item['date'] for item in trends_data],
-            'datasets': [{
-                'label': f'Расходы провайдера {provider_id}',
-                'data': [item['total_cost'] for item in trends_data],
-                'borderColor': '#10b981',
-                'backgroundColor': 'rgba(16, 185, 129, 0.1)',
-                'tension': 0.4,
-                'fill': True
-            }]
-        }
+        def build(analytics_service):
+            trends_data = analytics_service.get_provider_trends(provider_id, days)
+            
+            # Format data for Chart.js line chart
+            return {
+                'labels': [item['date'] for item in trends_data],
+                'datasets': [{
+                    'label': f'Расходы провайдера {provider_id}',
+                    'data': [item['total_cost'] for item in trends_data],
+                    'borderColor': '#10b981',
+                    'backgroundColor': 'rgba(16, 185, 129, 0.1)',
+                    'tension': 0.4,
+                    'fill': True
+                }]
+            }
         
-        return jsonify({
-            'success': True,
-            'data': chart_data
-        })
+        return _cached_response(build)
     except Exception as e:
         return jsonify({
             'success': False,
@@ -173,15 +172,7 @@ def get_provider_trends(provider_id):
 def get_implemented_recommendations():
     """Get implemented recommendations"""
     try:
-        user_id = int(float(session['user']['id']))
-        analytics_service = AnalyticsService(user_id)
-        
-        recommendations = analytics_service.get_implemented_recommendations()
-        
-        return jsonify({
-            'success': True,
-            'data': recommendations
-        })
+        return _cached_response(lambda service: service.get_implemented_recommendations(), recommendations=True)
     except Exception as e:
         return jsonify({
             'success': False,
@@ -193,15 +184,7 @@ def get_implemented_recommendations():
 def get_optimization_opportunities():
     """Get pending optimization opportunities"""
     try:
-        user_id = int(float(session['user']['id']))
-        analytics_service = AnalyticsService(user_id)
-        
-        opportunities = analytics_service.get_optimization_opportunities()
-        
-        return jsonify({
-            'success': True,
-            'data': opportunities
-        })
+        return _cached_response(lambda service: service.get_optimization_opportunities(), recommendations=True)
     except Exception as e:
         return jsonify({
             'success': False,
@@ -1,16 +1,31 @@
 """
 Complete Sync API endpoints
 """
-from flask import Blueprint, request, jsonify, session
+import json
+import time
+from flask import Blueprint, Response, current_app, request, jsonify, session, stream_with_context, url_for
+from app.core.database import db
+from app.core.models.sync_job import ACTIVE_STATUSES
 from app.core.services.complete_sync_service import CompleteSyncService
+from app.core.services.sync_job_service import SyncJobService, start_inprocess_workers
 from app.api.auth import check_demo_user_write_access
 
 # Create blueprint
 complete_sync_bp = Blueprint('complete_sync', __name__)
 
+@complete_sync_bp.before_app_request
+def ensure_sync_job_workers():
+    """
+    Start the in-process sync job workers with the first request after a restart
+    
+    Jobs queued or left running before the restart are then claimed or reaped
+    without waiting for the next successful enqueue.
+    """
+    start_inprocess_workers(wake=False)
+
 @complete_sync_bp.route('/api/complete-sync', methods=['POST'])
 def start_complete_sync():
-    """Start a complete sync operation for all auto-sync enabled providers"""
+    """Queue a complete sync for all auto-sync enabled providers (runs in a background job)"""
     try:
         if 'user' not in session:
             return jsonify({'success': False, 'error': 'Authentication required'}), 401
@@ -23,34 +38,30 @@ def start_complete_sync():
         user_id = int(float(session['user']['id']))
         sync_type = request.json.get('sync_type', 'manual') if request.is_json else 'manual'
         
-        # Create complete sync service
-        complete_sync_service = CompleteSyncService(user_id)
-        
-        # Start complete sync
-        result = complete_sync_service.start_complete_sync(sync_type)
+        result = SyncJobService(user_id).enqueue_complete_sync(sync_type)
         
-        if result['success']:
-            return jsonify({
-                'success': True,
-                'message': 'Complete sync started successfully',
-                'complete_sync_id': result['complete_sync_id'],
-                'sync_status': result['sync_status'],
-                'total_providers_synced': result['total_providers_synced'],
-                'successful_providers': result['successful_providers'],
-                'failed_providers': result['failed_providers'],
-                'total_resources_found': result['total_resources_found'],
-                'total_daily_cost': result['total_daily_cost'],
-                'total_monthly_cost': result['total_monthly_cost'],
-                'cost_by_provider': result['cost_by_provider'],
-                'resources_by_provider': result['resources_by_provider'],
-                'sync_duration_seconds': result['sync_duration_seconds']
-            })
-        else:
+        if not result['success']:
+            # One sync per user at a time: point the client at the job already in progress
+            job = result.get('job')
             return jsonify({
                 'success': False,
                 'error': result['error'],
-                'message': result.get('message', 'Complete sync failed')
-            }), 500
+                'message': 'A sync is already in progress',
+                'job_id': job['id'] if job else None,
+                'job': job,
+                'status_url': url_for('complete_sync.get_sync_job', job_id=job['id']) if job else None,
+                'events_url': url_for('complete_sync.stream_sync_job', job_id=job['id']) if job else None
+            }), 409
+        
+        job = result['job']
+        return jsonify({
+            'success': True,
+            'message': 'Complete sync queued',
+            'job_id': job['id'],
+            'job': job,
+            'status_url': url_for('complete_sync.get_sync_job', job_id=job['id']),
+            'events_url': url_for('complete_sync.stream_sync_job', job_id=job['id'])
+        }), 202
         
     except Exception as e:
         return jsonify({
@@ -59,6 +70,100 @@ def start_complete_sync():
             'message': 'Complete sync failed due to system error'
         }), 500
 
+@complete_sync_bp.route('/api/sync-jobs/<int:job_id>', methods=['GET'])
+def get_sync_job(job_id):
+    """Get status and progress of a sync job"""
+    if 'user' not in session:
+        return jsonify({'success': False, 'error': 'Authentication required'}), 401
+    
+    user_id = int(float(session['user']['id']))
+    job = SyncJobService(user_id).get_job(job_id)
+    if job is None:
+        return jsonify({'success': False, 'error': 'Sync job not found'}), 404
+    return jsonify({'success': True, 'job': job.to_dict()})
+
+@complete_sync_bp.route('/api/sync-jobs/active', methods=['GET'])
+def get_active_sync_job():
+    """Get the user's queued or running sync job, if any"""
+    if 'user' not in session:
+        return jsonify({'success': False, 'error': 'Authentication required'}), 401
+    
+    user_id = int(float(session['user']['id']))
+    job = SyncJobService(user_id).get_active_job()
+    return jsonify({'success': True, 'job': job.to_dict() if job else None})
+
+@complete_sync_bp.route('/api/sync-jobs/<int:job_id>/cancel', methods=['POST'])
+def cancel_sync_job(job_id):
+    """Cancel a queued job, or stop a running one before its next provider sync"""
+    if 'user' not in session:
+        return jsonify({'success': False, 'error': 'Authentication required'}), 401
+    
+    demo_check = check_demo_user_write_access()
+    if demo_check:
+        return demo_check
+    
+    user_id = int(float(session['user']['id']))
+    result = SyncJobService(user_id).cancel(job_id)
+    if result['success']:
+        return jsonify(result)
+    return jsonify(result), 404 if 'job' not in result else 409
+
+@complete_sync_bp.route('/api/sync-jobs/<int:job_id>/events', methods=['GET'])
+def stream_sync_job(job_id):
+    """
+    Server-sent events with the job's progress
+    
+    Emits a `progress` event whenever the job row changes and a final `done`
+    event once it has finished. The session is closed between polls, so an
+    open stream does not hold a database connection.
+    """
+    if 'user' not in session:
+        return jsonify({'success': False, 'error': 'Authentication required'}), 401
+    
+    user_id = int(float(session['user']['id']))
+    service = SyncJobService(user_id)
+    if service.get_job(job_id) is None:
+        return jsonify({'success': False, 'error': 'Sync job not found'}), 404
+    db.session.close()
+    
+    poll_seconds = current_app.config.get('SYNC_JOB_STREAM_POLL_SECONDS', 1.0)
+    max_seconds = current_app.config.get('SYNC_JOB_STREAM_SECONDS', 900)
+    
+    def event(name, payload):
+        return f"event: {name}\ndata: {json.dumps(payload, default=str)}\n\n"
+    
+    def generate():
+        deadline = time.monotonic() + max_seconds
+        last_version = None
+        last_sent = time.monotonic()
+        yield 'retry: 3000\n\n'
+        while True:
+            job = service.get_job(job_id, refresh=True)
+            state = job.to_dict() if job else None
+            db.session.close()
+            if state is None:
+                yield event('error', {'error': 'Sync job not found'})
+                return
+            if state['progress_version'] != last_version:
+                last_version = state['progress_version']
+                last_sent = time.monotonic()
+                yield event('progress', state)
+            if state['status'] not in ACTIVE_STATUSES:
+                yield event('done', state)
+                return
+            if time.monotonic() >= deadline:
+                # The client reconnects (EventSource retry) and resumes from the current state
+                return
+            if time.monotonic() - last_sent >= 15:
+                last_sent = time.monotonic()
+                yield ': keepalive\n\n'
+            time.sleep(poll_seconds)
+    
+    return Response(stream_with_context(generate()), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+
 @complete_sync_bp.route('/api/complete-sync/<int:complete_sync_id>', methods=['GET'])
 def get_complete_sync_status(complete_sync_id):
     """Get status of a specific complete sync"""
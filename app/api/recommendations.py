@@ -1,6 +1,8 @@
 """
 Recommendations API: list, detail, and actions
 """
+import base64
+import json
 from flask import Blueprint, request, jsonify, session
 from datetime import datetime, timedelta
 from sqlalchemy import or_, and_, desc, asc
@@ -14,6 +16,9 @@ from app.core.models.complete_sync import CompleteSync
 
 recommendations_bp = Blueprint('recommendations', __name__)
 
+# Sort fields that support cursor (keyset) pagination; both are non-NULL
+KEYSET_FIELDS = ('estimated_monthly_savings', 'created_at')
+
 
 def _parse_float(value, default=None):
     try:
@@ -22,6 +27,28 @@ def _parse_float(value, default=None):
         return default
 
 
+def _encode_cursor(rec: OptimizationRecommendation, field: str) -> str:
+    value = getattr(rec, field)
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    payload = json.dumps([value, rec.id], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def _decode_cursor(cursor: str, field: str):
+    """(sort value, id) from a cursor produced by _encode_cursor, or None if malformed"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        value, rec_id = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        if field == 'created_at':
+            value = datetime.fromisoformat(value)
+        else:
+            value = float(value or 0.0)
+        return value, int(rec_id)
+    except (ValueError, TypeError):
+        return None
+
+
 def _serialize(rec: OptimizationRecommendation):
     provider_code = None
     connection_name = None
@@ -124,7 +151,9 @@ def list_recommendations():
     if max_savings is not None:
         query = query.filter((OptimizationRecommendation.estimated_monthly_savings <= max_savings) | (OptimizationRecommendation.potential_savings <= max_savings))
     # confidence filter removed
-    # Search will be handled on the client side for better Unicode support
+    # Search: every term must occur in the case-folded title / description / resource name
+    for term in OptimizationRecommendation.normalize_search(q).split():
+        query = query.filter(OptimizationRecommendation.search_text.contains(term, autoescape=True))
     if date_from:
         try:
             df = datetime.fromisoformat(date_from)
@@ -142,6 +171,7 @@ def list_recommendations():
     order_by = request.args.get('order_by', '-estimated_monthly_savings')
     page = int(request.args.get('page', 1))
     page_size = min(int(request.args.get('page_size', 25)), 200)
+    cursor = request.args.get('cursor')
 
     if order_by.startswith('-'):
         field = order_by[1:]
@@ -156,17 +186,38 @@ def list_recommendations():
         'created_at': OptimizationRecommendation.created_at,
         'severity': OptimizationRecommendation.severity,
     }
-    if field in sortable:
-        query = query.order_by(direction(sortable[field]))
-    else:
-        query = query.order_by(desc(OptimizationRecommendation.created_at))
+    if field not in sortable:
+        field, direction = 'created_at', desc
+    sort_column = sortable[field]
+    # id breaks ties so pages never overlap or skip rows
+    query = query.order_by(direction(sort_column), direction(OptimizationRecommendation.id))
+
+    if field in KEYSET_FIELDS and cursor is not None:
+        # Keyset pagination (cursor='' for the first page): continue after the last row of the previous page
+        if cursor:
+            position = _decode_cursor(cursor, field)
+            if position is None:
+                return jsonify({'error': 'Invalid cursor'}), 400
+            value, last_id = position
+            after = sort_column < value if direction is desc else sort_column > value
+            after_id = OptimizationRecommendation.id < last_id if direction is desc else OptimizationRecommendation.id > last_id
+            query = query.filter(or_(after, and_(sort_column == value, after_id)))
+        rows = query.limit(page_size + 1).all()
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+        return jsonify({
+            'items': [_serialize(rec) for rec in rows],
+            'page_size': page_size,
+            'next_cursor': _encode_cursor(rows[-1], field) if has_more else None
+        })
 
     items = query.paginate(page=page, per_page=page_size, error_out=False)
     return jsonify({
         'items': [_serialize(rec) for rec in items.items],
         'page': items.page,
         'page_size': items.per_page,
-        'total': items.total
+        'total': items.total,
+        'next_cursor': _encode_cursor(items.items[-1], field) if field in KEYSET_FIELDS and items.has_next else None
     })
 
 
@@ -47,6 +47,9 @@ class Config:
     # Feature Flags
     ENABLE_AI_RECOMMENDATIONS = os.environ.get('ENABLE_AI_RECOMMENDATIONS', 'true').lower() == 'true'
     AGENT_SERVICE_URL = os.environ.get('AGENT_SERVICE_URL', 'http://127.0.0.1:8001')
+    # AI recommendation texts are generated in the background, in batches sent to the agent
+    AI_TEXT_BATCH_SIZE = int(os.environ.get('AI_TEXT_BATCH_SIZE', '20'))
+    AI_TEXT_BATCH_TIMEOUT = int(os.environ.get('AI_TEXT_BATCH_TIMEOUT', '300'))  # seconds per batch request
     
     # JWT Configuration (for agent service authentication)
     JWT_SECRET_KEY = os.environ.get('JWT_SECRET_KEY') or 'dev-jwt-secret-change-in-production'
@@ -71,6 +74,32 @@ class Config:
     # Only create recommendations if savings are significant enough to matter
     PRICE_CHECK_MIN_SAVINGS_RUB = float(os.environ.get('PRICE_CHECK_MIN_SAVINGS_RUB', '100'))  # Min 100 RUB/month
     PRICE_CHECK_MIN_SAVINGS_PERCENT = float(os.environ.get('PRICE_CHECK_MIN_SAVINGS_PERCENT', '10'))  # Or 10% improvement
+    # How often the in-memory normalized price catalog re-checks provider_prices for changes from other processes
+    PRICE_CATALOG_CHECK_SECONDS = int(os.environ.get('PRICE_CATALOG_CHECK_SECONDS', '60'))
+    # Per-user /api/analytics payloads kept in memory (invalidated by a new complete sync)
+    ANALYTICS_CACHE_MAX_ENTRIES = int(os.environ.get('ANALYTICS_CACHE_MAX_ENTRIES', '2000'))
+
+    # Beget configurator price crawl (cpu x memory x disk grid per region)
+    # BEGET_PRICING_INFER_MODEL: fit a linear price model from a sparse sample and fill the rest of the grid
+    BEGET_PRICING_MAX_WORKERS = int(os.environ.get('BEGET_PRICING_MAX_WORKERS', '6'))
+    BEGET_PRICING_REQUESTS_PER_SECOND = float(os.environ.get('BEGET_PRICING_REQUESTS_PER_SECOND', '5'))
+    BEGET_PRICING_MAX_RETRIES = int(os.environ.get('BEGET_PRICING_MAX_RETRIES', '3'))
+    BEGET_PRICING_PROGRESS_DIR = os.environ.get('BEGET_PRICING_PROGRESS_DIR', '')
+    BEGET_PRICING_INFER_MODEL = os.environ.get('BEGET_PRICING_INFER_MODEL', 'false').lower() == 'true'
+
+    # Yandex Cloud API transport: requests in flight per client (folder/resource-kind fan-out)
+    # and retries on 429/5xx with exponential backoff
+    YANDEX_API_MAX_IN_FLIGHT = int(os.environ.get('YANDEX_API_MAX_IN_FLIGHT', '8'))
+    YANDEX_API_MAX_RETRIES = int(os.environ.get('YANDEX_API_MAX_RETRIES', '3'))
+    # Instances per multi-series Monitoring query when collecting VM CPU statistics
+    YANDEX_MONITORING_BATCH_SIZE = int(os.environ.get('YANDEX_MONITORING_BATCH_SIZE', '50'))
+    # Servers whose CPU/memory statistics are fetched concurrently (Selectel, Beget)
+    PERFORMANCE_STATS_MAX_WORKERS = int(os.environ.get('PERFORMANCE_STATS_MAX_WORKERS', '6'))
+    # Selectel OpenStack listings (servers/volumes/shares/ports per project and region) fetched concurrently per sync
+    SELECTEL_INVENTORY_MAX_WORKERS = int(os.environ.get('SELECTEL_INVENTORY_MAX_WORKERS', '6'))
+    # Selectel flavor lists are cached per region/project; project-scoped Keystone tokens until shortly before expiry
+    SELECTEL_FLAVOR_CACHE_TTL_SECONDS = int(os.environ.get('SELECTEL_FLAVOR_CACHE_TTL_SECONDS', '3600'))
+    SELECTEL_TOKEN_REFRESH_MARGIN_SECONDS = int(os.environ.get('SELECTEL_TOKEN_REFRESH_MARGIN_SECONDS', '300'))
     
     # Cleanup recommendation thresholds
     SNAPSHOT_CLEANUP_AGE_DAYS = int(os.environ.get('SNAPSHOT_CLEANUP_AGE_DAYS', '180'))  # Delete snapshots older than 6 months
@@ -81,6 +110,39 @@ class Config:
     _DISABLED_RAW = os.environ.get('RECOMMENDATION_RULES_DISABLED', '')
     RECOMMENDATION_RULES_DISABLED = set([s.strip() for s in _DISABLED_RAW.split(',') if s.strip()])
 
+    # Resource rule evaluation across worker processes (1 = in the sync process)
+    # Each worker opens its own DB connection; small inventories stay serial (process start-up dominates)
+    RECOMMENDATION_EVALUATION_WORKERS = int(os.environ.get('RECOMMENDATION_EVALUATION_WORKERS', '1'))
+    RECOMMENDATION_PARALLEL_MIN_RESOURCES = int(os.environ.get('RECOMMENDATION_PARALLEL_MIN_RESOURCES', '2000'))
+
+    # Bulk sync concurrency (nightly sync across all users)
+    # BULK_SYNC_MAX_WORKERS: number of users synced at the same time (1 = sequential)
+    # BULK_SYNC_PROVIDER_LIMITS: max concurrent syncs per provider type, e.g. "yandex:2,selectel:2,beget:3"
+    BULK_SYNC_MAX_WORKERS = int(os.environ.get('BULK_SYNC_MAX_WORKERS', '4'))
+    _PROVIDER_LIMITS_RAW = os.environ.get('BULK_SYNC_PROVIDER_LIMITS', 'yandex:2,selectel:2,beget:3')
+    BULK_SYNC_PROVIDER_LIMITS = dict(
+        (k.strip(), int(v)) for k, v in (p.split(':', 1) for p in _PROVIDER_LIMITS_RAW.split(',') if ':' in p)
+    )
+
+    # Complete sync: run a user's provider syncs concurrently
+    # Each worker holds its own DB connection, keep workers x bulk workers below the pool size
+    COMPLETE_SYNC_PARALLEL = os.environ.get('COMPLETE_SYNC_PARALLEL', 'true').lower() == 'true'
+    COMPLETE_SYNC_MAX_WORKERS = int(os.environ.get('COMPLETE_SYNC_MAX_WORKERS', '3'))
+
+    # Background sync jobs (POST /api/complete-sync queues a job and returns at once)
+    # SYNC_JOB_INPROCESS_WORKERS: run jobs in the web process; set false when scripts/sync_job_worker.py runs them
+    # SYNC_JOB_STALE_SECONDS: a running job without a heartbeat for this long is marked failed
+    # SYNC_JOB_QUEUE_TIMEOUT_SECONDS: a queued job no worker claimed for this long is marked failed
+    SYNC_JOB_WORKERS = int(os.environ.get('SYNC_JOB_WORKERS', '2'))
+    SYNC_JOB_INPROCESS_WORKERS = os.environ.get('SYNC_JOB_INPROCESS_WORKERS', 'true').lower() == 'true'
+    SYNC_JOB_POLL_SECONDS = float(os.environ.get('SYNC_JOB_POLL_SECONDS', '5'))
+    SYNC_JOB_HEARTBEAT_SECONDS = int(os.environ.get('SYNC_JOB_HEARTBEAT_SECONDS', '30'))
+    SYNC_JOB_STALE_SECONDS = int(os.environ.get('SYNC_JOB_STALE_SECONDS', '300'))
+    SYNC_JOB_QUEUE_TIMEOUT_SECONDS = int(os.environ.get('SYNC_JOB_QUEUE_TIMEOUT_SECONDS', '1800'))
+    # Progress event streams poll the job row at this interval and close after SYNC_JOB_STREAM_SECONDS
+    SYNC_JOB_STREAM_POLL_SECONDS = float(os.environ.get('SYNC_JOB_STREAM_POLL_SECONDS', '1'))
+    SYNC_JOB_STREAM_SECONDS = int(os.environ.get('SYNC_JOB_STREAM_SECONDS', '900'))
+
 class DevelopmentConfig(Config):
     """Development configuration"""
     DEBUG = True
@@ -17,6 +17,7 @@ from .recommendations import OptimizationRecommendation
 from .recommendation_settings import RecommendationRuleSetting
 from .sync import SyncSnapshot, ResourceState
 from .complete_sync import CompleteSync, ProviderSyncReference
+from .sync_job import SyncJob
 from .unrecognized_resource import UnrecognizedResource
 from .provider_catalog import ProviderCatalog
 from .pricing import ProviderPrice, PriceHistory, PriceComparisonRecommendation
@@ -28,6 +29,7 @@ from .board_group import BoardGroup
 from .user_provider_preference import UserProviderPreference
 from .chat import ChatSession, ChatMessage, ChatSessionStatus, ChatMessageRole
 from .report import GeneratedReport, ReportStatus
+from .analytics import AnalyticsDailyAggregate
 
 __all__ = [
     'db',
@@ -48,6 +50,7 @@ __all__ = [
     'ResourceState',
     'CompleteSync',
     'ProviderSyncReference',
+    'SyncJob',
     'UnrecognizedResource',
     'ProviderCatalog',
     'ProviderPrice',
@@ -64,5 +67,6 @@ __all__ = [
     'ChatSessionStatus',
     'ChatMessageRole',
     'GeneratedReport',
-    'ReportStatus'
+    'ReportStatus',
+    'AnalyticsDailyAggregate'
 ]
\ No newline at end of file
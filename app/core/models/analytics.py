@@ -0,0 +1,57 @@
+"""
+Analytics aggregate model - per-day cost and count rollups written after each complete sync
+"""
+from app.core.database import db
+from .base import BaseModel
+
+
+class AnalyticsDailyAggregate(BaseModel):
+    """Latest complete-sync totals per user and day, by provider and by service
+
+    One row per (user, day, scope, dimension, dimension_key). `dimension` is
+    'total' (empty key), 'provider' (connection name) or 'service' (service
+    name). `scope` 'latest' holds the day's latest complete sync of any status
+    and 'success' the day's latest successful one, so a partial sync later in
+    the day does not hide the successful data the success-only charts read.
+    """
+
+    __tablename__ = 'analytics_daily_aggregates'
+
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    day = db.Column(db.Date, nullable=False)
+    scope = db.Column(db.String(10), nullable=False, default='latest')  # latest, success
+    dimension = db.Column(db.String(20), nullable=False)  # total, provider, service
+    dimension_key = db.Column(db.String(255), nullable=False, default='')
+    provider_id = db.Column(db.Integer, db.ForeignKey('cloud_providers.id'), nullable=True)
+    complete_sync_id = db.Column(db.Integer, db.ForeignKey('complete_syncs.id'), nullable=False, index=True)
+    sync_status = db.Column(db.String(20), nullable=False)  # status of the complete sync
+    synced_at = db.Column(db.DateTime, nullable=False)
+
+    daily_cost = db.Column(db.Float, default=0.0)
+    monthly_cost = db.Column(db.Float, default=0.0)
+    resource_count = db.Column(db.Integer, default=0)
+    provider_count = db.Column(db.Integer, default=0)
+
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'day', 'scope', 'dimension', 'dimension_key', name='uq_analytics_daily_aggregate'),
+        db.Index('idx_analytics_user_dimension_day', 'user_id', 'dimension', 'day'),
+    )
+
+    def to_dict(self):
+        """Convert to dictionary for API responses"""
+        return {
+            'day': self.day.isoformat() if self.day else None,
+            'scope': self.scope,
+            'dimension': self.dimension,
+            'key': self.dimension_key,
+            'provider_id': self.provider_id,
+            'complete_sync_id': self.complete_sync_id,
+            'sync_status': self.sync_status,
+            'daily_cost': self.daily_cost,
+            'monthly_cost': self.monthly_cost,
+            'resource_count': self.resource_count,
+            'provider_count': self.provider_count,
+        }
+
+    def __repr__(self):
+        return f'<AnalyticsDailyAggregate user={self.user_id} {self.day} {self.dimension}:{self.dimension_key}>'
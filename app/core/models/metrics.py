@@ -14,21 +14,36 @@ class ResourceMetric(BaseModel):
     metric_unit = db.Column(db.String(20))
     timestamp = db.Column(db.DateTime, nullable=False, index=True)
     
+    __table_args__ = (
+        db.Index('ix_resource_metrics_series', 'resource_id', 'metric_name', 'timestamp'),
+    )
+    
     def __repr__(self):
         return f'<ResourceMetric {self.metric_name}:{self.metric_value}>'
 
 class ResourceUsageSummary(BaseModel):
-    """Aggregated resource usage summaries"""
+    """Aggregated resource usage summaries (hour/day/month rollups of a metric)"""
     __tablename__ = 'resource_usage_summary'
     
     resource_id = db.Column(db.Integer, db.ForeignKey('resources.id'), nullable=False, index=True)
+    metric_name = db.Column(db.String(100))
+    granularity = db.Column(db.String(10))  # hour, day, month
     period_start = db.Column(db.DateTime, nullable=False, index=True)
     period_end = db.Column(db.DateTime, nullable=False)
+    sample_count = db.Column(db.Integer, default=0)
     total_usage = db.Column(db.Float, default=0.0)
     peak_usage = db.Column(db.Float, default=0.0)
     average_usage = db.Column(db.Float, default=0.0)
+    min_usage = db.Column(db.Float)
+    p50_usage = db.Column(db.Float)
+    p95_usage = db.Column(db.Float)
+    p99_usage = db.Column(db.Float)
     cost = db.Column(db.Float, default=0.0)
     currency = db.Column(db.String(3), default='RUB')
     
+    __table_args__ = (
+        db.Index('ix_resource_usage_summary_rollup', 'resource_id', 'metric_name', 'granularity', 'period_start'),
+    )
+    
     def __repr__(self):
         return f'<ResourceUsageSummary {self.resource_id}:{self.period_start}>'
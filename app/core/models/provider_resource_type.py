@@ -5,6 +5,9 @@ from __future__ import annotations
 Tracks known unified resource types per provider and raw aliases used by the provider.
 """
 
+import json
+from typing import Dict, Set, Tuple
+
 from app.core.models import db
 from .base import BaseModel
 
@@ -34,4 +37,25 @@ class ProviderResourceType(BaseModel):
             'raw_aliases': self.raw_aliases,
         }
 
-
+    def get_raw_aliases(self):
+        """Get parsed raw aliases list"""
+        try:
+            aliases = json.loads(self.raw_aliases) if self.raw_aliases else []
+        except (json.JSONDecodeError, TypeError):
+            return []
+        return aliases if isinstance(aliases, list) else []
+
+    @classmethod
+    def build_type_index(cls, provider_type: str) -> Tuple[Set[str], Dict[str, str]]:
+        """Load enabled types for a provider once and index them for type gating.
+
+        Returns a tuple of (unified types, lowercase raw alias -> unified type).
+        """
+        unified_types = set()
+        alias_index = {}
+        for row in cls.query.filter_by(provider_type=provider_type, enabled=True).order_by(cls.id.asc()).all():
+            unified_types.add(row.unified_type)
+            for alias in row.get_raw_aliases():
+                # First row wins on duplicate aliases, as the previous linear scan did
+                alias_index.setdefault(str(alias).lower(), row.unified_type)
+        return unified_types, alias_index
@@ -1,6 +1,10 @@
 """
 Optimization recommendations model
 """
+import re
+
+from sqlalchemy import event
+
 from app.core.models import db
 from .base import BaseModel
 
@@ -63,7 +67,41 @@ class OptimizationRecommendation(BaseModel):
     last_verified_at = db.Column(db.DateTime, index=True)  # Last time rule regenerated this recommendation
     verification_fail_count = db.Column(db.Integer, default=0)  # Consecutive scans without regeneration
 
-    # Indexes (implicit via index=True on columns). Ensure created_at is indexed via BaseModel is not; add here via composite idx if needed.
+    # Case-folded title / description / resource name, maintained on every flush (see _refresh_search_text)
+    search_text = db.Column(db.Text)
+
+    # Composite indexes for the recommendations list: user scope (provider_id) + status filter,
+    # ordered by the keyset columns; id is the keyset tie-breaker
+    __table_args__ = (
+        db.Index('ix_recommendations_provider_status_savings', 'provider_id', 'status', 'estimated_monthly_savings', 'id'),
+        db.Index('ix_recommendations_provider_status_created', 'provider_id', 'status', 'created_at', 'id'),
+        db.Index('ix_recommendations_provider_type_severity', 'provider_id', 'recommendation_type', 'severity'),
+    )
+
+    @staticmethod
+    def normalize_search(text) -> str:
+        """Fold text for search: Unicode case folding, ё -> е, collapsed whitespace.
+
+        Applied to both the stored column and the query, so matching does not
+        depend on the database: SQLite LOWER()/LIKE only fold ASCII, and MySQL
+        collations disagree on ё/е.
+        """
+        if not text:
+            return ''
+        return re.sub(r'\s+', ' ', str(text).casefold().replace('ё', 'е')).strip()
+
+    def build_search_text(self) -> str:
+        parts = (self.title, self.description, self.resource_name)
+        return '\n'.join(self.normalize_search(part) for part in parts if part)
 
     def __repr__(self):
         return f'<OptimizationRecommendation {self.severity}:{self.recommendation_type}:{self.title}>'
+
+
+@event.listens_for(OptimizationRecommendation, 'before_insert')
+@event.listens_for(OptimizationRecommendation, 'before_update')
+def _refresh_search_text(mapper, connection, target):
+    target.search_text = target.build_search_text()
+    # Keyset pagination orders by savings; keep it non-NULL
+    if target.estimated_monthly_savings is None:
+        target.estimated_monthly_savings = 0.0
@@ -152,6 +152,23 @@ class Resource(BaseModel):
             )
             db.session.add(new_tag)
     
+    def set_tags(self, tags: dict):
+        """Add or update several tags with a single lookup of the existing ones"""
+        from app.core.models.tags import ResourceTag
+        
+        existing = {
+            tag.tag_key: tag
+            for tag in ResourceTag.query.filter(
+                ResourceTag.resource_id == self.id,
+                ResourceTag.tag_key.in_(list(tags))
+            ).all()
+        }
+        for key, value in tags.items():
+            if key in existing:
+                existing[key].tag_value = value
+            else:
+                db.session.add(ResourceTag(resource_id=self.id, tag_key=key, tag_value=value))
+    
     def get_tag(self, key: str) -> str:
         """Get a tag value by key"""
         from app.core.models.tags import ResourceTag
@@ -0,0 +1,82 @@
+"""
+Background sync jobs - queued complete syncs with progress for live updates
+"""
+import json
+from datetime import datetime
+from app.core.models import db
+from .base import BaseModel
+
+ACTIVE_STATUSES = ('queued', 'running')
+FINISHED_STATUSES = ('success', 'partial', 'error', 'cancelled')
+
+
+class SyncJob(BaseModel):
+    """A complete sync requested by a user and executed by a sync job worker"""
+    __tablename__ = 'sync_jobs'
+    
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
+    # Equals user_id while the job is queued or running and NULL afterwards:
+    # the unique index allows one active job per user across all web/worker processes
+    active_user_id = db.Column(db.Integer, nullable=True, unique=True)
+    
+    job_type = db.Column(db.String(30), nullable=False, default='complete_sync')
+    sync_type = db.Column(db.String(20), nullable=False, default='manual')  # manual, scheduled, api
+    status = db.Column(db.String(20), nullable=False, default='queued', index=True)  # queued, running, success, partial, error, cancelled
+    cancel_requested = db.Column(db.Boolean, nullable=False, default=False)
+    
+    complete_sync_id = db.Column(db.Integer, db.ForeignKey('complete_syncs.id'), nullable=True)
+    worker_id = db.Column(db.String(100))  # host:pid:thread of the worker running the job
+    
+    # Progress published by the worker; progress_version increases on every update
+    progress = db.Column(db.Text)  # JSON: {"stage": ..., "providers": [...], "completed": 1, "total": 3}
+    progress_version = db.Column(db.Integer, nullable=False, default=0)
+    result = db.Column(db.Text)  # JSON: CompleteSyncService response
+    error_message = db.Column(db.Text)
+    
+    queued_at = db.Column(db.DateTime, nullable=False, default=datetime.now)
+    started_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
+    heartbeat_at = db.Column(db.DateTime)  # refreshed by the worker while running
+    
+    __table_args__ = (
+        db.Index('ix_sync_jobs_status_queued', 'status', 'queued_at'),
+    )
+    
+    @property
+    def is_active(self):
+        return self.status in ACTIVE_STATUSES
+    
+    def get_progress(self):
+        """Get parsed progress"""
+        try:
+            return json.loads(self.progress) if self.progress else {}
+        except (json.JSONDecodeError, TypeError):
+            return {}
+    
+    def get_result(self):
+        """Get parsed result"""
+        try:
+            return json.loads(self.result) if self.result else {}
+        except (json.JSONDecodeError, TypeError):
+            return {}
+    
+    def to_dict(self):
+        """Convert to dictionary for API responses"""
+        return {
+            'id': self.id,
+            'job_type': self.job_type,
+            'sync_type': self.sync_type,
+            'status': self.status,
+            'cancel_requested': self.cancel_requested,
+            'complete_sync_id': self.complete_sync_id,
+            'progress': self.get_progress(),
+            'progress_version': self.progress_version,
+            'result': self.get_result(),
+            'error_message': self.error_message,
+            'queued_at': self.queued_at.isoformat() if self.queued_at else None,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None,
+        }
+    
+    def __repr__(self):
+        return f'<SyncJob {self.id}: user {self.user_id} {self.status}>'
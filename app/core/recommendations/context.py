@@ -0,0 +1,201 @@
+from __future__ import annotations
+
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from sqlalchemy.orm import selectinload
+
+from app.core.models.resource import Resource
+from app.core.models.provider import CloudProvider
+from app.core.models.pricing import PriceComparisonRecommendation
+from app.core.models.recommendations import OptimizationRecommendation
+from app.core.models.user_provider_preference import UserProviderPreference
+from app.core.services.metrics_service import MetricsService
+from .price_catalog import price_catalog
+from .price_matching import PriceMatchingEngine
+
+
+# (source, resource_id, recommendation_type, target_provider, target_sku)
+DedupKey = Tuple[Optional[str], Optional[int], Optional[str], Optional[str], Optional[str]]
+
+
+class EvaluationContext(dict):
+    """Everything rules and persistence need for one recommendations run.
+
+    Loaded once per run so that rule evaluation and `_persist_output` do not
+    query the database per resource. It is still a dict, so rules reading
+    `context.get('user_id')` keep working.
+    """
+
+    def __init__(self, user_id: int, complete_sync_id: int) -> None:
+        super().__init__(user_id=user_id, complete_sync_id=complete_sync_id)
+        self.user_id = user_id
+        self.complete_sync_id = complete_sync_id
+        self.resources: List[Resource] = []
+        self.providers_by_id: Dict[int, CloudProvider] = {}
+        self.enabled_provider_types: List[str] = []
+        self._tags_by_resource: Dict[int, Dict[str, Any]] = {}
+        # Exact dedup key -> recommendation, and (source, resource_id, type) -> first recommendation
+        self._recommendations: Dict[DedupKey, OptimizationRecommendation] = {}
+        self._recommendations_by_resource: Dict[Tuple[Optional[str], Optional[int], Optional[str]], OptimizationRecommendation] = {}
+        self._dismissed: Dict[int, List[OptimizationRecommendation]] = {}
+        self._price_comparisons: Dict[Tuple[int, int], PriceComparisonRecommendation] = {}
+        self._price_engine: Optional[PriceMatchingEngine] = None
+        self._usage_profiles: Dict[str, Dict[int, Dict[str, float]]] = {}
+
+    @classmethod
+    def load(cls, user_id: int, complete_sync_id: int, provider_ids: Iterable[int]) -> 'EvaluationContext':
+        """Load providers, resources with tags, preferences and existing recommendations."""
+        ctx = cls(user_id, complete_sync_id)
+        provider_ids = list(provider_ids)
+        if not provider_ids:
+            return ctx
+
+        for provider in CloudProvider.query.filter(CloudProvider.id.in_(provider_ids)).all():
+            ctx.providers_by_id[provider.id] = provider
+
+        ctx.resources = (
+            Resource.query.options(selectinload(Resource.tags))
+            .filter(Resource.provider_id.in_(provider_ids))
+            .all()
+        )
+        for resource in ctx.resources:
+            ctx._tags_by_resource[resource.id] = {t.tag_key: t.tag_value for t in resource.tags}
+
+        if user_id:
+            prefs = UserProviderPreference.query.filter_by(user_id=user_id, is_enabled=True).all()
+            ctx.enabled_provider_types = [p.provider_type for p in prefs]
+
+        recommendations = (
+            OptimizationRecommendation.query
+            .join(Resource, Resource.id == OptimizationRecommendation.resource_id)
+            .filter(Resource.provider_id.in_(provider_ids))
+            .order_by(OptimizationRecommendation.id)
+            .all()
+        )
+        for rec in recommendations:
+            ctx.remember_recommendation(rec)
+            if rec.status == 'dismissed':
+                ctx._dismissed.setdefault(rec.resource_id, []).append(rec)
+
+        if user_id:
+            comparisons = (
+                PriceComparisonRecommendation.query
+                .join(Resource, Resource.id == PriceComparisonRecommendation.current_resource_id)
+                .filter(
+                    PriceComparisonRecommendation.user_id == user_id,
+                    Resource.provider_id.in_(provider_ids),
+                )
+                .all()
+            )
+            for pcr in comparisons:
+                ctx._price_comparisons.setdefault((pcr.current_resource_id, pcr.recommended_price_id), pcr)
+        return ctx
+
+    @property
+    def price_engine(self) -> PriceMatchingEngine:
+        """Server price catalog in column form, loaded on first use in this run."""
+        if self._price_engine is None:
+            self._price_engine = PriceMatchingEngine.from_catalog()
+        return self._price_engine
+
+    # ---- Lookups used by rules ----
+    def provider_for(self, resource: Resource) -> Optional[CloudProvider]:
+        provider_id = getattr(resource, 'provider_id', None)
+        return self.providers_by_id.get(provider_id) if provider_id else None
+
+    def tags_for(self, resource: Resource) -> Dict[str, Any]:
+        tags = self._tags_by_resource.get(getattr(resource, 'id', None))
+        if tags is None:
+            tags = {t.tag_key: t.tag_value for t in getattr(resource, 'tags', [])}
+        return tags
+
+    def usage_for(self, resource: Resource, metric_name: str = 'cpu_usage') -> Optional[Dict[str, float]]:
+        """30-day usage profile (avg/min/max/p50/p95/p99) from the metric rollups, or None.
+
+        Profiles for all resources of the run are loaded on the first lookup of a metric.
+        """
+        profiles = self._usage_profiles.get(metric_name)
+        if profiles is None:
+            profiles = MetricsService.usage_profiles([r.id for r in self.resources], metric_name)
+            self._usage_profiles[metric_name] = profiles
+        return profiles.get(getattr(resource, 'id', None))
+
+    def cheapest_price(self, provider: str, resource_type: Optional[str] = None, **filters: Any) -> Optional[Any]:
+        """Cheapest catalog price row matching the filters (see NormalizedPriceCatalog.find_prices).
+
+        Reads the process-wide price catalog, so rules do not query
+        `provider_prices` per resource.
+        """
+        return price_catalog.cheapest_price(provider, resource_type, **filters)
+
+    def price_regions(self, provider: str, resource_type: Optional[str] = None) -> List[str]:
+        """Regions the price catalog has rows for (provider, optionally one resource type)."""
+        return price_catalog.regions(provider, resource_type)
+
+    def dismissed_target_providers(
+        self,
+        resource_id: Optional[int],
+        recommendation_type: Optional[str] = None,
+        source: Optional[str] = None,
+    ) -> Set[str]:
+        """Target providers the user dismissed for this resource (progressive disclosure)."""
+        dismissed = set()
+        for rec in self._dismissed.get(resource_id, []):
+            if recommendation_type is not None and rec.recommendation_type != recommendation_type:
+                continue
+            if source is not None and rec.source != source:
+                continue
+            if rec.target_provider:
+                dismissed.add(rec.target_provider)
+        return dismissed
+
+    # ---- Lookups used by persistence ----
+    def find_recommendation(
+        self,
+        source: Optional[str],
+        resource_id: Optional[int],
+        recommendation_type: Optional[str],
+        target_provider: Optional[str] = None,
+        target_sku: Optional[str] = None,
+    ) -> Optional[OptimizationRecommendation]:
+        """Same matching as the former dedup query in `_persist_output`."""
+        if target_provider and target_sku:
+            return self._recommendations.get((source, resource_id, recommendation_type, target_provider, target_sku))
+        return self._recommendations_by_resource.get((source, resource_id, recommendation_type))
+
+    def remember_recommendation(self, rec: OptimizationRecommendation) -> None:
+        key = (rec.source, rec.resource_id, rec.recommendation_type, rec.target_provider, rec.target_sku)
+        self._recommendations.setdefault(key, rec)
+        self._recommendations_by_resource.setdefault(key[:3], rec)
+
+    # ---- Snapshots for worker processes ----
+    def shard_payload(self, resources: Sequence[Resource]) -> Dict[str, Any]:
+        """Picklable copy of what rules need for these resources (see parallel.ShardContext)."""
+        from .snapshots import DismissedSnapshot, PriceComparisonSnapshot, ProviderSnapshot, ResourceSnapshot
+
+        providers = {pid: ProviderSnapshot.from_model(p) for pid, p in self.providers_by_id.items()}
+        resource_ids = {r.id for r in resources}
+        return {
+            'user_id': self.user_id,
+            'complete_sync_id': self.complete_sync_id,
+            'enabled_provider_types': list(self.enabled_provider_types),
+            'providers': providers,
+            'resources': [
+                ResourceSnapshot.from_model(r, self.tags_for(r), providers.get(r.provider_id))
+                for r in resources
+            ],
+            'dismissed': {
+                rid: [DismissedSnapshot(rec.recommendation_type, rec.source, rec.target_provider) for rec in recs]
+                for rid, recs in self._dismissed.items() if rid in resource_ids
+            },
+            'price_comparisons': {
+                key: PriceComparisonSnapshot.from_model(pcr)
+                for key, pcr in self._price_comparisons.items() if key[0] in resource_ids
+            },
+        }
+
+    def find_price_comparison(self, resource_id: int, price_id: int) -> Optional[PriceComparisonRecommendation]:
+        return self._price_comparisons.get((resource_id, price_id))
+
+    def remember_price_comparison(self, pcr: PriceComparisonRecommendation) -> None:
+        self._price_comparisons.setdefault((pcr.current_resource_id, pcr.recommended_price_id), pcr)
@@ -5,7 +5,7 @@ from typing import Any, Dict, Iterable, List, Optional, Tuple
 import re
 
 
-@dataclass
+@dataclass(slots=True)
 class NormalizedSKU:
     provider: str
     region: Optional[str]
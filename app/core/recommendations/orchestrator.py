@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import logging
+from collections import Counter
 from typing import Any, Dict, List, Optional
 import time
 from datetime import datetime
@@ -10,12 +11,13 @@ from app.core.models.recommendation_settings import RecommendationRuleSetting
 from flask import current_app
 from app.core.models.complete_sync import CompleteSync, ProviderSyncReference
 from app.core.models.resource import Resource
-from app.core.models.provider import CloudProvider
 from app.core.models.recommendations import OptimizationRecommendation
 
 from .registry import RuleRegistry
+from .context import EvaluationContext
 from .interfaces import RecommendationOutput, RuleScope
-from app.core.services.ai_text_generator import generate_recommendation_text
+from .parallel import ProcessPoolRuleExecutor, evaluate_resource_rules, rule_id_of
+from app.core.services.ai_text_generator import enqueue_recommendation_texts
 
 
 logger = logging.getLogger(__name__)
@@ -44,7 +46,13 @@ class RecommendationOrchestrator:
             'suppressed_dismissed': 0,
             'suppressed_implemented': 0,
             'suppressed_snoozed': 0,
+            'ai_text_queued': 0,
             'rule_timings': {},
+            'rule_skips': {},
+            'rule_checks': 0,
+            'resource_pass_seconds': 0.0,
+            'rules_evaluated_per_second': None,
+            'evaluation_workers': 1,
         }
 
         complete_sync: Optional[CompleteSync] = CompleteSync.query.get(complete_sync_id)
@@ -59,16 +67,12 @@ class RecommendationOrchestrator:
         if not provider_ids:
             return {**summary, 'warning': 'no_providers_in_sync'}
 
-        # Load resources for those providers
-        resources: List[Resource] = Resource.query.filter(Resource.provider_id.in_(provider_ids)).all()
+        # Load resources, providers, tags, preferences and existing recommendations once for the whole run
+        context = EvaluationContext.load(complete_sync.user_id, complete_sync_id, provider_ids)
+        self._context = context
+        resources: List[Resource] = context.resources
         summary['resources_processed'] = len(resources)
 
-        # Build a minimal context for MVP
-        context: Dict[str, Any] = {
-            'user_id': complete_sync.user_id,
-            'complete_sync_id': complete_sync_id,
-        }
-
         created_count = 0
         updated_count = 0
 
@@ -78,9 +82,10 @@ class RecommendationOrchestrator:
             'suppressed_implemented': 0,
             'suppressed_snoozed': 0,
         }
+        # New recommendations created in this run (AI text is generated after commit)
+        self._new_recommendations: List[OptimizationRecommendation] = []
 
         # Resource-first pass
-        resource_rules = self.registry.resource_rules()
         disabled_rules = set()
         try:
             disabled_rules = set(current_app.config.get('RECOMMENDATION_RULES_DISABLED', set()) or [])
@@ -96,122 +101,98 @@ class RecommendationOrchestrator:
                     db_disabled.add(s.rule_id)
                 elif s.scope == 'resource':
                     scoped_disabled.add((s.rule_id, (s.provider_type or '')))
+
+        def disabled_reason(rule, provider_code):
+            rule_id = rule_id_of(rule)
+            if not rule_id:
+                return None
+            if rule_id in disabled_rules:
+                return 'config_disabled'
+            if rule_id in db_disabled:
+                return 'db_disabled_global'
+            if (rule_id, (provider_code or '')) in scoped_disabled:
+                return 'db_disabled_scoped'
+            return None
+
+        # Dispatch table: (resource_type, provider_type) -> enabled rules, with all disables applied once
+        keyed_resources = []
         for resource in resources:
-            provider = CloudProvider.query.get(resource.provider_id) if resource.provider_id else None
-            for rule in resource_rules:
+            provider = context.provider_for(resource)
+            provider_code = getattr(provider, 'provider_type', None) if provider else None
+            resource_type = getattr(resource, 'resource_type', None) or getattr(resource, 'type', None)
+            keyed_resources.append((resource, provider, provider_code, (resource_type, provider_code)))
+        dispatch = self.registry.dispatch_table((key for *_, key in keyed_resources), disabled_reason)
+
+        skips: Counter = Counter()
+        rule_checks = 0
+        resource_pass_started = time.perf_counter()
+        work = [(resource, provider, dispatch[key].rules) for resource, provider, _, key in keyed_resources]
+        workers = self._evaluation_workers(len(work))
+        summary['evaluation_workers'] = workers
+        evaluated = None
+        if workers > 1:
+            try:
+                evaluated = ProcessPoolRuleExecutor(workers).evaluate(work, context)
+            except Exception as e:
+                self.logger.warning("parallel_evaluation_failed | workers=%d error=%s; evaluating serially", workers, e)
+                summary['evaluation_workers'] = 1
+        if evaluated is None:
+            evaluated = (evaluate_resource_rules(resource, provider, rules, context) for resource, provider, rules in work)
+
+        # Persist in inventory order (identical for serial and parallel evaluation)
+        for (resource, provider, provider_code, key), runs in zip(keyed_resources, evaluated):
+            for reason, count in dispatch[key].disabled.items():
+                skips[reason] += count
+            for run in runs:
+                rule_checks += 1
+                if not run.applies:
+                    skips['not_applicable'] += 1
+                    continue
+                if run.failed:
+                    continue
                 try:
-                    # Feature flag: per-rule disable
-                    try:
-                        rule_id = getattr(rule, 'id') if isinstance(getattr(rule, 'id', None), str) else rule.id
-                    except Exception:
-                        rule_id = None
-                    # Check config disabled
-                    if rule_id and rule_id in disabled_rules:
-                        summary['skipped_rules_disabled'] += 1
-                        try:
-                            self.logger.info(
-                                "rule_skip | reason=config_disabled rule_id=%s provider=%s resource_id=%s",
-                                rule_id, getattr(provider, 'provider_type', None), getattr(resource, 'id', None)
-                            )
-                        except Exception:
-                            pass
-                        continue
-                    # Check DB disabled (global)
-                    if rule_id and rule_id in db_disabled:
-                        summary['skipped_rules_disabled'] += 1
-                        try:
-                            self.logger.info(
-                                "rule_skip | reason=db_disabled_global rule_id=%s provider=%s resource_id=%s",
-                                rule_id, getattr(provider, 'provider_type', None), getattr(resource, 'id', None)
-                            )
-                        except Exception:
-                            pass
-                        continue
-                    # Check scoped disabled by provider
-                    provider_code = getattr(provider, 'provider_type', None) if provider else None
-                    if rule_id and (rule_id, (provider_code or '')) in scoped_disabled:
-                        summary['skipped_rules_disabled'] += 1
-                        try:
-                            self.logger.info(
-                                "rule_skip | reason=db_disabled_scoped rule_id=%s provider=%s resource_id=%s",
-                                rule_id, provider_code, getattr(resource, 'id', None)
-                            )
-                        except Exception:
-                            pass
-                        continue
-
                     t0 = time.perf_counter()
                     created_local = 0
                     updated_local = 0
-                    # First check applicability; log skip if not applicable
-                    applies = False
-                    try:
-                        applies = rule.applies(resource, context)
-                    except Exception:
-                        applies = False
-                    if not applies:
-                        if rule_id:
-                            try:
-                                self.logger.info(
-                                    "rule_skip | reason=not_applicable rule_id=%s provider=%s resource_id=%s rtype=%s",
-                                    rule_id, provider_code, getattr(resource, 'id', None), getattr(resource, 'resource_type', None)
-                                )
-                            except Exception:
-                                pass
-                        continue
-
-                    if rule_id:
-                        try:
-                            self.logger.info(
-                                "rule_run_start | rule_id=%s provider=%s resource_id=%s rtype=%s",
-                                rule_id, provider_code, getattr(resource, 'id', None), getattr(resource, 'resource_type', None)
-                            )
-                        except Exception:
-                            pass
-
-                    if applies:
-                        outputs = rule.evaluate(resource, context) or []
-                        for out in outputs:
-                            # Backfill targeting fields if missing
-                            if out.resource_id is None:
-                                out.resource_id = getattr(resource, 'id', None)
-                            if out.provider_id is None and provider is not None:
-                                out.provider_id = provider.id
-                            if out.resource_type is None:
-                                out.resource_type = getattr(resource, 'resource_type', None)
-                            if out.resource_name is None:
-                                out.resource_name = getattr(resource, 'resource_name', None)
-                            c, u = self._persist_output(out)
-                            created_count += c
-                            updated_count += u
-                            created_local += c
-                            updated_local += u
-                        summary['resource_rules_run'] += 1
-                    dt = time.perf_counter() - t0
-                    if rule_id:
-                        summary['rule_timings'][rule_id] = summary['rule_timings'].get(rule_id, 0.0) + dt
-                        try:
-                            self.logger.info(
-                                "rule_run_end | rule_id=%s provider=%s resource_id=%s outputs=%d created=%d updated=%d duration_ms=%d",
-                                rule_id, provider_code, getattr(resource, 'id', None),
-                                len(outputs) if 'outputs' in locals() and isinstance(outputs, list) else 0,
-                                created_local, updated_local, int(dt * 1000)
-                            )
-                        except Exception:
-                            pass
+                    for out in run.outputs:
+                        c, u = self._persist_output(out)
+                        created_count += c
+                        updated_count += u
+                        created_local += c
+                        updated_local += u
+                    summary['resource_rules_run'] += 1
+                    dt = run.seconds + (time.perf_counter() - t0)
+                    if run.rule_id:
+                        summary['rule_timings'][run.rule_id] = summary['rule_timings'].get(run.rule_id, 0.0) + dt
+                        self.logger.debug(
+                            "rule_run_end | rule_id=%s provider=%s resource_id=%s outputs=%d created=%d updated=%d duration_ms=%d",
+                            run.rule_id, provider_code, getattr(resource, 'id', None),
+                            len(run.outputs), created_local, updated_local, int(dt * 1000)
+                        )
                 except Exception:
                     # Keep going even if one rule fails
                     continue
 
+        resource_pass_seconds = time.perf_counter() - resource_pass_started
+        summary['skipped_rules_disabled'] += skips['config_disabled'] + skips['db_disabled_global'] + skips['db_disabled_scoped']
+        summary['rule_skips'] = dict(skips)
+        summary['rule_checks'] = rule_checks
+        summary['resource_pass_seconds'] = round(resource_pass_seconds, 3)
+        summary['rules_evaluated_per_second'] = (
+            round(summary['resource_rules_run'] / resource_pass_seconds, 1) if resource_pass_seconds > 0 else None
+        )
+        self.logger.info(
+            "resource_pass | resources=%d dispatch_keys=%d checks=%d evaluated=%d skips=%s duration_ms=%d rules_per_sec=%s",
+            len(resources), len(dispatch), rule_checks, summary['resource_rules_run'], dict(skips),
+            int(resource_pass_seconds * 1000), summary['rules_evaluated_per_second']
+        )
+
         # Global pass (single inventory view)
         global_rules = self.registry.global_rules()
         for rule in global_rules:
             try:
                 # Feature flag: per-rule disable
-                try:
-                    rule_id = getattr(rule, 'id') if isinstance(getattr(rule, 'id', None), str) else rule.id
-                except Exception:
-                    rule_id = None
+                rule_id = rule_id_of(rule)
                 if rule_id and rule_id in disabled_rules:
                     summary['skipped_rules_disabled'] += 1
                     try:
@@ -274,6 +255,11 @@ class RecommendationOrchestrator:
 
         summary['recommendations_created'] = created_count
         summary['recommendations_updated'] = updated_count
+        # AI texts are generated in the background; the UI shows the rule text until ai_generated_at is set
+        try:
+            summary['ai_text_queued'] = enqueue_recommendation_texts(rec.id for rec in self._new_recommendations)
+        except Exception as e:
+            self.logger.warning(f"Failed to queue AI text generation: {e}")
         # Propagate internal suppression counters
         try:
             summary['suppressed_dismissed'] += int(self._metrics.get('suppressed_dismissed', 0))
@@ -283,6 +269,18 @@ class RecommendationOrchestrator:
             pass
         return summary
 
+    @staticmethod
+    def _evaluation_workers(resource_count: int) -> int:
+        """Worker processes for the resource pass (1 = evaluate in this process)."""
+        try:
+            workers = int(current_app.config.get('RECOMMENDATION_EVALUATION_WORKERS', 1) or 1)
+            min_resources = int(current_app.config.get('RECOMMENDATION_PARALLEL_MIN_RESOURCES', 2000) or 0)
+        except Exception:
+            return 1
+        if workers <= 1 or resource_count < min_resources:
+            return 1
+        return workers
+
     # ---- Persistence helpers ----
     def _persist_output(self, out: RecommendationOutput) -> (int, int):
         """Create or update OptimizationRecommendation with provider-specific dedup.
@@ -302,22 +300,15 @@ class RecommendationOrchestrator:
                 target_sku = out.insights.get('recommended_sku')
                 target_region = out.insights.get('recommended_region')
             
-            # Build dedup query
+            # Dedup against recommendations preloaded in the run context
             if out.source and out.resource_id and out.recommendation_type:
-                existing = OptimizationRecommendation.query.filter_by(
-                    resource_id=out.resource_id,
-                    recommendation_type=out.recommendation_type,
-                    source=out.source,
+                existing = self._context.find_recommendation(
+                    out.source,
+                    out.resource_id,
+                    out.recommendation_type,
+                    target_provider,
+                    target_sku,
                 )
-                
-                # Add provider-specific filter for cross-provider recommendations
-                if target_provider and target_sku:
-                    existing = existing.filter_by(
-                        target_provider=target_provider,
-                        target_sku=target_sku
-                    )
-                
-                existing = existing.first()
             else:
                 existing = None
 
@@ -350,21 +341,8 @@ class RecommendationOrchestrator:
                     verification_fail_count=0,
                 )
                 db.session.add(rec)
-                db.session.commit()  # Commit so agent can see the recommendation
-                
-                # Generate AI text for the new recommendation
-                try:
-                    ai_text = generate_recommendation_text(rec.id)
-                    if ai_text:
-                        rec.ai_short_description = ai_text.get('short_description_html')
-                        rec.ai_detailed_description = ai_text.get('detailed_description_html')
-                        rec.ai_generated_at = datetime.utcnow()
-                        db.session.commit()  # Commit AI text update
-                        self.logger.info(f"✓ AI text generated and stored for recommendation {rec.id}")
-                except Exception as e:
-                    self.logger.warning(f"Failed to generate AI text for rec {rec.id}: {e}")
-                    # Non-fatal - recommendation still created without AI text
-                
+                self._context.remember_recommendation(rec)
+                self._new_recommendations.append(rec)
                 return 1, 0
             else:
                 # Auto-dismiss stale "seen" recommendations after 30 days
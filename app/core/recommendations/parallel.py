@@ -0,0 +1,218 @@
+from __future__ import annotations
+
+import logging
+import logging.handlers
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from app.core.models import db
+from app.core.models.pricing import PriceComparisonRecommendation
+
+from .context import EvaluationContext
+from .interfaces import BaseRule, RecommendationOutput
+from .snapshots import PriceComparisonSnapshot
+
+
+logger = logging.getLogger(__name__)
+
+# Config keys forwarded to worker apps (rule thresholds may be set at runtime)
+WORKER_CONFIG_PREFIXES = ('PRICE_CHECK_', 'SNAPSHOT_CLEANUP_', 'UNUSED_IP_CLEANUP_', 'RECOMMENDATION')
+
+
+@dataclass
+class RuleRun:
+    """Result of one rule on one resource."""
+
+    rule_id: Optional[str]
+    applies: bool
+    outputs: List[RecommendationOutput] = field(default_factory=list)
+    seconds: float = 0.0
+    failed: bool = False
+
+
+def rule_id_of(rule: BaseRule) -> Optional[str]:
+    try:
+        return rule.id
+    except Exception:
+        return None
+
+
+def evaluate_resource_rules(resource: Any, provider: Any, rules: Sequence[BaseRule], context: Any) -> List[RuleRun]:
+    """Run `applies` / `evaluate` of each rule and backfill the outputs' targeting fields.
+
+    Used as-is by the serial pass (ORM rows) and by worker processes (snapshots),
+    so both modes produce the same outputs.
+    """
+    runs: List[RuleRun] = []
+    for rule in rules:
+        rule_id = rule_id_of(rule)
+        try:
+            applies = rule.applies(resource, context)
+        except Exception:
+            applies = False
+        if not applies:
+            runs.append(RuleRun(rule_id, False))
+            continue
+
+        t0 = time.perf_counter()
+        try:
+            outputs = list(rule.evaluate(resource, context) or [])
+        except Exception as e:
+            # Keep going even if one rule fails
+            logger.warning("rule_failed | rule_id=%s resource_id=%s error=%s", rule_id, getattr(resource, 'id', None), e)
+            runs.append(RuleRun(rule_id, True, seconds=time.perf_counter() - t0, failed=True))
+            continue
+        for out in outputs:
+            if out.resource_id is None:
+                out.resource_id = getattr(resource, 'id', None)
+            if out.provider_id is None and provider is not None:
+                out.provider_id = provider.id
+            if out.resource_type is None:
+                out.resource_type = getattr(resource, 'resource_type', None)
+            if out.resource_name is None:
+                out.resource_name = getattr(resource, 'resource_name', None)
+        runs.append(RuleRun(rule_id, True, outputs, time.perf_counter() - t0))
+    return runs
+
+
+class ShardContext(EvaluationContext):
+    """EvaluationContext rebuilt from a shard payload inside a worker process.
+
+    Lookups read the snapshots; price comparisons the price check rule creates
+    or refreshes are recorded (and kept out of the worker's session) so the
+    parent can apply them.
+    """
+
+    def __init__(self, payload: Dict[str, Any]) -> None:
+        super().__init__(payload['user_id'], payload['complete_sync_id'])
+        self.resources = payload['resources']
+        self.providers_by_id = payload['providers']
+        self.enabled_provider_types = payload['enabled_provider_types']
+        self._tags_by_resource = {r.id: r.tags for r in self.resources}
+        self._dismissed = payload['dismissed']
+        self._price_comparisons = payload['price_comparisons']
+        self._touched: Dict[Tuple[int, int], PriceComparisonSnapshot] = {}
+
+    def find_price_comparison(self, resource_id: int, price_id: int) -> Optional[PriceComparisonSnapshot]:
+        snapshot = self._price_comparisons.get((resource_id, price_id))
+        if snapshot is not None:
+            self._touched[(resource_id, price_id)] = snapshot
+        return snapshot
+
+    def remember_price_comparison(self, pcr: PriceComparisonRecommendation) -> None:
+        try:
+            db.session.expunge(pcr)
+        except Exception:
+            pass
+        key = (pcr.current_resource_id, pcr.recommended_price_id)
+        snapshot = self._price_comparisons.setdefault(key, PriceComparisonSnapshot.from_model(pcr))
+        self._touched[key] = snapshot
+
+    def price_comparison_changes(self) -> List[PriceComparisonSnapshot]:
+        return list(self._touched.values())
+
+
+# ---- Worker process ----
+_worker: Dict[str, Any] = {}
+
+
+def _init_worker(database_uri: str, config: Dict[str, Any]) -> None:
+    """Build an app with its own engine/session in the worker and discover the rules."""
+    from app import create_app
+    from .registry import RuleRegistry
+
+    if database_uri:
+        os.environ['DATABASE_URL'] = database_uri
+    app = create_app()
+    app.config.update(config)
+    app.app_context().push()
+    # The parent process owns server.log rotation; workers only append to it
+    root_logger = logging.getLogger()
+    for handler in list(root_logger.handlers):
+        if isinstance(handler, logging.handlers.RotatingFileHandler):
+            root_logger.removeHandler(handler)
+            handler.close()
+            appender = logging.FileHandler(handler.baseFilename, encoding='utf-8')
+            appender.setLevel(handler.level)
+            appender.setFormatter(handler.formatter)
+            root_logger.addHandler(appender)
+    registry = RuleRegistry()
+    registry.discover()
+    _worker['rules'] = {rule_id_of(rule): rule for rule in registry.resource_rules()}
+
+
+def _evaluate_shard(payload: Dict[str, Any]) -> Dict[str, Any]:
+    rules = _worker['rules']
+    context = ShardContext(payload)
+    runs = []
+    try:
+        for index, resource, rule_ids in zip(payload['indexes'], context.resources, payload['rule_ids']):
+            provider = context.provider_for(resource)
+            runs.append((index, evaluate_resource_rules(resource, provider, [rules[r] for r in rule_ids if r in rules], context)))
+    finally:
+        # Reads only: nothing evaluated in a worker is committed from it
+        db.session.rollback()
+    return {'runs': runs, 'price_comparisons': context.price_comparison_changes()}
+
+
+class ProcessPoolRuleExecutor:
+    """Evaluate resource rules across a process pool.
+
+    Resources are split into contiguous shards, each sent as snapshots
+    (`EvaluationContext.shard_payload`). Workers are spawned processes with
+    their own app, engine and session; rules run there exactly as in the
+    serial pass. Results come back in inventory order, so the parent persists
+    them in the same order as a serial run.
+    """
+
+    def __init__(self, max_workers: int, shards_per_worker: int = 4) -> None:
+        self.max_workers = max(1, int(max_workers))
+        self.shards_per_worker = max(1, int(shards_per_worker))
+
+    def evaluate(self, work: Sequence[Tuple[Any, Any, Sequence[BaseRule]]], context: EvaluationContext) -> List[List[RuleRun]]:
+        """`work` is (resource, provider, rules) per resource; returns the runs per resource."""
+        results: List[List[RuleRun]] = [[] for _ in work]
+        pending = [i for i, (_, _, rules) in enumerate(work) if rules]
+        if not pending:
+            return results
+
+        shard_count = min(len(pending), self.max_workers * self.shards_per_worker)
+        size = -(-len(pending) // shard_count)
+        payloads = []
+        for start in range(0, len(pending), size):
+            indexes = pending[start:start + size]
+            payload = context.shard_payload([work[i][0] for i in indexes])
+            payload['indexes'] = indexes
+            payload['rule_ids'] = [[rule_id_of(rule) for rule in work[i][2]] for i in indexes]
+            payloads.append(payload)
+
+        from flask import current_app
+        config = {k: v for k, v in current_app.config.items() if k.startswith(WORKER_CONFIG_PREFIXES)}
+        database_uri = current_app.config.get('SQLALCHEMY_DATABASE_URI')
+        with ProcessPoolExecutor(
+            max_workers=min(self.max_workers, len(payloads)),
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_init_worker,
+            initargs=(database_uri, config),
+        ) as pool:
+            for shard in pool.map(_evaluate_shard, payloads):
+                for index, runs in shard['runs']:
+                    results[index] = runs
+                self._apply_price_comparisons(context, shard['price_comparisons'])
+        return results
+
+    @staticmethod
+    def _apply_price_comparisons(context: EvaluationContext, snapshots: Sequence[PriceComparisonSnapshot]) -> None:
+        for snapshot in snapshots:
+            existing = context.find_price_comparison(snapshot.current_resource_id, snapshot.recommended_price_id)
+            if existing is None:
+                pcr = PriceComparisonRecommendation(**snapshot.values())
+                db.session.add(pcr)
+                context.remember_price_comparison(pcr)
+            else:
+                for name in PriceComparisonSnapshot.UPDATABLE:
+                    setattr(existing, name, getattr(snapshot, name))
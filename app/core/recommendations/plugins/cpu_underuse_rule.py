@@ -4,8 +4,6 @@ from typing import List, Optional
 import re
 from ..interfaces import BaseRule, RuleScope, RuleCategory, RecommendationOutput
 from ..normalization import normalize_resource
-from app.core.models.pricing import ProviderPrice
-from app.core.models.provider import CloudProvider
 
 
 class CpuUnderuseDownsizeRule(BaseRule):
@@ -53,7 +51,7 @@ class CpuUnderuseDownsizeRule(BaseRule):
     def evaluate(self, resource, context) -> List[RecommendationOutput]:
         # Expect CPU avg usage tag in percent (string). Fallback to 0.
         try:
-            tags = {t.tag_key: t.tag_value for t in getattr(resource, 'tags', [])}
+            tags = context.tags_for(resource)
         except Exception:
             tags = {}
         
@@ -72,17 +70,32 @@ class CpuUnderuseDownsizeRule(BaseRule):
         if tags.get('kubernetes_cluster_id'):
             return []
         
-        cpu_str = tags.get('cpu_avg_usage')
-        cpu_avg = 0.0
-        try:
-            if cpu_str is not None:
-                cpu_avg = float(str(cpu_str).replace('%', '').strip())
-        except (TypeError, ValueError):
+        # Prefer the 30-day profile from the metric rollups; fall back to the summary tag
+        usage = None
+        if hasattr(context, 'usage_for'):
+            try:
+                usage = context.usage_for(resource, 'cpu_usage')
+            except Exception:
+                usage = None
+        cpu_p95 = None
+        if usage:
+            cpu_avg = usage['avg']
+            cpu_p95 = usage['p95']
+        else:
+            cpu_str = tags.get('cpu_avg_usage')
             cpu_avg = 0.0
+            try:
+                if cpu_str is not None:
+                    cpu_avg = float(str(cpu_str).replace('%', '').strip())
+            except (TypeError, ValueError):
+                cpu_avg = 0.0
 
         # Threshold: < 10% monthly average considered underused (MVP)
         if cpu_avg >= 10.0:
             return []
+        # Bursty workloads (p95 at or above 50%) still need their current size
+        if cpu_p95 is not None and cpu_p95 >= 50.0:
+            return []
 
         # Parse current vCPU count from resource/tags/provider_config; skip if 1 or less
         current_vcpu: Optional[int] = None
@@ -135,7 +148,7 @@ class CpuUnderuseDownsizeRule(BaseRule):
             current_monthly = 0.0
 
         # Query provider catalog for a cheaper instance with one fewer vCPU
-        provider = CloudProvider.query.get(resource.provider_id) if getattr(resource, 'provider_id', None) else None
+        provider = context.provider_for(resource)
         provider_code = provider.provider_type if provider else None
         norm = normalize_resource(resource)
         region = getattr(resource, 'region', None)
@@ -145,20 +158,14 @@ class CpuUnderuseDownsizeRule(BaseRule):
         estimated_savings = 0.0
         if current_vcpu and current_vcpu > 1 and provider_code:
             target_vcpu = max(1, current_vcpu - 1)
-            q = ProviderPrice.query.filter(
-                ProviderPrice.provider == provider_code,
-                ProviderPrice.cpu_cores == target_vcpu,
-            )
             # keep RAM roughly the same (±25%, but not exceeding current)
+            ram_range = {}
             mem = norm.memory_gib or None
             if mem is not None:
-                low = max(0.5, mem * 0.75)
-                high = mem * 1.05
-                q = q.filter(ProviderPrice.ram_gb.between(low, high))
-            if region_prefix:
-                q = q.filter(ProviderPrice.region.startswith(region_prefix))
-            q = q.order_by((ProviderPrice.monthly_cost==None).asc(), ProviderPrice.monthly_cost.asc())
-            candidate = q.first()
+                ram_range = {'min_ram_gb': max(0.5, mem * 0.75), 'max_ram_gb': mem * 1.05}
+            candidate = context.cheapest_price(
+                provider_code, cpu_cores=target_vcpu, region_prefix=region_prefix, **ram_range
+            )
             if candidate and candidate.monthly_cost:
                 rec_monthly = float(candidate.monthly_cost)
                 if current_monthly > 0 and rec_monthly < current_monthly:
@@ -185,7 +192,11 @@ class CpuUnderuseDownsizeRule(BaseRule):
                 estimated_monthly_savings=estimated_savings,
                 currency=getattr(resource, 'currency', 'RUB') or 'RUB',
                 confidence_score=0.7,
-                metrics_snapshot={"cpu_avg_percent": cpu_avg, "current_vcpu": current_vcpu},
+                metrics_snapshot={
+                    "cpu_avg_percent": cpu_avg,
+                    "cpu_p95_percent": round(cpu_p95, 2) if cpu_p95 is not None else None,
+                    "current_vcpu": current_vcpu,
+                },
                 insights={"current_monthly_cost": current_monthly, "suggested_reduction": 0.5},
             )
         ]
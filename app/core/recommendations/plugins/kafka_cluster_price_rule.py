@@ -14,9 +14,6 @@ from flask import current_app
 
 from app.core.models.resource import Resource
 from app.core.models.provider import CloudProvider
-from app.core.models.pricing import ProviderPrice
-from app.core.models.user_provider_preference import UserProviderPreference
-from app.core.models.recommendations import OptimizationRecommendation
 from app.core.recommendations.interfaces import BaseRule, RuleCategory, RuleScope, RecommendationOutput
 
 logger = logging.getLogger(__name__)
@@ -95,7 +92,7 @@ class KafkaClusterPriceCheckRule(BaseRule):
             return []
         
         # Get current provider and user
-        provider: Optional[CloudProvider] = CloudProvider.query.get(resource.provider_id) if resource.provider_id else None
+        provider: Optional[CloudProvider] = context.provider_for(resource)
         provider_code = provider.provider_type if provider else None
         user_id = provider.user_id if provider else None
         
@@ -103,12 +100,7 @@ class KafkaClusterPriceCheckRule(BaseRule):
             return []
         
         # Get enabled alternative providers
-        prefs = UserProviderPreference.query.filter_by(
-            user_id=user_id,
-            is_enabled=True
-        ).all()
-        
-        enabled_provider_codes = {p.provider_type for p in prefs}
+        enabled_provider_codes = set(context.enabled_provider_types)
         
         # Remove current provider
         if provider_code in enabled_provider_codes:
@@ -118,19 +110,9 @@ class KafkaClusterPriceCheckRule(BaseRule):
             return []
         
         # Check for previously dismissed providers
-        dismissed_providers = set()
-        try:
-            existing_dismissed = OptimizationRecommendation.query.filter_by(
-                resource_id=resource.id,
-                recommendation_type='price_compare_cross_provider',
-                status='dismissed'
-            ).all()
-            
-            for rec in existing_dismissed:
-                if rec.target_provider:
-                    dismissed_providers.add(rec.target_provider)
-        except Exception:
-            pass
+        dismissed_providers = context.dismissed_target_providers(
+            resource.id, recommendation_type='price_compare_cross_provider'
+        )
         
         # Filter out dismissed providers
         candidate_providers = enabled_provider_codes - dismissed_providers
@@ -153,12 +135,7 @@ class KafkaClusterPriceCheckRule(BaseRule):
             if target_provider == 'selectel':
                 # Selectel Kafka uses the same DBaaS pricing as PostgreSQL
                 # Query the postgresql-cluster pricing records (they're identical for all DBaaS)
-                all_regions_query = ProviderPrice.query.filter_by(
-                    provider='selectel',
-                    resource_type='postgresql-cluster'  # Reuse PostgreSQL pricing (same for all DBaaS)
-                ).with_entities(ProviderPrice.region).distinct()
-                
-                all_regions = [r[0] for r in all_regions_query.all()]
+                all_regions = context.price_regions('selectel', 'postgresql-cluster')  # Reuse PostgreSQL pricing (same for all DBaaS)
                 
                 # Prioritize matching geographic regions
                 regions = []
@@ -176,14 +153,14 @@ class KafkaClusterPriceCheckRule(BaseRule):
                 
                 for region in regions:
                     # Query for closest matching configuration
-                    match = ProviderPrice.query.filter(
-                        ProviderPrice.provider == 'selectel',
-                        ProviderPrice.resource_type == 'postgresql-cluster',  # Same pricing for all DBaaS
-                        ProviderPrice.region == region,
-                        ProviderPrice.cpu_cores == total_vcpus,
-                        ProviderPrice.ram_gb >= total_ram_gb,  # Equal or more RAM
-                        ProviderPrice.storage_gb >= total_storage_gb * 0.8
-                    ).order_by(ProviderPrice.monthly_cost).first()
+                    match = context.cheapest_price(
+                        'selectel',
+                        'postgresql-cluster',  # Same pricing for all DBaaS
+                        region=region,
+                        cpu_cores=total_vcpus,
+                        min_ram_gb=total_ram_gb,  # Equal or more RAM
+                        min_storage_gb=total_storage_gb * 0.8
+                    )
                     
                     if match:
                         # Kafka pricing is per-broker like other DBaaS
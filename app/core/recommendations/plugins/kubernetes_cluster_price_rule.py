@@ -5,10 +5,7 @@ import logging
 from flask import current_app
 
 from ..interfaces import BaseRule, RuleScope, RuleCategory, RecommendationOutput
-from app.core.models.pricing import ProviderPrice
 from app.core.models.provider import CloudProvider
-from app.core.models.user_provider_preference import UserProviderPreference
-from app.core.models.recommendations import OptimizationRecommendation
 
 
 logger = logging.getLogger(__name__)
@@ -110,7 +107,7 @@ class KubernetesClusterPriceCheckRule(BaseRule):
             return []
         
         # Get current provider and user preferences
-        provider: Optional[CloudProvider] = CloudProvider.query.get(resource.provider_id) if resource.provider_id else None
+        provider: Optional[CloudProvider] = context.provider_for(resource)
         provider_code = provider.provider_type if provider else None
         user_id = provider.user_id if provider else None
         
@@ -118,12 +115,7 @@ class KubernetesClusterPriceCheckRule(BaseRule):
             return []
         
         # Get enabled alternative providers for price comparison
-        prefs = UserProviderPreference.query.filter_by(
-            user_id=user_id,
-            is_enabled=True
-        ).all()
-        
-        enabled_provider_codes = {p.provider_type for p in prefs}
+        enabled_provider_codes = set(context.enabled_provider_types)
         
         # Remove current provider from alternatives
         if provider_code in enabled_provider_codes:
@@ -137,19 +129,9 @@ class KubernetesClusterPriceCheckRule(BaseRule):
             return []
         
         # Check for dismissed recommendations to implement progressive disclosure
-        dismissed_providers = set()
-        try:
-            existing_dismissed = OptimizationRecommendation.query.filter_by(
-                resource_id=getattr(resource, 'id', None),
-                source=self.id,
-                status='dismissed'
-            ).all()
-            
-            for rec in existing_dismissed:
-                if rec.target_provider:
-                    dismissed_providers.add(rec.target_provider)
-        except Exception:
-            pass
+        dismissed_providers = context.dismissed_target_providers(
+            getattr(resource, 'id', None), source=self.id
+        )
         
         # Filter out dismissed providers
         candidate_providers = enabled_provider_codes - dismissed_providers
@@ -181,7 +163,7 @@ class KubernetesClusterPriceCheckRule(BaseRule):
                 continue
             
             # Get all available regions for this provider
-            all_regions = self._get_available_regions(target_provider)
+            all_regions = context.price_regions(target_provider)
             
             # Prioritize matching geographic regions
             regions = []
@@ -201,6 +183,7 @@ class KubernetesClusterPriceCheckRule(BaseRule):
             
             for region in regions:
                 worker_nodes_cost = self._calculate_worker_nodes_cost(
+                    context,
                     target_provider,
                     worker_vms,
                     region=region
@@ -385,17 +368,7 @@ class KubernetesClusterPriceCheckRule(BaseRule):
             # Unknown provider - no managed K8s assumption
             return None
     
-    def _get_available_regions(self, provider: str) -> List[str]:
-        """
-        Получает список доступных регионов для провайдера.
-        """
-        regions = ProviderPrice.query.filter_by(
-            provider=provider
-        ).with_entities(ProviderPrice.region).distinct().all()
-        
-        return [r[0] for r in regions if r[0]]
-    
-    def _calculate_worker_nodes_cost(self, provider: str, worker_vms: List[Dict[str, Any]], 
+    def _calculate_worker_nodes_cost(self, context, provider: str, worker_vms: List[Dict[str, Any]], 
                                      region: Optional[str] = None) -> Optional[float]:
         """
         Рассчитывает стоимость worker nodes в целевом провайдере и регионе.
@@ -426,21 +399,16 @@ class KubernetesClusterPriceCheckRule(BaseRule):
             
             # Find matching SKU in target provider and region
             # Use >= for storage to ensure sufficient capacity
-            query = ProviderPrice.query.filter(
-                ProviderPrice.provider == provider,
-                ProviderPrice.cpu_cores == vcpu,
-                ProviderPrice.ram_gb >= ram_gb * 0.9,
-                ProviderPrice.ram_gb <= ram_gb * 1.1,
-                ProviderPrice.storage_gb >= disk_gb,
-                ProviderPrice.storage_type == normalized_type
+            match = context.cheapest_price(
+                provider,
+                cpu_cores=vcpu,
+                min_ram_gb=ram_gb * 0.9,
+                max_ram_gb=ram_gb * 1.1,
+                min_storage_gb=disk_gb,
+                storage_type=normalized_type,
+                region=region or None
             )
             
-            # Filter by region if specified
-            if region:
-                query = query.filter(ProviderPrice.region == region)
-            
-            match = query.order_by(ProviderPrice.monthly_cost).first()
-            
             if not match:
                 # Can't match this node configuration
                 logger.debug(
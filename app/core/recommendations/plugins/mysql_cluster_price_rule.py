@@ -14,9 +14,6 @@ from flask import current_app
 
 from app.core.models.resource import Resource
 from app.core.models.provider import CloudProvider
-from app.core.models.pricing import ProviderPrice
-from app.core.models.user_provider_preference import UserProviderPreference
-from app.core.models.recommendations import OptimizationRecommendation
 from app.core.recommendations.interfaces import BaseRule, RuleCategory, RuleScope, RecommendationOutput
 
 logger = logging.getLogger(__name__)
@@ -84,7 +81,7 @@ class MySQLClusterPriceCheckRule(BaseRule):
             return []
         
         # Get current provider and user
-        provider: Optional[CloudProvider] = CloudProvider.query.get(resource.provider_id) if resource.provider_id else None
+        provider: Optional[CloudProvider] = context.provider_for(resource)
         provider_code = provider.provider_type if provider else None
         user_id = provider.user_id if provider else None
         
@@ -92,12 +89,7 @@ class MySQLClusterPriceCheckRule(BaseRule):
             return []
         
         # Get enabled alternative providers
-        prefs = UserProviderPreference.query.filter_by(
-            user_id=user_id,
-            is_enabled=True
-        ).all()
-        
-        enabled_provider_codes = {p.provider_type for p in prefs}
+        enabled_provider_codes = set(context.enabled_provider_types)
         
         if provider_code in enabled_provider_codes:
             enabled_provider_codes.remove(provider_code)
@@ -106,19 +98,9 @@ class MySQLClusterPriceCheckRule(BaseRule):
             return []
         
         # Check for previously dismissed providers
-        dismissed_providers = set()
-        try:
-            existing_dismissed = OptimizationRecommendation.query.filter_by(
-                resource_id=resource.id,
-                recommendation_type='price_compare_cross_provider',
-                status='dismissed'
-            ).all()
-            
-            for rec in existing_dismissed:
-                if rec.target_provider:
-                    dismissed_providers.add(rec.target_provider)
-        except Exception:
-            pass
+        dismissed_providers = context.dismissed_target_providers(
+            resource.id, recommendation_type='price_compare_cross_provider'
+        )
         
         candidate_providers = enabled_provider_codes - dismissed_providers
         
@@ -137,7 +119,8 @@ class MySQLClusterPriceCheckRule(BaseRule):
             total_ram_gb,
             total_storage_gb,
             total_hosts,
-            current_monthly
+            current_monthly,
+            context
         )
         
         if not alternatives:
@@ -196,7 +179,7 @@ class MySQLClusterPriceCheckRule(BaseRule):
     
     def _find_alternatives(self, candidate_providers, cluster_geo_prefix, 
                           total_vcpus, total_ram_gb, total_storage_gb, 
-                          total_hosts, current_monthly):
+                          total_hosts, current_monthly, context):
         """Find alternatives across providers (Selectel and Beget)."""
         alternatives = []
         
@@ -207,12 +190,7 @@ class MySQLClusterPriceCheckRule(BaseRule):
                 # For Beget, we use mysql-cluster pricing (specific to MySQL)
                 resource_type = 'mysql-cluster' if target_provider == 'beget' else 'postgresql-cluster'
                 
-                all_regions_query = ProviderPrice.query.filter_by(
-                    provider=target_provider,
-                    resource_type=resource_type
-                ).with_entities(ProviderPrice.region).distinct()
-                
-                all_regions = [r[0] for r in all_regions_query.all()]
+                all_regions = context.price_regions(target_provider, resource_type)
                 
                 # Prioritize matching geographic regions
                 regions = []
@@ -226,14 +204,14 @@ class MySQLClusterPriceCheckRule(BaseRule):
                 best_region_option = None
                 
                 for region in regions:
-                    match = ProviderPrice.query.filter(
-                        ProviderPrice.provider == target_provider,
-                        ProviderPrice.resource_type == resource_type,
-                        ProviderPrice.region == region,
-                        ProviderPrice.cpu_cores == total_vcpus,
-                        ProviderPrice.ram_gb >= total_ram_gb,
-                        ProviderPrice.storage_gb >= total_storage_gb * 0.8
-                    ).order_by(ProviderPrice.monthly_cost).first()
+                    match = context.cheapest_price(
+                        target_provider,
+                        resource_type,
+                        region=region,
+                        cpu_cores=total_vcpus,
+                        min_ram_gb=total_ram_gb,
+                        min_storage_gb=total_storage_gb * 0.8
+                    )
                     
                     if match:
                         total_cost = float(match.monthly_cost) * total_hosts
@@ -13,9 +13,6 @@ from flask import current_app
 
 from app.core.models.resource import Resource
 from app.core.models.provider import CloudProvider
-from app.core.models.pricing import ProviderPrice
-from app.core.models.user_provider_preference import UserProviderPreference
-from app.core.models.recommendations import OptimizationRecommendation
 from app.core.recommendations.interfaces import BaseRule, RuleCategory, RuleScope, RecommendationOutput
 
 logger = logging.getLogger(__name__)
@@ -114,7 +111,7 @@ class PostgreSQLClusterPriceCheckRule(BaseRule):
             return []
         
         # Get current provider and user
-        provider: Optional[CloudProvider] = CloudProvider.query.get(resource.provider_id) if resource.provider_id else None
+        provider: Optional[CloudProvider] = context.provider_for(resource)
         provider_code = provider.provider_type if provider else None
         user_id = provider.user_id if provider else None
         
@@ -122,12 +119,7 @@ class PostgreSQLClusterPriceCheckRule(BaseRule):
             return []
         
         # Get enabled alternative providers
-        prefs = UserProviderPreference.query.filter_by(
-            user_id=user_id,
-            is_enabled=True
-        ).all()
-        
-        enabled_provider_codes = {p.provider_type for p in prefs}
+        enabled_provider_codes = set(context.enabled_provider_types)
         
         # Remove current provider
         if provider_code in enabled_provider_codes:
@@ -137,19 +129,9 @@ class PostgreSQLClusterPriceCheckRule(BaseRule):
             return []
         
         # Check for previously dismissed providers
-        dismissed_providers = set()
-        try:
-            existing_dismissed = OptimizationRecommendation.query.filter_by(
-                resource_id=resource.id,
-                recommendation_type='price_compare_cross_provider',
-                status='dismissed'
-            ).all()
-            
-            for rec in existing_dismissed:
-                if rec.target_provider:
-                    dismissed_providers.add(rec.target_provider)
-        except Exception:
-            pass
+        dismissed_providers = context.dismissed_target_providers(
+            resource.id, recommendation_type='price_compare_cross_provider'
+        )
         
         # Filter out dismissed providers
         candidate_providers = enabled_provider_codes - dismissed_providers
@@ -171,12 +153,7 @@ class PostgreSQLClusterPriceCheckRule(BaseRule):
         for target_provider in candidate_providers:
             if target_provider == 'selectel':
                 # Get available regions for Selectel
-                all_regions_query = ProviderPrice.query.filter_by(
-                    provider='selectel',
-                    resource_type='postgresql-cluster'
-                ).with_entities(ProviderPrice.region).distinct()
-                
-                all_regions = [r[0] for r in all_regions_query.all()]
+                all_regions = context.price_regions('selectel', 'postgresql-cluster')
                 
                 # Prioritize matching geographic regions
                 regions = []
@@ -196,14 +173,14 @@ class PostgreSQLClusterPriceCheckRule(BaseRule):
                     # Query for closest matching configuration
                     # For databases: require equal or MORE RAM (managed services often have better specs)
                     # Allow less storage (20%) since Selectel uses local NVMe SSD vs Yandex network HDD
-                    match = ProviderPrice.query.filter(
-                        ProviderPrice.provider == 'selectel',
-                        ProviderPrice.resource_type == 'postgresql-cluster',
-                        ProviderPrice.region == region,
-                        ProviderPrice.cpu_cores == total_vcpus,
-                        ProviderPrice.ram_gb >= total_ram_gb,  # Equal or more RAM
-                        ProviderPrice.storage_gb >= total_storage_gb * 0.8  # Allow 20% less storage (SSD vs HDD)
-                    ).order_by(ProviderPrice.monthly_cost).first()
+                    match = context.cheapest_price(
+                        'selectel',
+                        'postgresql-cluster',
+                        region=region,
+                        cpu_cores=total_vcpus,
+                        min_ram_gb=total_ram_gb,  # Equal or more RAM
+                        min_storage_gb=total_storage_gb * 0.8  # Allow 20% less storage (SSD vs HDD)
+                    )
                     
                     if match:
                         # This is per-node cost in Selectel, multiply by node count to match Yandex
@@ -232,12 +209,7 @@ class PostgreSQLClusterPriceCheckRule(BaseRule):
             
             elif target_provider == 'beget':
                 # Get available regions for Beget
-                all_regions_query = ProviderPrice.query.filter_by(
-                    provider='beget',
-                    resource_type='postgresql-cluster'
-                ).with_entities(ProviderPrice.region).distinct()
-                
-                all_regions = [r[0] for r in all_regions_query.all()]
+                all_regions = context.price_regions('beget', 'postgresql-cluster')
                 
                 # Prioritize matching geographic regions
                 regions = []
@@ -256,14 +228,14 @@ class PostgreSQLClusterPriceCheckRule(BaseRule):
                 for region in regions:
                     # Query for closest matching configuration
                     # Beget also uses local NVMe SSD, similar matching logic as Selectel
-                    match = ProviderPrice.query.filter(
-                        ProviderPrice.provider == 'beget',
-                        ProviderPrice.resource_type == 'postgresql-cluster',
-                        ProviderPrice.region == region,
-                        ProviderPrice.cpu_cores == total_vcpus,
-                        ProviderPrice.ram_gb >= total_ram_gb,  # Equal or more RAM
-                        ProviderPrice.storage_gb >= total_storage_gb * 0.8  # Allow 20% less storage (SSD vs HDD)
-                    ).order_by(ProviderPrice.monthly_cost).first()
+                    match = context.cheapest_price(
+                        'beget',
+                        'postgresql-cluster',
+                        region=region,
+                        cpu_cores=total_vcpus,
+                        min_ram_gb=total_ram_gb,  # Equal or more RAM
+                        min_storage_gb=total_storage_gb * 0.8  # Allow 20% less storage (SSD vs HDD)
+                    )
                     
                     if match:
                         # Beget pricing is per-node like Selectel
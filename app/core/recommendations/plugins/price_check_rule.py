@@ -6,9 +6,10 @@ from sqlalchemy import and_
 import logging
 
 from ..interfaces import BaseRule, RuleScope, RuleCategory, RecommendationOutput
-from ..normalization import normalize_resource, normalize_price_row, candidates_for_resource
+from ..normalization import NormalizedSKU, normalize_resource
+from ..price_matching import MatchRequest
 
-from app.core.models.pricing import ProviderPrice, PriceComparisonRecommendation
+from app.core.models.pricing import PriceComparisonRecommendation
 from flask import current_app
 from app.core.models.resource import Resource
 from app.core.models.provider import CloudProvider
@@ -50,7 +51,7 @@ class CrossProviderPriceCheckRule(BaseRule):
         # Skip resources that are part of aggregated services (e.g., Kubernetes nodes, CSI volumes)
         # These should be recommended at the cluster/service level, not individually
         try:
-            tags = {t.tag_key: t.tag_value for t in getattr(resource, 'tags', [])}
+            tags = context.tags_for(resource)
             resource_name = getattr(resource, 'resource_name', '') or ''
             
             # Check if it's a Kubernetes node
@@ -102,11 +103,9 @@ class CrossProviderPriceCheckRule(BaseRule):
             pass
         
         # Load provider code and region
-        provider: Optional[CloudProvider] = CloudProvider.query.get(resource.provider_id) if resource.provider_id else None
+        provider: Optional[CloudProvider] = context.provider_for(resource)
         provider_code = provider.provider_type if provider else None
         region = getattr(resource, 'region', None)
-        # Treat 'global' as no region preference
-        region_prefix = None if (isinstance(region, str) and region.lower() == 'global') else ((region or '')[:2] if region else None)
 
         # Determine current monthly cost
         current_monthly = 0.0
@@ -132,84 +131,41 @@ class CrossProviderPriceCheckRule(BaseRule):
             getattr(resource, 'id', None), getattr(resource, 'resource_name', None), getattr(norm_res, 'vcpu', None), getattr(norm_res, 'memory_gib', None), region,
         )
 
-        # Get user's enabled providers for recommendations
-        from app.core.models.user_provider_preference import UserProviderPreference
+        # Get user's enabled providers for recommendations (empty list means all providers)
         user_id = resource.user_id if hasattr(resource, 'user_id') else (provider.user_id if provider else None)
-        enabled_providers = []
-        
+        enabled_providers = list(context.enabled_provider_types) if user_id else []
         if user_id:
-            try:
-                enabled_providers = UserProviderPreference.get_enabled_providers_for_user(user_id)
-                logger.info(
-                    "price_check: user preferences | user_id=%s enabled_providers=%s",
-                    user_id, enabled_providers
-                )
-            except Exception as e:
-                logger.warning(
-                    "price_check: failed to get user preferences (defaulting to all) | user_id=%s error=%s",
-                    user_id, str(e)
-                )
-                enabled_providers = []  # Empty list means all providers when no preferences set
+            logger.info(
+                "price_check: user preferences | user_id=%s enabled_providers=%s",
+                user_id, enabled_providers
+            )
 
-        # Query candidate price rows excluding same provider to focus on cross-provider
-        base_query = ProviderPrice.query.filter(ProviderPrice.cpu_cores.isnot(None), ProviderPrice.ram_gb.isnot(None))
-        if provider_code:
-            base_query = base_query.filter(ProviderPrice.provider != provider_code)
-        
-        # Filter by user's enabled providers if preferences are set
-        if enabled_providers:
-            base_query = base_query.filter(ProviderPrice.provider.in_(enabled_providers))
-        # Narrow by specs when known to ensure relevant matches are included in the limited window
-        if getattr(norm_res, 'vcpu', None) is not None:
-            base_query = base_query.filter(ProviderPrice.cpu_cores == int(norm_res.vcpu))
-        if getattr(norm_res, 'memory_gib', None) is not None:
-            try:
-                mem = float(norm_res.memory_gib)
-                base_query = base_query.filter(ProviderPrice.ram_gb.between(max(0.5, mem * 0.8), mem * 1.25))
-            except Exception:
-                pass
-        total_prices = base_query.count()
-        price_query = base_query
-        if region_prefix:
-            price_query = price_query.filter(ProviderPrice.region.startswith(region_prefix))
-        region_filtered_count = price_query.count()
-        # Prefer cheaper options first
-        price_query = price_query.order_by((ProviderPrice.monthly_cost==None).asc(), ProviderPrice.monthly_cost.asc())
-        prices = price_query.limit(500).all()  # MVP cap
+        # Match against the column catalog; VMs of this run are scored in one batch on first use
+        engine = context.price_engine
+        request = self._match_request(resource, context, norm_res)
+        if not engine.has_match(request.key):
+            engine.match_batch([request] + [
+                self._match_request(r, context)
+                for r in context.resources
+                if r is not resource and not engine.has_match(r.id) and self.applies(r, context)
+            ])
+        match = engine.match(request)
         logger.info(
             "price_check: catalog scope | res_id=%s total_prices=%s region_filtered=%s",
-            getattr(resource, 'id', None), total_prices, region_filtered_count,
+            getattr(resource, 'id', None), match.total_prices, match.region_filtered,
         )
 
-        # If specs are unknown, relax matching and select cheapest options as low-confidence candidates
         specs_unknown = (norm_res.vcpu is None) or (norm_res.memory_gib is None)
         min_score = 0.8 if not specs_unknown else 0.0
-        # Use normalized region (None when original is 'global') to avoid over-filtering
-        preferred_region = getattr(norm_res, 'region', None)
         logger.info(
             "price_check: candidate_search | res_id=%s pref_region=%s min_score=%.2f",
-            getattr(resource, 'id', None), preferred_region, min_score,
+            getattr(resource, 'id', None), getattr(norm_res, 'region', None), min_score,
         )
-        candidates = candidates_for_resource(
-            norm_res,
-            prices,
-            preferred_region=preferred_region,
-            region_prefix_match=True,
-            min_score=min_score,
-            limit=5,
-        )
-        if not candidates:
+        candidates = match.candidates
+        if match.used_region_fallback:
             logger.info(
                 "price_check: no candidates for preferred region | res_id=%s pref_region=%s -> fallback to any region",
-                getattr(resource, 'id', None), preferred_region,
-            )
-            candidates = candidates_for_resource(
-                norm_res,
-                prices,
-                preferred_region=None,
-                region_prefix_match=False,
-                min_score=min_score,
-                limit=5,
+                getattr(resource, 'id', None), getattr(norm_res, 'region', None),
             )
         if not candidates:
             logger.info(
@@ -219,15 +175,11 @@ class CrossProviderPriceCheckRule(BaseRule):
             return []
 
         # Progressive disclosure: Filter out dismissed providers for THIS resource
-        from app.core.models.recommendations import OptimizationRecommendation
-        dismissed_recs = OptimizationRecommendation.query.filter_by(
-            resource_id=resource.id,
+        dismissed_providers = context.dismissed_target_providers(
+            resource.id,
             recommendation_type="price_compare_cross_provider",
             source=self.id,
-            status='dismissed'
-        ).all()
-        
-        dismissed_providers = {rec.target_provider for rec in dismissed_recs if rec.target_provider}
+        )
         
         if dismissed_providers:
             logger.info(
@@ -314,11 +266,7 @@ class CrossProviderPriceCheckRule(BaseRule):
         try:
             user_id = context.get('user_id') if isinstance(context, dict) else None
             if user_id:
-                existing = PriceComparisonRecommendation.query.filter_by(
-                    user_id=user_id,
-                    current_resource_id=resource.id,
-                    recommended_price_id=best_row.id,
-                ).first()
+                existing = context.find_price_comparison(resource.id, best_row.id)
                 if existing is None:
                     pcr = PriceComparisonRecommendation(
                         user_id=user_id,
@@ -331,6 +279,7 @@ class CrossProviderPriceCheckRule(BaseRule):
                         migration_effort='medium',
                     )
                     db.session.add(pcr)
+                    context.remember_price_comparison(pcr)
                 else:
                     existing.similarity_score = round(best_score * 100, 2)
                     existing.monthly_savings = savings
@@ -388,6 +337,26 @@ class CrossProviderPriceCheckRule(BaseRule):
         )
         return [rec]
 
+    def _match_request(self, resource: Resource, context, norm_res: Optional[NormalizedSKU] = None) -> MatchRequest:
+        """Build the catalog query of this rule for a resource (same filters as the former SQL)."""
+        if norm_res is None:
+            norm_res = normalize_resource(resource)
+        provider = context.provider_for(resource)
+        user_id = resource.user_id if hasattr(resource, 'user_id') else (provider.user_id if provider else None)
+        region = getattr(resource, 'region', None)
+        # Treat 'global' as no region preference
+        region_prefix = None if (isinstance(region, str) and region.lower() == 'global') else ((region or '')[:2] if region else None)
+        specs_unknown = (norm_res.vcpu is None) or (norm_res.memory_gib is None)
+        return MatchRequest(
+            key=resource.id,
+            resource=norm_res,
+            exclude_provider=provider.provider_type if provider else None,
+            enabled_providers=list(context.enabled_provider_types) if user_id else [],
+            region_prefix=region_prefix,
+            min_score=0.8 if not specs_unknown else 0.0,
+            limit=5,
+        )
+
 
 RULES = [CrossProviderPriceCheckRule]
 
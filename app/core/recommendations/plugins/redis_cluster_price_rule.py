@@ -13,10 +13,6 @@ from typing import List
 from flask import current_app
 
 from app.core.models.resource import Resource
-from app.core.models.provider import CloudProvider
-from app.core.models.pricing import ProviderPrice
-from app.core.models.user_provider_preference import UserProviderPreference
-from app.core.models.recommendations import OptimizationRecommendation
 from app.core.recommendations.interfaces import BaseRule, RuleCategory, RuleScope, RecommendationOutput
 
 logger = logging.getLogger(__name__)
@@ -77,15 +73,14 @@ class RedisClusterPriceCheckRule(BaseRule):
         if not total_vcpus or not total_ram_gb or not total_storage_gb:
             return []
         
-        provider = CloudProvider.query.get(resource.provider_id) if resource.provider_id else None
+        provider = context.provider_for(resource)
         provider_code = provider.provider_type if provider else None
         user_id = provider.user_id if provider else None
         
         if not provider_code or not user_id:
             return []
         
-        prefs = UserProviderPreference.query.filter_by(user_id=user_id, is_enabled=True).all()
-        enabled_provider_codes = {p.provider_type for p in prefs}
+        enabled_provider_codes = set(context.enabled_provider_types)
         
         if provider_code in enabled_provider_codes:
             enabled_provider_codes.remove(provider_code)
@@ -94,19 +89,9 @@ class RedisClusterPriceCheckRule(BaseRule):
             return []
         
         # Check dismissed
-        dismissed_providers = set()
-        try:
-            existing_dismissed = OptimizationRecommendation.query.filter_by(
-                resource_id=resource.id,
-                recommendation_type='price_compare_cross_provider',
-                status='dismissed'
-            ).all()
-            
-            for rec in existing_dismissed:
-                if rec.target_provider:
-                    dismissed_providers.add(rec.target_provider)
-        except Exception:
-            pass
+        dismissed_providers = context.dismissed_target_providers(
+            resource.id, recommendation_type='price_compare_cross_provider'
+        )
         
         candidate_providers = enabled_provider_codes - dismissed_providers
         
@@ -122,12 +107,7 @@ class RedisClusterPriceCheckRule(BaseRule):
         for target_provider in candidate_providers:
             if target_provider == 'selectel':
                 # Selectel Redis uses unified DBaaS pricing
-                all_regions_query = ProviderPrice.query.filter_by(
-                    provider='selectel',
-                    resource_type='postgresql-cluster'  # Reuse unified DBaaS pricing
-                ).with_entities(ProviderPrice.region).distinct()
-                
-                all_regions = [r[0] for r in all_regions_query.all()]
+                all_regions = context.price_regions('selectel', 'postgresql-cluster')  # Reuse unified DBaaS pricing
                 
                 regions = []
                 if cluster_geo_prefix:
@@ -139,14 +119,14 @@ class RedisClusterPriceCheckRule(BaseRule):
                 best_region_option = None
                 
                 for region in regions:
-                    match = ProviderPrice.query.filter(
-                        ProviderPrice.provider == 'selectel',
-                        ProviderPrice.resource_type == 'postgresql-cluster',
-                        ProviderPrice.region == region,
-                        ProviderPrice.cpu_cores == total_vcpus,
-                        ProviderPrice.ram_gb >= total_ram_gb,
-                        ProviderPrice.storage_gb >= total_storage_gb * 0.8
-                    ).order_by(ProviderPrice.monthly_cost).first()
+                    match = context.cheapest_price(
+                        'selectel',
+                        'postgresql-cluster',
+                        region=region,
+                        cpu_cores=total_vcpus,
+                        min_ram_gb=total_ram_gb,
+                        min_storage_gb=total_storage_gb * 0.8
+                    )
                     
                     if match:
                         total_cost = float(match.monthly_cost) * total_hosts
@@ -70,7 +70,7 @@ class StoppedResourceCleanupRule(BaseRule):
         
         # Пропускаем ресурсы Kubernetes (они управляются кластером)
         try:
-            tags = {t.tag_key: t.tag_value for t in getattr(resource, 'tags', [])}
+            tags = context.tags_for(resource)
             resource_name = getattr(resource, 'resource_name', '') or ''
             
             if tags.get('is_kubernetes_node') == 'true' or tags.get('is_kubernetes_node') is True:
@@ -0,0 +1,232 @@
+"""Process-wide cache of the normalized provider price catalog."""
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from flask import current_app
+from sqlalchemy import func
+
+from app.core.models import db
+from app.core.models.pricing import ProviderPrice
+from .normalization import NormalizedSKU, normalize_price_row
+
+
+logger = logging.getLogger(__name__)
+
+# Columns read when (re)building the catalog; rows are normalized by attribute name
+_CATALOG_COLUMNS = (
+    ProviderPrice.id,
+    ProviderPrice.provider,
+    ProviderPrice.resource_type,
+    ProviderPrice.provider_sku,
+    ProviderPrice.region,
+    ProviderPrice.cpu_cores,
+    ProviderPrice.ram_gb,
+    ProviderPrice.storage_gb,
+    ProviderPrice.storage_type,
+    ProviderPrice.extended_specs,
+    ProviderPrice.monthly_cost,
+    ProviderPrice.currency,
+)
+
+
+class CatalogEntry:
+    """One price row: its id, resource type, normalized SKU and the raw catalog columns."""
+
+    __slots__ = ('id', 'resource_type', 'sku', 'price')
+
+    def __init__(self, id: int, resource_type: Optional[str], sku: NormalizedSKU, price: Any = None) -> None:
+        self.id = id
+        self.resource_type = resource_type
+        self.sku = sku
+        # Row of _CATALOG_COLUMNS; reads like a ProviderPrice (price.monthly_cost, price.provider_sku, ...)
+        self.price = price
+
+    def __repr__(self) -> str:
+        return f'<CatalogEntry {self.id} {self.sku.provider}/{self.resource_type} {self.sku.sku_id}>'
+
+
+class NormalizedPriceCatalog:
+    """Normalized `provider_prices` kept in memory and keyed by a catalog version.
+
+    The version combines a local generation, bumped by `bump_version()` after
+    price writes, with a fingerprint of the table (row count, max id, max
+    last_updated). The fingerprint is re-read at most every
+    PRICE_CATALOG_CHECK_SECONDS, so writes made by other processes (cron price
+    syncs) are picked up without a restart.
+    """
+
+    def __init__(self) -> None:
+        self.logger = logging.getLogger(f"{__name__}.{self.__class__.__name__}")
+        self._lock = threading.RLock()
+        self._entries: List[CatalogEntry] = []
+        self._by_provider_type: Dict[Tuple[str, str], List[CatalogEntry]] = {}
+        self._by_provider: Dict[str, List[CatalogEntry]] = {}
+        self._generation = 0
+        self._fingerprint: Optional[Tuple[Any, ...]] = None
+        self._loaded_version: Optional[Tuple[int, Optional[Tuple[Any, ...]]]] = None
+        self._checked_at = 0.0
+        self.hits = 0
+        self.misses = 0
+        self.rebuilds = 0
+        self.last_rebuild_seconds = 0.0
+        self.total_rebuild_seconds = 0.0
+        self.last_rebuild_at: Optional[float] = None
+
+    # ---- Public API ----
+    @property
+    def version(self) -> Tuple[int, Optional[Tuple[Any, ...]]]:
+        return (self._generation, self._fingerprint)
+
+    def bump_version(self) -> None:
+        """Mark the catalog stale; the next read re-checks the table and rebuilds."""
+        with self._lock:
+            self._generation += 1
+            self._checked_at = 0.0
+
+    def entries(self, provider: Optional[str] = None, resource_type: Optional[str] = None) -> List[CatalogEntry]:
+        """Catalog rows ordered by id, optionally limited to a provider and resource type."""
+        with self._lock:
+            self._ensure_fresh()
+            if provider is None and resource_type is None:
+                return list(self._entries)
+            if provider is not None and resource_type is not None:
+                return list(self._by_provider_type.get((provider, resource_type), ()))
+            if resource_type is None:
+                return list(self._by_provider.get(provider, ()))
+            return [
+                e for e in self._entries
+                if (provider is None or e.sku.provider == provider)
+                and (resource_type is None or e.resource_type == resource_type)
+            ]
+
+    def find_prices(
+        self,
+        provider: str,
+        resource_type: Optional[str] = None,
+        *,
+        region: Optional[str] = None,
+        region_prefix: Optional[str] = None,
+        cpu_cores: Optional[float] = None,
+        min_ram_gb: Optional[float] = None,
+        max_ram_gb: Optional[float] = None,
+        min_storage_gb: Optional[float] = None,
+        storage_type: Optional[str] = None,
+    ) -> List[Any]:
+        """Price rows of a provider (and resource type) matching the filters, cheapest first.
+
+        Filters compare the raw catalog columns like the former SQL filters
+        did: a row with NULL in a filtered column never matches. Rows without a
+        monthly cost sort last; equal costs keep catalog (id) order.
+        """
+        checks: List[Tuple[str, Any]] = []
+        if cpu_cores is not None:
+            checks.append(('cpu_cores', lambda v: v == cpu_cores))
+        if min_ram_gb is not None:
+            checks.append(('ram_gb', lambda v: v >= min_ram_gb))
+        if max_ram_gb is not None:
+            checks.append(('ram_gb', lambda v: v <= max_ram_gb))
+        if min_storage_gb is not None:
+            checks.append(('storage_gb', lambda v: v >= min_storage_gb))
+        if storage_type is not None:
+            checks.append(('storage_type', lambda v: v == storage_type))
+        if region is not None:
+            checks.append(('region', lambda v: v == region))
+        if region_prefix:
+            checks.append(('region', lambda v: v.startswith(region_prefix)))
+
+        rows = []
+        for entry in self.entries(provider, resource_type):
+            price = entry.price
+            if all(getattr(price, column) is not None and check(getattr(price, column)) for column, check in checks):
+                rows.append(price)
+        rows.sort(key=lambda row: (row.monthly_cost is None, row.monthly_cost or 0.0))
+        return rows
+
+    def cheapest_price(self, provider: str, resource_type: Optional[str] = None, **filters: Any) -> Optional[Any]:
+        """Cheapest row of `find_prices`, or None."""
+        rows = self.find_prices(provider, resource_type, **filters)
+        return rows[0] if rows else None
+
+    def regions(self, provider: str, resource_type: Optional[str] = None) -> List[str]:
+        """Distinct non-empty regions of a provider's (resource type's) rows, in catalog order."""
+        seen: Dict[str, None] = {}
+        for entry in self.entries(provider, resource_type):
+            if entry.price.region:
+                seen.setdefault(entry.price.region, None)
+        return list(seen)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'version': self._generation,
+                'fingerprint': [str(v) for v in self._fingerprint] if self._fingerprint else None,
+                'entries': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else None,
+                'rebuilds': self.rebuilds,
+                'last_rebuild_seconds': round(self.last_rebuild_seconds, 3),
+                'total_rebuild_seconds': round(self.total_rebuild_seconds, 3),
+                'last_rebuild_at': self.last_rebuild_at,
+            }
+
+    # ---- Internals ----
+    def _check_interval(self) -> float:
+        try:
+            return float(current_app.config.get('PRICE_CATALOG_CHECK_SECONDS', 60))
+        except Exception:
+            return 60.0
+
+    def _read_fingerprint(self) -> Tuple[Any, ...]:
+        row = db.session.query(
+            func.count(ProviderPrice.id),
+            func.max(ProviderPrice.id),
+            func.max(ProviderPrice.last_updated),
+        ).one()
+        return tuple(row)
+
+    def _ensure_fresh(self) -> None:
+        now = time.monotonic()
+        loaded = self._loaded_version
+        if loaded is not None and loaded[0] == self._generation and now - self._checked_at < self._check_interval():
+            self.hits += 1
+            return
+        self._fingerprint = self._read_fingerprint()
+        self._checked_at = now
+        if self.version == loaded:
+            self.hits += 1
+            return
+        self.misses += 1
+        self._rebuild()
+
+    def _rebuild(self) -> None:
+        t0 = time.perf_counter()
+        rows = ProviderPrice.query.with_entities(*_CATALOG_COLUMNS).order_by(ProviderPrice.id).all()
+        entries = [CatalogEntry(row.id, row.resource_type, normalize_price_row(row), row) for row in rows]
+        by_provider_type: Dict[Tuple[str, str], List[CatalogEntry]] = {}
+        by_provider: Dict[str, List[CatalogEntry]] = {}
+        for entry in entries:
+            by_provider_type.setdefault((entry.sku.provider, entry.resource_type), []).append(entry)
+            by_provider.setdefault(entry.sku.provider, []).append(entry)
+        self._entries = entries
+        self._by_provider_type = by_provider_type
+        self._by_provider = by_provider
+        self._loaded_version = self.version
+        dt = time.perf_counter() - t0
+        self.rebuilds += 1
+        self.last_rebuild_seconds = dt
+        self.total_rebuild_seconds += dt
+        self.last_rebuild_at = time.time()
+        self.logger.info(
+            "price_catalog_rebuild | version=%s entries=%d duration_ms=%d",
+            self._generation, len(entries), int(dt * 1000),
+        )
+
+
+# Global catalog shared by rules, services and agent tools in this process
+price_catalog = NormalizedPriceCatalog()
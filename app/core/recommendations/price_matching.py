@@ -0,0 +1,220 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Dict, Hashable, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .normalization import NormalizedSKU
+from .price_catalog import CatalogEntry, price_catalog
+
+
+# Same window the rule used to fetch per resource (cheapest first)
+CANDIDATE_WINDOW = 500
+# Upper bound on resource x price cells scored at once in a batch
+BATCH_CELLS = 500_000
+
+
+@dataclass
+class MatchRequest:
+    """Inputs of one price match; mirrors the per-VM query of the price check rule."""
+
+    key: Hashable
+    resource: NormalizedSKU
+    exclude_provider: Optional[str] = None
+    enabled_providers: Sequence[str] = ()
+    region_prefix: Optional[str] = None
+    min_score: float = 0.8
+    limit: int = 5
+
+
+@dataclass
+class MatchResult:
+    total_prices: int = 0
+    region_filtered: int = 0
+    # (normalized_price, score, catalog_entry) sorted by (score desc, monthly_cost asc)
+    candidates: List[Tuple[NormalizedSKU, float, CatalogEntry]] = field(default_factory=list)
+    used_region_fallback: bool = False
+
+
+class PriceMatchingEngine:
+    """Column-oriented server price catalog for cross-provider matching.
+
+    The catalog is taken once per run and kept in NumPy arrays ordered like the
+    rule's query (priced rows first, cheapest first). Filtering, the 500-row
+    window and `equivalence_score` are evaluated for many VMs at once and give
+    the same candidates and scores as `candidates_for_resource`.
+    """
+
+    def __init__(self, entries: Iterable[CatalogEntry]) -> None:
+        normalized = [(e.sku, e) for e in entries if e.sku.vcpu is not None and e.sku.memory_gib is not None]
+        # ORDER BY (monthly_cost IS NULL), monthly_cost; ties keep catalog (id) order
+        normalized.sort(key=lambda item: (item[0].monthly_cost is None, item[0].monthly_cost or 0.0))
+        self.skus: List[NormalizedSKU] = [ns for ns, _ in normalized]
+        self.rows: List[CatalogEntry] = [entry for _, entry in normalized]
+        n = len(self.skus)
+
+        self._provider_codes: Dict[str, int] = {}
+        self.provider = np.fromiter((self._code(self._provider_codes, s.provider) for s in self.skus), dtype=np.int32, count=n)
+        self.region = np.array([s.region for s in self.skus], dtype=object)
+        self.region2 = np.array([s.region[:2] if s.region else None for s in self.skus], dtype=object)
+        self.has_region = np.fromiter((bool(s.region) for s in self.skus), dtype=bool, count=n)
+        self.vcpu = np.fromiter((s.vcpu for s in self.skus), dtype=np.float64, count=n)
+        self.ram = np.fromiter((s.memory_gib for s in self.skus), dtype=np.float64, count=n)
+        self.storage = self._floats(s.storage_included_gib for s in self.skus)
+        self.network = self._floats(s.network_bandwidth_gbps for s in self.skus)
+        self.monthly = self._floats(s.monthly_cost for s in self.skus)
+        # candidates_for_resource sorts by `monthly_cost or inf`
+        self.sort_cost = np.where(np.isnan(self.monthly) | (self.monthly == 0), np.inf, self.monthly)
+
+        self._label_codes: Dict[str, int] = {}
+        self.baseline = np.fromiter((self._code(self._label_codes, s.cpu_baseline_type) for s in self.skus), dtype=np.int32, count=n)
+        self.storage_type = np.fromiter((self._code(self._label_codes, s.storage_type) for s in self.skus), dtype=np.int32, count=n)
+
+        self._prefix_masks: Dict[str, np.ndarray] = {}
+        self._provider_masks: Dict[Tuple[str, ...], np.ndarray] = {}
+        self._results: Dict[Hashable, MatchResult] = {}
+
+    @classmethod
+    def from_catalog(cls) -> 'PriceMatchingEngine':
+        """Build from the process-wide normalized catalog (no per-run normalization)."""
+        return cls(price_catalog.entries())
+
+    def __len__(self) -> int:
+        return len(self.skus)
+
+    # ---- Public API ----
+    def has_match(self, key: Hashable) -> bool:
+        return key in self._results
+
+    def match(self, request: MatchRequest) -> MatchResult:
+        """Return the match for one request, reusing a batched result when primed."""
+        cached = self._results.get(request.key)
+        if cached is not None:
+            return cached
+        return self.match_batch([request])[request.key]
+
+    def match_batch(self, requests: Sequence[MatchRequest]) -> Dict[Hashable, MatchResult]:
+        """Match many resources against the catalog, scoring them in chunks."""
+        results: Dict[Hashable, MatchResult] = {}
+        if not requests:
+            return results
+        if not len(self):
+            for req in requests:
+                results[req.key] = self._results[req.key] = MatchResult()
+            return results
+        chunk = max(1, BATCH_CELLS // len(self))
+        for start in range(0, len(requests), chunk):
+            for req, result in zip(requests[start:start + chunk], self._match_chunk(requests[start:start + chunk])):
+                results[req.key] = self._results[req.key] = result
+        return results
+
+    # ---- Internals ----
+    @staticmethod
+    def _code(codes: Dict[str, int], value: Optional[str]) -> int:
+        if not value:
+            return -1
+        return codes.setdefault(value, len(codes))
+
+    @staticmethod
+    def _floats(values: Iterable[Optional[float]]) -> np.ndarray:
+        return np.array([np.nan if v is None else v for v in values], dtype=np.float64)
+
+    @staticmethod
+    def _truthy(arr: np.ndarray) -> np.ndarray:
+        return ~np.isnan(arr) & (arr != 0)
+
+    def _prefix_mask(self, prefix: Optional[str]) -> np.ndarray:
+        """Rows whose region starts with prefix (SQL startswith; NULL regions never match)."""
+        mask = self._prefix_masks.get(prefix)
+        if mask is None:
+            mask = np.fromiter((bool(r is not None and r.startswith(prefix)) for r in self.region), dtype=bool, count=len(self))
+            self._prefix_masks[prefix] = mask
+        return mask
+
+    def _provider_mask(self, enabled: Sequence[str]) -> np.ndarray:
+        key = tuple(sorted(set(enabled)))
+        mask = self._provider_masks.get(key)
+        if mask is None:
+            codes = [self._provider_codes[p] for p in key if p in self._provider_codes]
+            mask = np.isin(self.provider, codes)
+            self._provider_masks[key] = mask
+        return mask
+
+    def _resource_columns(self, requests: Sequence[MatchRequest]) -> Dict[str, np.ndarray]:
+        res = [req.resource for req in requests]
+        labels = self._label_codes
+        return {
+            'vcpu': self._floats(r.vcpu for r in res)[:, None],
+            'ram': self._floats(r.memory_gib for r in res)[:, None],
+            'storage': self._floats(r.storage_included_gib for r in res)[:, None],
+            'network': self._floats(r.network_bandwidth_gbps for r in res)[:, None],
+            # Labels unknown to the catalog can never be equal to a catalog value
+            'baseline': np.array([labels.get(r.cpu_baseline_type, -2) if r.cpu_baseline_type else -1 for r in res], dtype=np.int32)[:, None],
+            'storage_type': np.array([labels.get(r.storage_type, -2) if r.storage_type else -1 for r in res], dtype=np.int32)[:, None],
+        }
+
+    def _scores(self, cols: Dict[str, np.ndarray]) -> np.ndarray:
+        """Vectorized `equivalence_score`; terms are added in the same order so floats match exactly."""
+        score = np.zeros((cols['vcpu'].shape[0], len(self)), dtype=np.float64)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            score += np.where(~np.isnan(cols['vcpu']) & (cols['vcpu'] == self.vcpu), 0.4, 0.0)
+
+            both = self._truthy(cols['ram']) & self._truthy(self.ram)
+            high = np.maximum(cols['ram'], self.ram)
+            low = np.minimum(cols['ram'], self.ram)
+            ratio = np.where(high != 0, low / high, 0.0)
+            score += np.where(both & (ratio >= 0.8), 0.3 * np.clip((ratio - 0.9) / 0.1 + 1.0, 0.0, 1.0), 0.0)
+
+            a_st, b_st = cols['storage'], self.storage
+            both = self._truthy(a_st) & self._truthy(b_st)
+            score += np.where(both & (b_st >= a_st), 0.15,
+                              np.where(both & (b_st >= a_st * 0.8), 0.15 * (b_st / a_st), 0.0))
+
+            score += np.where((cols['baseline'] >= 0) & (cols['baseline'] == self.baseline), 0.1, 0.0)
+            score += np.where((cols['storage_type'] >= 0) & (cols['storage_type'] == self.storage_type), 0.05, 0.0)
+
+            a_net, b_net = cols['network'], self.network
+            both = self._truthy(a_net) & self._truthy(b_net)
+            high = np.maximum(a_net, b_net)
+            score += np.where(both & (high > 0) & (np.minimum(a_net, b_net) / high >= 0.5), 0.05, 0.0)
+        return np.minimum(1.0, score)
+
+    def _match_chunk(self, requests: Sequence[MatchRequest]) -> List[MatchResult]:
+        cols = self._resource_columns(requests)
+        no_exclude = -2
+        exclude = np.array([self._provider_codes.get(r.exclude_provider, no_exclude) if r.exclude_provider else no_exclude for r in requests], dtype=np.int32)[:, None]
+        base = self.provider != exclude
+        base &= np.stack([self._provider_mask(r.enabled_providers) if r.enabled_providers else np.ones(len(self), dtype=bool) for r in requests])
+        vcpu, ram = cols['vcpu'], cols['ram']
+        base &= np.isnan(vcpu) | (self.vcpu == np.trunc(np.nan_to_num(vcpu)))
+        with np.errstate(invalid='ignore'):
+            base &= np.isnan(ram) | ((self.ram >= np.maximum(0.5, ram * 0.8)) & (self.ram <= ram * 1.25))
+
+        in_region = np.stack([self._prefix_mask(r.region_prefix) if r.region_prefix else np.ones(len(self), dtype=bool) for r in requests])
+        scoped = base & in_region
+        window = scoped & (np.cumsum(scoped, axis=1) <= CANDIDATE_WINDOW)
+        scores = self._scores(cols)
+        eligible = window & (scores >= np.array([r.min_score for r in requests], dtype=np.float64)[:, None])
+
+        total = base.sum(axis=1)
+        region_filtered = scoped.sum(axis=1)
+        results = []
+        for i, req in enumerate(requests):
+            preferred = req.resource.region
+            fallback = False
+            idx = np.flatnonzero(eligible[i])
+            if preferred and idx.size:
+                keep = ~self.has_region[idx] | (self.region[idx] == preferred) | (self.region2[idx] == preferred[:2])
+                region_idx = idx[keep]
+                if not region_idx.size:
+                    fallback = True
+                idx = region_idx if region_idx.size else idx
+            order = np.lexsort((self.sort_cost[idx], -scores[i, idx]))[:req.limit]
+            results.append(MatchResult(
+                total_prices=int(total[i]),
+                region_filtered=int(region_filtered[i]),
+                candidates=[(self.skus[j], float(scores[i, j]), self.rows[j]) for j in idx[order]],
+                used_region_fallback=fallback,
+            ))
+        return results
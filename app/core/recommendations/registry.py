@@ -2,10 +2,30 @@ from __future__ import annotations
 
 import importlib
 import pkgutil
-from typing import List, Optional, Sequence, Type
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple, Type
 
 from .interfaces import BaseRule, RuleScope
 
+# (resource_type, provider_type) of a resource as seen by the dispatcher
+DispatchKey = Tuple[Optional[str], Optional[str]]
+
+
+def normalize_resource_type(resource_type: Optional[str]) -> Optional[str]:
+    """Loose type key: rules compare case-insensitively and treat '-' and '_' alike."""
+    if resource_type is None:
+        return None
+    return str(resource_type).lower().replace('-', '_')
+
+
+@dataclass
+class DispatchEntry:
+    """Enabled rules for one dispatch key and the rules disabled for it (by reason)."""
+
+    rules: List[BaseRule] = field(default_factory=list)
+    disabled: Counter = field(default_factory=Counter)
+
 
 class RuleRegistry:
     """Discovery and registry of recommendation rules.
@@ -61,18 +81,41 @@ class RuleRegistry:
         return [r for r in self._rules if r.scope == RuleScope.GLOBAL]
 
     def rules_for_resource(self, resource_type: Optional[str], provider_type: Optional[str]) -> List[BaseRule]:
+        """Resource rules that may apply to this type/provider.
+
+        Types are matched loosely (see normalize_resource_type) so the result
+        is a superset of what each rule's `applies()` accepts; callers still
+        run `applies()` on the candidates.
+        """
         results: List[BaseRule] = []
+        rtype = normalize_resource_type(resource_type)
         for rule in self.resource_rules():
-            if rule.resource_types and resource_type not in rule.resource_types:
+            if rule.resource_types and rtype not in {normalize_resource_type(t) for t in rule.resource_types}:
                 continue
             if rule.providers is not None and provider_type not in rule.providers:
                 continue
             results.append(rule)
         return results
 
-
-
-
-
-
-
+    def dispatch_table(
+        self,
+        keys: Iterable[DispatchKey],
+        disabled_reason: Callable[[BaseRule, Optional[str]], Optional[str]],
+    ) -> Dict[DispatchKey, DispatchEntry]:
+        """Precompile (resource_type, provider_type) -> enabled resource rules.
+
+        `disabled_reason(rule, provider_type)` returns why a rule is switched
+        off for that provider (or None); it is called once per rule and key
+        instead of once per resource.
+        """
+        table: Dict[DispatchKey, DispatchEntry] = {}
+        for key in set(keys):
+            entry = DispatchEntry()
+            for rule in self.rules_for_resource(*key):
+                reason = disabled_reason(rule, key[1])
+                if reason:
+                    entry.disabled[reason] += 1
+                else:
+                    entry.rules.append(rule)
+            table[key] = entry
+        return table
@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional
+
+from sqlalchemy import inspect as sa_inspect
+
+
+@dataclass
+class ProviderSnapshot:
+    """Plain copy of the CloudProvider fields rules read."""
+
+    id: int
+    provider_type: Optional[str]
+    user_id: Optional[int]
+    connection_name: Optional[str] = None
+
+    @classmethod
+    def from_model(cls, provider: Any) -> 'ProviderSnapshot':
+        return cls(
+            id=provider.id,
+            provider_type=provider.provider_type,
+            user_id=provider.user_id,
+            connection_name=provider.connection_name,
+        )
+
+
+@dataclass
+class ResourceSnapshot:
+    """Picklable stand-in for a Resource row.
+
+    Every mapped column is readable as an attribute (like the ORM object), and
+    `provider` / `get_provider_config()` behave as on Resource, so rules and
+    `normalize_resource` accept it unchanged. Attributes that Resource does not
+    have raise AttributeError, keeping `hasattr` checks in rules equivalent.
+    """
+
+    id: int
+    provider_id: Optional[int]
+    resource_type: Optional[str]
+    resource_name: Optional[str]
+    columns: Dict[str, Any] = field(default_factory=dict)
+    tags: Dict[str, Any] = field(default_factory=dict)
+    provider: Optional[ProviderSnapshot] = None
+
+    @classmethod
+    def from_model(cls, resource: Any, tags: Dict[str, Any], provider: Optional[ProviderSnapshot]) -> 'ResourceSnapshot':
+        columns = {attr.key: getattr(resource, attr.key) for attr in sa_inspect(type(resource)).column_attrs}
+        return cls(
+            id=resource.id,
+            provider_id=resource.provider_id,
+            resource_type=resource.resource_type,
+            resource_name=resource.resource_name,
+            columns=columns,
+            tags=dict(tags),
+            provider=provider,
+        )
+
+    def __getattr__(self, name: str) -> Any:
+        # Only called for names that are not dataclass fields
+        columns = self.__dict__.get('columns') or {}
+        if name in columns:
+            return columns[name]
+        raise AttributeError(name)
+
+    def get_provider_config(self) -> Dict[str, Any]:
+        try:
+            raw = self.columns.get('provider_config')
+            return json.loads(raw) if raw else {}
+        except (json.JSONDecodeError, TypeError):
+            return {}
+
+
+@dataclass
+class DismissedSnapshot:
+    """Fields of a dismissed recommendation used for progressive disclosure."""
+
+    recommendation_type: Optional[str]
+    source: Optional[str]
+    target_provider: Optional[str]
+
+
+@dataclass
+class PriceComparisonSnapshot:
+    """Mutable copy of a PriceComparisonRecommendation; id is None for rows created in a worker."""
+
+    id: Optional[int]
+    user_id: Optional[int]
+    current_resource_id: int
+    recommended_price_id: int
+    similarity_score: Any = None
+    monthly_savings: Any = None
+    annual_savings: Any = None
+    savings_percent: Any = None
+    migration_effort: Optional[str] = None
+
+    # Fields the price check rule refreshes on existing rows
+    UPDATABLE = ('similarity_score', 'monthly_savings', 'annual_savings', 'savings_percent')
+
+    @classmethod
+    def from_model(cls, pcr: Any) -> 'PriceComparisonSnapshot':
+        return cls(
+            id=pcr.id,
+            user_id=pcr.user_id,
+            current_resource_id=pcr.current_resource_id,
+            recommended_price_id=pcr.recommended_price_id,
+            similarity_score=pcr.similarity_score,
+            monthly_savings=pcr.monthly_savings,
+            annual_savings=pcr.annual_savings,
+            savings_percent=pcr.savings_percent,
+            migration_effort=pcr.migration_effort,
+        )
+
+    def values(self) -> Dict[str, Any]:
+        return {
+            'user_id': self.user_id,
+            'current_resource_id': self.current_resource_id,
+            'recommended_price_id': self.recommended_price_id,
+            'similarity_score': self.similarity_score,
+            'monthly_savings': self.monthly_savings,
+            'annual_savings': self.annual_savings,
+            'savings_percent': self.savings_percent,
+            'migration_effort': self.migration_effort,
+        }
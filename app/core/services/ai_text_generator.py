@@ -1,10 +1,18 @@
 """
 AI text generation service
-Calls the Agent Service to generate recommendation texts during sync
+Calls the Agent Service to generate recommendation texts.
+
+Sync does not wait for the LLM: new recommendation IDs are handed to a
+background job queue which sends them to the agent's batch endpoint. The
+agent generates texts concurrently and stores them; recommendations show
+their rule description until ai_generated_at is set.
 """
 import logging
+import queue
+import threading
+import time
 import requests
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Iterable, List, Optional
 from datetime import datetime
 from flask import current_app
 
@@ -80,3 +88,162 @@ def generate_recommendation_text(recommendation_id: int) -> Optional[Dict[str, s
         logger.error(f"Error generating AI text for rec {recommendation_id}: {e}")
         return None
 
+
+def _get_ai_settings() -> Dict[str, Any]:
+    """Read AI text settings from the app config (or Config outside an app context)"""
+    try:
+        config = current_app.config
+    except RuntimeError:
+        from app.config import Config
+        config = {k: getattr(Config, k) for k in dir(Config) if k.isupper()}
+    return {
+        'enabled': config.get('ENABLE_AI_RECOMMENDATIONS', False),
+        'agent_url': config.get('AGENT_SERVICE_URL', 'http://127.0.0.1:8001'),
+        'batch_size': int(config.get('AI_TEXT_BATCH_SIZE', 20)),
+        'timeout': int(config.get('AI_TEXT_BATCH_TIMEOUT', 300)),
+    }
+
+
+def generate_recommendation_texts_batch(recommendation_ids: List[int], agent_url: Optional[str] = None,
+                                        timeout: Optional[int] = None) -> Optional[Dict[str, Any]]:
+    """
+    Ask the Agent Service to generate and store AI text for many recommendations
+    
+    The agent calls the LLM concurrently (bounded by AI_TEXT_BATCH_CONCURRENCY
+    on the agent side) and writes ai_* fields itself.
+    
+    Args:
+        recommendation_ids: Recommendation database IDs
+        agent_url: Agent Service base URL (defaults to AGENT_SERVICE_URL)
+        timeout: Request timeout in seconds (defaults to AI_TEXT_BATCH_TIMEOUT)
+        
+    Returns:
+        Dict with generated/failed counts and per-recommendation results, or None on failure
+    """
+    if not recommendation_ids:
+        return None
+    
+    if agent_url is None or timeout is None:
+        ai_settings = _get_ai_settings()
+        agent_url = agent_url or ai_settings['agent_url']
+        timeout = timeout or ai_settings['timeout']
+    
+    endpoint = f"{agent_url}/v1/generate/recommendation-text/batch"
+    
+    try:
+        response = requests.post(
+            endpoint,
+            json={"recommendation_ids": list(recommendation_ids), "persist": True},
+            timeout=timeout
+        )
+        
+        if not response.ok:
+            logger.warning(f"Agent returned status {response.status_code} for batch of {len(recommendation_ids)}: {response.text[:200]}")
+            return None
+        
+        data = response.json()
+        logger.info(
+            f"✓ AI text batch done: {data.get('generated', 0)} generated, "
+            f"{data.get('failed', 0)} failed of {len(recommendation_ids)} "
+            f"({data.get('duration_seconds', 0)}s)"
+        )
+        return data
+        
+    except requests.Timeout:
+        logger.warning(f"Timeout generating AI text for batch of {len(recommendation_ids)} recommendations")
+        return None
+    except Exception as e:
+        logger.error(f"Error generating AI text for batch of {len(recommendation_ids)} recommendations: {e}")
+        return None
+
+
+class AITextJobQueue:
+    """
+    In-process background queue for AI recommendation texts
+    
+    A single daemon worker drains queued recommendation IDs in batches and
+    sends each batch to the agent's batch endpoint. Items still pending when
+    the process exits keep ai_generated_at empty and are picked up by
+    scripts/generate_ai_text_for_existing.py.
+    """
+    
+    def __init__(self):
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._worker = None
+        self.logger = logging.getLogger(f"{__name__}.{self.__class__.__name__}")
+    
+    def enqueue(self, recommendation_ids: Iterable[int], agent_url: str,
+                batch_size: int = 20, timeout: int = 300) -> int:
+        """
+        Queue recommendation IDs for background text generation
+        
+        Returns:
+            Number of IDs queued
+        """
+        ids = [int(rec_id) for rec_id in recommendation_ids if rec_id]
+        for start in range(0, len(ids), max(1, batch_size)):
+            self._queue.put((ids[start:start + batch_size], agent_url, timeout))
+        if ids:
+            self._ensure_worker()
+        return len(ids)
+    
+    def pending(self) -> int:
+        """Number of queued batches not yet processed"""
+        return self._queue.unfinished_tasks
+    
+    def drain(self, timeout: float = 120.0) -> bool:
+        """
+        Wait until queued batches are processed (used by short-lived scripts)
+        
+        Returns:
+            True if the queue is empty, False if the timeout expired first
+        """
+        deadline = time.monotonic() + timeout
+        while self._queue.unfinished_tasks and time.monotonic() < deadline:
+            time.sleep(0.5)
+        return self._queue.unfinished_tasks == 0
+    
+    def _ensure_worker(self):
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name='ai-text-queue', daemon=True)
+                self._worker.start()
+    
+    def _run(self):
+        while True:
+            ids, agent_url, timeout = self._queue.get()
+            try:
+                generate_recommendation_texts_batch(ids, agent_url=agent_url, timeout=timeout)
+            except Exception as e:
+                self.logger.error(f"AI text batch failed for {len(ids)} recommendations: {e}")
+            finally:
+                self._queue.task_done()
+
+
+ai_text_queue = AITextJobQueue()
+
+
+def enqueue_recommendation_texts(recommendation_ids: Iterable[int]) -> int:
+    """
+    Queue AI text generation for new recommendations without blocking the caller
+    
+    Args:
+        recommendation_ids: Recommendation database IDs (must be committed)
+        
+    Returns:
+        Number of IDs queued (0 when AI recommendations are disabled)
+    """
+    ai_settings = _get_ai_settings()
+    if not ai_settings['enabled']:
+        return 0
+    
+    queued = ai_text_queue.enqueue(
+        recommendation_ids,
+        agent_url=ai_settings['agent_url'],
+        batch_size=ai_settings['batch_size'],
+        timeout=ai_settings['timeout']
+    )
+    if queued:
+        logger.info(f"Queued AI text generation for {queued} recommendations")
+    return queued
@@ -0,0 +1,93 @@
+"""
+Analytics response cache - per-user payloads versioned by the latest finished complete sync
+"""
+import hashlib
+import json
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class AnalyticsResponseCache:
+    """LRU cache of /api/analytics payloads with their ETags.
+
+    Entries are stored per (user, request key) together with the data version
+    they were built from (the user's latest finished CompleteSync and aggregate
+    ids, plus a recommendations fingerprint for the recommendation endpoints). A lookup
+    with a different version is a miss and replaces the entry, so a new sync
+    invalidates the user's payloads without explicit purging.
+    """
+
+    def __init__(self, max_entries: Optional[int] = None) -> None:
+        self._max_entries = max_entries
+        self._entries: 'OrderedDict[Tuple[int, Hashable], Tuple[Any, str, Any]]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self.not_modified = 0
+
+    @property
+    def max_entries(self) -> int:
+        if self._max_entries is not None:
+            return self._max_entries
+        try:
+            from flask import current_app
+            return int(current_app.config.get('ANALYTICS_CACHE_MAX_ENTRIES', 2000))
+        except Exception:
+            return 2000
+
+    @staticmethod
+    def etag_for(payload: Any) -> str:
+        body = json.dumps(payload, sort_keys=True, default=str, ensure_ascii=False)
+        return hashlib.sha1(body.encode('utf-8')).hexdigest()
+
+    def get(self, user_id: int, key: Hashable, version: Any) -> Optional[Tuple[str, Any]]:
+        """(etag, payload) when cached for this version, else None."""
+        with self._lock:
+            entry = self._entries.get((user_id, key))
+            if entry is None:
+                self.misses += 1
+                return None
+            if entry[0] != version:
+                self.stale += 1
+                self.misses += 1
+                del self._entries[(user_id, key)]
+                return None
+            self._entries.move_to_end((user_id, key))
+            self.hits += 1
+            return entry[1], entry[2]
+
+    def put(self, user_id: int, key: Hashable, version: Any, payload: Any) -> Tuple[str, Any]:
+        etag = self.etag_for(payload)
+        with self._lock:
+            self._entries[(user_id, key)] = (version, etag, payload)
+            self._entries.move_to_end((user_id, key))
+            limit = self.max_entries
+            while len(self._entries) > limit:
+                self._entries.popitem(last=False)
+        return etag, payload
+
+    def record_not_modified(self) -> None:
+        with self._lock:
+            self.not_modified += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses,
+                'stale': self.stale,
+                'not_modified': self.not_modified,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else None,
+            }
+
+
+# Global cache shared by the analytics endpoints in this process
+analytics_cache = AnalyticsResponseCache()
@@ -1,36 +1,238 @@
 """
 Analytics Service - Data operations for analytics dashboard
 """
+import logging
 from typing import Dict, List, Optional, Any
 from datetime import datetime, timedelta
-from sqlalchemy import desc, func, and_
+from sqlalchemy import delete, desc, func, insert
 
 from app.core.database import db
-from app.core.models.complete_sync import CompleteSync
-from app.core.models.sync import SyncSnapshot
+from app.core.models.analytics import AnalyticsDailyAggregate
+from app.core.models.complete_sync import CompleteSync, ProviderSyncReference
+from app.core.models.sync import SyncSnapshot, ResourceState
 from app.core.models.resource import Resource
 from app.core.models.recommendations import OptimizationRecommendation
 from app.core.models.provider import CloudProvider
 
+logger = logging.getLogger(__name__)
+
 
 class AnalyticsService:
-    """Service for analytics data operations"""
+    """Service for analytics data operations
+    
+    Cost charts read `analytics_daily_aggregates`, which `materialize()` fills
+    at the end of each complete sync, so each chart is one indexed read no
+    matter how much sync history the user has.
+    """
     
     def __init__(self, user_id: int):
         self.user_id = user_id
     
+    # ---- Materialization ----
+    def materialize(self, complete_sync: CompleteSync) -> int:
+        """
+        Write the day's total/provider/service aggregates of a finished complete sync
+        
+        The rows replace the day's 'latest' scope; a successful sync also
+        replaces the 'success' scope, which other statuses leave alone. Syncs
+        without a successful provider are skipped (they carry no cost data).
+        
+        Returns:
+            Number of aggregate rows written
+        """
+        refs = (
+            db.session.query(
+                ProviderSyncReference.provider_id,
+                ProviderSyncReference.sync_snapshot_id,
+                ProviderSyncReference.provider_cost,
+                ProviderSyncReference.resources_synced,
+                SyncSnapshot.total_monthly_cost,
+                CloudProvider.connection_name,
+            )
+            .join(SyncSnapshot, SyncSnapshot.id == ProviderSyncReference.sync_snapshot_id)
+            .join(CloudProvider, CloudProvider.id == ProviderSyncReference.provider_id)
+            .filter(
+                ProviderSyncReference.complete_sync_id == complete_sync.id,
+                ProviderSyncReference.sync_status == 'success',
+            )
+            .all()
+        )
+        if not refs:
+            return 0
+        
+        service_name = func.coalesce(func.nullif(ResourceState.service_name, ''), 'Unknown Service')
+        services = (
+            db.session.query(service_name, func.sum(ResourceState.effective_cost), func.count(ResourceState.id))
+            .filter(ResourceState.sync_snapshot_id.in_([ref.sync_snapshot_id for ref in refs]))
+            .group_by(service_name)
+            .all()
+        )
+        
+        synced_at = complete_sync.sync_completed_at or complete_sync.sync_started_at or datetime.now()
+        now = datetime.now()
+        base = {
+            'user_id': complete_sync.user_id,
+            'day': synced_at.date(),
+            'complete_sync_id': complete_sync.id,
+            'sync_status': complete_sync.sync_status,
+            'synced_at': synced_at,
+            'created_at': now,
+            'updated_at': now,
+        }
+        rows = [dict(
+            base,
+            dimension='total',
+            dimension_key='',
+            daily_cost=float(complete_sync.total_daily_cost or 0),
+            monthly_cost=float(complete_sync.total_monthly_cost or 0),
+            resource_count=complete_sync.total_resources_found or 0,
+            provider_count=complete_sync.successful_providers or 0,
+        )]
+        for ref in refs:
+            rows.append(dict(
+                base,
+                dimension='provider',
+                dimension_key=ref.connection_name,
+                provider_id=ref.provider_id,
+                daily_cost=float(ref.provider_cost or 0),
+                monthly_cost=float(ref.total_monthly_cost or 0),
+                resource_count=ref.resources_synced or 0,
+                provider_count=1,
+            ))
+        for name, cost, count in services:
+            rows.append(dict(
+                base,
+                dimension='service',
+                dimension_key=name,
+                daily_cost=float(cost or 0),
+                monthly_cost=float(cost or 0) * 30.0,
+                resource_count=count,
+                provider_count=0,
+            ))
+        
+        scopes = ['latest', 'success'] if complete_sync.sync_status == 'success' else ['latest']
+        rows = [dict(row, scope=scope) for scope in scopes for row in rows]
+        
+        db.session.execute(delete(AnalyticsDailyAggregate).where(
+            AnalyticsDailyAggregate.user_id == complete_sync.user_id,
+            AnalyticsDailyAggregate.day == base['day'],
+            AnalyticsDailyAggregate.scope.in_(scopes),
+        ))
+        db.session.execute(insert(AnalyticsDailyAggregate), rows)
+        db.session.commit()
+        return len(rows)
+    
+    def backfill(self) -> int:
+        """Materialize all past complete syncs of the user (oldest first, so the latest per day wins)"""
+        syncs = (
+            CompleteSync.query
+            .filter(CompleteSync.user_id == self.user_id, CompleteSync.sync_status.in_(['success', 'partial']))
+            .order_by(CompleteSync.sync_completed_at)
+            .all()
+        )
+        written = 0
+        for complete_sync in syncs:
+            written += self.materialize(complete_sync)
+        if written:
+            logger.info(f"Backfilled {written} analytics aggregates for user {self.user_id} from {len(syncs)} complete syncs")
+        return written
+    
+    def _ensure_backfilled(self) -> bool:
+        """Backfill once for users whose history predates the aggregates; True if rows were written"""
+        has_rows = db.session.query(
+            AnalyticsDailyAggregate.query.filter_by(user_id=self.user_id).exists()
+        ).scalar()
+        return not has_rows and self.backfill() > 0
+    
+    def _aggregates(self, dimensions, since=None, status: Optional[str] = None,
+                    provider_id: Optional[int] = None, latest: bool = False) -> List[AnalyticsDailyAggregate]:
+        """
+        One indexed read of aggregate rows of one or more dimensions (optionally only the latest day)
+        
+        status='success' reads each day's latest successful sync, otherwise each day's latest sync.
+        """
+        dimensions = [dimensions] if isinstance(dimensions, str) else list(dimensions)
+        if status not in (None, 'success'):
+            raise ValueError(f"Unsupported aggregate status filter: {status}")
+        scope = 'success' if status == 'success' else 'latest'
+        
+        def read():
+            query = AnalyticsDailyAggregate.query.filter(
+                AnalyticsDailyAggregate.user_id == self.user_id,
+                AnalyticsDailyAggregate.scope == scope,
+                AnalyticsDailyAggregate.dimension.in_(dimensions),
+            )
+            if since is not None:
+                query = query.filter(AnalyticsDailyAggregate.day >= since)
+            if provider_id is not None:
+                query = query.filter(AnalyticsDailyAggregate.provider_id == provider_id)
+            if latest:
+                latest_day = db.session.query(func.max(AnalyticsDailyAggregate.day)).filter(
+                    AnalyticsDailyAggregate.user_id == self.user_id,
+                    AnalyticsDailyAggregate.scope == scope,
+                    AnalyticsDailyAggregate.dimension == 'total',
+                )
+                query = query.filter(AnalyticsDailyAggregate.day == latest_day.scalar_subquery())
+            return query.order_by(AnalyticsDailyAggregate.day, AnalyticsDailyAggregate.dimension_key).all()
+        
+        rows = read()
+        if not rows and self._ensure_backfilled():
+            rows = read()
+        return rows
+    
+    # ---- Scoping and versioning ----
+    def _provider_ids(self):
+        """Subquery of the user's provider ids (recommendations and resources are scoped by it)"""
+        return db.session.query(CloudProvider.id).filter(CloudProvider.user_id == self.user_id).scalar_subquery()
+    
+    def data_version(self, include_recommendations: bool = False) -> tuple:
+        """
+        Version of the user's analytics data, for response caching
+        
+        The latest finished CompleteSync id changes when a sync ends (a running
+        sync is committed at start, so its id would label payloads built from
+        half-synced data) and the latest aggregate row id when `materialize()`
+        has written that sync's aggregates. Recommendation endpoints add
+        (count, max updated_at) of the user's recommendations so status changes
+        between syncs are picked up too.
+        """
+        latest_sync_id = db.session.query(func.max(CompleteSync.id)).filter(
+            CompleteSync.user_id == self.user_id,
+            CompleteSync.sync_status != 'running',
+        ).scalar_subquery()
+        latest_aggregate_id = db.session.query(func.max(AnalyticsDailyAggregate.id)).filter(
+            AnalyticsDailyAggregate.user_id == self.user_id
+        ).scalar_subquery()
+        version = tuple(db.session.query(latest_sync_id, latest_aggregate_id).one())
+        if not include_recommendations:
+            return version
+        count, updated_at = db.session.query(
+            func.count(OptimizationRecommendation.id), func.max(OptimizationRecommendation.updated_at)
+        ).filter(OptimizationRecommendation.provider_id.in_(self._provider_ids())).one()
+        return version + (count, str(updated_at) if updated_at else None)
+    
     def get_executive_summary(self) -> Dict[str, Any]:
         """Get executive summary KPIs"""
         # Get latest complete sync
         latest_sync = CompleteSync.query.filter_by(user_id=self.user_id)\
             .order_by(desc(CompleteSync.sync_completed_at)).first()
         
+        provider_ids = self._provider_ids()
+        
         # Get active resources count
-        active_resources = Resource.query.filter_by(is_active=True).count()
+        active_resources = db.session.query(func.count(Resource.id)).filter(
+            Resource.provider_id.in_(provider_ids),
+            Resource.is_active == True
+        ).scalar() or 0
         
         # Get implemented recommendations
-        implemented_recs = OptimizationRecommendation.query.filter_by(status='implemented').all()
-        total_savings = sum(rec.estimated_monthly_savings or 0 for rec in implemented_recs)
+        implemented_count, total_savings = db.session.query(
+            func.count(OptimizationRecommendation.id),
+            func.coalesce(func.sum(OptimizationRecommendation.estimated_monthly_savings), 0.0)
+        ).filter(
+            OptimizationRecommendation.provider_id.in_(provider_ids),
+            OptimizationRecommendation.status == 'implemented'
+        ).one()
         
         # Get provider success rate
         if latest_sync:
@@ -43,212 +245,113 @@ class AnalyticsService:
             'total_monthly_cost': latest_sync.total_monthly_cost if latest_sync else 0,
             'active_resources': active_resources,
             'provider_success_rate': provider_success_rate,
-            'total_savings': total_savings,
-            'implemented_recommendations_count': len(implemented_recs),
+            'total_savings': float(total_savings or 0),
+            'implemented_recommendations_count': implemented_count,
             'last_sync_date': latest_sync.sync_completed_at if latest_sync else None
         }
     
     def get_main_spending_trends(self, days: int = 30, provider: Optional[str] = None) -> List[Dict[str, Any]]:
-        """Get main spending trends for the primary chart"""
-        end_date = datetime.now()
-        start_date = end_date - timedelta(days=days)
+        """Get main spending trends for the primary chart (latest successful complete sync per day)"""
+        since = (datetime.now() - timedelta(days=days)).date()
+        rows = self._aggregates(('total', 'provider'), since=since, status='success')
         
-        # Get complete syncs within date range
-        syncs = CompleteSync.query.filter(
-            and_(
-                CompleteSync.user_id == self.user_id,
-                CompleteSync.sync_completed_at >= start_date,
-                CompleteSync.sync_completed_at <= end_date,
-                CompleteSync.sync_status == 'success'
-            )
-        ).order_by(CompleteSync.sync_completed_at).all()
+        cost_by_day: Dict[Any, Dict[str, float]] = {}
+        for row in rows:
+            if row.dimension == 'provider':
+                cost_by_day.setdefault(row.day, {})[row.dimension_key] = row.daily_cost or 0.0
         
-        trends = []
-        for sync in syncs:
-            trend_data = {
-                'date': sync.sync_completed_at.strftime('%Y-%m-%d'),
-                'total_cost': float(sync.total_monthly_cost or 0),  # Show monthly costs for consistency
-                'total_resources': sync.total_resources_found or 0,
-                'successful_providers': sync.successful_providers or 0
+        return [
+            {
+                'date': row.day.strftime('%Y-%m-%d'),
+                'total_cost': float(row.monthly_cost or 0),  # Show monthly costs for consistency
+                'total_resources': row.resource_count or 0,
+                'successful_providers': row.provider_count or 0,
+                'cost_by_provider': cost_by_day.get(row.day, {})
             }
-            
-            # Add provider-specific data if cost_by_provider exists
-            if sync.cost_by_provider:
-                try:
-                    import json
-                    cost_by_provider = json.loads(sync.cost_by_provider) if isinstance(sync.cost_by_provider, str) else sync.cost_by_provider
-                    trend_data['cost_by_provider'] = cost_by_provider
-                except (json.JSONDecodeError, TypeError):
-                    trend_data['cost_by_provider'] = {}
-            else:
-                trend_data['cost_by_provider'] = {}
-            
-            trends.append(trend_data)
-        
-        return trends
+            for row in rows
+            if row.dimension == 'total'
+        ]
     
     def get_service_analysis(self) -> Dict[str, Any]:
         """Get service-level cost breakdown from the last successful complete sync only.
 
-        This aggregates costs using `ResourceState` rows tied to the provider
-        snapshots that participated in the latest `CompleteSync` for this user.
+        Service costs are the `ResourceState` costs of the provider snapshots
+        in that sync, aggregated when the sync was materialized.
         """
-        # Get latest successful complete sync for the user
-        latest_sync = (
-            CompleteSync.query
-            .filter_by(user_id=self.user_id, sync_status='success')
-            .order_by(desc(CompleteSync.sync_completed_at))
-            .first()
-        )
-
-        if not latest_sync:
-            return {'services': [], 'total_cost': 0, 'total_resources': 0}
-
-        # Collect snapshot IDs that were part of this complete sync
-        from app.core.models.complete_sync import ProviderSyncReference
-        from app.core.models.sync import ResourceState
-
-        snapshot_ids = [ref.sync_snapshot_id for ref in latest_sync.provider_syncs or [] if ref.sync_status == 'success']
-
-        if not snapshot_ids:
+        rows = self._aggregates('service', status='success', latest=True)
+        if not rows:
             return {'services': [], 'total_cost': 0, 'total_resources': 0}
-
-        # Aggregate ResourceState by service_name for the snapshots
-        service_breakdown: Dict[str, Dict[str, Any]] = {}
-        total_cost: float = 0.0
-        total_resources: int = 0
-
-        states_query = ResourceState.query.filter(ResourceState.sync_snapshot_id.in_(snapshot_ids))
-
-        for state in states_query.all():
-            service_name = state.service_name or 'Unknown Service'
-            # effective_cost on state reflects the cost detected during that sync
-            cost = float(state.effective_cost or 0.0)
-
-            if service_name not in service_breakdown:
-                service_breakdown[service_name] = {
-                    'cost': 0.0,
-                    'count': 0,
-                    'resources': []
-                }
-
-            entry = service_breakdown[service_name]
-            entry['cost'] += cost
-            entry['count'] += 1
-            entry['resources'].append({
-                'name': state.resource_name,
-                'cost': cost,
-                'type': state.resource_type
-            })
-
-            total_cost += cost
-            total_resources += 1
-
-        # Convert to list and sort by cost
-        services = []
-        for name, data in service_breakdown.items():
-            services.append({
-                'name': name,
-                'cost': data['cost'],
-                'count': data['count'],
-                'percentage': (data['cost'] / total_cost * 100) if total_cost > 0 else 0,
-                'resources': data['resources']
-            })
-
+        
+        total_cost = sum(row.daily_cost or 0.0 for row in rows)
+        services = [
+            {
+                'name': row.dimension_key,
+                'cost': row.daily_cost or 0.0,
+                'count': row.resource_count or 0,
+                'percentage': ((row.daily_cost or 0.0) / total_cost * 100) if total_cost > 0 else 0
+            }
+            for row in rows
+        ]
         services.sort(key=lambda x: x['cost'], reverse=True)
-
+        
         return {
             'services': services,
             'total_cost': total_cost,
-            'total_resources': total_resources
+            'total_resources': sum(service['count'] for service in services)
         }
     
     def get_provider_breakdown(self) -> Dict[str, Any]:
-        """Get provider cost breakdown for pie chart"""
-        # Get latest complete sync
-        latest_sync = CompleteSync.query.filter_by(user_id=self.user_id)\
-            .order_by(desc(CompleteSync.sync_completed_at)).first()
-        
-        if not latest_sync or not latest_sync.cost_by_provider:
+        """Get provider cost breakdown for pie chart (latest complete sync)"""
+        rows = self._aggregates('provider', latest=True)
+        if not rows:
             return {'providers': [], 'total_cost': 0}
         
-        try:
-            import json
-            cost_by_provider = json.loads(latest_sync.cost_by_provider) if isinstance(latest_sync.cost_by_provider, str) else latest_sync.cost_by_provider
-            
-            # The cost_by_provider uses provider names as keys, not IDs
-            # We need to find providers by connection_name
-            provider_names = list(cost_by_provider.keys())
-            providers = CloudProvider.query.filter(CloudProvider.connection_name.in_(provider_names)).all()
-            provider_name_to_id = {p.connection_name: p.id for p in providers}
-            
-            total_cost = sum(cost_by_provider.values())
-            
-            provider_data = []
-            for provider_name, cost in cost_by_provider.items():
-                provider_id = provider_name_to_id.get(provider_name)
-                provider_data.append({
-                    'id': provider_id,
-                    'name': provider_name,
-                    'cost': float(cost),
-                    'percentage': (cost / total_cost * 100) if total_cost > 0 else 0
-                })
-            
-            provider_data.sort(key=lambda x: x['cost'], reverse=True)
-            
-            return {
-                'providers': provider_data,
-                'total_cost': total_cost
+        total_cost = sum(row.daily_cost or 0.0 for row in rows)
+        provider_data = [
+            {
+                'id': row.provider_id,
+                'name': row.dimension_key,
+                'cost': float(row.daily_cost or 0),
+                'percentage': ((row.daily_cost or 0) / total_cost * 100) if total_cost > 0 else 0
             }
-            
-        except (json.JSONDecodeError, TypeError, ValueError):
-            return {'providers': [], 'total_cost': 0}
+            for row in rows
+        ]
+        provider_data.sort(key=lambda x: x['cost'], reverse=True)
+        
+        return {
+            'providers': provider_data,
+            'total_cost': total_cost
+        }
     
     def get_provider_trends(self, provider_id: Optional[int] = None, days: int = 30) -> List[Dict[str, Any]]:
         """Get individual provider spending trends"""
-        from app.core.models.provider import CloudProvider
-        
-        end_date = datetime.now()
-        start_date = end_date - timedelta(days=days)
-        
-        # Get sync snapshots for the provider, filtered by user
-        query = SyncSnapshot.query.join(CloudProvider).filter(
-            and_(
-                CloudProvider.user_id == self.user_id,
-                SyncSnapshot.sync_completed_at >= start_date,
-                SyncSnapshot.sync_completed_at <= end_date,
-                SyncSnapshot.sync_status == 'success'
-            )
-        )
-        
-        if provider_id:
-            query = query.filter(SyncSnapshot.provider_id == provider_id)
-        
-        snapshots = query.order_by(SyncSnapshot.sync_completed_at).all()
-        
-        trends = []
-        for snapshot in snapshots:
-            # Get provider name
-            provider = CloudProvider.query.get(snapshot.provider_id)
-            provider_name = provider.connection_name if provider else f'Provider {snapshot.provider_id}'
-            
-            trends.append({
-                'date': snapshot.sync_completed_at.strftime('%Y-%m-%d'),
-                'provider_id': snapshot.provider_id,
-                'provider_name': provider_name,
-                'total_cost': float(snapshot.total_monthly_cost or 0),
-                'resources_found': snapshot.total_resources_found or 0
-            })
+        since = (datetime.now() - timedelta(days=days)).date()
+        rows = self._aggregates('provider', since=since, provider_id=provider_id)
         
-        return trends
+        return [
+            {
+                'date': row.day.strftime('%Y-%m-%d'),
+                'provider_id': row.provider_id,
+                'provider_name': row.dimension_key,
+                'total_cost': float(row.monthly_cost or 0),
+                'resources_found': row.resource_count or 0
+            }
+            for row in rows
+        ]
     
     def get_implemented_recommendations(self) -> List[Dict[str, Any]]:
         """Get implemented recommendations with savings"""
-        recommendations = OptimizationRecommendation.query.filter_by(status='implemented').all()
+        R = OptimizationRecommendation
+        rows = db.session.query(
+            R.id, R.title, R.description, R.recommendation_type, R.estimated_monthly_savings,
+            R.estimated_one_time_savings, R.applied_at, R.resource_name, R.resource_type
+        ).filter(
+            R.provider_id.in_(self._provider_ids()),
+            R.status == 'implemented'
+        ).order_by(R.id).all()
         
-        rec_data = []
-        for rec in recommendations:
-            rec_data.append({
+        return [
+            {
                 'id': rec.id,
                 'title': rec.title,
                 'description': rec.description,
@@ -258,17 +361,23 @@ class AnalyticsService:
                 'applied_at': rec.applied_at.isoformat() if rec.applied_at else None,
                 'resource_name': rec.resource_name,
                 'resource_type': rec.resource_type
-            })
-        
-        return rec_data
+            }
+            for rec in rows
+        ]
     
     def get_optimization_opportunities(self) -> List[Dict[str, Any]]:
         """Get pending optimization opportunities"""
-        recommendations = OptimizationRecommendation.query.filter_by(status='pending').all()
+        R = OptimizationRecommendation
+        rows = db.session.query(
+            R.id, R.title, R.description, R.recommendation_type, R.severity,
+            R.estimated_monthly_savings, R.confidence_score, R.resource_name, R.resource_type
+        ).filter(
+            R.provider_id.in_(self._provider_ids()),
+            R.status == 'pending'
+        ).order_by(R.id).all()
         
-        opp_data = []
-        for rec in recommendations:
-            opp_data.append({
+        return [
+            {
                 'id': rec.id,
                 'title': rec.title,
                 'description': rec.description,
@@ -278,9 +387,9 @@ class AnalyticsService:
                 'confidence_score': float(rec.confidence_score or 0),
                 'resource_name': rec.resource_name,
                 'resource_type': rec.resource_type
-            })
-        
-        return opp_data
+            }
+            for rec in rows
+        ]
     
     def export_analytics_report(self, format: str = 'pdf') -> bytes:
         """Export analytics report in specified format"""
@@ -322,44 +431,24 @@ class AnalyticsService:
             'fill': True
         })
         
-        # Provider-specific lines
+        # Provider-specific lines (cost_by_provider is keyed by connection name)
         provider_colors = ['#10b981', '#f59e0b', '#ef4444', '#06b6d4', '#8b5cf6']
-        color_index = 0
-        
+        provider_names: List[str] = []
         for trend in trends:
-            if 'cost_by_provider' in trend and trend['cost_by_provider']:
-                for provider_id, cost in trend['cost_by_provider'].items():
-                    # Get provider name
-                    provider = CloudProvider.query.get(int(provider_id))
-                    provider_name = provider.connection_name if provider else f'Provider {provider_id}'
-                    
-                    # Check if we already have this provider in datasets
-                    existing_dataset = None
-                    for dataset in datasets:
-                        if dataset['label'] == provider_name:
-                            existing_dataset = dataset
-                            break
-                    
-                    if existing_dataset:
-                        # Add cost to existing provider dataset
-                        existing_dataset['data'].append(float(cost))
-                    else:
-                        # Create new provider dataset
-                        datasets.append({
-                            'label': provider_name,
-                            'data': [float(cost)],
-                            'borderColor': provider_colors[color_index % len(provider_colors)],
-                            'backgroundColor': f'rgba({provider_colors[color_index % len(provider_colors)].lstrip("#")}, 0.1)',
-                            'tension': 0.4,
-                            'fill': False
-                        })
-                        color_index += 1
+            for provider_name in trend.get('cost_by_provider') or {}:
+                if provider_name not in provider_names:
+                    provider_names.append(provider_name)
         
-        # Pad all datasets to same length
-        max_length = len(labels)
-        for dataset in datasets:
-            while len(dataset['data']) < max_length:
-                dataset['data'].append(0)
+        for color_index, provider_name in enumerate(provider_names):
+            color = provider_colors[color_index % len(provider_colors)]
+            datasets.append({
+                'label': provider_name,
+                'data': [float((trend.get('cost_by_provider') or {}).get(provider_name, 0)) for trend in trends],
+                'borderColor': color,
+                'backgroundColor': f'rgba({color.lstrip("#")}, 0.1)',
+                'tension': 0.4,
+                'fill': False
+            })
         
         return {
             'labels': labels,
@@ -2,11 +2,14 @@
 Bulk Sync Service for orchestrating synchronization across all active users
 """
 import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
-from typing import Dict, List
+from typing import Dict, List, Optional, Tuple
+from flask import current_app
 from app.core.models import db
 from app.core.models.user import User
-from app.core.services.complete_sync_service import CompleteSyncService
+from app.core.models.sync_job import SyncJob
+from app.core.services.complete_sync_service import CompleteSyncService, ProviderConcurrencyLimiter
 
 logger = logging.getLogger(__name__)
 
@@ -33,12 +36,18 @@ class BulkSyncService:
         self.logger.info(f"Found {len(users)} eligible users for bulk sync")
         return users
     
-    def sync_all_users(self, sync_type: str = 'scheduled') -> Dict[str, any]:
+    def sync_all_users(self, sync_type: str = 'scheduled', max_workers: Optional[int] = None) -> Dict[str, any]:
         """
         Execute synchronization for all active users (excluding demo users)
         
+        Users are synced concurrently in a thread pool when max_workers > 1.
+        Each worker runs in its own app context, so it gets its own
+        SQLAlchemy session. Provider API load is capped per provider type
+        by BULK_SYNC_PROVIDER_LIMITS.
+        
         Args:
             sync_type: Type of sync (scheduled, manual, api)
+            max_workers: Number of users synced at once (defaults to BULK_SYNC_MAX_WORKERS)
             
         Returns:
             Dict containing bulk sync results with detailed per-user results
@@ -46,7 +55,16 @@ class BulkSyncService:
         start_time = datetime.now()
         
         try:
-            self.logger.info(f"Starting bulk sync for all active users (type: {sync_type})")
+            if max_workers is None:
+                max_workers = current_app.config.get('BULK_SYNC_MAX_WORKERS', 1)
+            max_workers = max(1, int(max_workers))
+            provider_limits = current_app.config.get('BULK_SYNC_PROVIDER_LIMITS', {})
+            limiter = ProviderConcurrencyLimiter(provider_limits)
+            
+            self.logger.info(
+                f"Starting bulk sync for all active users (type: {sync_type}, "
+                f"workers: {max_workers}, provider limits: {provider_limits})"
+            )
             
             # Get eligible users
             eligible_users = self.get_eligible_users()
@@ -64,90 +82,24 @@ class BulkSyncService:
                     'duration_seconds': 0
                 }
             
-            # Initialize counters
-            successful_users = 0
-            failed_users = 0
-            skipped_users = 0
-            user_results = []
+            # Detach plain values from ORM objects before handing them to workers
+            user_refs = [(user.id, user.email) for user in eligible_users]
             
-            # Process each user sequentially
-            for idx, user in enumerate(eligible_users, 1):
-                user_start_time = datetime.now()
-                
-                self.logger.info(f"Processing user {idx}/{len(eligible_users)}: {user.email} (ID: {user.id})")
-                
-                try:
-                    # Create sync service for user
-                    sync_service = CompleteSyncService(user.id)
-                    
-                    # Get user's providers to check if sync is needed
-                    providers = sync_service.get_user_providers()
-                    
-                    if not providers:
-                        self.logger.info(f"User {user.email} has no auto-sync enabled providers, skipping")
-                        skipped_users += 1
-                        user_results.append({
-                            'user_id': user.id,
-                            'user_email': user.email,
-                            'status': 'skipped',
-                            'reason': 'No auto-sync enabled providers',
-                            'duration_seconds': 0
-                        })
-                        continue
-                    
-                    # Execute sync
-                    self.logger.info(f"Starting sync for user {user.email} with {len(providers)} providers")
-                    sync_result = sync_service.start_complete_sync(sync_type=sync_type)
-                    
-                    user_duration = (datetime.now() - user_start_time).total_seconds()
-                    
-                    if sync_result.get('success'):
-                        successful_users += 1
-                        user_results.append({
-                            'user_id': user.id,
-                            'user_email': user.email,
-                            'status': 'success',
-                            'complete_sync_id': sync_result.get('complete_sync_id'),
-                            'sync_status': sync_result.get('sync_status'),
-                            'providers_synced': sync_result.get('total_providers_synced'),
-                            'successful_providers': sync_result.get('successful_providers'),
-                            'failed_providers': sync_result.get('failed_providers'),
-                            'resources_found': sync_result.get('total_resources_found'),
-                            'total_daily_cost': sync_result.get('total_daily_cost'),
-                            'duration_seconds': user_duration
-                        })
-                        self.logger.info(
-                            f"✓ User {user.email} sync completed: "
-                            f"{sync_result.get('successful_providers')}/{sync_result.get('total_providers_synced')} providers, "
-                            f"{sync_result.get('total_resources_found')} resources, "
-                            f"{user_duration:.1f}s"
-                        )
-                    else:
-                        failed_users += 1
-                        user_results.append({
-                            'user_id': user.id,
-                            'user_email': user.email,
-                            'status': 'failed',
-                            'error': sync_result.get('error', 'Unknown error'),
-                            'message': sync_result.get('message'),
-                            'duration_seconds': user_duration
-                        })
-                        self.logger.error(f"✗ User {user.email} sync failed: {sync_result.get('error')}")
-                
-                except Exception as e:
-                    failed_users += 1
-                    user_duration = (datetime.now() - user_start_time).total_seconds()
-                    user_results.append({
-                        'user_id': user.id,
-                        'user_email': user.email,
-                        'status': 'error',
-                        'error': str(e),
-                        'duration_seconds': user_duration
-                    })
-                    self.logger.error(f"✗ User {user.email} sync exception: {e}", exc_info=True)
+            if max_workers == 1:
+                user_results = []
+                for idx, (user_id, user_email) in enumerate(user_refs, 1):
+                    self.logger.info(f"Processing user {idx}/{len(user_refs)}: {user_email} (ID: {user_id})")
+                    user_results.append(self._sync_user(user_id, user_email, sync_type, limiter))
+            else:
+                user_results = self._sync_users_concurrently(user_refs, sync_type, max_workers, limiter)
+            
+            successful_users = sum(1 for r in user_results if r['status'] == 'success')
+            failed_users = sum(1 for r in user_results if r['status'] in ('failed', 'error'))
+            skipped_users = sum(1 for r in user_results if r['status'] == 'skipped')
             
             # Calculate total duration
             total_duration = (datetime.now() - start_time).total_seconds()
+            throughput = self._build_throughput_report(user_results, total_duration, max_workers, limiter)
             
             # Prepare summary
             summary = {
@@ -159,6 +111,7 @@ class BulkSyncService:
                 'skipped_users': skipped_users,
                 'user_results': user_results,
                 'duration_seconds': total_duration,
+                'throughput': throughput,
                 'sync_type': sync_type,
                 'started_at': start_time.isoformat(),
                 'completed_at': datetime.now().isoformat()
@@ -169,6 +122,12 @@ class BulkSyncService:
                 f"{successful_users} successful, {failed_users} failed, {skipped_users} skipped "
                 f"out of {len(eligible_users)} users"
             )
+            self.logger.info(
+                f"Bulk sync throughput: {throughput['users_per_minute']} users/min, "
+                f"{throughput['cumulative_user_seconds']:.1f}s of user syncs in {total_duration:.1f}s wall clock "
+                f"(x{throughput['parallel_speedup']} with {max_workers} workers), "
+                f"provider slot waits: {throughput['provider_wait_seconds']}"
+            )
             
             return summary
             
@@ -182,6 +141,184 @@ class BulkSyncService:
                 'duration_seconds': total_duration
             }
     
+    def _sync_users_concurrently(self, user_refs: List[Tuple[int, str]], sync_type: str,
+                                 max_workers: int, limiter: ProviderConcurrencyLimiter) -> List[Dict[str, any]]:
+        """
+        Sync users in a thread pool, one app context (and DB session) per user
+        
+        Args:
+            user_refs: List of (user_id, user_email) tuples
+            sync_type: Type of sync (scheduled, manual, api)
+            max_workers: Thread pool size
+            limiter: Shared per-provider-type concurrency limiter
+            
+        Returns:
+            List of per-user results in the same order as user_refs
+        """
+        app = current_app._get_current_object()
+        results = [None] * len(user_refs)
+        completed = 0
+        
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='bulk-sync') as executor:
+            future_to_index = {
+                executor.submit(self._sync_user_in_app_context, app, user_id, user_email, sync_type, limiter): idx
+                for idx, (user_id, user_email) in enumerate(user_refs)
+            }
+            
+            for future in as_completed(future_to_index):
+                idx = future_to_index[future]
+                user_id, user_email = user_refs[idx]
+                try:
+                    results[idx] = future.result()
+                except Exception as e:
+                    self.logger.error(f"✗ User {user_email} sync worker crashed: {e}", exc_info=True)
+                    results[idx] = {
+                        'user_id': user_id,
+                        'user_email': user_email,
+                        'status': 'error',
+                        'error': str(e),
+                        'duration_seconds': 0
+                    }
+                completed += 1
+                self.logger.info(f"Bulk sync progress: {completed}/{len(user_refs)} users done")
+        
+        return results
+    
+    def _sync_user_in_app_context(self, app, user_id: int, user_email: str, sync_type: str,
+                                  limiter: ProviderConcurrencyLimiter) -> Dict[str, any]:
+        """Worker entry point: run a user sync inside a fresh app context"""
+        with app.app_context():
+            try:
+                return self._sync_user(user_id, user_email, sync_type, limiter)
+            finally:
+                db.session.remove()
+    
+    def _sync_user(self, user_id: int, user_email: str, sync_type: str,
+                   limiter: Optional[ProviderConcurrencyLimiter] = None) -> Dict[str, any]:
+        """
+        Run a complete sync for one user and build the per-user result entry
+        
+        Args:
+            user_id: User ID
+            user_email: User email (for logging and the result entry)
+            sync_type: Type of sync (scheduled, manual, api)
+            limiter: Optional per-provider-type concurrency limiter
+            
+        Returns:
+            Dict with the user's sync result (status: success, failed, error, skipped)
+        """
+        user_start_time = datetime.now()
+        
+        try:
+            # Create sync service for user
+            sync_service = CompleteSyncService(user_id, provider_limiter=limiter)
+            
+            # Get user's providers to check if sync is needed
+            providers = sync_service.get_user_providers()
+            
+            if not providers:
+                self.logger.info(f"User {user_email} has no auto-sync enabled providers, skipping")
+                return {
+                    'user_id': user_id,
+                    'user_email': user_email,
+                    'status': 'skipped',
+                    'reason': 'No auto-sync enabled providers',
+                    'duration_seconds': 0
+                }
+            
+            # A sync the user started themselves is already refreshing their data
+            if SyncJob.query.filter_by(active_user_id=user_id).first():
+                self.logger.info(f"User {user_email} has a sync job in progress, skipping")
+                return {
+                    'user_id': user_id,
+                    'user_email': user_email,
+                    'status': 'skipped',
+                    'reason': 'Sync job in progress',
+                    'duration_seconds': 0
+                }
+            
+            # Execute sync
+            self.logger.info(f"Starting sync for user {user_email} with {len(providers)} providers")
+            sync_result = sync_service.start_complete_sync(sync_type=sync_type)
+            
+            user_duration = (datetime.now() - user_start_time).total_seconds()
+            
+            if sync_result.get('success'):
+                self.logger.info(
+                    f"✓ User {user_email} sync completed: "
+                    f"{sync_result.get('successful_providers')}/{sync_result.get('total_providers_synced')} providers, "
+                    f"{sync_result.get('total_resources_found')} resources, "
+                    f"{user_duration:.1f}s"
+                )
+                return {
+                    'user_id': user_id,
+                    'user_email': user_email,
+                    'status': 'success',
+                    'complete_sync_id': sync_result.get('complete_sync_id'),
+                    'sync_status': sync_result.get('sync_status'),
+                    'providers_synced': sync_result.get('total_providers_synced'),
+                    'successful_providers': sync_result.get('successful_providers'),
+                    'failed_providers': sync_result.get('failed_providers'),
+                    'resources_found': sync_result.get('total_resources_found'),
+                    'total_daily_cost': sync_result.get('total_daily_cost'),
+                    'duration_seconds': user_duration
+                }
+            
+            self.logger.error(f"✗ User {user_email} sync failed: {sync_result.get('error')}")
+            return {
+                'user_id': user_id,
+                'user_email': user_email,
+                'status': 'failed',
+                'error': sync_result.get('error', 'Unknown error'),
+                'message': sync_result.get('message'),
+                'duration_seconds': user_duration
+            }
+        
+        except Exception as e:
+            user_duration = (datetime.now() - user_start_time).total_seconds()
+            self.logger.error(f"✗ User {user_email} sync exception: {e}", exc_info=True)
+            db.session.rollback()
+            return {
+                'user_id': user_id,
+                'user_email': user_email,
+                'status': 'error',
+                'error': str(e),
+                'duration_seconds': user_duration
+            }
+    
+    def _build_throughput_report(self, user_results: List[Dict[str, any]], wall_clock_seconds: float,
+                                 max_workers: int, limiter: ProviderConcurrencyLimiter) -> Dict[str, any]:
+        """
+        Summarize wall-clock time and throughput of a bulk sync run
+        
+        Args:
+            user_results: Per-user results
+            wall_clock_seconds: Total bulk sync duration
+            max_workers: Number of workers used
+            limiter: Limiter used for the run (for slot wait times)
+            
+        Returns:
+            Dict with throughput metrics
+        """
+        synced = [r for r in user_results if r['status'] != 'skipped']
+        cumulative = sum(r.get('duration_seconds') or 0 for r in synced)
+        slowest = sorted(synced, key=lambda r: r.get('duration_seconds') or 0, reverse=True)[:5]
+        
+        return {
+            'mode': 'concurrent' if max_workers > 1 else 'sequential',
+            'max_workers': max_workers,
+            'provider_limits': limiter.limits,
+            'wall_clock_seconds': round(wall_clock_seconds, 2),
+            'cumulative_user_seconds': round(cumulative, 2),
+            'users_per_minute': round(len(synced) / wall_clock_seconds * 60, 2) if wall_clock_seconds > 0 else 0.0,
+            'parallel_speedup': round(cumulative / wall_clock_seconds, 2) if wall_clock_seconds > 0 else 0.0,
+            'provider_wait_seconds': limiter.get_wait_seconds(),
+            'slowest_users': [
+                {'user_email': r['user_email'], 'duration_seconds': round(r.get('duration_seconds') or 0, 2)}
+                for r in slowest
+            ]
+        }
+    
     def sync_specific_users(self, user_ids: List[int], sync_type: str = 'manual') -> Dict[str, any]:
         """
         Execute synchronization for specific users by ID
@@ -281,24 +418,3 @@ class BulkSyncService:
                 'error': str(e),
                 'message': 'Sync failed for specific users'
             }
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
@@ -2,25 +2,105 @@
 Complete Sync Service for orchestrating synchronization across all user providers
 """
 import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from datetime import datetime
 from typing import Dict, List, Optional, Tuple
 from app.core.models import db
 from app.core.models.user import User
 from app.core.models.provider import CloudProvider
 from app.core.models.complete_sync import CompleteSync, ProviderSyncReference
+from app.core.services.analytics_service import AnalyticsService
 from app.providers import sync_orchestrator
 from app.core.recommendations.orchestrator import RecommendationOrchestrator
 from flask import current_app
 
 logger = logging.getLogger(__name__)
 
+
+class ProviderConcurrencyLimiter:
+    """
+    Caps the number of simultaneous syncs per provider type.
+
+    A single limiter is shared by all worker threads of a bulk sync so that
+    many tenants syncing at once do not hammer the same provider API.
+    Provider types without a configured limit are not throttled.
+    """
+    
+    def __init__(self, limits: Optional[Dict[str, int]] = None):
+        self.limits = {k: int(v) for k, v in (limits or {}).items() if int(v) > 0}
+        self._semaphores = {
+            provider_type: threading.BoundedSemaphore(limit)
+            for provider_type, limit in self.limits.items()
+        }
+        self._lock = threading.Lock()
+        self._wait_seconds = {}
+    
+    @contextmanager
+    def slot(self, provider_type: str):
+        """Hold one sync slot for the given provider type"""
+        semaphore = self._semaphores.get(provider_type)
+        if semaphore is None:
+            yield
+            return
+        
+        wait_start = time.monotonic()
+        semaphore.acquire()
+        waited = time.monotonic() - wait_start
+        with self._lock:
+            self._wait_seconds[provider_type] = self._wait_seconds.get(provider_type, 0.0) + waited
+        try:
+            yield
+        finally:
+            semaphore.release()
+    
+    def get_wait_seconds(self) -> Dict[str, float]:
+        """Total time spent waiting for a slot, per provider type"""
+        with self._lock:
+            return {k: round(v, 2) for k, v in self._wait_seconds.items()}
+
+
+class SyncProgress:
+    """
+    Observer of a running complete sync (no-op by default)
+
+    CompleteSyncService reports stages and per-provider outcomes to it and asks
+    `cancelled()` before starting each provider, so a caller such as the sync
+    job runner can publish progress and stop a sync between providers.
+    Provider callbacks may come from worker threads.
+    """
+    
+    def started(self, complete_sync_id: int, providers: List[CloudProvider]) -> None:
+        pass
+    
+    def provider_started(self, provider_id: int) -> None:
+        pass
+    
+    def provider_finished(self, provider_id: int, result: Dict[str, any]) -> None:
+        pass
+    
+    def stage(self, name: str) -> None:
+        pass
+    
+    def cancelled(self) -> bool:
+        return False
+
+
+CANCELLED_RESULT = {'success': False, 'error': 'Cancelled', 'cancelled': True}
+
+
 class CompleteSyncService:
     """
     Service for managing complete sync operations across all user providers
     """
     
-    def __init__(self, user_id: int):
+    def __init__(self, user_id: int, provider_limiter: Optional[ProviderConcurrencyLimiter] = None,
+                 progress: Optional[SyncProgress] = None):
         self.user_id = user_id
+        self.provider_limiter = provider_limiter
+        self.progress = progress or SyncProgress()
         self.user = User.query.get(user_id)
         if not self.user:
             raise ValueError(f"User with ID {user_id} not found")
@@ -58,10 +138,16 @@ class CompleteSyncService:
                 sync_started_at=datetime.now()
             )
             
+            parallel = (
+                current_app.config.get('COMPLETE_SYNC_PARALLEL', True)
+                and len(providers) > 1
+            )
+            
             # Set sync configuration
             sync_config = {
                 'sync_type': sync_type,
                 'user_id': self.user_id,
+                'execution_mode': 'parallel' if parallel else 'sequential',
                 'providers_count': len(providers),
                 'sync_timestamp': datetime.now().isoformat(),
                 'providers': [{'id': p.id, 'name': p.connection_name, 'type': p.provider_type} for p in providers]
@@ -72,6 +158,10 @@ class CompleteSyncService:
             db.session.commit()
             
             self.logger.info(f"Created complete sync {complete_sync.id} for {len(providers)} providers")
+            self.progress.started(complete_sync.id, providers)
+            
+            if parallel:
+                return self._execute_parallel_sync(complete_sync, providers)
             
             # Execute sequential sync for each provider
             return self._execute_sequential_sync(complete_sync, providers)
@@ -106,6 +196,105 @@ class CompleteSyncService:
             complete_sync: CompleteSync instance
             providers: List of providers to sync
             
+        Returns:
+            Dict containing sync results
+        """
+        return self._execute_sync(complete_sync, providers, self._run_providers_sequentially)
+    
+    def _execute_parallel_sync(self, complete_sync: CompleteSync, providers: List[CloudProvider]) -> Dict[str, any]:
+        """
+        Execute provider syncs concurrently
+        
+        Provider fetches run in a thread pool, the orchestrator's persistence
+        stage is serialized per complete sync, and the ProviderSyncReference /
+        CompleteSync aggregates are written once after all providers finish.
+        
+        Args:
+            complete_sync: CompleteSync instance
+            providers: List of providers to sync
+            
+        Returns:
+            Dict containing sync results
+        """
+        return self._execute_sync(complete_sync, providers, self._run_providers_in_parallel)
+    
+    def _run_providers_sequentially(self, providers: List[CloudProvider]) -> List[Dict[str, any]]:
+        """
+        Sync providers one after another in the current session
+        
+        Returns:
+            List of sync results in provider order
+        """
+        results = []
+        for order, provider in enumerate(providers, 1):
+            if self.progress.cancelled():
+                results.append(dict(CANCELLED_RESULT))
+                continue
+            self.logger.info(f"Syncing provider {provider.id} ({provider.connection_name}) - {order}/{len(providers)}")
+            results.append(self._timed_provider_sync(provider.id, provider.provider_type, provider.connection_name))
+        return results
+    
+    def _run_providers_in_parallel(self, providers: List[CloudProvider]) -> List[Dict[str, any]]:
+        """
+        Sync providers concurrently, one app context (and DB session) per provider
+        
+        Returns:
+            List of sync results in provider order
+        """
+        app = current_app._get_current_object()
+        persist_lock = threading.Lock()
+        max_workers = min(len(providers), max(1, int(current_app.config.get('COMPLETE_SYNC_MAX_WORKERS', 3))))
+        
+        # Plain values only: ORM instances must not cross session boundaries
+        provider_refs = [(p.id, p.provider_type, p.connection_name) for p in providers]
+        
+        # End this session's transaction so its connection goes back to the pool
+        # while the workers run, and later reads see the workers' commits
+        db.session.commit()
+        
+        self.logger.info(f"Syncing {len(providers)} providers in parallel ({max_workers} workers)")
+        
+        def run(provider_ref):
+            if self.progress.cancelled():
+                return dict(CANCELLED_RESULT)
+            with app.app_context():
+                try:
+                    return self._timed_provider_sync(*provider_ref, persist_lock=persist_lock)
+                finally:
+                    db.session.remove()
+        
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f'complete-sync-{self.user_id}') as executor:
+            return list(executor.map(run, provider_refs))
+    
+    def _timed_provider_sync(self, provider_id: int, provider_type: str, connection_name: str,
+                             persist_lock: Optional[threading.Lock] = None) -> Dict[str, any]:
+        """
+        Sync one provider, converting exceptions into an error result and recording duration
+        
+        Returns:
+            Dict containing the orchestrator sync result
+        """
+        started = time.monotonic()
+        self.progress.provider_started(provider_id)
+        try:
+            result = self._sync_provider(provider_id, provider_type, persist_lock)
+        except Exception as e:
+            self.logger.error(f"Provider {connection_name} sync exception: {e}")
+            db.session.rollback()
+            result = {'success': False, 'error': str(e), 'exception': True}
+        result.setdefault('sync_duration_seconds', int(time.monotonic() - started))
+        self.progress.provider_finished(provider_id, result)
+        return result
+    
+    def _execute_sync(self, complete_sync: CompleteSync, providers: List[CloudProvider], runner) -> Dict[str, any]:
+        """
+        Run provider syncs with the given runner and write the complete sync aggregates
+        
+        Args:
+            complete_sync: CompleteSync instance
+            providers: List of providers to sync
+            runner: Callable taking the providers and returning their sync results in order
+            
         Returns:
             Dict containing sync results
         """
@@ -121,10 +310,12 @@ class CompleteSyncService:
             # Update complete sync with provider count
             complete_sync.total_providers_synced = len(providers)
             
-            # Sync each provider sequentially
-            for order, provider in enumerate(providers, 1):
-                self.logger.info(f"Syncing provider {provider.id} ({provider.connection_name}) - {order}/{len(providers)}")
-                
+            self.progress.stage('providers')
+            provider_results = runner(providers)
+            cancelled_providers = sum(1 for result in provider_results if result.get('cancelled'))
+            
+            # Record each provider's outcome
+            for order, (provider, sync_result) in enumerate(zip(providers, provider_results), 1):
                 # Create provider sync reference
                 provider_ref = ProviderSyncReference(
                     complete_sync_id=complete_sync.id,
@@ -134,8 +325,8 @@ class CompleteSyncService:
                 )
                 
                 try:
-                    # Execute individual provider sync
-                    sync_result = sync_orchestrator.sync_provider(provider.id, 'complete_sync')
+                    if sync_result.get('exception'):
+                        raise RuntimeError(sync_result['error'])
                     
                     if sync_result['success']:
                         # Store reference to generated snapshot
@@ -212,7 +403,10 @@ class CompleteSyncService:
             complete_sync.set_resources_by_provider(resources_by_provider)
             
             # Determine final status
-            if failed_providers == 0:
+            if cancelled_providers:
+                # Partial data: keep it out of the analytics aggregates and recommendations
+                complete_sync.mark_completed('cancelled', f'Cancelled before {cancelled_providers} provider syncs started')
+            elif failed_providers == 0:
                 complete_sync.sync_status = 'success'
                 complete_sync.mark_completed('success')
             elif successful_providers == 0:
@@ -228,6 +422,15 @@ class CompleteSyncService:
             
             db.session.commit()
             
+            # Refresh the per-day aggregates the analytics dashboards read
+            try:
+                if not cancelled_providers:
+                    self.progress.stage('analytics')
+                    AnalyticsService(complete_sync.user_id).materialize(complete_sync)
+            except Exception as agg_err:
+                db.session.rollback()
+                self.logger.error(f"Failed to materialize analytics aggregates: {agg_err}")
+            
             # Prepare response
             response = {
                 'success': complete_sync.sync_status in ['success', 'partial'],
@@ -250,6 +453,7 @@ class CompleteSyncService:
             # Post-sync: run recommendations orchestrator if enabled and sync had any success
             try:
                 if current_app.config.get('RECOMMENDATIONS_ENABLED', True) and response['success']:
+                    self.progress.stage('recommendations')
                     self.logger.info(f"Running recommendations orchestrator for complete_sync {complete_sync.id}")
                     reco = RecommendationOrchestrator()
                     reco_summary = reco.run_for_sync(complete_sync.id)
@@ -269,7 +473,7 @@ class CompleteSyncService:
             return response
             
         except Exception as e:
-            self.logger.error(f"Sequential sync execution failed: {e}")
+            self.logger.error(f"Complete sync execution failed: {e}")
             complete_sync.sync_status = 'error'
             complete_sync.error_message = str(e)
             complete_sync.set_error_details({'exception': str(e)})
@@ -282,6 +486,25 @@ class CompleteSyncService:
                 'message': 'Complete sync execution failed'
             }
     
+    def _sync_provider(self, provider_id: int, provider_type: str,
+                       persist_lock: Optional[threading.Lock] = None) -> Dict[str, any]:
+        """
+        Run a single provider sync, holding a provider-type slot when a limiter is set
+        
+        Args:
+            provider_id: ID of the provider to sync
+            provider_type: Provider type (used for the concurrency limiter)
+            persist_lock: Optional lock serializing the orchestrator's persistence stage
+            
+        Returns:
+            Dict containing the orchestrator sync result
+        """
+        if self.provider_limiter is None:
+            return sync_orchestrator.sync_provider(provider_id, 'complete_sync', persist_lock=persist_lock)
+        
+        with self.provider_limiter.slot(provider_type):
+            return sync_orchestrator.sync_provider(provider_id, 'complete_sync', persist_lock=persist_lock)
+    
     def get_complete_sync_status(self, complete_sync_id: int) -> Dict[str, any]:
         """
         Get status of a specific complete sync
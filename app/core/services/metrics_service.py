@@ -0,0 +1,407 @@
+"""
+Metrics Service - Time-series storage for resource performance metrics
+"""
+import json
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import func, insert, update
+
+from app.core.database import db
+from app.core.models.metrics import ResourceMetric, ResourceUsageSummary
+
+logger = logging.getLogger(__name__)
+
+# (timestamp, value) pairs of one series; timestamps are naive UTC
+Points = Sequence[Tuple[datetime, float]]
+
+
+class MetricsService:
+    """Bulk ingestion and reads of `resource_metrics` series and their rollups
+
+    Every ingest refreshes the hour/day/month rollups in
+    `resource_usage_summary` (count, sum, avg, min, max, p50/p95/p99) for the
+    periods it touched, so readers get percentiles without scanning raw points.
+
+    Writes go into a savepoint of the caller's transaction and are committed
+    with it: collectors run in the middle of provider syncs, whose pending
+    changes a failed ingest must neither commit nor roll back.
+    """
+
+    # Rows per executemany batch
+    BULK_CHUNK_SIZE = 1000
+    # Resource ids per IN (...) when reading
+    READ_CHUNK_SIZE = 500
+    # Rollup granularity -> NumPy datetime unit
+    ROLLUP_UNITS = {'hour': 'h', 'day': 'D', 'month': 'M'}
+    PERCENTILES = (('p50_usage', 0.50), ('p95_usage', 0.95), ('p99_usage', 0.99))
+
+    @staticmethod
+    def ingest(series: Dict[int, Points], metric_name: str, metric_unit: Optional[str] = None) -> Dict[str, int]:
+        """
+        Store points for many resources of one metric
+
+        Points at a timestamp that is already stored replace the stored value
+        (the newest point of a previous collection may have covered a partial
+        interval), so re-collecting an overlapping window is safe. Points and
+        rollups are written in one savepoint; on error only that is undone.
+
+        Args:
+            series: Resource id -> (timestamp, value) points
+            metric_name: Metric name (e.g. 'cpu_usage')
+            metric_unit: Unit stored with each point (e.g. '%')
+
+        Returns:
+            Dict with inserted / updated / unchanged counts
+        """
+        stats = {'inserted': 0, 'updated': 0, 'unchanged': 0}
+        series = {rid: points for rid, points in series.items() if points}
+        if not series:
+            return stats
+
+        try:
+            all_ts = [ts for points in series.values() for ts, _ in points]
+            existing: Dict[Tuple[int, datetime], Tuple[int, float]] = {}
+            resource_ids = list(series)
+            for i in range(0, len(resource_ids), MetricsService.READ_CHUNK_SIZE):
+                rows = db.session.query(
+                    ResourceMetric.id, ResourceMetric.resource_id, ResourceMetric.timestamp, ResourceMetric.metric_value
+                ).filter(
+                    ResourceMetric.resource_id.in_(resource_ids[i:i + MetricsService.READ_CHUNK_SIZE]),
+                    ResourceMetric.metric_name == metric_name,
+                    ResourceMetric.timestamp >= min(all_ts),
+                    ResourceMetric.timestamp <= max(all_ts),
+                ).all()
+                for row in rows:
+                    existing[(row.resource_id, row.timestamp)] = (row.id, row.metric_value)
+
+            now = datetime.now()
+            inserts: List[Dict[str, Any]] = []
+            updates: List[Dict[str, Any]] = []
+            for resource_id, points in series.items():
+                for ts, value in points:
+                    value = float(value)
+                    found = existing.get((resource_id, ts))
+                    if found is None:
+                        inserts.append({
+                            'resource_id': resource_id,
+                            'metric_name': metric_name,
+                            'metric_value': value,
+                            'metric_unit': metric_unit,
+                            'timestamp': ts,
+                            'created_at': now,
+                            'updated_at': now,
+                        })
+                        # Same timestamp twice in one payload: keep the first point
+                        existing[(resource_id, ts)] = (None, value)
+                    elif found[1] != value and found[0] is not None:
+                        updates.append({'id': found[0], 'metric_value': value, 'updated_at': now})
+                    else:
+                        stats['unchanged'] += 1
+
+            stats.update(inserted=len(inserts), updated=len(updates))
+            if inserts or updates:
+                with db.session.begin_nested():
+                    MetricsService._write(ResourceMetric, inserts, updates)
+                    stats['rollups'] = MetricsService.rollup(list(series), metric_name, min(all_ts))
+            logger.info(
+                "Ingested %s for %d resources: inserted=%d updated=%d unchanged=%d",
+                metric_name, len(series), stats['inserted'], stats['updated'], stats['unchanged'],
+            )
+            return stats
+
+        except Exception as e:
+            logger.error(f"Error ingesting {metric_name} metrics: {str(e)}")
+            raise
+
+    @staticmethod
+    def latest_timestamps(resource_ids: Iterable[int], metric_name: str) -> Dict[int, datetime]:
+        """
+        Newest stored point per resource (the collection high-water mark)
+
+        Returns:
+            Dict of resource id -> timestamp, only for resources with stored points
+        """
+        resource_ids = list(resource_ids)
+        latest: Dict[int, datetime] = {}
+        for i in range(0, len(resource_ids), MetricsService.READ_CHUNK_SIZE):
+            rows = db.session.query(
+                ResourceMetric.resource_id, func.max(ResourceMetric.timestamp)
+            ).filter(
+                ResourceMetric.resource_id.in_(resource_ids[i:i + MetricsService.READ_CHUNK_SIZE]),
+                ResourceMetric.metric_name == metric_name,
+            ).group_by(ResourceMetric.resource_id).all()
+            latest.update({resource_id: ts for resource_id, ts in rows if ts is not None})
+        return latest
+
+    @staticmethod
+    def summarize(resource_ids: Iterable[int], metric_name: str, since: datetime) -> Dict[int, Dict[str, float]]:
+        """
+        Average / max / min / point count per resource since a moment
+
+        Returns:
+            Dict of resource id -> {'avg', 'max', 'min', 'count'}
+        """
+        resource_ids = list(resource_ids)
+        summary: Dict[int, Dict[str, float]] = {}
+        for i in range(0, len(resource_ids), MetricsService.READ_CHUNK_SIZE):
+            rows = db.session.query(
+                ResourceMetric.resource_id,
+                func.avg(ResourceMetric.metric_value),
+                func.max(ResourceMetric.metric_value),
+                func.min(ResourceMetric.metric_value),
+                func.count(ResourceMetric.id),
+            ).filter(
+                ResourceMetric.resource_id.in_(resource_ids[i:i + MetricsService.READ_CHUNK_SIZE]),
+                ResourceMetric.metric_name == metric_name,
+                ResourceMetric.timestamp >= since,
+            ).group_by(ResourceMetric.resource_id).all()
+            for resource_id, avg, max_value, min_value, count in rows:
+                summary[resource_id] = {
+                    'avg': float(avg or 0),
+                    'max': float(max_value or 0),
+                    'min': float(min_value or 0),
+                    'count': int(count),
+                }
+        return summary
+
+    @staticmethod
+    def series(resource_ids: Iterable[int], metric_name: str, since: datetime) -> Dict[int, List[Tuple[datetime, float]]]:
+        """
+        Stored points per resource since a moment, oldest first
+
+        Returns:
+            Dict of resource id -> (timestamp, value) points, only for resources with points
+        """
+        resource_ids = list(resource_ids)
+        points: Dict[int, List[Tuple[datetime, float]]] = {}
+        for i in range(0, len(resource_ids), MetricsService.READ_CHUNK_SIZE):
+            rows = db.session.query(
+                ResourceMetric.resource_id, ResourceMetric.timestamp, ResourceMetric.metric_value
+            ).filter(
+                ResourceMetric.resource_id.in_(resource_ids[i:i + MetricsService.READ_CHUNK_SIZE]),
+                ResourceMetric.metric_name == metric_name,
+                ResourceMetric.timestamp >= since,
+            ).order_by(ResourceMetric.resource_id, ResourceMetric.timestamp).all()
+            for resource_id, ts, value in rows:
+                points.setdefault(resource_id, []).append((ts, float(value)))
+        return points
+
+    @staticmethod
+    def rollup(resource_ids: Iterable[int], metric_name: str, since: datetime) -> int:
+        """
+        Recompute hour/day/month rollups of one metric for periods from `since` on
+
+        Hours and days starting at or after `since` (floored) are rebuilt from
+        the raw points; the month containing `since` is rebuilt in full. Rows
+        are written in a savepoint of the caller's transaction.
+
+        Returns:
+            Number of rollup rows written
+        """
+        resource_ids = list(resource_ids)
+        month_start = since.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+        history = MetricsService.series(resource_ids, metric_name, month_start)
+        if not history:
+            return 0
+
+        rows: Dict[Tuple[int, str, datetime], Dict[str, Any]] = {}
+        since64 = np.datetime64(since.replace(microsecond=0), 's')
+        for resource_id, points in history.items():
+            timestamps = np.array([ts for ts, _ in points], dtype='datetime64[s]')
+            values = np.array([value for _, value in points], dtype=np.float64)
+            for granularity, unit in MetricsService.ROLLUP_UNITS.items():
+                buckets = timestamps.astype(f'datetime64[{unit}]')
+                keep = buckets >= since64.astype(f'datetime64[{unit}]')
+                if not keep.any():
+                    continue
+                for row in MetricsService._bucket_stats(buckets[keep], values[keep], unit):
+                    row.update(resource_id=resource_id, metric_name=metric_name, granularity=granularity)
+                    rows[(resource_id, granularity, row['period_start'])] = row
+
+        existing: Dict[Tuple[int, str, datetime], int] = {}
+        for i in range(0, len(resource_ids), MetricsService.READ_CHUNK_SIZE):
+            for row in db.session.query(
+                ResourceUsageSummary.id, ResourceUsageSummary.resource_id,
+                ResourceUsageSummary.granularity, ResourceUsageSummary.period_start
+            ).filter(
+                ResourceUsageSummary.resource_id.in_(resource_ids[i:i + MetricsService.READ_CHUNK_SIZE]),
+                ResourceUsageSummary.metric_name == metric_name,
+                ResourceUsageSummary.granularity.in_(list(MetricsService.ROLLUP_UNITS)),
+                ResourceUsageSummary.period_start >= month_start,
+            ):
+                existing[(row.resource_id, row.granularity, row.period_start)] = row.id
+
+        now = datetime.now()
+        inserts: List[Dict[str, Any]] = []
+        updates: List[Dict[str, Any]] = []
+        for key, row in rows.items():
+            row['updated_at'] = now
+            if key in existing:
+                row['id'] = existing[key]
+                updates.append(row)
+            else:
+                row['created_at'] = now
+                inserts.append(row)
+
+        with db.session.begin_nested():
+            MetricsService._write(ResourceUsageSummary, inserts, updates)
+        return len(rows)
+
+    @staticmethod
+    def _write(model, inserts: List[Dict[str, Any]], updates: List[Dict[str, Any]]) -> None:
+        """Bulk insert new rows and update existing ones (by id) in executemany batches, without committing"""
+        chunk_size = MetricsService.BULK_CHUNK_SIZE
+        for i in range(0, len(inserts), chunk_size):
+            db.session.execute(insert(model), inserts[i:i + chunk_size])
+        for i in range(0, len(updates), chunk_size):
+            db.session.execute(update(model), updates[i:i + chunk_size])
+
+    @staticmethod
+    def _bucket_stats(buckets: np.ndarray, values: np.ndarray, unit: str) -> List[Dict[str, Any]]:
+        """Per-bucket count/sum/avg/min/max and linear-interpolated percentiles (as numpy.percentile)"""
+        order = np.lexsort((values, buckets))
+        buckets, values = buckets[order], values[order]
+        starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+        counts = np.diff(np.r_[starts, len(values)])
+        sums = np.add.reduceat(values, starts)
+        columns = {
+            'sample_count': counts,
+            'total_usage': sums,
+            'average_usage': sums / counts,
+            'min_usage': values[starts],
+            'peak_usage': values[starts + counts - 1],
+        }
+        for name, q in MetricsService.PERCENTILES:
+            pos = starts + q * (counts - 1)
+            low = np.floor(pos).astype(np.int64)
+            high = np.ceil(pos).astype(np.int64)
+            columns[name] = values[low] + (values[high] - values[low]) * (pos - low)
+
+        period_starts = buckets[starts]
+        period_ends = period_starts + np.timedelta64(1, unit)
+        return [
+            {
+                'period_start': start.astype('datetime64[s]').item(),
+                'period_end': end.astype('datetime64[s]').item(),
+                **{name: column[i].item() for name, column in columns.items()},
+            }
+            for i, (start, end) in enumerate(zip(period_starts, period_ends))
+        ]
+
+    @staticmethod
+    def rollup_series(resource_ids: Iterable[int], metric_name: str, granularity: str = 'day',
+                      since: Optional[datetime] = None, field: str = 'average_usage') -> Dict[int, Tuple[np.ndarray, np.ndarray]]:
+        """
+        Rollup values as arrays per resource, oldest first
+
+        Args:
+            granularity: 'hour', 'day' or 'month'
+            field: Rollup column (average_usage, peak_usage, p95_usage, ...)
+
+        Returns:
+            Dict of resource id -> (datetime64[s] period starts, float64 values)
+        """
+        if granularity not in MetricsService.ROLLUP_UNITS:
+            raise ValueError(f"Unknown rollup granularity: {granularity}")
+        column = getattr(ResourceUsageSummary, field)
+        resource_ids = [rid for rid in resource_ids if rid is not None]
+        collected: Dict[int, Tuple[List[datetime], List[float]]] = {}
+        for i in range(0, len(resource_ids), MetricsService.READ_CHUNK_SIZE):
+            query = db.session.query(
+                ResourceUsageSummary.resource_id, ResourceUsageSummary.period_start, column
+            ).filter(
+                ResourceUsageSummary.resource_id.in_(resource_ids[i:i + MetricsService.READ_CHUNK_SIZE]),
+                ResourceUsageSummary.metric_name == metric_name,
+                ResourceUsageSummary.granularity == granularity,
+            )
+            if since is not None:
+                query = query.filter(ResourceUsageSummary.period_start >= since)
+            for resource_id, period_start, value in query.order_by(
+                ResourceUsageSummary.resource_id, ResourceUsageSummary.period_start
+            ):
+                dates, values = collected.setdefault(resource_id, ([], []))
+                dates.append(period_start)
+                values.append(np.nan if value is None else value)
+        return {
+            resource_id: (np.array(dates, dtype='datetime64[s]'), np.array(values, dtype=np.float64))
+            for resource_id, (dates, values) in collected.items()
+        }
+
+    @staticmethod
+    def usage_profiles(resource_ids: Iterable[int], metric_name: str, days: int = 30) -> Dict[int, Dict[str, float]]:
+        """
+        Usage over the last `days` from the daily rollups
+
+        avg/min/max/count are exact; p50/p95/p99 are the sample-weighted
+        means of the daily percentiles.
+
+        Returns:
+            Dict of resource id -> {'avg', 'min', 'max', 'p50', 'p95', 'p99', 'count'}
+        """
+        resource_ids = [rid for rid in resource_ids if rid is not None]
+        since = (datetime.utcnow() - timedelta(days=days)).replace(hour=0, minute=0, second=0, microsecond=0)
+        count = func.sum(ResourceUsageSummary.sample_count)
+        profiles: Dict[int, Dict[str, float]] = {}
+        for i in range(0, len(resource_ids), MetricsService.READ_CHUNK_SIZE):
+            rows = db.session.query(
+                ResourceUsageSummary.resource_id,
+                count,
+                func.sum(ResourceUsageSummary.total_usage),
+                func.min(ResourceUsageSummary.min_usage),
+                func.max(ResourceUsageSummary.peak_usage),
+                *[func.sum(getattr(ResourceUsageSummary, name) * ResourceUsageSummary.sample_count)
+                  for name, _ in MetricsService.PERCENTILES],
+            ).filter(
+                ResourceUsageSummary.resource_id.in_(resource_ids[i:i + MetricsService.READ_CHUNK_SIZE]),
+                ResourceUsageSummary.metric_name == metric_name,
+                ResourceUsageSummary.granularity == 'day',
+                ResourceUsageSummary.period_start >= since,
+            ).group_by(ResourceUsageSummary.resource_id).all()
+            for resource_id, samples, total, min_value, max_value, p50, p95, p99 in rows:
+                if not samples:
+                    continue
+                profiles[resource_id] = {
+                    'avg': float(total or 0) / samples,
+                    'min': float(min_value or 0),
+                    'max': float(max_value or 0),
+                    'p50': float(p50 or 0) / samples,
+                    'p95': float(p95 or 0) / samples,
+                    'p99': float(p99 or 0) / samples,
+                    'count': int(samples),
+                }
+        return profiles
+
+    @staticmethod
+    def merge_history(series: Dict[int, Points], metric_name: str, metric_unit: Optional[str],
+                      resource_ids: Iterable[int], history_days: int = 30) -> Dict[int, Dict[str, float]]:
+        """
+        Ingest newly collected points, then summarize each resource's stored window
+
+        Used by incremental collectors: the provider call returns only points
+        after the high-water mark, while statistics cover the last `history_days`.
+        """
+        MetricsService.ingest(series, metric_name, metric_unit)
+        since = datetime.utcnow() - timedelta(days=history_days)
+        return MetricsService.summarize(resource_ids, metric_name, since)
+
+    @staticmethod
+    def daily_series(resource_ids: Iterable[int], metric_names: Sequence[str], days: int = 30) -> Dict[int, Dict[str, str]]:
+        """
+        Daily averages for charts, as the JSON the resources page expects
+
+        Returns:
+            Dict of resource id -> metric name -> '{"dates": [...], "values": [...]}'
+        """
+        resource_ids = list(resource_ids)
+        since = (datetime.utcnow() - timedelta(days=days)).replace(hour=0, minute=0, second=0, microsecond=0)
+        charts: Dict[int, Dict[str, str]] = {}
+        for metric_name in metric_names:
+            for resource_id, (dates, values) in MetricsService.rollup_series(resource_ids, metric_name, 'day', since).items():
+                charts.setdefault(resource_id, {})[metric_name] = json.dumps({
+                    'dates': [str(d) for d in dates.astype('datetime64[D]')],
+                    'values': [round(float(v), 2) for v in values],
+                })
+        return charts
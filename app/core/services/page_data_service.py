@@ -0,0 +1,181 @@
+"""
+Page Data Service - batched, user-scoped reads for the dashboard, connections and resources pages
+"""
+from datetime import timedelta
+from typing import Dict, List, Optional
+
+from sqlalchemy import func, or_
+from sqlalchemy.orm import selectinload
+
+from app.core.database import db
+from app.core.models.provider import CloudProvider
+from app.core.models.resource import Resource
+from app.core.models.sync import ResourceState, SyncSnapshot
+
+# Metrics tags that mark a resource as having performance data
+PERFORMANCE_TAGS = ('cpu_avg_usage', 'memory_avg_usage_mb')
+
+
+class UserPageData:
+    """Load everything a page needs about one user's providers in a fixed number of queries
+
+    The pages used to query snapshots, counts and resources once per provider.
+    Each reader here covers all of the user's providers at once (GROUP BY,
+    window functions and IN lists), and results are memoized on the instance,
+    so a view should build one loader per request and pass it around.
+    """
+
+    # Window in which YandexService writes a second snapshot next to the orchestrator's
+    SNAPSHOT_PAIR_WINDOW = timedelta(seconds=5)
+
+    def __init__(self, user_id):
+        # Session ids can arrive as '1.0' / '1e0' strings
+        self.user_id = int(float(user_id))
+        self._providers: Optional[List[CloudProvider]] = None
+        self._cache: Dict[tuple, object] = {}
+
+    @property
+    def providers(self) -> List[CloudProvider]:
+        """The user's providers that are not soft-deleted, in creation order"""
+        if self._providers is None:
+            self._providers = CloudProvider.query.filter(
+                CloudProvider.user_id == self.user_id,
+                CloudProvider.is_deleted == False
+            ).order_by(CloudProvider.id).all()
+        return self._providers
+
+    @property
+    def provider_ids(self) -> List[int]:
+        return [p.id for p in self.providers]
+
+    def _memo(self, key: tuple, load):
+        if key not in self._cache:
+            self._cache[key] = load() if self.provider_ids else {}
+        return self._cache[key]
+
+    def resource_counts(self, status: Optional[str] = None) -> Dict[int, int]:
+        """Provider id -> number of resources (optionally only with the given status)"""
+        def load():
+            query = db.session.query(Resource.provider_id, func.count(Resource.id)).filter(
+                Resource.provider_id.in_(self.provider_ids)
+            )
+            if status is not None:
+                query = query.filter(Resource.status == status)
+            return dict(query.group_by(Resource.provider_id).all())
+        return self._memo(('resource_counts', status), load)
+
+    def active_daily_costs(self) -> Dict[int, float]:
+        """Provider id -> sum of daily_cost over active resources"""
+        def load():
+            rows = db.session.query(
+                Resource.provider_id, func.coalesce(func.sum(Resource.daily_cost), 0.0)
+            ).filter(
+                Resource.provider_id.in_(self.provider_ids),
+                Resource.is_active == True
+            ).group_by(Resource.provider_id).all()
+            return {provider_id: float(total or 0) for provider_id, total in rows}
+        return self._memo(('active_daily_costs',), load)
+
+    def latest_snapshots(self, order_by: str = 'sync_completed_at') -> Dict[int, SyncSnapshot]:
+        """Provider id -> latest successful SyncSnapshot, ordered by `order_by` (one query)"""
+        def load():
+            column = getattr(SyncSnapshot, order_by)
+            rank = func.row_number().over(
+                partition_by=SyncSnapshot.provider_id,
+                order_by=(column.desc(), SyncSnapshot.id.desc())
+            ).label('rank')
+            ranked = db.session.query(SyncSnapshot.id.label('id'), rank).filter(
+                SyncSnapshot.provider_id.in_(self.provider_ids),
+                SyncSnapshot.sync_status == 'success'
+            ).subquery()
+            snapshots = SyncSnapshot.query.join(ranked, ranked.c.id == SyncSnapshot.id).filter(ranked.c.rank == 1).all()
+            return {s.provider_id: s for s in snapshots}
+        return self._memo(('latest_snapshots', order_by), load)
+
+    def snapshot_resources(self) -> List[Resource]:
+        """Resources of each provider's latest snapshot, tags preloaded
+
+        Mirrors the resources page rules: the latest successful snapshot by
+        created_at, or a snapshot written within a few seconds of it that has
+        ResourceState rows; providers without usable snapshot states fall back
+        to all of their resources. Per provider, resources with performance
+        tags come first.
+        """
+        cached = self._cache.get(('snapshot_resources',))
+        if cached is not None:
+            return cached
+        if not self.provider_ids:
+            return []
+
+        latest = self.latest_snapshots('created_at')
+        state_counts = self._state_counts([s.id for s in latest.values()])
+        chosen = {pid: s for pid, s in latest.items() if state_counts.get(s.id)}
+
+        # Latest snapshot without states: look for its pair written next to it
+        empty = {pid: s for pid, s in latest.items() if pid not in chosen and s.created_at}
+        if empty:
+            window = self.SNAPSHOT_PAIR_WINDOW
+            candidates = SyncSnapshot.query.filter(
+                SyncSnapshot.provider_id.in_(list(empty)),
+                SyncSnapshot.sync_status == 'success',
+                SyncSnapshot.created_at >= min(s.created_at for s in empty.values()) - window,
+                SyncSnapshot.created_at <= max(s.created_at for s in empty.values()) + window,
+                SyncSnapshot.id.notin_([s.id for s in empty.values()])
+            ).order_by(SyncSnapshot.created_at.desc()).all()
+            candidate_counts = self._state_counts([c.id for c in candidates])
+            for candidate in candidates:
+                snapshot = empty.get(candidate.provider_id)
+                if (candidate.provider_id not in chosen and candidate_counts.get(candidate.id)
+                        and abs(candidate.created_at - snapshot.created_at) <= window):
+                    chosen[candidate.provider_id] = candidate
+
+        snapshot_resource_ids: Dict[int, set] = {pid: set() for pid in chosen}
+        if chosen:
+            provider_by_snapshot = {s.id: pid for pid, s in chosen.items()}
+            rows = db.session.query(ResourceState.sync_snapshot_id, ResourceState.resource_id).filter(
+                ResourceState.sync_snapshot_id.in_(list(provider_by_snapshot)),
+                ResourceState.resource_id.isnot(None)
+            ).all()
+            for snapshot_id, resource_id in rows:
+                snapshot_resource_ids[provider_by_snapshot[snapshot_id]].add(resource_id)
+        # Providers with no snapshot, or whose snapshot references no resources, show everything
+        fallback_ids = [pid for pid in self.provider_ids if not snapshot_resource_ids.get(pid)]
+        wanted_ids = set().union(*snapshot_resource_ids.values())
+
+        criteria = []
+        if wanted_ids:
+            criteria.append(Resource.id.in_(list(wanted_ids)))
+        if fallback_ids:
+            criteria.append(Resource.provider_id.in_(fallback_ids))
+        loaded = Resource.query.options(selectinload(Resource.tags)).filter(or_(*criteria)).order_by(Resource.id).all()
+
+        by_provider: Dict[int, List[Resource]] = {pid: [] for pid in self.provider_ids}
+        fallback = set(fallback_ids)
+        for resource in loaded:
+            for pid, ids in snapshot_resource_ids.items():
+                if resource.id in ids:
+                    by_provider[pid].append(resource)
+            if resource.provider_id in fallback:
+                by_provider[resource.provider_id].append(resource)
+
+        resources = []
+        for pid in self.provider_ids:
+            with_performance = [r for r in by_provider[pid] if self.has_performance_data(r)]
+            without_performance = [r for r in by_provider[pid] if not self.has_performance_data(r)]
+            resources.extend(with_performance)
+            resources.extend(without_performance)
+        self._cache[('snapshot_resources',)] = resources
+        return resources
+
+    @staticmethod
+    def has_performance_data(resource: Resource) -> bool:
+        """True when the resource carries CPU or memory usage tags (uses loaded tags)"""
+        return any(tag.tag_key in PERFORMANCE_TAGS for tag in resource.tags)
+
+    @staticmethod
+    def _state_counts(snapshot_ids: List[int]) -> Dict[int, int]:
+        if not snapshot_ids:
+            return {}
+        return dict(db.session.query(ResourceState.sync_snapshot_id, func.count(ResourceState.id)).filter(
+            ResourceState.sync_snapshot_id.in_(snapshot_ids)
+        ).group_by(ResourceState.sync_snapshot_id).all())
@@ -96,35 +96,26 @@ class PriceUpdateService:
                     db.session.execute(db.text('SELECT 1'))
                     logger.info("Database reconnected successfully")
                 
-                # Save pricing data in batches to avoid MySQL connection timeouts
-                batch_size = 100
-                saved_records = []
-                
-                for i in range(0, len(pricing_data), batch_size):
-                    batch = pricing_data[i:i + batch_size]
-                    batch_num = (i // batch_size) + 1
-                    total_batches = (len(pricing_data) + batch_size - 1) // batch_size
-                    
-                    logger.info(f"Saving batch {batch_num}/{total_batches} ({len(batch)} records)")
-                    batch_saved = self.pricing_service.bulk_save_price_data(batch)
-                    saved_records.extend(batch_saved)
-                    
-                    # Commit after each batch to keep connection alive
-                    db.session.commit()
-                    logger.info(f"Batch {batch_num}/{total_batches} committed ({len(saved_records)}/{len(pricing_data)} total)")
+                # Bulk upsert; commits once per chunk to keep the connection alive on large catalogs
+                save_stats = self.pricing_service.bulk_save_price_data(pricing_data)
+                records_synced = save_stats['inserted'] + save_stats['updated'] + save_stats['unchanged']
                 
                 # Update sync status to success
                 self.pricing_service.update_provider_sync_status(provider_type, 'success')
                 
                 result = {
                     'success': True,
-                    'message': f'Successfully synced {len(saved_records)} pricing records from {provider_type}',
+                    'message': f'Successfully synced {records_synced} pricing records from {provider_type}',
                     'provider': provider_type,
-                    'records_synced': len(saved_records),
+                    'records_synced': records_synced,
+                    'inserted': save_stats['inserted'],
+                    'updated': save_stats['updated'],
+                    'unchanged': save_stats['unchanged'],
+                    'price_changed': save_stats['price_changed'],
                     'timestamp': datetime.utcnow().isoformat()
                 }
                 
-                logger.info(f"Price sync completed successfully for {provider_type}: {len(saved_records)} records")
+                logger.info(f"Price sync completed successfully for {provider_type}: {records_synced} records")
                 return result
                 
             except Exception as e:
@@ -2,13 +2,17 @@
 Pricing Service - Handles price data management and updates
 """
 import logging
+import time
 from datetime import datetime
 from typing import List, Dict, Optional, Any
 from decimal import Decimal
 
+from sqlalchemy import Float, Numeric, insert, select, update
+
 from app.core.database import db
 from app.core.models.pricing import ProviderPrice, PriceHistory, PriceComparisonRecommendation
 from app.core.models.provider_catalog import ProviderCatalog
+from app.core.recommendations.price_catalog import price_catalog
 
 logger = logging.getLogger(__name__)
 
@@ -16,6 +20,9 @@ logger = logging.getLogger(__name__)
 class PricingService:
     """Service for managing pricing data operations"""
     
+    # Rows per executemany batch (and per commit) in bulk_save_price_data
+    BULK_CHUNK_SIZE = 500
+    
     @staticmethod
     def save_price_data(price_data: Dict[str, Any]) -> ProviderPrice:
         """
@@ -83,48 +90,136 @@ class PricingService:
             raise
     
     @staticmethod
-    def bulk_save_price_data(price_data_list: List[Dict[str, Any]]) -> List[ProviderPrice]:
+    def bulk_save_price_data(price_data_list: List[Dict[str, Any]]) -> Dict[str, Any]:
         """
-        Save multiple price records in batch. Existing records for the same provider
-        (and optionally resource type/region) are removed before inserting the fresh
-        dataset to ensure the table reflects only the latest snapshot.
+        Upsert a price catalog in bulk. Rows are matched on
+        (provider, resource_type, provider_sku, region); existing rows for the
+        payload providers are prefetched in one query and diffed in memory, then
+        new rows, changed rows and PriceHistory entries are written in chunks
+        with one commit per chunk. Existing prices are never deleted, since
+        recommendations and price history reference them.
 
         Args:
             price_data_list: List of price data dictionaries
 
         Returns:
-            List[ProviderPrice]: List of saved price records
+            Dict: counts of inserted, updated, unchanged and price_changed rows
         """
-        saved_records: List[ProviderPrice] = []
+        stats: Dict[str, Any] = {
+            'total': len(price_data_list or []),
+            'inserted': 0,
+            'updated': 0,
+            'unchanged': 0,
+            'price_changed': 0,
+            'duration_seconds': 0.0,
+        }
 
         if not price_data_list:
             logger.warning("bulk_save_price_data called with empty payload")
-            return saved_records
+            return stats
 
-        provider = price_data_list[0].get("provider")
-        if not provider:
+        providers = {p.get("provider") for p in price_data_list}
+        if None in providers or '' in providers:
             raise ValueError("Pricing payload missing 'provider'")
 
-        resource_type = price_data_list[0].get("resource_type")
-        region = price_data_list[0].get("region")
+        t0 = time.perf_counter()
+        table = ProviderPrice.__table__
+        columns = {c.name: c for c in table.columns if c.name not in ('id', 'created_at', 'updated_at')}
+
+        def normalize(name: str, value: Any) -> Any:
+            # Compare numerics at column scale so float payloads match stored DECIMALs
+            col_type = columns[name].type
+            if value is not None and isinstance(col_type, Numeric) and not isinstance(col_type, Float):
+                try:
+                    return round(float(value), col_type.scale or 0)
+                except (TypeError, ValueError):
+                    return value
+            return value
+
+        def price_key(row: Dict[str, Any]):
+            return (row.get('provider'), row.get('resource_type'), row.get('provider_sku'), row.get('region'))
 
         try:
-            # Don't delete existing prices - just update/insert
-            # This avoids:
-            # 1. Foreign key violations (recommendations reference prices)
-            # 2. MySQL connection timeouts during long DELETE operations
-            # 3. Loss of price history data
-            # The save_price_data method will update existing records automatically
-            
-            logger.info(f"Upserting {len(price_data_list)} price records for provider={provider}")
-            
+            # Latest payload entry wins for duplicate keys
+            incoming: Dict[tuple, Dict[str, Any]] = {}
             for price_data in price_data_list:
-                record = PricingService.save_price_data(price_data)
-                saved_records.append(record)
-            
-            logger.info(f"Successfully saved {len(saved_records)} price records")
-            return saved_records
-            
+                incoming[price_key(price_data)] = {k: v for k, v in price_data.items() if k in columns}
+
+            existing: Dict[tuple, Dict[str, Any]] = {}
+            for row in db.session.execute(
+                select(table).where(table.c.provider.in_(providers)).order_by(table.c.id)
+            ).mappings():
+                existing.setdefault(price_key(row), dict(row))
+
+            logger.info(
+                f"Upserting {len(incoming)} price records for provider={','.join(sorted(providers))} "
+                f"({len(existing)} existing)"
+            )
+
+            now = datetime.utcnow()
+            inserts: List[Dict[str, Any]] = []
+            updates: List[Dict[str, Any]] = []
+            touched_ids: List[int] = []
+            history: List[Dict[str, Any]] = []
+            for key, data in incoming.items():
+                current = existing.get(key)
+                if current is None:
+                    inserts.append({**data, 'last_updated': now})
+                    continue
+
+                changes = {
+                    name: value for name, value in data.items()
+                    if name != 'last_updated' and normalize(name, value) != normalize(name, current.get(name))
+                }
+                if not changes:
+                    touched_ids.append(current['id'])
+                    continue
+                updates.append({'id': current['id'], **changes, 'last_updated': now, 'updated_at': datetime.now()})
+
+                old_cost = current.get('monthly_cost')
+                new_cost = data.get('monthly_cost')
+                if 'monthly_cost' in changes and old_cost is not None and new_cost is not None:
+                    old_val = float(old_cost)
+                    new_val = float(new_cost)
+                    history.append({
+                        'price_id': current['id'],
+                        'old_monthly_cost': old_cost,
+                        'new_monthly_cost': new_cost,
+                        'change_percent': ((new_val - old_val) / old_val) * 100 if old_val else None,
+                        'change_reason': 'price_update',
+                    })
+
+            chunk_size = PricingService.BULK_CHUNK_SIZE
+            for i in range(0, len(inserts), chunk_size):
+                db.session.execute(insert(ProviderPrice), inserts[i:i + chunk_size])
+                db.session.commit()
+            for i in range(0, len(updates), chunk_size):
+                db.session.execute(update(ProviderPrice), updates[i:i + chunk_size])
+                db.session.commit()
+            for i in range(0, len(history), chunk_size):
+                db.session.execute(insert(PriceHistory), history[i:i + chunk_size])
+                db.session.commit()
+            # Unchanged rows were re-confirmed by this sync
+            for i in range(0, len(touched_ids), chunk_size):
+                db.session.execute(
+                    update(table).where(table.c.id.in_(touched_ids[i:i + chunk_size])).values(last_updated=now)
+                )
+                db.session.commit()
+
+            stats.update(
+                inserted=len(inserts),
+                updated=len(updates),
+                unchanged=len(touched_ids),
+                price_changed=len(history),
+                duration_seconds=round(time.perf_counter() - t0, 3),
+            )
+            price_catalog.bump_version()
+            logger.info(
+                "Bulk price upsert done: inserted=%d updated=%d unchanged=%d price_changed=%d in %.2fs",
+                stats['inserted'], stats['updated'], stats['unchanged'], stats['price_changed'], stats['duration_seconds'],
+            )
+            return stats
+
         except Exception as e:
             db.session.rollback()
             logger.error(f"Error in bulk save: {str(e)}")
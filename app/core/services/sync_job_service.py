@@ -0,0 +1,455 @@
+"""
+Background sync jobs - a DB-backed queue for complete syncs
+
+POST /api/complete-sync stores a SyncJob and returns immediately. Worker
+threads (started in the web process by the first sync job request, or by
+scripts/sync_job_worker.py) claim queued jobs with a conditional UPDATE, so
+any number of processes can share the sync_jobs table without a broker.
+Workers publish per-provider progress to the job row, which the status and
+event-stream endpoints read.
+"""
+import json
+import logging
+import os
+import socket
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from flask import current_app
+from sqlalchemy import select, update
+from sqlalchemy.exc import IntegrityError
+
+from app.core.database import db
+from app.core.models.sync_job import SyncJob
+from app.core.models.provider import CloudProvider
+from app.core.services.complete_sync_service import CompleteSyncService, SyncProgress
+
+sync_jobs = SyncJob.__table__
+
+
+class SyncJobService:
+    """
+    Enqueue, inspect and cancel a user's sync jobs
+    """
+    
+    def __init__(self, user_id: int):
+        self.user_id = user_id
+        self.logger = logging.getLogger(f"{__name__}.{self.__class__.__name__}")
+    
+    def enqueue_complete_sync(self, sync_type: str = 'manual', _retry: bool = True) -> Dict[str, Any]:
+        """
+        Queue a complete sync for the user
+        
+        When the user's active job turns out to be abandoned (its worker died,
+        or nothing claimed it) it is failed and the new job queued instead.
+        
+        Returns:
+            Dict with the queued job, or success=False and the user's active job
+            when a sync is already queued or running
+        """
+        now = datetime.now()
+        job = SyncJob(
+            user_id=self.user_id,
+            active_user_id=self.user_id,
+            sync_type=sync_type,
+            status='queued',
+            queued_at=now,
+            progress=json.dumps({'stage': 'queued'})
+        )
+        db.session.add(job)
+        try:
+            db.session.commit()
+        except IntegrityError:
+            # active_user_id is unique: another request queued a sync for this user first
+            db.session.rollback()
+            app = current_app._get_current_object()
+            start_inprocess_workers()
+            if _retry and sync_job_runner.reap_stale(app, force=True):
+                return self.enqueue_complete_sync(sync_type, _retry=False)
+            active = self.get_active_job()
+            return {
+                'success': False,
+                'error': 'Sync already in progress',
+                'job': active.to_dict() if active else None
+            }
+        
+        self.logger.info(f"Queued complete sync job {job.id} for user {self.user_id}")
+        start_inprocess_workers()
+        return {'success': True, 'job': job.to_dict()}
+    
+    def get_job(self, job_id: int, refresh: bool = False) -> Optional[SyncJob]:
+        """The user's job, re-read from the database when `refresh` is set"""
+        query = SyncJob.query.filter_by(id=job_id, user_id=self.user_id)
+        if refresh:
+            query = query.execution_options(populate_existing=True)
+        return query.first()
+    
+    def get_active_job(self) -> Optional[SyncJob]:
+        return SyncJob.query.filter_by(active_user_id=self.user_id).first()
+    
+    def cancel(self, job_id: int) -> Dict[str, Any]:
+        """
+        Cancel a job: queued jobs are cancelled at once, running jobs stop
+        before their next provider sync starts
+        """
+        job = self.get_job(job_id)
+        if job is None:
+            return {'success': False, 'error': 'Sync job not found'}
+        if not job.is_active:
+            return {'success': False, 'error': f'Sync job already {job.status}', 'job': job.to_dict()}
+        
+        now = datetime.now()
+        cancelled = db.session.execute(
+            update(sync_jobs)
+            .where(sync_jobs.c.id == job.id, sync_jobs.c.status == 'queued')
+            .values(status='cancelled', cancel_requested=True, active_user_id=None,
+                    progress=json.dumps({'stage': 'finished'}), finished_at=now, updated_at=now,
+                    progress_version=sync_jobs.c.progress_version + 1)
+        ).rowcount
+        if not cancelled:
+            db.session.execute(
+                update(sync_jobs)
+                .where(sync_jobs.c.id == job.id, sync_jobs.c.status == 'running')
+                .values(cancel_requested=True, updated_at=now,
+                        progress_version=sync_jobs.c.progress_version + 1)
+            )
+        db.session.commit()
+        
+        self.logger.info(f"Cancel requested for sync job {job.id} (user {self.user_id})")
+        return {'success': True, 'job': self.get_job(job.id, refresh=True).to_dict()}
+
+
+class SyncJobProgress(SyncProgress):
+    """
+    Publishes a running complete sync to its SyncJob row
+    
+    Every update rewrites the progress JSON, bumps progress_version and
+    refreshes heartbeat_at in its own short transaction, so readers see it at
+    once and the sync's own session is not involved. Writes are serialized,
+    provider callbacks arrive from the parallel runner's threads.
+    """
+    
+    def __init__(self, job_id: int, engine):
+        self.job_id = job_id
+        self.engine = engine
+        self._lock = threading.Lock()
+        self._state: Dict[str, Any] = {
+            'stage': 'starting',
+            'complete_sync_id': None,
+            'total': 0,
+            'completed': 0,
+            'providers': []
+        }
+        self.logger = logging.getLogger(f"{__name__}.{self.__class__.__name__}")
+    
+    @property
+    def complete_sync_id(self) -> Optional[int]:
+        return self._state['complete_sync_id']
+    
+    def started(self, complete_sync_id: int, providers: List[CloudProvider]) -> None:
+        with self._lock:
+            self._state.update(
+                complete_sync_id=complete_sync_id,
+                total=len(providers),
+                providers=[
+                    {'id': p.id, 'name': p.connection_name, 'type': p.provider_type, 'status': 'pending'}
+                    for p in providers
+                ]
+            )
+            self._publish()
+    
+    def provider_started(self, provider_id: int) -> None:
+        with self._lock:
+            self._provider(provider_id)['status'] = 'running'
+            self._publish()
+    
+    def provider_finished(self, provider_id: int, result: Dict[str, Any]) -> None:
+        with self._lock:
+            entry = self._provider(provider_id)
+            entry['status'] = 'success' if result.get('success') else 'error'
+            entry['resources'] = result.get('resources_synced')
+            entry['duration_seconds'] = result.get('sync_duration_seconds')
+            if not result.get('success'):
+                entry['error'] = result.get('error', 'Unknown error')
+            self._state['completed'] += 1
+            self._publish()
+    
+    def stage(self, name: str) -> None:
+        with self._lock:
+            self._state['stage'] = name
+            self._publish()
+    
+    def cancelled(self) -> bool:
+        try:
+            with self.engine.connect() as conn:
+                return bool(conn.execute(
+                    select(sync_jobs.c.cancel_requested).where(sync_jobs.c.id == self.job_id)
+                ).scalar())
+        except Exception as e:
+            self.logger.warning(f"Failed to read cancel flag of sync job {self.job_id}: {e}")
+            return False
+    
+    def final_payload(self, status: str) -> str:
+        """Progress JSON for a finished job (providers never started are marked cancelled)"""
+        with self._lock:
+            self._state['stage'] = 'finished'
+            if status == 'cancelled':
+                for entry in self._state['providers']:
+                    if entry['status'] == 'pending':
+                        entry['status'] = 'cancelled'
+            return json.dumps(self._state, default=str)
+    
+    def _provider(self, provider_id: int) -> Dict[str, Any]:
+        for entry in self._state['providers']:
+            if entry['id'] == provider_id:
+                return entry
+        entry = {'id': provider_id, 'status': 'pending'}
+        self._state['providers'].append(entry)
+        return entry
+    
+    def _publish(self) -> None:
+        # Progress is best effort: a failed write must not fail the sync
+        now = datetime.now()
+        try:
+            with self.engine.begin() as conn:
+                conn.execute(
+                    update(sync_jobs)
+                    .where(sync_jobs.c.id == self.job_id)
+                    .values(progress=json.dumps(self._state, default=str), heartbeat_at=now, updated_at=now,
+                            progress_version=sync_jobs.c.progress_version + 1)
+                )
+        except Exception as e:
+            self.logger.warning(f"Failed to publish progress of sync job {self.job_id}: {e}")
+
+
+class SyncJobRunner:
+    """
+    Worker threads executing queued sync jobs
+    
+    Each worker claims the oldest queued job (UPDATE ... WHERE status='queued'
+    succeeds for exactly one claimant), runs CompleteSyncService with a
+    SyncJobProgress observer and records the outcome. A heartbeat thread keeps
+    heartbeat_at fresh for running jobs; jobs whose heartbeat stops (worker
+    process killed mid-sync) are failed after SYNC_JOB_STALE_SECONDS, and jobs
+    no worker claimed within SYNC_JOB_QUEUE_TIMEOUT_SECONDS are failed too, so
+    the user can sync again. Idle workers keep polling, so the reaper runs
+    whether or not anything is queued.
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self._heartbeat_thread: Optional[threading.Thread] = None
+        self._running: Dict[int, str] = {}  # job id -> worker id
+        self._spawned = 0
+        self._last_reap = 0.0
+        self._counters = {'claimed': 0, 'finished': 0, 'failed': 0, 'reaped': 0}
+        self.logger = logging.getLogger(f"{__name__}.{self.__class__.__name__}")
+    
+    def start(self, app, workers: Optional[int] = None) -> int:
+        """Start worker threads up to `workers` (SYNC_JOB_WORKERS); returns the number alive"""
+        workers = max(1, int(workers or app.config.get('SYNC_JOB_WORKERS', 2)))
+        with self._lock:
+            self._stop.clear()
+            self._threads = [t for t in self._threads if t.is_alive()]
+            while len(self._threads) < workers:
+                self._spawned += 1
+                thread = threading.Thread(target=self._work, args=(app,),
+                                          name=f'sync-job-worker-{self._spawned}', daemon=True)
+                thread.start()
+                self._threads.append(thread)
+            if self._heartbeat_thread is None or not self._heartbeat_thread.is_alive():
+                self._heartbeat_thread = threading.Thread(target=self._heartbeat, args=(app,),
+                                                          name='sync-job-heartbeat', daemon=True)
+                self._heartbeat_thread.start()
+            return len(self._threads)
+    
+    def wake(self) -> None:
+        """Make idle workers look for queued jobs now instead of at the next poll"""
+        self._wake.set()
+    
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Stop claiming jobs and wait for running ones to finish"""
+        self._stop.set()
+        self._wake.set()
+        for thread in list(self._threads):
+            thread.join(timeout)
+    
+    def run_forever(self, app, workers: Optional[int] = None) -> None:
+        """Run workers in the foreground until interrupted (standalone worker process)"""
+        count = self.start(app, workers)
+        self.logger.info(f"Sync job worker started with {count} threads")
+        try:
+            while not self._stop.wait(1.0):
+                pass
+        except KeyboardInterrupt:
+            self.logger.info("Stopping sync job worker, waiting for running jobs")
+            self.stop()
+    
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'workers': sum(1 for t in self._threads if t.is_alive()),
+                'running_jobs': sorted(self._running),
+                **self._counters
+            }
+    
+    # ---- Worker loop ----
+    def _work(self, app) -> None:
+        while not self._stop.is_set():
+            job_id = None
+            with app.app_context():
+                try:
+                    self.reap_stale(app)
+                    job_id = self._claim_next()
+                except Exception as e:
+                    db.session.rollback()
+                    self.logger.error(f"Failed to claim a sync job: {e}")
+                finally:
+                    db.session.remove()
+            
+            if job_id is None:
+                self._wake.wait(app.config.get('SYNC_JOB_POLL_SECONDS', 5))
+                self._wake.clear()
+                continue
+            self._execute(app, job_id)
+    
+    def _worker_id(self) -> str:
+        return f"{socket.gethostname()}:{os.getpid()}:{threading.current_thread().name}"[:100]
+    
+    def _claim_next(self) -> Optional[int]:
+        candidates = db.session.execute(
+            select(sync_jobs.c.id)
+            .where(sync_jobs.c.status == 'queued')
+            .order_by(sync_jobs.c.queued_at, sync_jobs.c.id)
+            .limit(5)
+        ).scalars().all()
+        
+        worker_id = self._worker_id()
+        for job_id in candidates:
+            now = datetime.now()
+            claimed = db.session.execute(
+                update(sync_jobs)
+                .where(sync_jobs.c.id == job_id, sync_jobs.c.status == 'queued')
+                .values(status='running', worker_id=worker_id, started_at=now, heartbeat_at=now, updated_at=now,
+                        progress_version=sync_jobs.c.progress_version + 1)
+            ).rowcount
+            db.session.commit()
+            if claimed:
+                with self._lock:
+                    self._running[job_id] = worker_id
+                    self._counters['claimed'] += 1
+                self.logger.info(f"Worker {worker_id} claimed sync job {job_id}")
+                return job_id
+        return None
+    
+    def _execute(self, app, job_id: int) -> None:
+        started = time.monotonic()
+        with app.app_context():
+            progress = SyncJobProgress(job_id, db.engine)
+            status, result, error = 'error', {}, None
+            try:
+                job = db.session.get(SyncJob, job_id)
+                result = CompleteSyncService(job.user_id, progress=progress).start_complete_sync(job.sync_type)
+                status = result.get('sync_status') or 'error'
+                if not result.get('success'):
+                    error = result.get('error') or result.get('error_message')
+            except Exception as e:
+                db.session.rollback()
+                error = str(e)
+                self.logger.error(f"Sync job {job_id} failed: {e}")
+            finally:
+                try:
+                    self._finish(job_id, progress, status, result, error)
+                except Exception as e:
+                    self.logger.error(f"Failed to record outcome of sync job {job_id}: {e}")
+                with self._lock:
+                    self._running.pop(job_id, None)
+                    self._counters['finished' if status != 'error' else 'failed'] += 1
+                db.session.remove()
+        self.logger.info(f"Sync job {job_id} finished: {status} in {time.monotonic() - started:.1f}s")
+    
+    def _finish(self, job_id: int, progress: SyncJobProgress, status: str,
+                result: Dict[str, Any], error: Optional[str]) -> None:
+        now = datetime.now()
+        with db.engine.begin() as conn:
+            conn.execute(
+                update(sync_jobs)
+                .where(sync_jobs.c.id == job_id)
+                .values(status=status, active_user_id=None,
+                        complete_sync_id=result.get('complete_sync_id') or progress.complete_sync_id,
+                        result=json.dumps(result, default=str), error_message=error,
+                        progress=progress.final_payload(status), finished_at=now, updated_at=now,
+                        progress_version=sync_jobs.c.progress_version + 1)
+            )
+    
+    # ---- Liveness ----
+    def _heartbeat(self, app) -> None:
+        interval = app.config.get('SYNC_JOB_HEARTBEAT_SECONDS', 30)
+        while not self._stop.wait(interval):
+            with self._lock:
+                job_ids = list(self._running)
+            if not job_ids:
+                continue
+            try:
+                with app.app_context():
+                    with db.engine.begin() as conn:
+                        conn.execute(
+                            update(sync_jobs)
+                            .where(sync_jobs.c.id.in_(job_ids), sync_jobs.c.status == 'running')
+                            .values(heartbeat_at=datetime.now())
+                        )
+            except Exception as e:
+                self.logger.warning(f"Failed to refresh heartbeat of sync jobs {job_ids}: {e}")
+    
+    def reap_stale(self, app, force: bool = False) -> int:
+        """
+        Fail running jobs without a recent heartbeat and queued jobs nobody claimed
+        
+        Runs at most every min(60, SYNC_JOB_STALE_SECONDS) unless `force` is
+        set. Returns the number of jobs failed.
+        """
+        stale_seconds = app.config.get('SYNC_JOB_STALE_SECONDS', 300)
+        queue_timeout = app.config.get('SYNC_JOB_QUEUE_TIMEOUT_SECONDS', 1800)
+        with self._lock:
+            if not force and time.monotonic() - self._last_reap < min(60, stale_seconds):
+                return 0
+            self._last_reap = time.monotonic()
+        
+        now = datetime.now()
+        reaped = 0
+        for status, cutoff_column, cutoff, error in (
+            ('running', sync_jobs.c.heartbeat_at, stale_seconds, 'Sync worker stopped responding'),
+            ('queued', sync_jobs.c.queued_at, queue_timeout, 'No sync worker picked up the job'),
+        ):
+            reaped += db.session.execute(
+                update(sync_jobs)
+                .where(sync_jobs.c.status == status, cutoff_column < now - timedelta(seconds=cutoff))
+                .values(status='error', error_message=error, active_user_id=None,
+                        progress=json.dumps({'stage': 'finished'}), finished_at=now, updated_at=now,
+                        progress_version=sync_jobs.c.progress_version + 1)
+            ).rowcount
+        db.session.commit()
+        if reaped:
+            with self._lock:
+                self._counters['reaped'] += reaped
+            self.logger.warning(f"Marked {reaped} stale sync jobs as failed")
+        return reaped
+
+
+# Global runner for this process
+sync_job_runner = SyncJobRunner()
+
+
+def start_inprocess_workers(wake: bool = True) -> None:
+    """Start (and optionally wake) this process's sync job workers unless a separate worker process runs them"""
+    app = current_app._get_current_object()
+    if not app.config.get('SYNC_JOB_INPROCESS_WORKERS', True):
+        return
+    sync_job_runner.start(app)
+    if wake:
+        sync_job_runner.wake()
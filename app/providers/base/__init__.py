@@ -3,5 +3,6 @@ Base provider system for extensible cloud provider support
 """
 from .provider_base import BaseProvider
 from .resource_mapper import ResourceMapper
+from .rate_limit import TokenBucket
 
-__all__ = ['BaseProvider', 'ResourceMapper']
+__all__ = ['BaseProvider', 'ResourceMapper', 'TokenBucket']
@@ -2,8 +2,9 @@
 Beget API Client for InfraZen
 """
 import logging
-from typing import Dict, Optional, List
-from datetime import datetime, date
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional, List, Tuple
+from datetime import datetime, date, timedelta, timezone
 import requests
 import json
 import base64
@@ -1545,9 +1546,73 @@ class BegetAPIClient:
             logger.error(f"Failed to collect S3 statistics: {e}")
             return {}
     
-    def get_vps_cpu_statistics(self, vps_id: str, period: str = 'HOUR') -> Dict:
-        """Get CPU statistics for a specific VPS"""
+    # Statistics periods offered by the API and the span each covers (MONTH: the rest)
+    STATISTICS_PERIODS = (
+        ('HOUR', timedelta(hours=1)),
+        ('DAY', timedelta(days=1)),
+        ('WEEK', timedelta(days=7)),
+        ('MONTH', None),
+    )
+    
+    @classmethod
+    def _statistics_period(cls, period: str, since: Optional[datetime]) -> str:
+        """Smallest period covering the time since `since`, never larger than `period`"""
+        if since is None:
+            return period
+        gap = datetime.utcnow() - since
+        for name, span in cls.STATISTICS_PERIODS:
+            if name == period or span is None or gap <= span:
+                return name
+        return period
+    
+    @staticmethod
+    def _parse_statistics_date(value) -> Optional[datetime]:
+        """Parse a statistics date (ISO string, 'YYYY-MM-DD HH:MM[:SS]' or epoch) to naive UTC"""
+        if value is None or value == '':
+            return None
+        try:
+            if isinstance(value, (int, float)):
+                return datetime.fromtimestamp(float(value), tz=timezone.utc).replace(tzinfo=None)
+            text = str(value).strip()
+            if text.isdigit():
+                return datetime.fromtimestamp(int(text), tz=timezone.utc).replace(tzinfo=None)
+            parsed = datetime.fromisoformat(text.replace('Z', '+00:00'))
+        except ValueError:
+            parsed = None
+            for fmt in ('%Y-%m-%d %H:%M:%S', '%Y-%m-%d %H:%M', '%d.%m.%Y %H:%M', '%d.%m.%Y'):
+                try:
+                    parsed = datetime.strptime(str(value).strip(), fmt)
+                    break
+                except ValueError:
+                    continue
+            if parsed is None:
+                return None
+        if parsed.tzinfo is not None:
+            parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+        return parsed
+    
+    def _statistics_points(self, dates: List, values: List,
+                           since: Optional[datetime] = None) -> List[Tuple[datetime, float]]:
+        """(timestamp, value) pairs newer than `since`; unparseable dates are skipped"""
+        points = []
+        for raw_date, value in zip(dates, values):
+            if value is None:
+                continue
+            ts = self._parse_statistics_date(raw_date)
+            if ts is None or (since is not None and ts <= since):
+                continue
+            points.append((ts, float(value)))
+        return points
+    
+    def get_vps_cpu_statistics(self, vps_id: str, period: str = 'HOUR', since: Optional[datetime] = None) -> Dict:
+        """
+        Get CPU statistics for a specific VPS
+        
+        With `since` (newest stored point) the smallest period that still
+        covers the gap is requested, and `points` holds only newer points.
+        """
         try:
+            period = self._statistics_period(period, since)
             if not self.access_token:
                 self.authenticate()
             
@@ -1574,7 +1639,7 @@ class BegetAPIClient:
                 
                 # Process the CPU statistics data
                 if 'cpu' in result:
-                    return self._process_cpu_statistics_data(result['cpu'], vps_id, period)
+                    return self._process_cpu_statistics_data(result['cpu'], vps_id, period, since)
                 else:
                     logger.warning(f"Unexpected CPU statistics response format: {result}")
                     return {}
@@ -1587,7 +1652,8 @@ class BegetAPIClient:
             logger.error(f"Failed to get CPU statistics for VPS {vps_id}: {e}")
             return {}
     
-    def _process_cpu_statistics_data(self, cpu_data: Dict, vps_id: str, period: str) -> Dict:
+    def _process_cpu_statistics_data(self, cpu_data: Dict, vps_id: str, period: str,
+                                     since: Optional[datetime] = None) -> Dict:
         """Process CPU statistics data from API"""
         try:
             dates = cpu_data.get('date', [])
@@ -1638,6 +1704,7 @@ class BegetAPIClient:
                     'dates': dates,
                     'values': values
                 },
+                'points': self._statistics_points(dates, values, since),
                 'timestamp': dates[-1] if dates else None,  # Last timestamp
                 'collection_timestamp': datetime.now().isoformat()
             }
@@ -1646,28 +1713,51 @@ class BegetAPIClient:
             logger.error(f"Error processing CPU statistics for VPS {vps_id}: {e}")
             return {}
     
-    def get_all_vps_cpu_statistics(self, vps_servers: List[Dict], period: str = 'HOUR') -> Dict:
-        """Get CPU statistics for all VPS servers"""
+    def _map_vps(self, vps_servers: List[Dict], fetch, max_workers: int = 1) -> List[Tuple[Dict, Dict]]:
+        """Run `fetch(vps)` for VPS servers with an ID on up to `max_workers` threads (input order kept)"""
+        with_id = [vps for vps in vps_servers if vps.get('id')]
+        for vps in vps_servers:
+            if not vps.get('id'):
+                logger.warning(f"No VPS ID found for VPS: {vps.get('name', 'Unknown')}")
+        if not with_id:
+            return []
+        if not self.access_token:
+            # Authenticate once instead of from every worker
+            self.authenticate()
+        workers = max(1, min(int(max_workers or 1), len(with_id)))
+        if workers == 1:
+            return [(vps, fetch(vps)) for vps in with_id]
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='beget-stats') as pool:
+            return list(zip(with_id, pool.map(fetch, with_id)))
+    
+    def get_all_vps_cpu_statistics(self, vps_servers: List[Dict], period: str = 'HOUR',
+                                   since: Optional[Dict[str, datetime]] = None, max_workers: int = 1) -> Dict:
+        """
+        Get CPU statistics for all VPS servers
+        
+        Args:
+            vps_servers: VPS dicts from the API
+            period: Longest period requested
+            since: VPS ID -> newest stored point (incremental window per VPS)
+            max_workers: VPS fetched concurrently
+        """
         try:
             cpu_statistics = {}
+            since = since or {}
             
-            for vps in vps_servers:
-                vps_id = vps.get('id')
+            def fetch(vps):
+                logger.info(f"Collecting CPU statistics for VPS: {vps.get('name', 'Unknown')} ({vps['id']})")
+                return self.get_vps_cpu_statistics(vps['id'], period, since.get(vps['id']))
+            
+            for vps, cpu_data in self._map_vps(vps_servers, fetch, max_workers):
                 vps_name = vps.get('name', 'Unknown')
-                
-                if vps_id:
-                    logger.info(f"Collecting CPU statistics for VPS: {vps_name} ({vps_id})")
-                    cpu_data = self.get_vps_cpu_statistics(vps_id, period)
-                    
-                    if cpu_data:
-                        cpu_statistics[vps_id] = {
-                            'vps_name': vps_name,
-                            'cpu_statistics': cpu_data
-                        }
-                    else:
-                        logger.warning(f"No CPU data collected for VPS {vps_name}")
+                if cpu_data:
+                    cpu_statistics[vps['id']] = {
+                        'vps_name': vps_name,
+                        'cpu_statistics': cpu_data
+                    }
                 else:
-                    logger.warning(f"No VPS ID found for VPS: {vps_name}")
+                    logger.warning(f"No CPU data collected for VPS {vps_name}")
             
             return {
                 'total_vps': len(vps_servers),
@@ -1681,9 +1771,10 @@ class BegetAPIClient:
             logger.error(f"Failed to collect CPU statistics for all VPS: {e}")
             return {}
     
-    def get_vps_memory_statistics(self, vps_id: str, period: str = 'HOUR') -> Dict:
-        """Get memory statistics for a specific VPS"""
+    def get_vps_memory_statistics(self, vps_id: str, period: str = 'HOUR', since: Optional[datetime] = None) -> Dict:
+        """Get memory statistics for a specific VPS (`since` as in get_vps_cpu_statistics)"""
         try:
+            period = self._statistics_period(period, since)
             if not self.access_token:
                 self.authenticate()
             
@@ -1710,7 +1801,7 @@ class BegetAPIClient:
                 
                 # Process the memory statistics data
                 if 'memory' in result:
-                    return self._process_memory_statistics_data(result['memory'], vps_id, period)
+                    return self._process_memory_statistics_data(result['memory'], vps_id, period, since)
                 else:
                     logger.warning(f"Unexpected memory statistics response format: {result}")
                     return {}
@@ -1723,7 +1814,8 @@ class BegetAPIClient:
             logger.error(f"Failed to get memory statistics for VPS {vps_id}: {e}")
             return {}
     
-    def _process_memory_statistics_data(self, memory_data: Dict, vps_id: str, period: str) -> Dict:
+    def _process_memory_statistics_data(self, memory_data: Dict, vps_id: str, period: str,
+                                        since: Optional[datetime] = None) -> Dict:
         """Process memory statistics data from API"""
         try:
             dates = memory_data.get('date', [])
@@ -1778,6 +1870,7 @@ class BegetAPIClient:
                     'dates': dates,
                     'values': values
                 },
+                'points': self._statistics_points(dates, values, since),
                 'timestamp': dates[-1] if dates else None,  # Last timestamp
                 'collection_timestamp': datetime.now().isoformat()
             }
@@ -1786,28 +1879,26 @@ class BegetAPIClient:
             logger.error(f"Error processing memory statistics for VPS {vps_id}: {e}")
             return {}
     
-    def get_all_vps_memory_statistics(self, vps_servers: List[Dict], period: str = 'HOUR') -> Dict:
-        """Get memory statistics for all VPS servers"""
+    def get_all_vps_memory_statistics(self, vps_servers: List[Dict], period: str = 'HOUR',
+                                      since: Optional[Dict[str, datetime]] = None, max_workers: int = 1) -> Dict:
+        """Get memory statistics for all VPS servers (arguments as in get_all_vps_cpu_statistics)"""
         try:
             memory_statistics = {}
+            since = since or {}
             
-            for vps in vps_servers:
-                vps_id = vps.get('id')
+            def fetch(vps):
+                logger.info(f"Collecting memory statistics for VPS: {vps.get('name', 'Unknown')} ({vps['id']})")
+                return self.get_vps_memory_statistics(vps['id'], period, since.get(vps['id']))
+            
+            for vps, memory_data in self._map_vps(vps_servers, fetch, max_workers):
                 vps_name = vps.get('name', 'Unknown')
-                
-                if vps_id:
-                    logger.info(f"Collecting memory statistics for VPS: {vps_name} ({vps_id})")
-                    memory_data = self.get_vps_memory_statistics(vps_id, period)
-                    
-                    if memory_data:
-                        memory_statistics[vps_id] = {
-                            'vps_name': vps_name,
-                            'memory_statistics': memory_data
-                        }
-                    else:
-                        logger.warning(f"No memory data collected for VPS {vps_name}")
+                if memory_data:
+                    memory_statistics[vps['id']] = {
+                        'vps_name': vps_name,
+                        'memory_statistics': memory_data
+                    }
                 else:
-                    logger.warning(f"No VPS ID found for VPS: {vps_name}")
+                    logger.warning(f"No memory data collected for VPS {vps_name}")
             
             return {
                 'total_vps': len(vps_servers),
@@ -2,11 +2,22 @@
 Beget provider plugin
 Wraps existing Beget functionality in the new plugin architecture
 """
+import hashlib
+import itertools
 import logging
 import json
-from typing import Dict, List, Any, Optional
-from datetime import datetime
-
+import os
+import random
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, List, Any, Optional, Tuple
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from ..base.rate_limit import TokenBucket
 from ..plugin_system import ProviderPlugin, SyncResult
 from ..beget.client import BegetAPIClient
 from ..resource_registry import resource_registry, ProviderResource
@@ -15,21 +26,65 @@ logger = logging.getLogger(__name__)
 
 
 class BegetPricingClient:
-    """Collect VPS pricing via Beget's configurator endpoints."""
+    """Collect VPS pricing via Beget's configurator endpoints.
+
+    Grid points are priced concurrently by a bounded worker pool sharing one
+    pooled session, throttled by a token bucket and retried with backoff.
+    Progress is checkpointed per (region, group, grid) so an interrupted run
+    resumes where it stopped. Optionally a linear price model is fitted from a
+    sparse sample and used to fill the rest of the grid.
+    """
 
     BASE_URL = "https://api.beget.com/v1"
     DEFAULT_SOFTWARE_ID = 6153
     CONFIG_GROUPS = ["normal_cpu"]
     MAX_VALUES_PER_DIM = 6
 
-    def __init__(self, access_token: Optional[str] = None):
-        self.session = self._create_session(access_token)
+    MAX_WORKERS = 6
+    REQUESTS_PER_SECOND = 5.0
+    MAX_RETRIES = 3
+    BACKOFF_SECONDS = 1.0
+    RETRY_STATUSES = {429, 500, 502, 503, 504}
+    # Checkpoints older than this are ignored (prices may have changed since)
+    PROGRESS_TTL_SECONDS = 24 * 3600
+    PROGRESS_FLUSH_EVERY = 20
+    # Max relative error of the linear model on held-out points before it is trusted
+    MODEL_TOLERANCE = 0.01
+
+    def __init__(
+        self,
+        access_token: Optional[str] = None,
+        max_workers: Optional[int] = None,
+        requests_per_second: Optional[float] = None,
+        max_retries: Optional[int] = None,
+        progress_dir: Optional[str] = None,
+        infer_linear_model: bool = False,
+    ):
+        self.max_workers = max(1, max_workers or self.MAX_WORKERS)
+        self.max_retries = self.MAX_RETRIES if max_retries is None else max_retries
+        self.session = self._create_session(access_token, self.max_workers)
+        self.rate_limiter = TokenBucket(requests_per_second or self.REQUESTS_PER_SECOND)
+        self.progress_dir = progress_dir or os.path.join(tempfile.gettempdir(), "beget_pricing_progress")
+        self.infer_linear_model = infer_linear_model
+        self._stats_lock = threading.Lock()
+        self.stats = {
+            "requests": 0,
+            "retries": 0,
+            "failed_points": 0,
+            "resumed_points": 0,
+            "inferred_points": 0,
+        }
 
     @staticmethod
-    def _create_session(access_token: Optional[str]):
+    def _create_session(access_token: Optional[str], pool_size: int = 10):
         import requests
+        from requests.adapters import HTTPAdapter
 
         session = requests.Session()
+        # One keep-alive connection per worker
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
         session.headers.update(
             {
                 "Origin": "https://cp.beget.com",
@@ -50,13 +105,41 @@ class BegetPricingClient:
 
         return session
 
+    def _count(self, key: str, amount: int = 1) -> None:
+        with self._stats_lock:
+            self.stats[key] += amount
+
     def _get(self, endpoint: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         import requests
 
         url = f"{self.BASE_URL}/{endpoint.lstrip('/')}"
-        response = self.session.get(url, params=params, timeout=30)
-        response.raise_for_status()
-        return response.json()
+        attempt = 0
+        while True:
+            self.rate_limiter.acquire()
+            self._count("requests")
+            retry_after = None
+            try:
+                response = self.session.get(url, params=params, timeout=30)
+                if response.status_code not in self.RETRY_STATUSES:
+                    response.raise_for_status()
+                    return response.json()
+                retry_after = response.headers.get("Retry-After")
+                error: Exception = requests.HTTPError(f"HTTP {response.status_code}", response=response)
+            except (requests.ConnectionError, requests.Timeout) as exc:
+                error = exc
+
+            if attempt >= self.max_retries:
+                raise error
+            try:
+                delay = float(retry_after) if retry_after else None
+            except ValueError:
+                delay = None
+            if delay is None:
+                delay = self.BACKOFF_SECONDS * (2 ** attempt) + random.uniform(0, self.BACKOFF_SECONDS)
+            attempt += 1
+            self._count("retries")
+            logger.debug("Retrying %s in %.1fs (attempt %d): %s", endpoint, delay, attempt, error)
+            time.sleep(delay)
 
     def collect_vps_prices(self) -> List[Dict[str, Any]]:
         regions = self._fetch_regions()
@@ -75,6 +158,7 @@ class BegetPricingClient:
                 grid = self._build_grid(info["settings"])
                 pricing_records.extend(self._collect_grid_prices(region_id, group, grid))
 
+        logger.info("Beget configurator crawl stats: %s", self.stats)
         return pricing_records
 
     def _fetch_regions(self) -> List[Dict[str, Any]]:
@@ -133,68 +217,260 @@ class BegetPricingClient:
         group: str,
         grid: Dict[str, List[int]],
     ) -> List[Dict[str, Any]]:
-        records: List[Dict[str, Any]] = []
-
-        for cpu in grid.get("cpu", []):
-            for memory in grid.get("memory", []):
-                for disk in grid.get("disk", []):
-                    params = {
-                        "params.cpu_count": cpu,
-                        "params.memory": memory,
-                        "params.disk_size": disk,
-                        "region": region,
-                        "configuration_group": group,
-                        "software_id": self.DEFAULT_SOFTWARE_ID,
-                    }
-
-                    try:
-                        data = self._get("vps/configurator/calculation", params=params)
-                        success = data.get("success", {})
-                        price_day = success.get("price_day")
-                        price_month = success.get("price_month")
-
-                        records.append(
-                            {
-                                "provider": "beget",
-                                "resource_type": "server",
-                                "provider_sku": self._build_sku(region, group, cpu, memory, disk),
-                                "region": region,
-                                "cpu_cores": cpu,
-                                "ram_gb": memory / 1024 if memory else None,
-                                "storage_gb": disk / 1024 if disk else None,
-                                "storage_type": "SSD",
-                                "extended_specs": {
-                                    "configuration_group": group,
-                                    "ram_mb": memory,
-                                    "disk_mb": disk,
-                                },
-                                "hourly_cost": (price_day / 24) if price_day else None,
-                                "monthly_cost": price_month,
-                                "currency": "RUB",
-                                "confidence_score": 0.95,
-                                "source": "api_configurator",
-                                "source_url": "https://cp.beget.com/cloud/servers",
-                                "notes": f"Configurator pricing (group={group})",
-                            }
-                        )
-                    except Exception as exc:
-                        logger.debug(
-                            "Configurator pricing failed for region=%s group=%s cpu=%s memory=%s disk=%s: %s",
-                            region,
-                            group,
-                            cpu,
-                            memory,
-                            disk,
-                            exc,
-                        )
+        points = list(itertools.product(grid.get("cpu", []), grid.get("memory", []), grid.get("disk", [])))
+        if not points:
+            return []
+
+        progress = _GridProgress(self._progress_path(region, group, grid), self.PROGRESS_TTL_SECONDS)
+        complete = False
+        try:
+            if self.infer_linear_model:
+                records = self._collect_with_linear_model(region, group, grid, points, progress)
+                if records is not None:
+                    complete = True
+                    return records
+
+            prices = self._crawl_points(region, group, points, progress)
+            complete = len(prices) == len(points)
+            return [
+                self._build_record(region, group, cpu, memory, disk, *prices[(cpu, memory, disk)])
+                for cpu, memory, disk in points
+                if (cpu, memory, disk) in prices
+            ]
+        finally:
+            progress.finish(complete)
+
+    def _crawl_points(
+        self,
+        region: str,
+        group: str,
+        points: List[Tuple[int, int, int]],
+        progress: "_GridProgress",
+    ) -> Dict[Tuple[int, int, int], Tuple[Optional[float], Optional[float]]]:
+        """Price grid points concurrently; returns {point: (price_day, price_month)}."""
+        prices = {point: progress.get(point) for point in points if progress.get(point) is not None}
+        if prices:
+            self._count("resumed_points", len(prices))
+            logger.info("Resuming Beget grid region=%s group=%s: %d/%d points done", region, group, len(prices), len(points))
+
+        pending = [point for point in points if point not in prices]
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="beget-grid") as executor:
+            futures = {executor.submit(self._fetch_point_price, region, group, *point): point for point in pending}
+            for future in as_completed(futures):
+                point = futures[future]
+                price = future.result()
+                if price is None:
+                    self._count("failed_points")
+                    continue
+                prices[point] = price
+                progress.add(point, price)
+        return prices
+
+    def _fetch_point_price(
+        self, region: str, group: str, cpu: int, memory: int, disk: int
+    ) -> Optional[Tuple[Optional[float], Optional[float]]]:
+        params = {
+            "params.cpu_count": cpu,
+            "params.memory": memory,
+            "params.disk_size": disk,
+            "region": region,
+            "configuration_group": group,
+            "software_id": self.DEFAULT_SOFTWARE_ID,
+        }
 
+        try:
+            data = self._get("vps/configurator/calculation", params=params)
+            success = data.get("success", {})
+            return success.get("price_day"), success.get("price_month")
+        except Exception as exc:
+            logger.debug(
+                "Configurator pricing failed for region=%s group=%s cpu=%s memory=%s disk=%s: %s",
+                region,
+                group,
+                cpu,
+                memory,
+                disk,
+                exc,
+            )
+            return None
+
+    def _collect_with_linear_model(
+        self,
+        region: str,
+        group: str,
+        grid: Dict[str, List[int]],
+        points: List[Tuple[int, int, int]],
+        progress: "_GridProgress",
+    ) -> Optional[List[Dict[str, Any]]]:
+        """Fit price = base + a*cpu + b*memory + c*disk from a sparse sample and fill the grid.
+
+        The sample varies one dimension at a time from the smallest configuration;
+        a few held-out points validate the fit. Returns None (full crawl) if the
+        model does not reproduce the held-out prices within MODEL_TOLERANCE.
+        """
+        cpus, memories, disks = grid.get("cpu", []), grid.get("memory", []), grid.get("disk", [])
+        base = (cpus[0], memories[0], disks[0])
+        training = {base}
+        training.update((cpu, base[1], base[2]) for cpu in cpus)
+        training.update((base[0], memory, base[2]) for memory in memories)
+        training.update((base[0], base[1], disk) for disk in disks)
+        holdout = {
+            (cpus[-1], memories[-1], disks[-1]),
+            (cpus[len(cpus) // 2], memories[len(memories) // 2], disks[len(disks) // 2]),
+            (cpus[-1], memories[0], disks[-1]),
+        } - training
+        if len(training) + len(holdout) >= len(points):
+            return None
+
+        sample = sorted(training | holdout)
+        prices = self._crawl_points(region, group, sample, progress)
+        model_month = self._fit_linear_model(prices, [p for p in training if p in prices], index=1)
+        if model_month is None or any(p not in prices for p in holdout):
+            return None
+        for point in holdout:
+            actual = prices[point][1]
+            predicted = self._predict(model_month, point)
+            if actual is None or abs(predicted - actual) > max(1.0, abs(actual) * self.MODEL_TOLERANCE):
+                logger.info(
+                    "Linear price model rejected for region=%s group=%s at %s: predicted=%.2f actual=%s",
+                    region, group, point, predicted, actual,
+                )
+                return None
+        model_day = self._fit_linear_model(prices, [p for p in training if p in prices], index=0)
+
+        records = []
+        for point in points:
+            if point in prices:
+                records.append(self._build_record(region, group, *point, *prices[point]))
+                continue
+            price_day = round(self._predict(model_day, point), 2) if model_day is not None else None
+            price_month = round(self._predict(model_month, point), 2)
+            records.append(
+                self._build_record(region, group, *point, price_day, price_month, inferred=True)
+            )
+            self._count("inferred_points")
+        logger.info(
+            "Beget grid region=%s group=%s: %d points priced via API, %d inferred by linear model",
+            region, group, len(prices), len(points) - len(prices),
+        )
         return records
 
+    @staticmethod
+    def _fit_linear_model(prices, sample_points, index: int):
+        rows = [(p, prices[p][index]) for p in sample_points if prices[p][index] is not None]
+        if len(rows) < 2:
+            return None
+        design = np.array([[1.0, cpu, memory, disk] for (cpu, memory, disk), _ in rows])
+        target = np.array([float(value) for _, value in rows])
+        coef, *_ = np.linalg.lstsq(design, target, rcond=None)
+        return coef
+
+    @staticmethod
+    def _predict(coef, point: Tuple[int, int, int]) -> float:
+        cpu, memory, disk = point
+        return float(coef[0] + coef[1] * cpu + coef[2] * memory + coef[3] * disk)
+
+    def _progress_path(self, region: str, group: str, grid: Dict[str, List[int]]) -> str:
+        signature = hashlib.sha1(json.dumps(grid, sort_keys=True).encode()).hexdigest()[:12]
+        return os.path.join(self.progress_dir, f"{region}-{group}-{signature}.json")
+
+    def _build_record(
+        self,
+        region: str,
+        group: str,
+        cpu: int,
+        memory: int,
+        disk: int,
+        price_day: Optional[float],
+        price_month: Optional[float],
+        inferred: bool = False,
+    ) -> Dict[str, Any]:
+        return {
+            "provider": "beget",
+            "resource_type": "server",
+            "provider_sku": self._build_sku(region, group, cpu, memory, disk),
+            "region": region,
+            "cpu_cores": cpu,
+            "ram_gb": memory / 1024 if memory else None,
+            "storage_gb": disk / 1024 if disk else None,
+            "storage_type": "SSD",
+            "extended_specs": {
+                "configuration_group": group,
+                "ram_mb": memory,
+                "disk_mb": disk,
+            },
+            "hourly_cost": (price_day / 24) if price_day else None,
+            "monthly_cost": price_month,
+            "currency": "RUB",
+            "confidence_score": 0.85 if inferred else 0.95,
+            "source": "api_configurator_model" if inferred else "api_configurator",
+            "source_url": "https://cp.beget.com/cloud/servers",
+            "notes": (
+                f"Configurator pricing inferred from linear model (group={group})"
+                if inferred else f"Configurator pricing (group={group})"
+            ),
+        }
+
     @staticmethod
     def _build_sku(region: str, group: str, cpu: int, memory: int, disk: int) -> str:
         return f"{region}-{group}-{cpu}cpu-{memory // 1024}gb-{disk // 1024}gb"
 
 
+class _GridProgress:
+    """JSON checkpoint of priced grid points, flushed atomically every few points."""
+
+    def __init__(self, path: str, ttl_seconds: float):
+        self.path = path
+        self._lock = threading.Lock()
+        self._points: Dict[str, List[Optional[float]]] = {}
+        self._unsaved = 0
+        try:
+            if os.path.exists(path) and time.time() - os.path.getmtime(path) < ttl_seconds:
+                with open(path, "r", encoding="utf-8") as fh:
+                    self._points = json.load(fh).get("points", {})
+        except (OSError, ValueError) as exc:
+            logger.warning("Ignoring unreadable Beget pricing checkpoint %s: %s", path, exc)
+            self._points = {}
+
+    @staticmethod
+    def _key(point: Tuple[int, int, int]) -> str:
+        return ":".join(str(v) for v in point)
+
+    def get(self, point: Tuple[int, int, int]) -> Optional[Tuple[Optional[float], Optional[float]]]:
+        value = self._points.get(self._key(point))
+        return tuple(value) if value is not None else None
+
+    def add(self, point: Tuple[int, int, int], price: Tuple[Optional[float], Optional[float]]) -> None:
+        with self._lock:
+            self._points[self._key(point)] = list(price)
+            self._unsaved += 1
+            if self._unsaved >= BegetPricingClient.PROGRESS_FLUSH_EVERY:
+                self._flush()
+
+    def _flush(self) -> None:
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as fh:
+                json.dump({"saved_at": datetime.utcnow().isoformat(), "points": self._points}, fh)
+            os.replace(tmp_path, self.path)
+            self._unsaved = 0
+        except OSError as exc:
+            logger.warning("Failed to write Beget pricing checkpoint %s: %s", self.path, exc)
+
+    def finish(self, complete: bool) -> None:
+        """Drop the checkpoint once the grid is done; keep it so a rerun retries missing points."""
+        with self._lock:
+            if complete:
+                try:
+                    if os.path.exists(self.path):
+                        os.remove(self.path)
+                except OSError:
+                    pass
+            elif self._unsaved:
+                self._flush()
+
+
 class BegetProviderPlugin(ProviderPlugin):
     """Beget provider plugin implementation"""
 
@@ -523,11 +799,7 @@ class BegetProviderPlugin(ProviderPlugin):
         memory_statistics = {}
         if vps_servers_for_stats:
             try:
-                self.logger.info("Collecting CPU statistics for VPS servers...")
-                cpu_statistics = self.client.get_all_vps_cpu_statistics(vps_servers_for_stats, period='MONTH')
-                
-                self.logger.info("Collecting memory statistics for VPS servers...")
-                memory_statistics = self.client.get_all_vps_memory_statistics(vps_servers_for_stats, period='MONTH')
+                cpu_statistics, memory_statistics = self._collect_vps_statistics(vps_servers_for_stats)
                 
                 self.logger.info(f"CPU statistics collected for {cpu_statistics.get('vps_with_cpu_data', 0)} VPS servers")
                 self.logger.info(f"Memory statistics collected for {memory_statistics.get('vps_with_memory_data', 0)} VPS servers")
@@ -578,6 +850,81 @@ class BegetProviderPlugin(ProviderPlugin):
         self.logger.info(f"Unified {len(unified_resources)} paid resources")
         return unified_resources, cpu_statistics, memory_statistics, s3_statistics
 
+    def _collect_vps_statistics(self, vps_servers: List[Dict]) -> Tuple[Dict, Dict]:
+        """
+        Collect VPS CPU/memory statistics incrementally into the metrics store
+        
+        VPS that already have a resource row only request points after their
+        newest stored point (Beget has no start-time parameter, so this picks
+        the smallest HOUR/DAY/WEEK/MONTH period covering the gap). New points
+        are merged into `resource_metrics` and their statistics recomputed over
+        the stored 30-day history. VPS are fetched on a bounded thread pool.
+        """
+        from app.core.models.resource import Resource
+        from app.core.services.metrics_service import MetricsService
+
+        vps_ids = [vps['id'] for vps in vps_servers if vps.get('id')]
+        stored = dict(
+            Resource.query.with_entities(Resource.resource_id, Resource.id).filter(
+                Resource.provider_id == self.provider_id,
+                Resource.resource_id.in_(vps_ids)
+            ).all()
+        ) if vps_ids else {}
+        cpu_latest = MetricsService.latest_timestamps(stored.values(), 'cpu_usage')
+        memory_latest = MetricsService.latest_timestamps(stored.values(), 'memory_usage')
+        cpu_since = {vps_id: cpu_latest[rid] for vps_id, rid in stored.items() if rid in cpu_latest}
+        memory_since = {vps_id: memory_latest[rid] for vps_id, rid in stored.items() if rid in memory_latest}
+
+        max_workers = self._performance_stats_workers()
+        self.logger.info(f"Collecting CPU statistics for VPS servers ({len(cpu_since)} incremental)...")
+        cpu_statistics = self.client.get_all_vps_cpu_statistics(
+            vps_servers, period='MONTH', since=cpu_since, max_workers=max_workers)
+        self.logger.info(f"Collecting memory statistics for VPS servers ({len(memory_since)} incremental)...")
+        memory_statistics = self.client.get_all_vps_memory_statistics(
+            vps_servers, period='MONTH', since=memory_since, max_workers=max_workers)
+
+        if stored:
+            names = {vps['id']: vps.get('name', 'Unknown') for vps in vps_servers if vps.get('id')}
+            since = datetime.utcnow() - timedelta(days=30)
+            for metric_name, unit, statistics, key, count_key, process in (
+                ('cpu_usage', '%', cpu_statistics, 'cpu_statistics', 'vps_with_cpu_data',
+                 self.client._process_cpu_statistics_data),
+                ('memory_usage', 'MB', memory_statistics, 'memory_statistics', 'vps_with_memory_data',
+                 self.client._process_memory_statistics_data),
+            ):
+                by_vps = statistics.setdefault(key, {})
+                MetricsService.ingest({
+                    rid: (by_vps.get(vps_id, {}).get(key) or {}).get('points', [])
+                    for vps_id, rid in stored.items()
+                }, metric_name, unit)
+                history = MetricsService.series(stored.values(), metric_name, since)
+                for vps_id, rid in stored.items():
+                    points = history.get(rid)
+                    if not points:
+                        continue
+                    # Same statistics as a MONTH fetch, computed from the stored history
+                    processed = process({
+                        'date': [ts.isoformat() for ts, _ in points],
+                        'value': [value for _, value in points]
+                    }, vps_id, 'MONTH')
+                    if processed:
+                        # Chart series come from the metrics store
+                        processed.pop('raw_data', None)
+                        processed.pop('points', None)
+                        by_vps.setdefault(vps_id, {'vps_name': names.get(vps_id, 'Unknown')})[key] = processed
+                statistics[count_key] = len(by_vps)
+
+        return cpu_statistics, memory_statistics
+
+    @staticmethod
+    def _performance_stats_workers() -> int:
+        """VPS fetched concurrently for statistics (1 outside an app context)"""
+        try:
+            from flask import current_app
+            return int(current_app.config.get('PERFORMANCE_STATS_MAX_WORKERS', 6))
+        except Exception:
+            return 1
+
     def _validate_costs_against_billing(self, total_calculated_cost: float, account_billing: Dict) -> Dict[str, Any]:
         """Phase 4: Validate calculated costs against account billing"""
         validation = {
@@ -620,6 +967,9 @@ class BegetProviderPlugin(ProviderPlugin):
                     if vps_id in cpu_stats_data:
                         cpu_data = cpu_stats_data[vps_id].get('cpu_statistics', {})
                         if cpu_data:
+                            if cpu_data.get('raw_data'):
+                                # Only VPS without stored history chart from tags
+                                resource.tags['cpu_raw_data'] = json.dumps(cpu_data['raw_data'])
                             resource.tags.update({
                                 'cpu_avg_usage': str(cpu_data.get('avg_cpu_usage', 0)),
                                 'cpu_max_usage': str(cpu_data.get('max_cpu_usage', 0)),
@@ -627,14 +977,15 @@ class BegetProviderPlugin(ProviderPlugin):
                                 'cpu_trend': str(cpu_data.get('trend', 0)),
                                 'cpu_performance_tier': cpu_data.get('performance_tier', 'unknown'),
                                 'cpu_data_points': str(cpu_data.get('data_points', 0)),
-                                'cpu_timestamp': cpu_data.get('timestamp', ''),
-                                'cpu_raw_data': json.dumps(cpu_data.get('raw_data', {}))
+                                'cpu_timestamp': cpu_data.get('timestamp', '')
                             })
                     
                     # Attach memory statistics
                     if vps_id in memory_stats_data:
                         memory_data = memory_stats_data[vps_id].get('memory_statistics', {})
                         if memory_data:
+                            if memory_data.get('raw_data'):
+                                resource.tags['memory_raw_data'] = json.dumps(memory_data['raw_data'])
                             resource.tags.update({
                                 'memory_avg_usage_mb': str(memory_data.get('avg_memory_usage_mb', 0)),
                                 'memory_max_usage_mb': str(memory_data.get('max_memory_usage_mb', 0)),
@@ -643,8 +994,7 @@ class BegetProviderPlugin(ProviderPlugin):
                                 'memory_trend': str(memory_data.get('trend', 0)),
                                 'memory_tier': memory_data.get('memory_tier', 'unknown'),
                                 'memory_data_points': str(memory_data.get('data_points', 0)),
-                                'memory_timestamp': memory_data.get('timestamp', ''),
-                                'memory_raw_data': json.dumps(memory_data.get('raw_data', {}))
+                                'memory_timestamp': memory_data.get('timestamp', '')
                             })
                             
             self.logger.info(f"Attached performance statistics to {len(unified_resources)} resources")
@@ -1020,7 +1370,7 @@ class BegetProviderPlugin(ProviderPlugin):
                 except Exception as auth_error:
                     self.logger.warning("Beget pricing authentication failed: %s", auth_error)
 
-            pricing_client = BegetPricingClient(access_token)
+            pricing_client = BegetPricingClient(access_token, **self._pricing_client_options())
             configurator_pricing = pricing_client.collect_vps_prices()
             pricing_data.extend(configurator_pricing)
 
@@ -1056,6 +1406,22 @@ class BegetProviderPlugin(ProviderPlugin):
             self.logger.error(f"Failed to get Beget pricing data: {e}")
             return []
 
+    @staticmethod
+    def _pricing_client_options() -> Dict[str, Any]:
+        """Configurator crawl settings from app config (defaults when outside an app context)."""
+        try:
+            from flask import current_app
+            cfg = current_app.config
+        except Exception:
+            return {}
+        return {
+            'max_workers': cfg.get('BEGET_PRICING_MAX_WORKERS'),
+            'requests_per_second': cfg.get('BEGET_PRICING_REQUESTS_PER_SECOND'),
+            'max_retries': cfg.get('BEGET_PRICING_MAX_RETRIES'),
+            'progress_dir': cfg.get('BEGET_PRICING_PROGRESS_DIR') or None,
+            'infer_linear_model': bool(cfg.get('BEGET_PRICING_INFER_MODEL', False)),
+        }
+
     def _create_vps_pricing_record(self, plan_data: Dict[str, Any]) -> Dict[str, Any]:
         """Create standardized pricing record from VPS plan data"""
         try:
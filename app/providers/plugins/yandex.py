@@ -160,7 +160,6 @@ class YandexProviderPlugin(ProviderPlugin):
         try:
             from ..yandex.client import YandexClient
             import time
-            import requests
             
             self.logger.info("Starting complete Yandex Cloud pricing sync...")
             
@@ -204,8 +203,6 @@ class YandexProviderPlugin(ProviderPlugin):
             start_time = time.time()
             timeout_seconds = 20 * 60  # 20 minutes
             
-            headers = client._get_headers()
-            
             for i, sku_id in enumerate(all_sku_ids):
                 # Check timeout
                 elapsed = time.time() - start_time
@@ -216,7 +213,7 @@ class YandexProviderPlugin(ProviderPlugin):
                 try:
                     # Fetch individual SKU details
                     url = f'{client.billing_url}/skus/{sku_id}'
-                    response = requests.get(url, headers=headers, timeout=10)
+                    response = client._request('GET', url, timeout=10)
                     
                     if response.status_code == 200:
                         sku_data = response.json()
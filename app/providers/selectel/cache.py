@@ -0,0 +1,119 @@
+"""
+Selectel client caches - compute flavors per region and project-scoped Keystone tokens
+"""
+import hashlib
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+
+class SelectelClientCache:
+    """Process-wide caches shared by SelectelClient instances.
+
+    Flavor lists are kept per (compute endpoint, project) for `flavor_ttl`
+    seconds. Project-scoped tokens are kept per (service user, project) until
+    `token_margin` before their Keystone `expires_at`; the key includes a hash
+    of the password, so only clients holding the same credentials reuse a
+    token. Concurrent misses for one key wait for a single fetch instead of
+    each calling the API.
+    """
+
+    def __init__(self, flavor_ttl: Optional[int] = None, token_margin: Optional[int] = None) -> None:
+        self._flavor_ttl = flavor_ttl
+        self._token_margin = token_margin
+        self._flavors: Dict[Tuple[str, Optional[str]], Tuple[float, Dict[str, Dict[str, Any]]]] = {}
+        self._tokens: Dict[Tuple[str, str], Tuple[str, datetime]] = {}
+        self._lock = threading.Lock()
+        self._key_locks: Dict[Hashable, threading.Lock] = {}
+
+    @staticmethod
+    def _config(name: str, default: int) -> int:
+        try:
+            from flask import current_app
+            return int(current_app.config.get(name, default))
+        except Exception:
+            return default
+
+    @property
+    def flavor_ttl(self) -> int:
+        if self._flavor_ttl is not None:
+            return self._flavor_ttl
+        return self._config('SELECTEL_FLAVOR_CACHE_TTL_SECONDS', 3600)
+
+    @property
+    def token_margin(self) -> timedelta:
+        seconds = self._token_margin if self._token_margin is not None else self._config('SELECTEL_TOKEN_REFRESH_MARGIN_SECONDS', 300)
+        return timedelta(seconds=seconds)
+
+    def _key_lock(self, key: Hashable) -> threading.Lock:
+        with self._lock:
+            return self._key_locks.setdefault(key, threading.Lock())
+
+    # ---- Flavors ----
+    def flavors(self, endpoint: str, project_id: Optional[str],
+                fetch: Callable[[], Dict[str, Dict[str, Any]]]) -> Tuple[Dict[str, Dict[str, Any]], bool]:
+        """(flavor id -> flavor, fetched) for an endpoint/project, calling `fetch` when missing or expired"""
+        key = (endpoint, project_id)
+        entry = self._flavors.get(key)
+        if entry is not None and entry[0] > time.monotonic():
+            return entry[1], False
+        with self._key_lock(('flavors',) + key):
+            entry = self._flavors.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                return entry[1], False
+            flavors = fetch()
+            self._flavors[key] = (time.monotonic() + self.flavor_ttl, flavors)
+            return flavors, True
+
+    def add_flavor(self, endpoint: str, project_id: Optional[str], flavor: Dict[str, Any]) -> None:
+        """Remember a flavor fetched individually (e.g. private flavors missing from the list)"""
+        entry = self._flavors.get((endpoint, project_id))
+        if entry is not None and flavor.get('id'):
+            entry[1][flavor['id']] = flavor
+
+    # ---- Project-scoped tokens ----
+    @staticmethod
+    def token_identity(username: str, domain: str, password: Optional[str]) -> str:
+        secret = hashlib.sha256((password or '').encode('utf-8')).hexdigest()
+        return f"{domain}/{username}/{secret}"
+
+    def token(self, identity: str, project_id: str,
+              issue: Callable[[], Tuple[str, Optional[datetime]]]) -> Tuple[str, bool]:
+        """(token, issued) for a project, calling `issue` unless a token valid past the margin is cached"""
+        key = (identity, project_id)
+        cached = self._valid_token(key)
+        if cached:
+            return cached, False
+        with self._key_lock(('token',) + key):
+            cached = self._valid_token(key)
+            if cached:
+                return cached, False
+            token, expires_at = issue()
+            if expires_at is not None:
+                self._tokens[key] = (token, expires_at)
+            return token, True
+
+    def _valid_token(self, key: Tuple[str, str]) -> Optional[str]:
+        entry = self._tokens.get(key)
+        if entry is None:
+            return None
+        token, expires_at = entry
+        if expires_at - self.token_margin <= datetime.now(timezone.utc):
+            self._tokens.pop(key, None)
+            return None
+        return token
+
+    def invalidate_token(self, identity: str, project_id: str) -> None:
+        self._tokens.pop((identity, project_id), None)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'flavor_lists': len(self._flavors),
+            'flavors': sum(len(entry[1]) for entry in list(self._flavors.values())),
+            'tokens': len(self._tokens),
+        }
+
+
+# Global cache shared by all Selectel clients in this process
+selectel_cache = SelectelClientCache()
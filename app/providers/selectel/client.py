@@ -5,9 +5,12 @@ import requests
 import json
 import logging
 import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Optional, Any
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 # from app.providers.base.provider_base import BaseProvider
+from app.providers.selectel.cache import selectel_cache
 
 logger = logging.getLogger(__name__)
 
@@ -68,6 +71,19 @@ class SelectelClient:
         self._jwt_token = None
         self._service_catalog = None
         self._discovered_regions = False
+        # Flavors and project-scoped tokens are shared across clients in this process;
+        # the counters below cover this client only (reported in the sync summary)
+        self.cache = selectel_cache
+        self._cache_counters = {
+            'flavor_hits': 0,
+            'flavor_misses': 0,
+            'flavor_list_requests': 0,
+            'flavor_single_requests': 0,
+            'token_hits': 0,
+            'token_requests': 0,
+        }
+        self._counters_lock = threading.Lock()
+        self._token_identity = None
     
     def _get_iam_token(self) -> str:
         """
@@ -290,7 +306,10 @@ class SelectelClient:
     
     def _get_project_scoped_token(self, project_id: str) -> str:
         """
-        Generate an IAM token scoped to a specific project
+        Get an IAM token scoped to a specific project
+        
+        Tokens are cached per service user and project until shortly before they
+        expire, so stats collection and per-project listings reuse one token.
         
         Args:
             project_id: The project ID to scope the token to
@@ -313,51 +332,95 @@ class SelectelClient:
                 username = account_data.get('name', '478587')
                 account_id = account_data.get('name', '478587')
             
-            # Get IAM token scoped to the specific project
-            auth_url = 'https://cloud.api.selcloud.ru/identity/v3/auth/tokens'
-            auth_data = {
-                "auth": {
-                    "identity": {
-                        "methods": ["password"],
-                        "password": {
-                            "user": {
-                                "name": username,
-                                "domain": {
-                                    "name": account_id
-                                },
-                                "password": self.service_password if self.service_password else self.api_key
-                            }
-                        }
-                    },
-                    "scope": {
-                        "project": {
-                            "id": project_id,
+            password = self.service_password if self.service_password else self.api_key
+            identity = self._token_identity = self.cache.token_identity(username, account_id, password)
+            token, issued = self.cache.token(
+                identity, project_id,
+                lambda: self._issue_project_scoped_token(project_id, username, account_id, password)
+            )
+            self._count('token_requests' if issued else 'token_hits')
+            return token
+                
+        except Exception as e:
+            raise Exception(f"Project-scoped token generation failed for project {project_id}: {str(e)}")
+    
+    def _issue_project_scoped_token(self, project_id: str, username: str, account_id: str, password: str) -> tuple:
+        """Request a project-scoped token from Keystone; returns (token, expires_at or None)"""
+        auth_url = 'https://cloud.api.selcloud.ru/identity/v3/auth/tokens'
+        auth_data = {
+            "auth": {
+                "identity": {
+                    "methods": ["password"],
+                    "password": {
+                        "user": {
+                            "name": username,
                             "domain": {
                                 "name": account_id
-                            }
+                            },
+                            "password": password
+                        }
+                    }
+                },
+                "scope": {
+                    "project": {
+                        "id": project_id,
+                        "domain": {
+                            "name": account_id
                         }
                     }
                 }
             }
-            
-            headers = {
-                'Content-Type': 'application/json',
-                'Accept': 'application/json'
-            }
-            
-            response = requests.post(auth_url, json=auth_data, headers=headers, timeout=90)
-            
-            if response.status_code == 201:
-                subject_token = response.headers.get('X-Subject-Token')
-                if subject_token:
-                    return subject_token
-                else:
-                    raise Exception("No X-Subject-Token header in response")
-            else:
-                raise Exception(f"IAM token generation failed ({response.status_code}): {response.text[:200]}")
-                
+        }
+        
+        headers = {
+            'Content-Type': 'application/json',
+            'Accept': 'application/json'
+        }
+        
+        response = requests.post(auth_url, json=auth_data, headers=headers, timeout=90)
+        
+        if response.status_code != 201:
+            raise Exception(f"IAM token generation failed ({response.status_code}): {response.text[:200]}")
+        subject_token = response.headers.get('X-Subject-Token')
+        if not subject_token:
+            raise Exception("No X-Subject-Token header in response")
+        
+        expires_at = None
+        try:
+            raw_expires = response.json().get('token', {}).get('expires_at')
+            if raw_expires:
+                expires_at = datetime.fromisoformat(raw_expires.replace('Z', '+00:00'))
+                if expires_at.tzinfo is None:
+                    expires_at = expires_at.replace(tzinfo=timezone.utc)
         except Exception as e:
-            raise Exception(f"Project-scoped token generation failed for project {project_id}: {str(e)}")
+            # Token still usable, just not cached
+            logger.debug(f"Could not read expires_at of project {project_id} token: {e}")
+        return subject_token, expires_at
+    
+    def _forget_project_token(self, response: requests.Response, project_id: Optional[str]) -> None:
+        """Drop a cached project token that the API rejected (revoked before its expiry)"""
+        if project_id and response.status_code == 401 and self._token_identity:
+            self.cache.invalidate_token(self._token_identity, project_id)
+    
+    def _count(self, counter: str, amount: int = 1) -> None:
+        with self._counters_lock:
+            self._cache_counters[counter] += amount
+    
+    def cache_stats(self) -> Dict[str, int]:
+        """Flavor and token cache counters of this client"""
+        with self._counters_lock:
+            return dict(self._cache_counters)
+    
+    def _get_flavors(self, base_url: str, headers: Dict[str, str], project_id: Optional[str]) -> Dict[str, Dict[str, Any]]:
+        """All flavors visible to the project at this compute endpoint (one flavors/detail call per TTL)"""
+        def fetch():
+            self._count('flavor_list_requests')
+            response = requests.get(f'{base_url}/compute/v2.1/flavors/detail', headers=headers, timeout=90)
+            response.raise_for_status()
+            return {flavor['id']: flavor for flavor in response.json().get('flavors', []) if flavor.get('id')}
+        
+        flavors, _ = self.cache.flavors(base_url, project_id, fetch)
+        return flavors
     
     def get_openstack_servers(self, region: str = None, project_id: str = None) -> List[Dict[str, Any]]:
         """
@@ -394,6 +457,7 @@ class SelectelClient:
             
             logger.debug(f"Fetching servers from: {servers_url} (project: {project_id or 'default'})")
             response = requests.get(servers_url, headers=headers, timeout=90)
+            self._forget_project_token(response, project_id)
             response.raise_for_status()
             
             data = response.json()
@@ -401,6 +465,14 @@ class SelectelClient:
             
             logger.info(f"Found {len(servers)} servers in region {region} for project {project_id or 'default'}")
             
+            # Flavor details come from one cached flavors/detail list per endpoint and project
+            flavors = {}
+            if any(server.get('flavor', {}).get('id') for server in servers):
+                try:
+                    flavors = self._get_flavors(base_url, headers, project_id)
+                except Exception as e:
+                    logger.debug(f"Failed to list flavors at {base_url}: {e}")
+            
             # Enrich each server with flavor details
             for server in servers:
                 if region and 'region' not in server:
@@ -413,12 +485,20 @@ class SelectelClient:
                 # Get flavor details if flavor ID is present
                 flavor_id = server.get('flavor', {}).get('id')
                 if flavor_id:
+                    if flavor_id in flavors:
+                        self._count('flavor_hits')
+                        server['flavor'] = flavors[flavor_id]
+                        continue
+                    # Not in the list (e.g. private or deleted flavor): fetch it alone
+                    self._count('flavor_misses')
                     try:
+                        self._count('flavor_single_requests')
                         flavor_url = f'{base_url}/compute/v2.1/flavors/{flavor_id}'
                         flavor_response = requests.get(flavor_url, headers=headers, timeout=90)
                         if flavor_response.status_code == 200:
                             flavor_data = flavor_response.json().get('flavor', {})
                             server['flavor'] = flavor_data
+                            self.cache.add_flavor(base_url, project_id, flavor_data)
                     except Exception as e:
                         logger.debug(f"Failed to get flavor {flavor_id} for server {server.get('id')}: {e}")
             
@@ -457,6 +537,7 @@ class SelectelClient:
                 volumes_url = f'{base_url}/volume/v3/volumes/detail'
             
             response = requests.get(volumes_url, headers=headers, timeout=90)
+            self._forget_project_token(response, project_id)
             response.raise_for_status()
             
             data = response.json()
@@ -565,7 +646,25 @@ class SelectelClient:
         except Exception as e:
             raise Exception(f"Failed to get OpenStack ports from {region or 'default region'}: {str(e)}")
     
-    def get_server_cpu_statistics(self, server_id: str, hours: int = 24 * 30, region: str = None, project_id: str = None) -> Dict[str, Any]:
+    @staticmethod
+    def _metrics_window(hours: int, since: Optional[datetime]) -> tuple:
+        """(start, stop) in naive UTC: the last `hours`, or only what follows `since`"""
+        stop_time = datetime.utcnow()
+        start_time = stop_time - timedelta(hours=hours)
+        if since and since > start_time:
+            start_time = since
+        return start_time, stop_time
+    
+    @staticmethod
+    def _parse_measure_time(timestamp: str) -> datetime:
+        """Gnocchi measure timestamp ('2025-10-24T10:00:00+00:00') as naive UTC"""
+        parsed = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
+        if parsed.tzinfo is not None:
+            parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+        return parsed
+    
+    def get_server_cpu_statistics(self, server_id: str, hours: int = 24 * 30, region: str = None, project_id: str = None,
+                                  since: datetime = None) -> Dict[str, Any]:
         """
         Get CPU usage statistics for a server
         
@@ -573,6 +672,7 @@ class SelectelClient:
             server_id: Server UUID
             hours: Number of hours of historical data (default: 1)
             project_id: Project ID for token scoping (critical - VM must be in this project)
+            since: Only request points after this moment (naive UTC high-water mark)
             
         Returns:
             Dict containing CPU statistics in Beget-compatible format:
@@ -582,10 +682,9 @@ class SelectelClient:
             - trend: CPU usage variance
             - performance_tier: low/medium/high
             - data_points: Number of data points
+            - points: [(timestamp, value)] raw points (naive UTC) for the metrics store
         """
         try:
-            from datetime import datetime, timedelta
-            
             # Get IAM token scoped to the VM's project (critical for metrics access)
             if project_id:
                 iam_token = self._get_project_scoped_token(project_id)
@@ -593,8 +692,7 @@ class SelectelClient:
                 iam_token = self._get_iam_token()
             
             # Set time range
-            stop_time = datetime.utcnow()
-            start_time = stop_time - timedelta(hours=hours)
+            start_time, stop_time = self._metrics_window(hours, since)
             
             start_iso = start_time.strftime('%Y-%m-%dT%H:%M:%S.000Z')
             stop_iso = stop_time.strftime('%Y-%m-%dT%H:%M:%S.000Z')
@@ -619,6 +717,7 @@ class SelectelClient:
             }
             
             response = requests.post(url, json=body, headers=headers, timeout=90)
+            self._forget_project_token(response, project_id)
             response.raise_for_status()
             
             data = response.json()
@@ -631,6 +730,7 @@ class SelectelClient:
                 # Aggregate 5-minute data into daily points for UI display
                 from collections import defaultdict
                 daily_data = defaultdict(list)
+                points = []
                 
                 for point in data_points:
                     if point[2] is not None:
@@ -638,6 +738,7 @@ class SelectelClient:
                         timestamp = point[0]  # ISO string like "2025-10-24T10:00:00+00:00"
                         date = timestamp[:10]  # Extract YYYY-MM-DD
                         daily_data[date].append(point[2])
+                        points.append((self._parse_measure_time(timestamp), float(point[2])))
                 
                 if daily_data:
                     # Calculate overall statistics
@@ -675,7 +776,8 @@ class SelectelClient:
                         'daily_data_points': len(daily_points),
                         'period': 'DAY',
                         'collection_timestamp': datetime.utcnow().isoformat(),
-                        'daily_aggregated': daily_points  # For chart display
+                        'daily_aggregated': daily_points,  # For chart display
+                        'points': points
                     }
             
             return {}
@@ -683,7 +785,8 @@ class SelectelClient:
         except Exception as e:
             raise Exception(f"Failed to get CPU statistics for server {server_id}: {str(e)}")
     
-    def get_server_memory_statistics(self, server_id: str, ram_mb: int, hours: int = 24 * 30, region: str = None, project_id: str = None) -> Dict[str, Any]:
+    def get_server_memory_statistics(self, server_id: str, ram_mb: int, hours: int = 24 * 30, region: str = None, project_id: str = None,
+                                     since: datetime = None) -> Dict[str, Any]:
         """
         Get memory usage statistics for a server
         
@@ -691,6 +794,7 @@ class SelectelClient:
             server_id: Server UUID
             ram_mb: Total RAM in MB (for percentage calculation)
             hours: Number of hours of historical data (default: 1)
+            since: Only request points after this moment (naive UTC high-water mark)
             
         Returns:
             Dict containing memory statistics in Beget-compatible format:
@@ -701,10 +805,9 @@ class SelectelClient:
             - trend: Memory usage variance
             - memory_tier: low/medium/high
             - data_points: Number of data points
+            - points: [(timestamp, value_mb)] raw points (naive UTC) for the metrics store
         """
         try:
-            from datetime import datetime, timedelta
-            
             # Get IAM token scoped to the VM's project (critical for metrics access)
             if project_id:
                 iam_token = self._get_project_scoped_token(project_id)
@@ -712,8 +815,7 @@ class SelectelClient:
                 iam_token = self._get_iam_token()
             
             # Set time range
-            stop_time = datetime.utcnow()
-            start_time = stop_time - timedelta(hours=hours)
+            start_time, stop_time = self._metrics_window(hours, since)
             
             start_iso = start_time.strftime('%Y-%m-%dT%H:%M:%S.000Z')
             stop_iso = stop_time.strftime('%Y-%m-%dT%H:%M:%S.000Z')
@@ -737,6 +839,7 @@ class SelectelClient:
             }
             
             response = requests.post(url, json=body, headers=headers, timeout=90)
+            self._forget_project_token(response, project_id)
             response.raise_for_status()
             
             data = response.json()
@@ -751,12 +854,14 @@ class SelectelClient:
                     # Aggregate 5-minute data into daily points
                     from collections import defaultdict
                     daily_data = defaultdict(list)
+                    points = []
                     
                     for point in data_points:
                         if point[2] is not None:
                             timestamp = point[0]
                             date = timestamp[:10]
                             daily_data[date].append(point[2])
+                            points.append((self._parse_measure_time(timestamp), float(point[2])))
                     
                     if daily_data:
                         # Calculate overall statistics
@@ -796,7 +901,8 @@ class SelectelClient:
                             'daily_data_points': len(daily_points),
                             'period': 'DAY',
                             'collection_timestamp': datetime.utcnow().isoformat(),
-                            'daily_aggregated': daily_points  # For chart display
+                            'daily_aggregated': daily_points,  # For chart display
+                            'points': points
                         }
             
             return {}
@@ -1113,12 +1219,15 @@ class SelectelClient:
             traceback.print_exc()
             return {}
     
-    def get_all_server_statistics(self, servers: List[Dict[str, Any]]) -> Dict[str, Any]:
+    def get_all_server_statistics(self, servers: List[Dict[str, Any]], max_workers: int = 1) -> Dict[str, Any]:
         """
         Get CPU and memory statistics for all servers
         
         Args:
-            servers: List of server dictionaries from get_combined_vm_resources()
+            servers: List of server dictionaries from get_combined_vm_resources();
+                optional 'cpu_since' / 'memory_since' (naive UTC) limit each
+                metric to points after the previous collection
+            max_workers: Servers collected concurrently
             
         Returns:
             Dict mapping server_id to statistics:
@@ -1130,46 +1239,59 @@ class SelectelClient:
                 }
             }
         """
-        all_statistics = {}
+        servers = [server for server in servers if server.get('id')]
+        if not servers:
+            return {}
         
-        for server in servers:
-            server_id = server.get('id')
-            server_name = server.get('name', 'Unknown')
-            ram_mb = server.get('ram_mb', 1024)
-            server_region = server.get('region', 'ru-3')  # Use VM's actual region
-            server_project_id = server.get('project_id')  # Get VM's project ID for token scoping
-            
-            # Convert availability zone (ru-3b) to region (ru-3) if needed
-            if server_region and len(server_region) > 2:
-                if server_region[-1].isalpha() and server_region[-2].isdigit():
-                    server_region = server_region[:-1]
-            
-            try:
-                logger.info(f"Collecting statistics for {server_name} (ID: {server_id[:20]}...) in region {server_region}, project {server_project_id[:20] if server_project_id else 'default'}...")
-                
-                # Get CPU statistics (pass project_id for correct token scoping)
-                cpu_stats = self.get_server_cpu_statistics(server_id, hours=24*30, region=server_region, project_id=server_project_id)
-                
-                # Get memory statistics (pass project_id for correct token scoping)
-                memory_stats = self.get_server_memory_statistics(server_id, ram_mb, hours=24*30, region=server_region, project_id=server_project_id)
-                
-                all_statistics[server_id] = {
-                    'server_name': server_name,
-                    'cpu_statistics': cpu_stats,
-                    'memory_statistics': memory_stats,
-                    'collection_timestamp': datetime.utcnow().isoformat()
-                }
-                
-            except Exception as e:
-                # Log error but continue with other servers
-                all_statistics[server_id] = {
-                    'server_name': server_name,
-                    'error': str(e),
-                    'cpu_statistics': {},
-                    'memory_statistics': {}
-                }
+        workers = max(1, min(int(max_workers or 1), len(servers)))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='selectel-stats') as pool:
+            results = list(pool.map(self._collect_server_statistics, servers))
+        
+        return {server['id']: stats for server, stats in zip(servers, results)}
+    
+    def _collect_server_statistics(self, server: Dict[str, Any]) -> Dict[str, Any]:
+        """CPU and memory statistics of one server (errors are returned, not raised)"""
+        server_id = server.get('id')
+        server_name = server.get('name', 'Unknown')
+        ram_mb = server.get('ram_mb', 1024)
+        server_region = server.get('region', 'ru-3')  # Use VM's actual region
+        server_project_id = server.get('project_id')  # Get VM's project ID for token scoping
+        
+        # Convert availability zone (ru-3b) to region (ru-3) if needed
+        if server_region and len(server_region) > 2:
+            if server_region[-1].isalpha() and server_region[-2].isdigit():
+                server_region = server_region[:-1]
         
-        return all_statistics
+        try:
+            logger.info(f"Collecting statistics for {server_name} (ID: {server_id[:20]}...) in region {server_region}, project {server_project_id[:20] if server_project_id else 'default'}...")
+            
+            # Get CPU statistics (pass project_id for correct token scoping)
+            cpu_stats = self.get_server_cpu_statistics(
+                server_id, hours=24*30, region=server_region, project_id=server_project_id,
+                since=server.get('cpu_since')
+            )
+            
+            # Get memory statistics (pass project_id for correct token scoping)
+            memory_stats = self.get_server_memory_statistics(
+                server_id, ram_mb, hours=24*30, region=server_region, project_id=server_project_id,
+                since=server.get('memory_since')
+            )
+            
+            return {
+                'server_name': server_name,
+                'cpu_statistics': cpu_stats,
+                'memory_statistics': memory_stats,
+                'collection_timestamp': datetime.utcnow().isoformat()
+            }
+            
+        except Exception as e:
+            # Log error but continue with other servers
+            return {
+                'server_name': server_name,
+                'error': str(e),
+                'cpu_statistics': {},
+                'memory_statistics': {}
+            }
     
     def get_combined_vm_resources(self) -> List[Dict[str, Any]]:
         """
@@ -0,0 +1,170 @@
+"""
+OpenStack inventory index for Selectel syncs
+"""
+import logging
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from app.providers.selectel.client import SelectelClient
+
+# (kind, project_id, region); ports are listed per region only (project_id is None)
+FetchKey = Tuple[str, Optional[str], Optional[str]]
+
+
+def openstack_region(zone: Optional[str]) -> Optional[str]:
+    """Billing availability zone (ru-7b) -> OpenStack region (ru-7)"""
+    if zone and len(zone) > 2 and zone[-1].isalpha() and zone[-2].isdigit():
+        return zone[:-1]
+    return zone
+
+
+class SelectelInventory:
+    """
+    Servers, volumes, shares and ports of an account, indexed by id
+
+    Each (project, region) listing is fetched at most once per sync, so resolving
+    a billed resource is a dict lookup instead of a listing per resource. Listings
+    requested together are fetched concurrently. A server that is not at its
+    billing location triggers one search across every project and region for the
+    whole sync (not one per missing server); shares fall back to the account's
+    first project in every region, as before.
+    """
+
+    FETCHERS = {
+        'servers': lambda client, project_id, region: client.get_openstack_servers(region=region, project_id=project_id),
+        'volumes': lambda client, project_id, region: client.get_openstack_volumes(project_id, region=region),
+        'shares': lambda client, project_id, region: client.get_openstack_shares(project_id, region=region),
+        'ports': lambda client, project_id, region: client.get_openstack_ports(region=region),
+    }
+
+    def __init__(self, client: SelectelClient, max_workers: int = 6):
+        self.client = client
+        self.max_workers = max(1, int(max_workers or 1))
+        self.servers: Dict[str, Dict[str, Any]] = {}
+        self.volumes: Dict[str, Dict[str, Any]] = {}
+        self.shares: Dict[str, Dict[str, Any]] = {}
+        self.ports_by_server: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        self._fetched = set()
+        self._searched_everywhere = set()
+        self._project_names: Optional[Dict[str, str]] = None
+        self.stats = {'requests': 0, 'failed_requests': 0, 'seconds': 0.0}
+        self.logger = logging.getLogger(f"{__name__}.{self.__class__.__name__}")
+
+    # ---- Loading ----
+    def load(self, keys: Iterable[FetchKey]) -> None:
+        """Fetch the listings not loaded yet, concurrently, and index them"""
+        pending = []
+        for kind, project_id, region in keys:
+            key = (kind, None if kind == 'ports' else project_id, region)
+            if key not in self._fetched:
+                self._fetched.add(key)
+                pending.append(key)
+        if not pending:
+            return
+
+        started = time.perf_counter()
+        workers = min(self.max_workers, len(pending))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='selectel-inventory') as pool:
+            results = list(pool.map(self._fetch, pending))
+        for key, items in zip(pending, results):
+            self.stats['requests'] += 1
+            if items is None:
+                self.stats['failed_requests'] += 1
+                continue
+            self._index(key, items)
+        self.stats['seconds'] += time.perf_counter() - started
+
+    def load_locations(self, kinds: Iterable[str], locations: Iterable[Tuple[Optional[str], Optional[str]]]) -> None:
+        """Load every kind for each (project_id, region)"""
+        locations = list(locations)
+        self.load((kind, project_id, region) for kind in kinds for project_id, region in locations)
+
+    def _fetch(self, key: FetchKey) -> Optional[List[Dict[str, Any]]]:
+        kind, project_id, region = key
+        try:
+            return self.FETCHERS[kind](self.client, project_id, region)
+        except Exception as e:
+            self.logger.debug(f"Failed to list {kind} in project {project_id or 'default'} region {region}: {e}")
+            return None
+
+    def _index(self, key: FetchKey, items: List[Dict[str, Any]]) -> None:
+        kind, project_id, region = key
+        if kind == 'ports':
+            for port in items:
+                device_id = port.get('device_id')
+                if device_id and port.get('device_owner', '').startswith('compute:'):
+                    self.ports_by_server[device_id].append(port)
+            return
+        index = getattr(self, kind)
+        for item in items:
+            if not item.get('id') or item['id'] in index:
+                continue
+            if kind == 'servers':
+                item['project_id'] = project_id
+                item['project_name'] = self.project_names().get(project_id, 'Unknown') if project_id else 'default'
+            index[item['id']] = item
+
+    def project_names(self) -> Dict[str, str]:
+        """Billing project id -> name (one billing request per sync)"""
+        if self._project_names is None:
+            self._project_names = {p['id']: p.get('name') for p in self.client.get_all_projects_from_billing() if p.get('id')}
+        return self._project_names
+
+    def _search_everywhere(self, kind: str, project_ids: List[Optional[str]], regions: List[str]) -> None:
+        if kind in self._searched_everywhere:
+            return
+        self._searched_everywhere.add(kind)
+        self.logger.debug(f"Searching {kind} across {len(project_ids)} projects and {len(regions)} regions")
+        self.load((kind, project_id, region) for project_id in project_ids for region in regions)
+
+    # ---- Lookups ----
+    def find_server(self, server_id: str, project_id: str = None, region: str = None) -> Optional[Dict[str, Any]]:
+        """Server details (with ip_addresses from its ports), searching all locations once on a miss"""
+        if server_id not in self.servers and project_id and region:
+            self.load([('servers', project_id, region)])
+        if server_id not in self.servers:
+            project_ids = list(self.project_names()) or [None]
+            self._search_everywhere('servers', project_ids, self.client.get_available_regions())
+        server = self.servers.get(server_id)
+        if server is None:
+            return None
+
+        if server.get('region'):
+            self.load([('ports', None, server['region'])])
+        if not server.get('ip_addresses'):
+            server['ip_addresses'] = [
+                fixed_ip.get('ip_address')
+                for port in self.ports_by_server.get(server_id, [])
+                for fixed_ip in port.get('fixed_ips', [])
+                if fixed_ip.get('ip_address')
+            ]
+        return server
+
+    def find_volume(self, volume_id: str, project_id: str = None, region: str = None) -> Optional[Dict[str, Any]]:
+        """Volume details; only the billing location is listed (no account-wide search)"""
+        if volume_id not in self.volumes and project_id and region:
+            self.load([('volumes', project_id, region)])
+        return self.volumes.get(volume_id)
+
+    def find_share(self, share_id: str, project_id: str = None, region: str = None) -> Optional[Dict[str, Any]]:
+        """Share details, falling back to the account's first project in every region"""
+        if share_id not in self.shares and project_id and region:
+            self.load([('shares', project_id, region)])
+        if share_id not in self.shares:
+            projects = self.client.get_projects()
+            if projects:
+                self._search_everywhere('shares', [projects[0]['id']], list(self.client.regions.keys()) or ['ru-3'])
+        return self.shares.get(share_id)
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            'servers': len(self.servers),
+            'volumes': len(self.volumes),
+            'shares': len(self.shares),
+            'ports': sum(len(ports) for ports in self.ports_by_server.values()),
+            'requests': self.stats['requests'],
+            'failed_requests': self.stats['failed_requests'],
+            'seconds': round(self.stats['seconds'], 2),
+        }
@@ -2,7 +2,10 @@
 Selectel provider service implementation
 """
 from typing import Dict, List, Any, Optional
+from flask import current_app
 from app.providers.selectel.client import SelectelClient
+from app.providers.selectel.inventory import SelectelInventory, openstack_region
+from app.core.services.metrics_service import MetricsService
 from app.core.models.provider import CloudProvider
 from app.core.models.resource import Resource
 from app.core.models.sync import SyncSnapshot
@@ -33,6 +36,8 @@ class SelectelService:
         credentials_with_account['account_id'] = provider.account_id
         
         self.client = SelectelClient(credentials_with_account)
+        # OpenStack objects indexed once per sync (see _build_inventory)
+        self._inventory = None
     
     def test_connection(self) -> Dict[str, Any]:
         """
@@ -185,6 +190,10 @@ class SelectelService:
             logger.info("PHASE 2: Grouping resources by service type")
             resources_by_type = self._group_by_service_type(billed_resources, sync_snapshot.id)
             
+            # PHASE 2.5: Index OpenStack servers, volumes, shares and ports at the billed locations
+            logger.info("PHASE 2.5: Building OpenStack inventory index")
+            self._build_inventory(resources_by_type)
+            
             synced_resources = []
             orphan_volumes = []
             zombie_resources = []
@@ -248,20 +257,17 @@ class SelectelService:
                 resources_by_type['volume'] = {}
             resources_by_type['volume'].update(orphaned_volumes_from_deleted_vms)
             
-            # PHASE 4: Pre-fetch all volumes from OpenStack (OPTIMIZATION: batch fetch)
-            logger.info("PHASE 4: Pre-fetching volumes from OpenStack for faster processing")
-            volume_cache = self._prefetch_all_volumes(resources_by_type.get('volume', {}))
-            
-            # PHASE 4.5: Process volumes (unify with VMs where possible, using pre-fetched data)
-            logger.info("PHASE 4.5: Processing volumes")
+            # PHASE 4: Process volumes (unify with VMs where possible, resolved from the inventory index)
+            logger.info("PHASE 4: Processing volumes")
             if 'volume' in resources_by_type:
+                # Orphaned volumes may add locations the index has not listed yet
+                self._get_inventory().load_locations(['volumes'], self._billing_locations(resources_by_type['volume']))
                 for resource_id, billing_data in resources_by_type['volume'].items():
                     volume_result = self._process_volume_resource(
                         resource_id,
                         billing_data,
                         unified_vms,
-                        sync_snapshot.id,
-                        volume_cache=volume_cache
+                        sync_snapshot.id
                     )
                     if volume_result:
                         if not volume_result.get('unified_into_vm'):
@@ -315,6 +321,12 @@ class SelectelService:
             active_servers = [vm for vm in unified_vms.values() if vm.status != 'DELETED_BILLED']
             if active_servers and collect_stats:
                 try:
+                    # Only points after the newest stored one are requested (per server and metric)
+                    db.session.flush()
+                    vm_ids = [vm.id for vm in active_servers]
+                    cpu_since = MetricsService.latest_timestamps(vm_ids, 'cpu_usage')
+                    memory_since = MetricsService.latest_timestamps(vm_ids, 'memory_usage')
+                    
                     server_data_list = []
                     for vm in active_servers:
                         metadata = json.loads(vm.provider_config) if vm.provider_config else {}
@@ -325,11 +337,17 @@ class SelectelService:
                             'name': vm.resource_name,
                             'ram_mb': metadata.get('ram_mb', 1024),
                             'region': vm.region,  # Pass VM's actual region for stats API
-                            'project_id': billing_data.get('project_id')  # CRITICAL: Pass project ID for token scoping
+                            'project_id': billing_data.get('project_id'),  # CRITICAL: Pass project ID for token scoping
+                            'cpu_since': cpu_since.get(vm.id),
+                            'memory_since': memory_since.get(vm.id)
                         })
                     
-                    statistics = self.client.get_all_server_statistics(server_data_list)
+                    statistics = self.client.get_all_server_statistics(
+                        server_data_list,
+                        max_workers=current_app.config.get('PERFORMANCE_STATS_MAX_WORKERS', 6)
+                    )
                     if statistics:
+                        self._merge_statistics_history(active_servers, statistics)
                         self._process_server_statistics(sync_snapshot, statistics)
                         logger.info(f"Retrieved statistics for {len(statistics)} servers")
                 except Exception as e:
@@ -360,7 +378,9 @@ class SelectelService:
                 'zombie_daily_cost': round(zombie_cost, 2),
                 'orphan_daily_cost': round(orphan_cost, 2),
                 'service_types': list(resources_by_type.keys()),
-                'billed_resource_count': len(billed_resources)
+                'billed_resource_count': len(billed_resources),
+                'openstack_inventory': self._get_inventory().summary(),
+                'client_cache': self.client.cache_stats()
             })
             sync_snapshot.sync_config = json.dumps(sync_config)
             
@@ -417,6 +437,7 @@ class SelectelService:
             logger.info(f"  - Active: {len(synced_resources) - len(zombie_resources)}")
             logger.info(f"  - Zombies: {len(zombie_resources)} ({zombie_cost:.2f} ₽/day)")
             logger.info(f"  - Orphan volumes: {len(orphan_volumes)} ({orphan_cost:.2f} ₽/day)")
+            logger.info(f"  - Client cache: {self.client.cache_stats()}")
             
             # Build success message
             base_message = f'Successfully synced {len(synced_resources)} resources ({total_cost:.2f} ₽/day)'
@@ -756,8 +777,7 @@ class SelectelService:
     
     def _process_volume_resource(self, resource_id: str, billing_data: Dict,
                                  unified_vms: Dict[str, Resource],
-                                 sync_snapshot_id: int,
-                                 volume_cache: Dict[str, Dict] = None) -> Optional[Dict]:
+                                 sync_snapshot_id: int) -> Optional[Dict]:
         """
         Process volume - try to unify with VM or create standalone
         
@@ -783,21 +803,12 @@ class SelectelService:
                 if billing_region_raw[-1].isalpha() and billing_region_raw[-2].isdigit():
                     billing_region = billing_region_raw[:-1]
             
-            # Try to get volume details from OpenStack
-            # First check the pre-fetched cache, then try direct fetch if not in cache
-            volume_details = None
-            if volume_cache and resource_id in volume_cache:
-                volume_details = volume_cache[resource_id]
-                logger.debug(f"Volume {resource_id} found in pre-fetched cache")
-            elif billing_project_id and billing_region:
-                # Fallback to direct fetch if not in cache (shouldn't happen often)
-                volume_details = self._fetch_volume_from_openstack_safe(
-                    resource_id,
-                    billing_project_id=billing_project_id,
-                    billing_region=billing_region
-                )
-            else:
-                logger.debug(f"No billing location hint for volume {resource_id}, creating from billing data only")
+            # Try to get volume details from the OpenStack inventory index
+            volume_details = self._fetch_volume_from_openstack_safe(
+                resource_id,
+                billing_project_id=billing_project_id,
+                billing_region=billing_region
+            )
             
             if volume_details:
                 # Volume exists in OpenStack
@@ -1123,7 +1134,11 @@ class SelectelService:
                                        sync_snapshot_id: int) -> Optional[Resource]:
         """Process file storage (Manila shares)"""
         try:
-            share_details = self._fetch_share_from_openstack(resource_id)
+            share_details = self._fetch_share_from_openstack(
+                resource_id,
+                billing_project_id=billing_data.get('project_id'),
+                billing_region=openstack_region(billing_data.get('region'))
+            )
             
             if share_details:
                 # Active file storage
@@ -1206,126 +1221,73 @@ class SelectelService:
             logger.error(f"Error processing {service_type} {resource_id}: {e}")
             return None
     
+    def _get_inventory(self) -> SelectelInventory:
+        """OpenStack inventory index of the current sync (created on first use)"""
+        if self._inventory is None:
+            self._inventory = SelectelInventory(
+                self.client,
+                max_workers=current_app.config.get('SELECTEL_INVENTORY_MAX_WORKERS', 6)
+            )
+        return self._inventory
+    
+    @staticmethod
+    def _billing_locations(billing_items: Dict[str, Dict]) -> set:
+        """Distinct (project_id, OpenStack region) pairs of billed resources"""
+        locations = set()
+        for billing_data in billing_items.values():
+            project_id = billing_data.get('project_id')
+            region = openstack_region(billing_data.get('region'))
+            if project_id and region:
+                locations.add((project_id, region))
+        return locations
+    
+    def _build_inventory(self, resources_by_type: Dict[str, Dict]) -> SelectelInventory:
+        """
+        List every OpenStack object type once per billed (project, region), concurrently
+        
+        Servers and volumes are listed where servers are billed (attached and orphaned
+        volumes live next to their VM), volumes and shares where they are billed, and
+        ports per server region. Later lookups are dict reads.
+        """
+        self._inventory = None
+        inventory = self._get_inventory()
+        server_locations = self._billing_locations(resources_by_type.get('server', {}))
+        volume_locations = self._billing_locations(resources_by_type.get('volume', {})) | server_locations
+        share_locations = self._billing_locations(resources_by_type.get('file_storage', {}))
+        
+        keys = [('servers', project_id, region) for project_id, region in server_locations]
+        keys += [('ports', None, region) for region in {region for _, region in server_locations}]
+        keys += [('volumes', project_id, region) for project_id, region in volume_locations]
+        keys += [('shares', project_id, region) for project_id, region in share_locations]
+        inventory.load(keys)
+        
+        summary = inventory.summary()
+        logger.info(
+            f"Indexed {summary['servers']} servers, {summary['volumes']} volumes, {summary['shares']} shares, "
+            f"{summary['ports']} ports from {summary['requests']} listings ({summary['failed_requests']} failed) "
+            f"in {summary['seconds']}s"
+        )
+        return inventory
+    
     def _fetch_server_from_openstack(self, server_id: str, billing_project_id: str = None, billing_region: str = None) -> Optional[Dict]:
         """
-        Fetch server details from OpenStack APIs
+        Fetch server details from the OpenStack inventory index
         
-        Uses project_id and region from billing API if available to avoid brute-force search
-        Falls back to multi-project/region search if billing info not provided
+        Uses project_id and region from billing API if available; servers missing
+        there are searched across all projects/regions once per sync
         """
         try:
-            # OPTIMIZATION: If we have project/region from billing, try that first
-            if billing_project_id and billing_region:
-                logger.debug(f"Trying server {server_id} in billing-provided project {billing_project_id} region {billing_region}")
-                try:
-                    servers = self.client.get_openstack_servers(region=billing_region, project_id=billing_project_id)
-                    for server in servers:
-                        if server['id'] == server_id:
-                            logger.info(f"✅ Found server {server_id} using billing-provided location")
-                            server['project_id'] = billing_project_id
-                            # Get project name from billing
-                            projects = self.client.get_all_projects_from_billing()
-                            for p in projects:
-                                if p.get('id') == billing_project_id:
-                                    server['project_name'] = p.get('name')
-                                    break
-                            return server
-                except Exception as e:
-                    logger.warning(f"Server {server_id} not found at billing location: {e}")
-            
-            # FALLBACK: Brute-force search across all projects/regions
-            logger.debug(f"Falling back to brute-force search for server {server_id}")
-            
-            # Discover all projects from billing
-            projects = self.client.get_all_projects_from_billing()
-            if not projects:
-                logger.warning("No projects discovered from billing, using default")
-                projects = [{'id': None, 'name': 'default'}]
-            
-            # Get available regions
-            regions = self.client.get_available_regions()
-            logger.debug(f"Searching across {len(projects)} projects and {len(regions)} regions")
-            
-            # Try each project/region combination
-            for project in projects:
-                project_id = project.get('id')
-                project_name = project.get('name', 'Unknown')
-                
-                for region in regions:
-                    try:
-                        servers = self.client.get_openstack_servers(region=region, project_id=project_id)
-                        for server in servers:
-                            if server['id'] == server_id:
-                                logger.info(f"Found server {server_id} in project '{project_name}' region {region}")
-                                server['project_id'] = project_id
-                                server['project_name'] = project_name
-                                return server
-                    except Exception as e:
-                        logger.debug(f"Server {server_id} not in project '{project_name}' region {region}: {e}")
-                        continue
-            
-            logger.warning(f"Server {server_id} not found in any project/region combination")
-            return None
-            
+            server = self._get_inventory().find_server(server_id, billing_project_id, billing_region)
+            if server is None:
+                logger.warning(f"Server {server_id} not found in any project/region combination")
+            return server
         except Exception as e:
             logger.error(f"Error fetching server {server_id}: {e}")
             return None
     
-    def _prefetch_all_volumes(self, volume_billing_data: Dict[str, Dict]) -> Dict[str, Dict]:
-        """
-        Pre-fetch all volumes from OpenStack in batch for faster processing
-        
-        Args:
-            volume_billing_data: Dict of volume_id -> billing_data
-            
-        Returns:
-            Dict mapping volume_id -> volume_details (from OpenStack)
-        """
-        volume_cache = {}
-        
-        if not volume_billing_data:
-            return volume_cache
-        
-        # Group volumes by (project_id, region) to minimize API calls
-        volumes_by_location = {}
-        for volume_id, billing_data in volume_billing_data.items():
-            project_id = billing_data.get('project_id')
-            region_raw = billing_data.get('region', 'unknown')
-            
-            # Convert billing zone to region (ru-7b -> ru-7)
-            region = region_raw
-            if region_raw and len(region_raw) > 2:
-                if region_raw[-1].isalpha() and region_raw[-2].isdigit():
-                    region = region_raw[:-1]
-            
-            if project_id and region:
-                location_key = f"{project_id}:{region}"
-                if location_key not in volumes_by_location:
-                    volumes_by_location[location_key] = {'project_id': project_id, 'region': region, 'volume_ids': []}
-                volumes_by_location[location_key]['volume_ids'].append(volume_id)
-        
-        # Fetch volumes for each unique location
-        for location_key, location_data in volumes_by_location.items():
-            project_id = location_data['project_id']
-            region = location_data['region']
-            volume_ids = location_data['volume_ids']
-            
-            logger.debug(f"Fetching {len(volume_ids)} volumes from project {project_id} region {region}")
-            try:
-                volumes = self.client.get_openstack_volumes(project_id, region=region)
-                for volume in volumes:
-                    if volume['id'] in volume_ids:
-                        volume_cache[volume['id']] = volume
-                logger.debug(f"Cached {len([v for v in volume_ids if v in volume_cache])} volumes from this location")
-            except Exception as e:
-                logger.debug(f"Failed to fetch volumes from {region} project {project_id}: {e}")
-        
-        logger.info(f"Pre-fetched {len(volume_cache)} volumes from OpenStack")
-        return volume_cache
-    
     def _fetch_volume_from_openstack_safe(self, volume_id: str, billing_project_id: str = None, billing_region: str = None) -> Optional[Dict]:
         """
-        Fetch volume details from OpenStack APIs - ONLY tries billing-provided location
+        Fetch volume details from the OpenStack inventory index - ONLY the billing-provided location
         
         NO brute-force search to avoid hanging on 400 errors
         Returns None if not found at billing location (caller creates from billing data)
@@ -1333,41 +1295,18 @@ class SelectelService:
         try:
             if not billing_project_id or not billing_region:
                 logger.debug(f"No billing location hint for volume {volume_id}")
-                return None
-            
-            logger.debug(f"Trying volume {volume_id} in billing-provided project {billing_project_id} region {billing_region}")
-            try:
-                volumes = self.client.get_openstack_volumes(billing_project_id, region=billing_region)
-                for volume in volumes:
-                    if volume['id'] == volume_id:
-                        logger.info(f"✅ Found volume {volume_id} using billing-provided location")
-                        return volume
+            volume = self._get_inventory().find_volume(volume_id, billing_project_id, billing_region)
+            if volume is None:
                 logger.debug(f"Volume {volume_id} not found in {billing_region} project {billing_project_id} (may be deleted)")
-            except Exception as e:
-                logger.debug(f"Volume {volume_id} not found at billing location: {e}")
-            
-            return None
-            
+            return volume
         except Exception as e:
             logger.error(f"Error fetching volume {volume_id}: {e}")
             return None
     
-    def _fetch_share_from_openstack(self, share_id: str) -> Optional[Dict]:
-        """Fetch file storage share details"""
+    def _fetch_share_from_openstack(self, share_id: str, billing_project_id: str = None, billing_region: str = None) -> Optional[Dict]:
+        """Fetch file storage share details from the OpenStack inventory index"""
         try:
-            projects = self.client.get_projects()
-            project_id = projects[0]['id'] if projects else None
-            
-            if project_id:
-                for region in self.client.regions.keys() if self.client.regions else ['ru-3']:
-                    try:
-                        shares = self.client.get_openstack_shares(project_id, region=region)
-                        for share in shares:
-                            if share['id'] == share_id:
-                                return share
-                    except Exception:
-                        continue
-            return None
+            return self._get_inventory().find_share(share_id, billing_project_id, billing_region)
         except Exception as e:
             logger.error(f"Error fetching share {share_id}: {e}")
             return None
@@ -1696,6 +1635,68 @@ class SelectelService:
             logger.error(f"Failed to get projects: {str(e)}")
             return []
     
+    def _merge_statistics_history(self, servers: List[Resource], statistics: Dict[str, Any]):
+        """
+        Store newly collected CPU/memory points and recompute statistics from history
+        
+        The client only returns points after each server's high-water mark, so
+        the per-server statistics are replaced with figures over the stored
+        30-day window (same keys and tiers as the client produces).
+        
+        Args:
+            servers: Server resources the statistics were collected for
+            statistics: Result of SelectelClient.get_all_server_statistics (updated in place)
+        """
+        by_resource_id = {vm.resource_id: vm for vm in servers}
+        cpu_points = {}
+        memory_points = {}
+        for server_id, stats in statistics.items():
+            vm = by_resource_id.get(server_id)
+            if vm is None:
+                continue
+            cpu_points[vm.id] = (stats.get('cpu_statistics') or {}).get('points', [])
+            memory_points[vm.id] = (stats.get('memory_statistics') or {}).get('points', [])
+        
+        vm_ids = [vm.id for vm in servers]
+        cpu_history = MetricsService.merge_history(cpu_points, 'cpu_usage', '%', vm_ids)
+        memory_history = MetricsService.merge_history(memory_points, 'memory_usage', 'MB', vm_ids)
+        collection_timestamp = datetime.utcnow().isoformat()
+        
+        for server_id, stats in statistics.items():
+            vm = by_resource_id.get(server_id)
+            if vm is None:
+                continue
+            
+            cpu = cpu_history.get(vm.id)
+            if cpu:
+                avg_cpu = cpu['avg']
+                stats['cpu_statistics'] = {
+                    'avg_cpu_usage': round(avg_cpu, 2),
+                    'max_cpu_usage': round(cpu['max'], 2),
+                    'min_cpu_usage': round(cpu['min'], 2),
+                    'trend': round(cpu['max'] - cpu['min'], 2),
+                    'performance_tier': 'low' if avg_cpu < 20 else 'medium' if avg_cpu < 60 else 'high',
+                    'data_points': cpu['count'],
+                    'period': 'DAY',
+                    'collection_timestamp': collection_timestamp
+                }
+            
+            memory = memory_history.get(vm.id)
+            if memory:
+                ram_mb = (json.loads(vm.provider_config) if vm.provider_config else {}).get('ram_mb', 1024)
+                avg_mem_percent = (memory['avg'] / ram_mb) * 100 if ram_mb and ram_mb > 0 else 0
+                stats['memory_statistics'] = {
+                    'avg_memory_usage_mb': round(memory['avg'], 2),
+                    'max_memory_usage_mb': round(memory['max'], 2),
+                    'min_memory_usage_mb': round(memory['min'], 2),
+                    'memory_usage_percent': round(avg_mem_percent, 2),
+                    'trend': round(memory['max'] - memory['min'], 2),
+                    'memory_tier': 'low' if avg_mem_percent < 40 else 'medium' if avg_mem_percent < 70 else 'high',
+                    'data_points': memory['count'],
+                    'period': 'DAY',
+                    'collection_timestamp': collection_timestamp
+                }
+    
     def _process_server_statistics(self, sync_snapshot, statistics: Dict[str, Any]):
         """
         Process and store server statistics (similar to Beget implementation)
@@ -1731,15 +1732,7 @@ class SelectelService:
                     server_resource.add_tag('cpu_data_points', str(cpu_stats.get('data_points', 0)))
                     server_resource.add_tag('cpu_period', cpu_stats.get('period', 'HOUR'))
                     server_resource.add_tag('cpu_collection_timestamp', cpu_stats.get('collection_timestamp', ''))
-                    
-                    # Add daily aggregated data for UI charts
-                    if cpu_stats.get('daily_aggregated'):
-                        daily_data = cpu_stats['daily_aggregated']
-                        raw_data = {
-                            'dates': [d['date'] for d in daily_data],
-                            'values': [d['value'] for d in daily_data]
-                        }
-                        server_resource.add_tag('cpu_raw_data', json.dumps(raw_data))
+                    # Chart series are read from the metrics store (resource_metrics)
                 
                 # Add memory statistics tags (same format as Beget)
                 if stats.get('memory_statistics'):
@@ -1753,15 +1746,6 @@ class SelectelService:
                     server_resource.add_tag('memory_data_points', str(mem_stats.get('data_points', 0)))
                     server_resource.add_tag('memory_period', mem_stats.get('period', 'HOUR'))
                     server_resource.add_tag('memory_collection_timestamp', mem_stats.get('collection_timestamp', ''))
-                    
-                    # Add daily aggregated data for UI charts
-                    if mem_stats.get('daily_aggregated'):
-                        daily_data = mem_stats['daily_aggregated']
-                        raw_data = {
-                            'dates': [d['date'] for d in daily_data],
-                            'values': [d['value'] for d in daily_data]
-                        }
-                        server_resource.add_tag('memory_raw_data', json.dumps(raw_data))
                 
                 # Also add usage statistics to provider_config for UI display
                 if server_resource.provider_config:
@@ -6,6 +6,10 @@ from typing import Dict, List, Any, Optional
 from datetime import datetime
 from concurrent.futures import ThreadPoolExecutor, as_completed
 import json
+import threading
+import time
+
+from sqlalchemy import insert, update
 
 from app.core.models import db
 from app.core.models.provider import CloudProvider
@@ -21,17 +25,23 @@ logger = logging.getLogger(__name__)
 class SyncOrchestrator:
     """Unified sync orchestrator for all provider types"""
 
+    # Rows per bulk INSERT/UPDATE statement when persisting plugin resources
+    BULK_CHUNK_SIZE = 500
+
     def __init__(self, plugin_manager: ProviderPluginManager = None):
         self.plugin_manager = plugin_manager or plugin_manager
         self.logger = logging.getLogger(f"{__name__}.{self.__class__.__name__}")
 
-    def sync_provider(self, provider_id: int, sync_type: str = 'manual') -> Dict[str, Any]:
+    def sync_provider(self, provider_id: int, sync_type: str = 'manual',
+                      persist_lock: Optional[threading.Lock] = None) -> Dict[str, Any]:
         """
         Sync a specific provider using its plugin
 
         Args:
             provider_id: Database ID of the provider
             sync_type: Type of sync (manual, scheduled, api)
+            persist_lock: Optional lock held while plugin results are written to the
+                database, so concurrent provider syncs persist one at a time
 
         Returns:
             Dict containing sync results
@@ -120,7 +130,11 @@ class SyncOrchestrator:
             sync_result = plugin.sync_resources()
 
             # Process sync results
-            processed_result = self._process_sync_result(sync_result, sync_snapshot, provider)
+            if persist_lock is not None:
+                with persist_lock:
+                    processed_result = self._process_sync_result(sync_result, sync_snapshot, provider)
+            else:
+                processed_result = self._process_sync_result(sync_result, sync_snapshot, provider)
 
             # Update provider sync status
             provider.last_sync = datetime.now()
@@ -389,13 +403,17 @@ class SyncOrchestrator:
 
             # Process and store resources if available
             resources_processed = 0
+            persistence_stats = None
             resource_processing_errors = []
 
             if sync_data and 'resources' in sync_data and sync_data['resources']:
                 try:
-                    resources_processed = self._process_plugin_resources(
+                    persistence_stats = self._process_plugin_resources(
                         sync_data['resources'], sync_snapshot, provider
                     )
+                    resources_processed = persistence_stats['resources']
+                    sync_config['persistence_stats'] = persistence_stats
+                    sync_snapshot.sync_config = json.dumps(sync_config)
                 except Exception as e:
                     error_msg = f"Resource processing failed: {str(e)}"
                     self.logger.error(error_msg, exc_info=True)
@@ -451,7 +469,8 @@ class SyncOrchestrator:
                 'resources_synced': sync_result.resources_synced,
                 'total_cost': sync_result.total_cost,
                 'errors': sync_result.errors,
-                'sync_snapshot_id': sync_snapshot.id
+                'sync_snapshot_id': sync_snapshot.id,
+                'persistence_stats': persistence_stats
             }
 
         except Exception as e:
@@ -467,9 +486,13 @@ class SyncOrchestrator:
             }
 
     def _process_plugin_resources(self, plugin_resources: List[Dict], sync_snapshot: SyncSnapshot,
-                                provider: CloudProvider) -> int:
+                                provider: CloudProvider) -> Dict[str, Any]:
         """
-        Process resources returned by plugin and save to database
+        Persist resources returned by plugin using bulk statements
+
+        Existing resources for the provider are prefetched in one query, inserts
+        and updates are computed in memory, and Resource, ResourceState and
+        ResourceTag rows are written with chunked bulk INSERT/UPDATE statements.
 
         Args:
             plugin_resources: List of resource dictionaries from plugin
@@ -477,213 +500,285 @@ class SyncOrchestrator:
             provider: The cloud provider
 
         Returns:
-            Number of resources processed
+            Dict with persistence statistics (resources processed, rows written, rows per second)
         """
-        try:
-            processed_count = 0
+        from app.core.models.provider_resource_type import ProviderResourceType
 
-            processed_resources = []
-            for resource_data in plugin_resources:
-                try:
-                    # Create or update resource in database
-                    resource = self._create_or_update_resource_from_plugin(
-                        resource_data, sync_snapshot, provider
-                    )
-                    if resource:
-                        processed_count += 1
-                        processed_resources.append((resource, resource_data))
-                        self.logger.info(f"Successfully processed resource: {resource_data.get('resource_name', 'unknown')}")
-                    else:
-                        self.logger.warning(f"Resource processing returned None for: {resource_data.get('resource_name', 'unknown')}")
+        started = time.monotonic()
+        now = datetime.now()
 
-                except Exception as e:
-                    self.logger.error(f"Failed to process resource {resource_data.get('resource_name', 'unknown')}: {e}")
-                    continue
-            
-            # Create ResourceState records and finish resource processing
-            from app.core.models.sync import ResourceState
-            with db.session.no_autoflush:
-                for resource, resource_data in processed_resources:
-                    try:
-                        # Create ResourceState record
-                        resource_state = ResourceState(
-                            sync_snapshot_id=sync_snapshot.id,
-                            resource_id=resource.id,
-                            provider_resource_id=resource_data['resource_id'],
-                            resource_type=resource_data['resource_type'],
-                            resource_name=resource_data['resource_name'],
-                            state_action='created' if resource_data.get('is_new', False) else 'updated',
-                            service_name=resource_data.get('service_name', resource_data['resource_type'].title()),
-                            region=resource_data.get('region', 'unknown'),
-                            status=resource_data.get('status', 'unknown'),
-                            effective_cost=resource_data.get('effective_cost', 0.0)
-                        )
-                        db.session.add(resource_state)
-                        
-                        # Finish resource processing (set daily cost baseline and add tags)
-                        resource.set_daily_cost_baseline(
-                            original_cost=resource_data.get('effective_cost', 0.0),
-                            period=resource_data.get('billing_period', 'monthly'),
-                            frequency='recurring'
-                        )
-                        
-                        # Add tags
-                        tags = resource_data.get('tags', {})
-                        for key, value in tags.items():
-                            resource.add_tag(key, str(value))
-                        
-                        self.logger.info(f"Successfully created ResourceState for {resource_data.get('resource_name', 'unknown')}")
-                    except Exception as e:
-                        self.logger.error(f"Failed to create ResourceState for {resource_data.get('resource_name', 'unknown')}: {e}")
-                        continue
-
-            self.logger.info(f"Processed {processed_count} resources for provider {provider.id}")
-            return processed_count
+        # Known types and aliases are loaded once and shared by all resources of the run
+        type_index = ProviderResourceType.build_type_index(provider.provider_type)
+        unrecognized_rows = []
 
-        except Exception as e:
-            self.logger.error(f"Failed to process plugin resources: {e}")
-            return 0
-
-    def _create_or_update_resource_from_plugin(self, resource_data: Dict, sync_snapshot: SyncSnapshot,
-                                             provider: CloudProvider) -> Optional[Resource]:
+        # Gate types and build rows; a resource reported twice keeps its last version
+        incoming = {}
+        for resource_data in plugin_resources:
+            try:
+                self._gate_resource_type(resource_data, sync_snapshot, provider, type_index, unrecognized_rows)
+                row = self._build_resource_row(resource_data, provider, now)
+            except Exception as e:
+                self.logger.error(f"Failed to prepare resource {resource_data.get('resource_name', 'unknown')}: {e}")
+                continue
+            incoming[(row['resource_id'], row['resource_type'])] = (row, resource_data)
+
+        self._save_unrecognized_resources(unrecognized_rows)
+
+        stats = {
+            'resources': 0,
+            'inserted': 0,
+            'updated': 0,
+            'states': 0,
+            'tags_inserted': 0,
+            'tags_updated': 0,
+            'unrecognized': len(unrecognized_rows),
+            'rows_written': 0,
+            'duration_seconds': 0.0,
+            'rows_per_second': 0.0
+        }
+        if not incoming:
+            return stats
+
+        # Savepoint: a failed bulk write must not discard the snapshot's pending changes
+        with db.session.begin_nested():
+            counts = self._write_resource_rows(incoming, sync_snapshot, provider, now)
+
+        duration = time.monotonic() - started
+        rows_written = sum(counts.values())
+        stats.update(counts)
+        stats.update({
+            'resources': len(incoming),
+            'rows_written': rows_written,
+            'duration_seconds': round(duration, 3),
+            'rows_per_second': round(rows_written / duration, 1) if duration > 0 else 0.0
+        })
+
+        self.logger.info(
+            f"Persisted {len(incoming)} resources for provider {provider.id} "
+            f"({counts['inserted']} new, {counts['updated']} updated, "
+            f"{counts['tags_inserted'] + counts['tags_updated']} tag writes): "
+            f"{rows_written} rows in {duration:.2f}s ({stats['rows_per_second']} rows/s)"
+        )
+        return stats
+
+    def _write_resource_rows(self, incoming: Dict[tuple, tuple], sync_snapshot: SyncSnapshot,
+                             provider: CloudProvider, now: datetime) -> Dict[str, int]:
         """
-        Create a fresh resource from plugin data (always creates new, never updates)
+        Bulk write Resource, ResourceState and ResourceTag rows for prepared resources
 
         Args:
-            resource_data: Resource data from plugin
+            incoming: (resource_id, resource_type) -> (resource row, plugin resource data)
             sync_snapshot: The sync snapshot
             provider: The cloud provider
+            now: Sync timestamp
 
         Returns:
-            Resource instance or None if failed
+            Dict with the number of rows written per kind
         """
-        try:
-            # Enforce known provider resource types inventory
-            from app.core.models.provider_resource_type import ProviderResourceType
-            from app.core.models.unrecognized_resource import UnrecognizedResource
-            from datetime import datetime
-            import json
-
-            incoming_type = resource_data.get('resource_type')
-            if incoming_type:
-                # Try exact match first
-                known = ProviderResourceType.query.filter_by(
-                    provider_type=provider.provider_type,
-                    unified_type=incoming_type,
-                    enabled=True
-                ).first()
-                # If not found, try alias match and remap to unified type
-                if known is None:
-                    try:
-                        rows = ProviderResourceType.query.filter_by(provider_type=provider.provider_type, enabled=True).all()
-                        for row in rows:
-                            aliases = []
-                            if row.raw_aliases:
-                                try:
-                                    aliases = json.loads(row.raw_aliases)
-                                except Exception:
-                                    aliases = []
-                            if incoming_type and any(incoming_type.lower() == str(a).lower() for a in aliases):
-                                # Remap to unified type for storage/processing
-                                resource_data['resource_type'] = row.unified_type
-                                known = row
-                                break
-                    except Exception:
-                        pass
-
-                if known is None:
-                    # Route to unrecognized resources and also surface in UI as a visible 'unknown' resource
-                    try:
-                        unrec = UnrecognizedResource(
-                            provider_id=provider.id,
-                            resource_id=str(resource_data.get('resource_id', '')),
-                            resource_name=resource_data.get('resource_name', 'Unknown'),
-                            resource_type=incoming_type,
-                            service_type=resource_data.get('service_name'),
-                            billing_data=json.dumps(resource_data, ensure_ascii=False),
-                            user_id=provider.user_id,
-                            sync_snapshot_id=sync_snapshot.id,
-                            discovered_at=datetime.utcnow()
-                        )
-                        db.session.add(unrec)
-                        db.session.commit()
-                        self.logger.info(f"Gated unknown type: {provider.provider_type}:{incoming_type} -> Unrecognized")
-                    except Exception:
-                        db.session.rollback()
-                    # Continue processing but downgrade the type to 'unknown' so it appears in Resources
-                    resource_data['resource_type'] = 'unknown'
-            # Extract resource information
-            resource_id = resource_data['resource_id']
-            resource_name = resource_data['resource_name']
-            resource_type = resource_data['resource_type']
-            
-            self.logger.info(f"Processing resource: {resource_name} ({resource_type}) - ID: {resource_id}")
-            service_name = resource_data.get('service_name', resource_type.title())
-            region = resource_data.get('region', 'unknown')
-            status = resource_data.get('status', 'unknown')
-            effective_cost = resource_data.get('effective_cost', 0.0)
-            currency = resource_data.get('currency', 'RUB')
-            billing_period = resource_data.get('billing_period', 'monthly')
-            provider_config = resource_data.get('provider_config', resource_data)
-            tags = resource_data.get('tags', {})
-            external_ip = resource_data.get('external_ip')
-
-            # Get or create the base Resource record (for reference)
-            existing_resource = Resource.query.filter_by(
-                provider_id=provider.id,
-                resource_id=resource_id
-            ).first()
-            
-            if existing_resource:
-                # Update the base resource record with latest info
-                resource = existing_resource
-                resource.resource_name = resource_name
-                resource.resource_type = resource_type
-                resource.service_name = service_name
-                resource.region = region
-                resource.status = status
-                resource.effective_cost = effective_cost
-                resource.currency = currency
-                resource.billing_period = billing_period
-                resource.provider_config = json.dumps(provider_config)
-                resource.external_ip = external_ip
-                resource.last_sync = datetime.now()
-                resource.is_active = True
+        from app.core.models.sync import ResourceState
+        from app.core.models.tags import ResourceTag
+
+        # Prefetch existing resources in one query
+        existing_ids = self._fetch_resource_ids(provider.id)
+        ids_by_resource_id = {}
+        for (resource_id, _), db_id in existing_ids.items():
+            ids_by_resource_id.setdefault(resource_id, []).append(db_id)
+
+        # Exact (resource_id, resource_type) matches first, then reuse a row with the
+        # same provider ID under another type (the resource was re-typed)
+        matched = {key: existing_ids[key] for key in incoming if key in existing_ids}
+        claimed = set(matched.values())
+        for key in incoming:
+            if key in matched:
+                continue
+            for db_id in ids_by_resource_id.get(key[0], []):
+                if db_id not in claimed:
+                    matched[key] = db_id
+                    claimed.add(db_id)
+                    break
+
+        inserts = []
+        updates = []
+        inserted_keys = set()
+        for key, (row, _) in incoming.items():
+            if key in matched:
+                updates.append(dict(row, id=matched[key], updated_at=now))
             else:
-                # Create new base resource record
-                resource = Resource(
-                    provider_id=provider.id,
-                    resource_id=resource_id,
-                    resource_name=resource_name,
-                    resource_type=resource_type,
-                    service_name=service_name,
-                    region=region,
-                    status=status,
-                    effective_cost=effective_cost,
-                    currency=currency,
-                    billing_period=billing_period,
-                    provider_config=json.dumps(provider_config),
-                    external_ip=external_ip,
-                    last_sync=datetime.now(),
-                    is_active=True
-                )
-                db.session.add(resource)
-            
-            db.session.flush()  # Get the resource ID
-            
-            # Store resource data for later processing to avoid autoflush conflicts
-            resource_data['processed_resource'] = resource
-            resource_data['tags'] = tags
-            resource_data['effective_cost'] = effective_cost
-            resource_data['billing_period'] = billing_period
-            
-            self.logger.info(f"Successfully processed resource: {resource_name}")
-            return resource
+                inserts.append(row)
+                inserted_keys.add(key)
+
+        for chunk in self._chunks(inserts):
+            db.session.execute(insert(Resource), chunk)
+        for chunk in self._chunks(updates):
+            db.session.execute(update(Resource), chunk)
+
+        # Resolve IDs of freshly inserted rows
+        if inserts:
+            resolved_ids = self._fetch_resource_ids(provider.id)
+            for key in inserted_keys:
+                matched[key] = resolved_ids[key]
+
+        # Resource states for this snapshot
+        state_rows = []
+        for key, (row, resource_data) in incoming.items():
+            state_rows.append({
+                'sync_snapshot_id': sync_snapshot.id,
+                'resource_id': matched[key],
+                'provider_resource_id': row['resource_id'],
+                'resource_type': row['resource_type'],
+                'resource_name': row['resource_name'],
+                'state_action': 'created' if key in inserted_keys else 'updated',
+                'service_name': row['service_name'],
+                'region': row['region'],
+                'status': row['status'],
+                'effective_cost': row['effective_cost']
+            })
+        for chunk in self._chunks(state_rows):
+            db.session.execute(insert(ResourceState), chunk)
+
+        # Tags: prefetch existing tags for the provider, write only new or changed values
+        existing_tags = {
+            (t.resource_id, t.tag_key): (t.id, t.tag_value)
+            for t in db.session.query(ResourceTag.id, ResourceTag.resource_id, ResourceTag.tag_key, ResourceTag.tag_value)
+            .join(Resource, Resource.id == ResourceTag.resource_id)
+            .filter(Resource.provider_id == provider.id)
+        }
+        tag_inserts = {}
+        tag_updates = {}
+        for key, (_, resource_data) in incoming.items():
+            db_id = matched[key]
+            for tag_key, tag_value in (resource_data.get('tags') or {}).items():
+                tag_value = str(tag_value)
+                existing_tag = existing_tags.get((db_id, tag_key))
+                if existing_tag is None:
+                    tag_inserts[(db_id, tag_key)] = {
+                        'resource_id': db_id,
+                        'tag_key': tag_key,
+                        'tag_value': tag_value
+                    }
+                elif existing_tag[1] != tag_value:
+                    tag_updates[existing_tag[0]] = {'id': existing_tag[0], 'tag_value': tag_value, 'updated_at': now}
+        for chunk in self._chunks(list(tag_inserts.values())):
+            db.session.execute(insert(ResourceTag), chunk)
+        for chunk in self._chunks(list(tag_updates.values())):
+            db.session.execute(update(ResourceTag), chunk)
+
+        return {
+            'inserted': len(inserts),
+            'updated': len(updates),
+            'states': len(state_rows),
+            'tags_inserted': len(tag_inserts),
+            'tags_updated': len(tag_updates)
+        }
+
+    def _fetch_resource_ids(self, provider_id: int) -> Dict[tuple, int]:
+        """Map (resource_id, resource_type) -> Resource.id for all resources of a provider"""
+        rows = db.session.query(Resource.id, Resource.resource_id, Resource.resource_type)\
+            .filter(Resource.provider_id == provider_id).all()
+        return {(r.resource_id, r.resource_type): r.id for r in rows}
 
+    def _chunks(self, rows: List[Dict]):
+        """Split rows into BULK_CHUNK_SIZE batches"""
+        for i in range(0, len(rows), self.BULK_CHUNK_SIZE):
+            yield rows[i:i + self.BULK_CHUNK_SIZE]
+
+    def _build_resource_row(self, resource_data: Dict, provider: CloudProvider, now: datetime) -> Dict[str, Any]:
+        """
+        Build the Resource column values for a plugin resource
+
+        Args:
+            resource_data: Resource data from plugin (already type-gated)
+            provider: The cloud provider
+            now: Sync timestamp
+
+        Returns:
+            Dict of Resource column values (without primary key)
+        """
+        resource_type = resource_data['resource_type']
+        effective_cost = resource_data.get('effective_cost', 0.0)
+        billing_period = resource_data.get('billing_period', 'monthly')
+
+        return {
+            'provider_id': provider.id,
+            'resource_id': resource_data['resource_id'],
+            'resource_name': resource_data['resource_name'],
+            'resource_type': resource_type,
+            'service_name': resource_data.get('service_name', resource_type.title()),
+            'region': resource_data.get('region', 'unknown'),
+            'status': resource_data.get('status', 'unknown'),
+            'effective_cost': effective_cost,
+            'currency': resource_data.get('currency', 'RUB'),
+            'billing_period': billing_period,
+            'provider_config': json.dumps(resource_data.get('provider_config', resource_data)),
+            'external_ip': resource_data.get('external_ip'),
+            'original_cost': effective_cost,
+            'cost_period': billing_period,
+            'cost_frequency': 'recurring',
+            'daily_cost': Resource.normalize_to_daily_cost(effective_cost, billing_period, 'recurring'),
+            'last_sync': now,
+            'is_active': True
+        }
+
+    def _gate_resource_type(self, resource_data: Dict, sync_snapshot: SyncSnapshot,
+                            provider: CloudProvider, type_index: tuple,
+                            unrecognized_rows: List[Dict]) -> None:
+        """
+        Enforce known provider resource types inventory
+
+        Remaps raw aliases to their unified type. Unknown types are queued as
+        UnrecognizedResource rows and downgraded to 'unknown' so they still
+        appear in Resources. Mutates resource_data in place.
+
+        Args:
+            resource_data: Resource data from plugin
+            sync_snapshot: The sync snapshot
+            provider: The cloud provider
+            type_index: (unified types, lowercase alias -> unified type) from
+                ProviderResourceType.build_type_index, built once per sync
+            unrecognized_rows: Collector for UnrecognizedResource rows to bulk insert
+        """
+        incoming_type = resource_data.get('resource_type')
+        if not incoming_type:
+            return
+
+        unified_types, alias_index = type_index
+
+        # Exact match first, then alias match remapped to the unified type
+        if incoming_type in unified_types:
+            return
+        unified_type = alias_index.get(str(incoming_type).lower())
+        if unified_type is not None:
+            resource_data['resource_type'] = unified_type
+            return
+
+        # Route to unrecognized resources and also surface in UI as a visible 'unknown' resource
+        unrecognized_rows.append({
+            'provider_id': provider.id,
+            'resource_id': str(resource_data.get('resource_id', '')),
+            'resource_name': resource_data.get('resource_name', 'Unknown'),
+            'resource_type': incoming_type,
+            'service_type': resource_data.get('service_name'),
+            'billing_data': json.dumps(resource_data, ensure_ascii=False),
+            'user_id': provider.user_id,
+            'sync_snapshot_id': sync_snapshot.id,
+            'discovered_at': datetime.utcnow()
+        })
+        self.logger.info(f"Gated unknown type: {provider.provider_type}:{incoming_type} -> Unrecognized")
+        # Continue processing but downgrade the type to 'unknown' so it appears in Resources
+        resource_data['resource_type'] = 'unknown'
+
+    def _save_unrecognized_resources(self, unrecognized_rows: List[Dict]) -> None:
+        """Bulk insert gated unknown resources in their own savepoint"""
+        from app.core.models.unrecognized_resource import UnrecognizedResource
+
+        if not unrecognized_rows:
+            return
+        try:
+            with db.session.begin_nested():
+                for chunk in self._chunks(unrecognized_rows):
+                    db.session.execute(insert(UnrecognizedResource), chunk)
         except Exception as e:
-            self.logger.error(f"Failed to create/update resource: {e}")
-            db.session.rollback()
-            return None
+            self.logger.error(f"Failed to record {len(unrecognized_rows)} unrecognized resources: {e}")
 
 
 # Global sync orchestrator instance
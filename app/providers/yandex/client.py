@@ -5,17 +5,32 @@ import requests
 import json
 import logging
 import jwt
+import random
+import threading
 import time
-from typing import Dict, List, Optional, Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterator, List, Optional, Any
 from datetime import datetime, timedelta
 
+from requests.adapters import HTTPAdapter
+
 logger = logging.getLogger(__name__)
 
+# Folder-level resource kinds fetched by get_all_resources_from_folder
+FOLDER_RESOURCE_KINDS = ('instances', 'disks', 'networks', 'subnets')
+
 
 class YandexClient:
     """Yandex Cloud API client for managing cloud resources"""
     
-    def __init__(self, credentials: dict, cloud_id: str = None, folder_id: str = None):
+    RETRY_STATUSES = {429, 500, 502, 503, 504}
+    BACKOFF_SECONDS = 0.5
+    PAGE_SIZE = 1000
+    DEFAULT_MAX_IN_FLIGHT = 8
+    DEFAULT_MAX_RETRIES = 3
+    
+    def __init__(self, credentials: dict, cloud_id: str = None, folder_id: str = None,
+                 max_in_flight: int = None, max_retries: int = None):
         """
         Initialize Yandex Cloud client
         
@@ -23,6 +38,8 @@ class YandexClient:
             credentials: Dict with credentials (service_account_key or oauth_token)
             cloud_id: Cloud ID (optional, can be discovered)
             folder_id: Folder ID (optional, can be discovered)
+            max_in_flight: Concurrent API requests (default: YANDEX_API_MAX_IN_FLIGHT)
+            max_retries: Retries on 429/5xx and connection errors (default: YANDEX_API_MAX_RETRIES)
         """
         # Handle both dictionary credentials and legacy string formats
         if isinstance(credentials, dict):
@@ -73,11 +90,103 @@ class YandexClient:
         self._discovered_folders = []
         self._discovered_clouds = []
         
-        self.session = requests.Session()
-        self.session.headers.update({
+        options = self._client_options()
+        self.max_in_flight = max(1, int(max_in_flight or options.get('max_in_flight') or self.DEFAULT_MAX_IN_FLIGHT))
+        if max_retries is None:
+            max_retries = options.get('max_retries')
+        self.max_retries = max(0, int(self.DEFAULT_MAX_RETRIES if max_retries is None else max_retries))
+        
+        # One pooled session for every API call; the semaphore caps requests in flight
+        # across all worker threads that share this client
+        self.session = self._create_session(self.max_in_flight)
+        self._in_flight = threading.BoundedSemaphore(self.max_in_flight)
+        self._token_lock = threading.Lock()
+    
+    @staticmethod
+    def _client_options() -> Dict[str, Any]:
+        """Transport settings from app config (defaults when outside an app context)."""
+        try:
+            from flask import current_app
+            cfg = current_app.config
+        except Exception:
+            return {}
+        return {
+            'max_in_flight': cfg.get('YANDEX_API_MAX_IN_FLIGHT'),
+            'max_retries': cfg.get('YANDEX_API_MAX_RETRIES'),
+        }
+    
+    @staticmethod
+    def _create_session(pool_size: int) -> requests.Session:
+        session = requests.Session()
+        session.headers.update({
             'Accept': 'application/json',
             'Content-Type': 'application/json'
         })
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        return session
+    
+    def _request(self, method: str, url: str, params: Dict[str, Any] = None, json_body: Dict[str, Any] = None,
+                 timeout: int = 30, authenticated: bool = True) -> requests.Response:
+        """
+        Send a request over the shared session, retrying 429/5xx and connection errors
+        
+        Backoff is exponential with jitter and honours Retry-After. The last
+        response is returned once retries are exhausted so callers can inspect or
+        raise_for_status() it as before.
+        """
+        attempt = 0
+        while True:
+            headers = self._get_headers() if authenticated else None
+            retry_after = None
+            try:
+                with self._in_flight:
+                    response = self.session.request(
+                        method, url, params=params, json=json_body, headers=headers, timeout=timeout
+                    )
+                if response.status_code not in self.RETRY_STATUSES or attempt >= self.max_retries:
+                    return response
+                retry_after = response.headers.get('Retry-After')
+                error = f"HTTP {response.status_code}"
+            except (requests.ConnectionError, requests.Timeout) as exc:
+                if attempt >= self.max_retries:
+                    raise
+                error = str(exc)
+            
+            try:
+                delay = float(retry_after) if retry_after else None
+            except ValueError:
+                delay = None
+            if delay is None:
+                delay = self.BACKOFF_SECONDS * (2 ** attempt) + random.uniform(0, self.BACKOFF_SECONDS)
+            attempt += 1
+            logger.debug(f"Retrying {method} {url} in {delay:.1f}s (attempt {attempt}): {error}")
+            time.sleep(delay)
+    
+    def _iter_pages(self, url: str, items_key: str, params: Dict[str, Any] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Yield items of a list call, following nextPageToken until the last page
+        
+        Args:
+            url: List endpoint
+            items_key: Response field holding the page items (e.g. 'instances')
+            params: Query parameters (folderId etc.)
+        """
+        params = dict(params or {})
+        params.setdefault('pageSize', self.PAGE_SIZE)
+        while True:
+            response = self._request('GET', url, params=params)
+            response.raise_for_status()
+            data = response.json()
+            yield from data.get(items_key, [])
+            page_token = data.get('nextPageToken')
+            if not page_token:
+                return
+            params['pageToken'] = page_token
+    
+    def _list(self, url: str, items_key: str, params: Dict[str, Any] = None) -> List[Dict[str, Any]]:
+        return list(self._iter_pages(url, items_key, params))
     
     def _truncate_to_microseconds(self, timestamp_str: str) -> str:
         """
@@ -122,29 +231,32 @@ class YandexClient:
         Returns:
             IAM token string
         """
-        # Check if we have a valid cached token
-        if self._iam_token and self._iam_token_expires_at:
-            # Use timezone-aware datetime for comparison
-            from datetime import timezone
-            now = datetime.now(timezone.utc)
-            # Remove timezone info from expires_at for comparison (make both naive)
-            expires_at_naive = self._iam_token_expires_at.replace(tzinfo=None)
-            now_naive = datetime.now()
-            if now_naive < expires_at_naive - timedelta(minutes=5):
-                return self._iam_token
+        # Workers share the client; only one of them refreshes an expiring token
+        with self._token_lock:
+            # Check if we have a valid cached token
+            if self._iam_token and self._iam_token_expires_at:
+                # Use timezone-aware datetime for comparison
+                from datetime import timezone
+                now = datetime.now(timezone.utc)
+                # Remove timezone info from expires_at for comparison (make both naive)
+                expires_at_naive = self._iam_token_expires_at.replace(tzinfo=None)
+                now_naive = datetime.now()
+                if now_naive < expires_at_naive - timedelta(minutes=5):
+                    return self._iam_token
         
-        try:
-            if self.service_account_key:
-                # Use service account key (JWT method)
-                return self._get_iam_token_from_service_account()
-            elif self.oauth_token:
-                # Use OAuth token
-                return self._get_iam_token_from_oauth()
-            else:
-                raise Exception("No credentials provided (service_account_key or oauth_token required)")
+            try:
+                if self.service_account_key:
+                    # Use service account key (JWT method)
+                    return self._get_iam_token_from_service_account()
+                elif self.oauth_token:
+                    # Use OAuth token
+                    return self._get_iam_token_from_oauth()
+                else:
+                    raise Exception("No credentials provided (service_account_key or oauth_token required)")
         
-        except Exception as e:
-            raise Exception(f"IAM token generation failed: {str(e)}")
+            except Exception as e:
+                raise Exception(f"IAM token generation failed: {str(e)}")
+    
     
     def _get_iam_token_from_service_account(self) -> str:
         """
@@ -185,12 +297,7 @@ class YandexClient:
             
             # Exchange JWT for IAM token
             iam_url = 'https://iam.api.cloud.yandex.net/iam/v1/tokens'
-            response = requests.post(
-                iam_url,
-                json={'jwt': encoded_token},
-                headers={'Content-Type': 'application/json'},
-                timeout=30
-            )
+            response = self._request('POST', iam_url, json_body={'jwt': encoded_token}, authenticated=False)
             
             if response.status_code == 200:
                 data = response.json()
@@ -226,11 +333,8 @@ class YandexClient:
         """
         try:
             iam_url = 'https://iam.api.cloud.yandex.net/iam/v1/tokens'
-            response = requests.post(
-                iam_url,
-                json={'yandexPassportOauthToken': self.oauth_token},
-                headers={'Content-Type': 'application/json'},
-                timeout=30
+            response = self._request(
+                'POST', iam_url, json_body={'yandexPassportOauthToken': self.oauth_token}, authenticated=False
             )
             
             if response.status_code == 200:
@@ -320,14 +424,9 @@ class YandexClient:
             List of cloud dictionaries
         """
         try:
-            headers = self._get_headers()
             url = f'{self.resource_manager_url}/clouds'
             
-            response = requests.get(url, headers=headers, timeout=30)
-            response.raise_for_status()
-            
-            data = response.json()
-            clouds = data.get('clouds', [])
+            clouds = self._list(url, 'clouds')
             
             self._discovered_clouds = clouds
             logger.info(f"Found {len(clouds)} clouds")
@@ -357,15 +456,10 @@ class YandexClient:
                 else:
                     raise Exception("No clouds found and no cloud_id provided")
             
-            headers = self._get_headers()
             url = f'{self.resource_manager_url}/folders'
             params = {'cloudId': cloud_id}
             
-            response = requests.get(url, headers=headers, params=params, timeout=30)
-            response.raise_for_status()
-            
-            data = response.json()
-            folders = data.get('folders', [])
+            folders = self._list(url, 'folders', params)
             
             self._discovered_folders = folders
             logger.info(f"Found {len(folders)} folders in cloud {cloud_id}")
@@ -395,15 +489,10 @@ class YandexClient:
                 else:
                     raise Exception("No folders found and no folder_id provided")
             
-            headers = self._get_headers()
             url = f'{self.compute_url}/instances'
             params = {'folderId': folder_id}
             
-            response = requests.get(url, headers=headers, params=params, timeout=30)
-            response.raise_for_status()
-            
-            data = response.json()
-            instances = data.get('instances', [])
+            instances = self._list(url, 'instances', params)
             
             logger.info(f"Found {len(instances)} instances in folder {folder_id}")
             
@@ -430,10 +519,9 @@ class YandexClient:
             Instance details dictionary
         """
         try:
-            headers = self._get_headers()
             url = f'{self.compute_url}/instances/{instance_id}'
             
-            response = requests.get(url, headers=headers, timeout=30)
+            response = self._request('GET', url)
             response.raise_for_status()
             
             return response.json()
@@ -460,15 +548,10 @@ class YandexClient:
                 else:
                     raise Exception("No folders found and no folder_id provided")
             
-            headers = self._get_headers()
             url = f'{self.compute_url}/disks'
             params = {'folderId': folder_id}
             
-            response = requests.get(url, headers=headers, params=params, timeout=30)
-            response.raise_for_status()
-            
-            data = response.json()
-            disks = data.get('disks', [])
+            disks = self._list(url, 'disks', params)
             
             logger.info(f"Found {len(disks)} disks in folder {folder_id}")
             
@@ -498,15 +581,10 @@ class YandexClient:
                 else:
                     raise Exception("No folders found and no folder_id provided")
             
-            headers = self._get_headers()
             url = f'{self.compute_url}/snapshots'
             params = {'folderId': folder_id}
             
-            response = requests.get(url, headers=headers, params=params, timeout=30)
-            response.raise_for_status()
-            
-            data = response.json()
-            snapshots = data.get('snapshots', [])
+            snapshots = self._list(url, 'snapshots', params)
             
             logger.info(f"Found {len(snapshots)} snapshots in folder {folder_id}")
             
@@ -537,15 +615,10 @@ class YandexClient:
                 else:
                     raise Exception("No folders found and no folder_id provided")
             
-            headers = self._get_headers()
             url = f'{self.compute_url}/images'
             params = {'folderId': folder_id}
             
-            response = requests.get(url, headers=headers, params=params, timeout=30)
-            response.raise_for_status()
-            
-            data = response.json()
-            images = data.get('images', [])
+            images = self._list(url, 'images', params)
             
             logger.info(f"Found {len(images)} custom images in folder {folder_id}")
             
@@ -574,15 +647,10 @@ class YandexClient:
                 else:
                     raise Exception("No folders found and no folder_id provided")
             
-            headers = self._get_headers()
             url = f'{self.vpc_url}/networks'
             params = {'folderId': folder_id}
             
-            response = requests.get(url, headers=headers, params=params, timeout=30)
-            response.raise_for_status()
-            
-            data = response.json()
-            networks = data.get('networks', [])
+            networks = self._list(url, 'networks', params)
             
             logger.info(f"Found {len(networks)} networks in folder {folder_id}")
             
@@ -610,15 +678,10 @@ class YandexClient:
                 else:
                     raise Exception("No folders found and no folder_id provided")
             
-            headers = self._get_headers()
             url = f'{self.vpc_url}/subnets'
             params = {'folderId': folder_id}
             
-            response = requests.get(url, headers=headers, params=params, timeout=30)
-            response.raise_for_status()
-            
-            data = response.json()
-            subnets = data.get('subnets', [])
+            subnets = self._list(url, 'subnets', params)
             
             logger.info(f"Found {len(subnets)} subnets in folder {folder_id}")
             
@@ -644,15 +707,10 @@ class YandexClient:
             if not folder_id:
                 return []
             
-            headers = self._get_headers()
             url = f'{self.vpc_url}/addresses'
             params = {'folderId': folder_id}
             
-            response = requests.get(url, headers=headers, params=params, timeout=30)
-            response.raise_for_status()
-            
-            data = response.json()
-            addresses = data.get('addresses', [])
+            addresses = self._list(url, 'addresses', params)
             
             logger.info(f"Found {len(addresses)} reserved addresses in folder {folder_id}")
             
@@ -679,15 +737,10 @@ class YandexClient:
             if not folder_id:
                 return []
             
-            headers = self._get_headers()
             url = f'{self.vpc_url}/gateways'
             params = {'folderId': folder_id}
             
-            response = requests.get(url, headers=headers, params=params, timeout=30)
-            response.raise_for_status()
-            
-            data = response.json()
-            gateways = data.get('gateways', [])
+            gateways = self._list(url, 'gateways', params)
             
             logger.info(f"Found {len(gateways)} NAT gateways in folder {folder_id}")
             
@@ -714,17 +767,12 @@ class YandexClient:
                 if not folder_id:
                     raise Exception("No folder_id available")
             
-            headers = self._get_headers()
             # Load Balancer API endpoint
             lb_url = 'https://load-balancer.api.cloud.yandex.net/load-balancer/v1'
             url = f'{lb_url}/networkLoadBalancers'
             params = {'folderId': folder_id}
             
-            response = requests.get(url, headers=headers, params=params, timeout=30)
-            response.raise_for_status()
-            
-            data = response.json()
-            load_balancers = data.get('networkLoadBalancers', [])
+            load_balancers = self._list(url, 'networkLoadBalancers', params)
             
             logger.info(f"Found {len(load_balancers)} network load balancers in folder {folder_id}")
             
@@ -751,17 +799,12 @@ class YandexClient:
                 if not folder_id:
                     raise Exception("No folder_id available")
             
-            headers = self._get_headers()
             # Container Registry API endpoint
             cr_url = 'https://container-registry.api.cloud.yandex.net/container-registry/v1'
             url = f'{cr_url}/registries'
             params = {'folderId': folder_id}
             
-            response = requests.get(url, headers=headers, params=params, timeout=30)
-            response.raise_for_status()
-            
-            data = response.json()
-            registries = data.get('registries', [])
+            registries = self._list(url, 'registries', params)
             
             logger.info(f"Found {len(registries)} container registries in folder {folder_id}")
             
@@ -798,17 +841,12 @@ class YandexClient:
                 if not folder_id:
                     raise Exception("No folder_id available")
             
-            headers = self._get_headers()
             # DNS API endpoint
             dns_url = 'https://dns.api.cloud.yandex.net/dns/v1'
             url = f'{dns_url}/zones'
             params = {'folderId': folder_id}
             
-            response = requests.get(url, headers=headers, params=params, timeout=30)
-            response.raise_for_status()
-            
-            data = response.json()
-            zones = data.get('dnsZones', [])
+            zones = self._list(url, 'dnsZones', params)
             
             logger.info(f"Found {len(zones)} DNS zones in folder {folder_id}")
             
@@ -841,10 +879,9 @@ class YandexClient:
             if not sa_id:
                 return None
             
-            headers = self._get_headers()
             url = f'https://iam.api.cloud.yandex.net/iam/v1/serviceAccounts/{sa_id}'
             
-            response = requests.get(url, headers=headers, timeout=30)
+            response = self._request('GET', url)
             
             if response.status_code == 200:
                 sa_info = response.json()
@@ -870,10 +907,9 @@ class YandexClient:
             Folder details dict or None
         """
         try:
-            headers = self._get_headers()
             url = f'{self.resource_manager_url}/folders/{folder_id}'
             
-            response = requests.get(url, headers=headers, timeout=30)
+            response = self._request('GET', url)
             response.raise_for_status()
             
             return response.json()
@@ -885,38 +921,66 @@ class YandexClient:
         """
         Get all resources from a folder
         
+        Resource kinds are listed concurrently (see _fetch_folder_resources).
+        
         Args:
             folder_id: Folder ID (uses self.folder_id if not provided)
         
         Returns:
             Dict containing all resource types
         """
-        try:
-            folder_id = folder_id or self.folder_id
-            
-            resources = {
-                'instances': self.list_instances(folder_id),
-                'disks': self.list_disks(folder_id),
-                'networks': self.list_networks(folder_id),
-                'subnets': self.list_subnets(folder_id)
-            }
-            
-            return resources
+        folder_id = folder_id or self.folder_id
+        return self._fetch_folder_resources([folder_id])[folder_id]
+    
+    def _fetch_folder_resources(self, folder_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        List every folder resource kind for many folders concurrently
         
-        except Exception as e:
-            logger.error(f"Error getting resources from folder {folder_id}: {e}")
-            return {
-                'instances': [],
-                'disks': [],
-                'networks': [],
-                'subnets': [],
-                'error': str(e)
+        Each (folder, kind) pair is one task on a pool of max_in_flight workers, so
+        a cloud with many folders is not walked one request at a time. A folder
+        whose listing fails gets empty lists and an 'error', as before.
+        
+        Args:
+            folder_ids: Folder IDs
+        
+        Returns:
+            Dict of folder ID -> resources dict
+        """
+        listers = {
+            'instances': self.list_instances,
+            'disks': self.list_disks,
+            'networks': self.list_networks,
+            'subnets': self.list_subnets,
+        }
+        folder_ids = list(dict.fromkeys(folder_ids))
+        results: Dict[str, Dict[str, Any]] = {folder_id: {} for folder_id in folder_ids}
+        errors: Dict[str, str] = {}
+        
+        with ThreadPoolExecutor(max_workers=self.max_in_flight, thread_name_prefix='yandex-api') as pool:
+            futures = {
+                pool.submit(listers[kind], folder_id): (folder_id, kind)
+                for folder_id in folder_ids
+                for kind in FOLDER_RESOURCE_KINDS
             }
+            for future, (folder_id, kind) in futures.items():
+                try:
+                    results[folder_id][kind] = future.result()
+                except Exception as e:
+                    errors.setdefault(folder_id, str(e))
+        
+        for folder_id, error in errors.items():
+            logger.error(f"Error getting resources from folder {folder_id}: {error}")
+            results[folder_id] = {kind: [] for kind in FOLDER_RESOURCE_KINDS}
+            results[folder_id]['error'] = error
+        
+        return results
     
     def get_all_resources(self) -> Dict[str, Any]:
         """
         Get all resources across all accessible folders
         
+        Folders are discovered first, then listed concurrently.
+        
         Returns:
             Dict containing all resources organized by folder
         """
@@ -930,6 +994,8 @@ class YandexClient:
                 'total_disks': 0,
                 'total_networks': 0
             }
+            # (folder, cloud_id) pairs to fetch
+            folder_refs = []
             
             # If no clouds found, try to discover ALL folders via service account's cloud
             if len(clouds) == 0:
@@ -949,46 +1015,14 @@ class YandexClient:
                             try:
                                 all_cloud_folders = self.list_folders(cloud_id)
                                 logger.info(f"Found {len(all_cloud_folders)} total folder(s) in cloud {cloud_id}")
-                                
-                                # Process each accessible folder
-                                for folder in all_cloud_folders:
-                                    folder_id = folder['id']
-                                    folder_name = folder.get('name', folder_id)
-                                    
-                                    try:
-                                        logger.info(f"Processing folder: {folder_name} ({folder_id})")
-                                        folder_resources = self.get_all_resources_from_folder(folder_id)
-                                        
-                                        folder_info = {
-                                            'folder': folder,
-                                            'cloud_id': cloud_id,
-                                            'resources': folder_resources
-                                        }
-                                        
-                                        all_resources['folders'].append(folder_info)
-                                        all_resources['total_instances'] += len(folder_resources.get('instances', []))
-                                        all_resources['total_disks'] += len(folder_resources.get('disks', []))
-                                        all_resources['total_networks'] += len(folder_resources.get('networks', []))
-                                    
-                                    except Exception as folder_err:
-                                        logger.warning(f"Failed to access folder {folder_name}: {folder_err}")
-                                        logger.warning(f"Skipping folder {folder_id} - likely permission denied")
+                                folder_refs.extend((folder, cloud_id) for folder in all_cloud_folders)
                             
                             except Exception as list_err:
                                 logger.warning(f"Cannot list folders in cloud {cloud_id}: {list_err}")
                                 logger.info("Falling back to service account folder only")
                                 
                                 # Fallback: just process the service account's folder
-                                folder_resources = self.get_all_resources_from_folder(sa_folder_id)
-                                folder_info = {
-                                    'folder': folder_details,
-                                    'cloud_id': cloud_id,
-                                    'resources': folder_resources
-                                }
-                                all_resources['folders'].append(folder_info)
-                                all_resources['total_instances'] += len(folder_resources.get('instances', []))
-                                all_resources['total_disks'] += len(folder_resources.get('disks', []))
-                                all_resources['total_networks'] += len(folder_resources.get('networks', []))
+                                folder_refs.append((dict(folder_details, id=sa_folder_id), cloud_id))
                 
                 except Exception as folder_error:
                     logger.error(f"Failed to discover folders via service account: {folder_error}")
@@ -996,21 +1030,24 @@ class YandexClient:
             for cloud in clouds:
                 cloud_id = cloud['id']
                 folders = self.list_folders(cloud_id)
+                folder_refs.extend((folder, cloud_id) for folder in folders)
+            
+            logger.info(f"Listing resources in {len(folder_refs)} folders (max {self.max_in_flight} requests in flight)")
+            resources_by_folder = self._fetch_folder_resources([folder['id'] for folder, _ in folder_refs])
+            
+            for folder, cloud_id in folder_refs:
+                folder_resources = resources_by_folder[folder['id']]
                 
-                for folder in folders:
-                    folder_id = folder['id']
-                    folder_resources = self.get_all_resources_from_folder(folder_id)
-                    
-                    folder_info = {
-                        'folder': folder,
-                        'cloud_id': cloud_id,
-                        'resources': folder_resources
-                    }
-                    
-                    all_resources['folders'].append(folder_info)
-                    all_resources['total_instances'] += len(folder_resources.get('instances', []))
-                    all_resources['total_disks'] += len(folder_resources.get('disks', []))
-                    all_resources['total_networks'] += len(folder_resources.get('networks', []))
+                folder_info = {
+                    'folder': folder,
+                    'cloud_id': cloud_id,
+                    'resources': folder_resources
+                }
+                
+                all_resources['folders'].append(folder_info)
+                all_resources['total_instances'] += len(folder_resources.get('instances', []))
+                all_resources['total_disks'] += len(folder_resources.get('disks', []))
+                all_resources['total_networks'] += len(folder_resources.get('networks', []))
             
             logger.info(f"Discovered {all_resources['total_instances']} instances, "
                        f"{all_resources['total_disks']} disks, "
@@ -1038,14 +1075,9 @@ class YandexClient:
             Billing account details
         """
         try:
-            headers = self._get_headers()
             url = f'{self.billing_url}/billingAccounts'
             
-            response = requests.get(url, headers=headers, timeout=30)
-            response.raise_for_status()
-            
-            data = response.json()
-            accounts = data.get('billingAccounts', [])
+            accounts = self._list(url, 'billingAccounts')
             
             if accounts:
                 return accounts[0]  # Return first billing account
@@ -1097,7 +1129,6 @@ class YandexClient:
             Dict with 'skus' list and optional 'nextPageToken'
         """
         try:
-            headers = self._get_headers()
             url = f'{self.billing_url}/skus'
             
             params = {
@@ -1113,7 +1144,7 @@ class YandexClient:
             if billing_account_id:
                 params['billingAccountId'] = billing_account_id
             
-            response = requests.get(url, headers=headers, params=params, timeout=30)
+            response = self._request('GET', url, params=params)
             response.raise_for_status()
             
             return response.json()
@@ -1171,8 +1202,7 @@ class YandexClient:
                 }
             }
             
-            headers = self._get_headers()
-            response = requests.post(url, json=body, params=params, headers=headers, timeout=90)
+            response = self._request('POST', url, params=params, json_body=body, timeout=90)
             response.raise_for_status()
             
             data = response.json()
@@ -1279,6 +1309,57 @@ class YandexClient:
                 'no_data': True
             }
     
+    def get_cpu_usage_series(self, instance_ids: List[str], folder_id: str,
+                             from_time: datetime, to_time: datetime = None,
+                             interval_seconds: int = 3600) -> Dict[str, List[tuple]]:
+        """
+        Read cpu_usage for many instances with one multi-series Monitoring query
+        
+        Args:
+            instance_ids: Instance IDs in the same folder
+            folder_id: Folder the instances belong to
+            from_time: Window start (naive UTC)
+            to_time: Window end (naive UTC, default: now)
+            interval_seconds: Downsampling grid (AVG per interval)
+        
+        Returns:
+            Dict of instance ID -> [(timestamp, value)] with naive UTC timestamps;
+            instances without data are absent
+        """
+        if not instance_ids:
+            return {}
+        to_time = to_time or datetime.utcnow()
+        
+        url = f'{self.monitoring_url}/data/read'
+        params = {'folderId': folder_id}
+        selector = '|'.join(instance_ids)
+        body = {
+            'query': f'cpu_usage{{resource_id="{selector}"}}',
+            'fromTime': from_time.isoformat() + 'Z',
+            'toTime': to_time.isoformat() + 'Z',
+            'downsampling': {
+                'gridAggregation': 'AVG',
+                'gridInterval': interval_seconds * 1000
+            }
+        }
+        
+        response = self._request('POST', url, params=params, json_body=body, timeout=90)
+        response.raise_for_status()
+        
+        series: Dict[str, List[tuple]] = {}
+        for metric in response.json().get('metrics', []):
+            instance_id = (metric.get('labels') or {}).get('resource_id')
+            if instance_id not in instance_ids:
+                continue
+            timeseries = metric.get('timeseries', {})
+            points = series.setdefault(instance_id, [])
+            for ts, value in zip(timeseries.get('timestamps', []), timeseries.get('doubleValues', [])):
+                if value is None or value != value:  # skip gaps (null / NaN)
+                    continue
+                points.append((datetime.utcfromtimestamp(ts / 1000.0), float(value)))
+        
+        return series
+    
     # ============================================================================
     # MANAGED SERVICES APIs
     # ============================================================================
@@ -1300,15 +1381,10 @@ class YandexClient:
                 if not folder_id:
                     raise Exception("No folder_id available")
             
-            headers = self._get_headers()
             url = f'{self.kubernetes_url}/clusters'
             params = {'folderId': folder_id}
             
-            response = requests.get(url, headers=headers, params=params, timeout=30)
-            response.raise_for_status()
-            
-            data = response.json()
-            clusters = data.get('clusters', [])
+            clusters = self._list(url, 'clusters', params)
             
             logger.info(f"Found {len(clusters)} Kubernetes clusters in folder {folder_id}")
             
@@ -1336,10 +1412,9 @@ class YandexClient:
             Cluster details dictionary
         """
         try:
-            headers = self._get_headers()
             url = f'{self.kubernetes_url}/clusters/{cluster_id}'
             
-            response = requests.get(url, headers=headers, timeout=30)
+            response = self._request('GET', url)
             response.raise_for_status()
             
             cluster = response.json()
@@ -1361,14 +1436,9 @@ class YandexClient:
             List of node group dictionaries
         """
         try:
-            headers = self._get_headers()
             url = f'{self.kubernetes_url}/clusters/{cluster_id}/nodeGroups'
             
-            response = requests.get(url, headers=headers, timeout=30)
-            response.raise_for_status()
-            
-            data = response.json()
-            node_groups = data.get('nodeGroups', [])
+            node_groups = self._list(url, 'nodeGroups')
             
             logger.info(f"Found {len(node_groups)} node groups for cluster {cluster_id}")
             return node_groups
@@ -1394,15 +1464,10 @@ class YandexClient:
                 if not folder_id:
                     raise Exception("No folder_id available")
             
-            headers = self._get_headers()
             url = f'{self.mdb_url}/managed-postgresql/v1/clusters'
             params = {'folderId': folder_id}
             
-            response = requests.get(url, headers=headers, params=params, timeout=30)
-            response.raise_for_status()
-            
-            data = response.json()
-            clusters = data.get('clusters', [])
+            clusters = self._list(url, 'clusters', params)
             
             logger.info(f"Found {len(clusters)} PostgreSQL clusters in folder {folder_id}")
             
@@ -1415,10 +1480,7 @@ class YandexClient:
                 # Fetch hosts for this cluster
                 try:
                     hosts_url = f'{self.mdb_url}/managed-postgresql/v1/clusters/{cluster["id"]}/hosts'
-                    hosts_response = requests.get(hosts_url, headers=headers, timeout=30)
-                    if hosts_response.status_code == 200:
-                        hosts_data = hosts_response.json()
-                        cluster['hosts'] = hosts_data.get('hosts', [])
+                    cluster['hosts'] = self._list(hosts_url, 'hosts')
                 except Exception as hosts_error:
                     logger.error(f"Failed to get hosts for PostgreSQL cluster {cluster['id']}: {hosts_error}")
                     cluster['hosts'] = []
@@ -1448,15 +1510,10 @@ class YandexClient:
                 if not folder_id:
                     raise Exception("No folder_id available")
             
-            headers = self._get_headers()
             url = f'{self.mdb_url}/managed-mysql/v1/clusters'
             params = {'folderId': folder_id}
             
-            response = requests.get(url, headers=headers, params=params, timeout=30)
-            response.raise_for_status()
-            
-            data = response.json()
-            clusters = data.get('clusters', [])
+            clusters = self._list(url, 'clusters', params)
             
             logger.info(f"Found {len(clusters)} MySQL clusters in folder {folder_id}")
             
@@ -1469,10 +1526,7 @@ class YandexClient:
                 # Fetch hosts for this cluster
                 try:
                     hosts_url = f'{self.mdb_url}/managed-mysql/v1/clusters/{cluster["id"]}/hosts'
-                    hosts_response = requests.get(hosts_url, headers=headers, timeout=30)
-                    if hosts_response.status_code == 200:
-                        hosts_data = hosts_response.json()
-                        cluster['hosts'] = hosts_data.get('hosts', [])
+                    cluster['hosts'] = self._list(hosts_url, 'hosts')
                 except Exception as hosts_error:
                     logger.error(f"Failed to get hosts for MySQL cluster {cluster['id']}: {hosts_error}")
                     cluster['hosts'] = []
@@ -1502,15 +1556,10 @@ class YandexClient:
                 if not folder_id:
                     raise Exception("No folder_id available")
             
-            headers = self._get_headers()
             url = f'{self.mdb_url}/managed-kafka/v1/clusters'
             params = {'folderId': folder_id}
             
-            response = requests.get(url, headers=headers, params=params, timeout=30)
-            response.raise_for_status()
-            
-            data = response.json()
-            clusters = data.get('clusters', [])
+            clusters = self._list(url, 'clusters', params)
             
             logger.info(f"Found {len(clusters)} Kafka clusters in folder {folder_id}")
             
@@ -1523,10 +1572,7 @@ class YandexClient:
                 # Fetch hosts for this cluster
                 try:
                     hosts_url = f'{self.mdb_url}/managed-kafka/v1/clusters/{cluster["id"]}/hosts'
-                    hosts_response = requests.get(hosts_url, headers=headers, timeout=30)
-                    if hosts_response.status_code == 200:
-                        hosts_data = hosts_response.json()
-                        cluster['hosts'] = hosts_data.get('hosts', [])
+                    cluster['hosts'] = self._list(hosts_url, 'hosts')
                 except Exception as hosts_error:
                     logger.error(f"Failed to get hosts for Kafka cluster {cluster['id']}: {hosts_error}")
                     cluster['hosts'] = []
@@ -1556,15 +1602,10 @@ class YandexClient:
                 if not folder_id:
                     raise Exception("No folder_id available")
             
-            headers = self._get_headers()
             url = f'{self.mdb_url}/managed-mongodb/v1/clusters'
             params = {'folderId': folder_id}
             
-            response = requests.get(url, headers=headers, params=params, timeout=30)
-            response.raise_for_status()
-            
-            data = response.json()
-            clusters = data.get('clusters', [])
+            clusters = self._list(url, 'clusters', params)
             
             logger.info(f"Found {len(clusters)} MongoDB clusters in folder {folder_id}")
             
@@ -1598,15 +1639,10 @@ class YandexClient:
                 if not folder_id:
                     raise Exception("No folder_id available")
             
-            headers = self._get_headers()
             url = f'{self.mdb_url}/managed-clickhouse/v1/clusters'
             params = {'folderId': folder_id}
             
-            response = requests.get(url, headers=headers, params=params, timeout=30)
-            response.raise_for_status()
-            
-            data = response.json()
-            clusters = data.get('clusters', [])
+            clusters = self._list(url, 'clusters', params)
             
             logger.info(f"Found {len(clusters)} ClickHouse clusters in folder {folder_id}")
             
@@ -1640,15 +1676,10 @@ class YandexClient:
                 if not folder_id:
                     raise Exception("No folder_id available")
             
-            headers = self._get_headers()
             url = f'{self.mdb_url}/managed-redis/v1/clusters'
             params = {'folderId': folder_id}
             
-            response = requests.get(url, headers=headers, params=params, timeout=30)
-            response.raise_for_status()
-            
-            data = response.json()
-            clusters = data.get('clusters', [])
+            clusters = self._list(url, 'clusters', params)
             
             logger.info(f"Found {len(clusters)} Redis clusters in folder {folder_id}")
             
@@ -1682,16 +1713,22 @@ class YandexClient:
                 if not folder_id:
                     raise Exception("No folder_id available")
             
-            services = {
-                'kubernetes_clusters': self.list_kubernetes_clusters(folder_id),
-                'postgresql_clusters': self.list_postgresql_clusters(folder_id),
-                'mysql_clusters': self.list_mysql_clusters(folder_id),
-                'kafka_clusters': self.list_kafka_clusters(folder_id),
-                'mongodb_clusters': self.list_mongodb_clusters(folder_id),
-                'clickhouse_clusters': self.list_clickhouse_clusters(folder_id),
-                'redis_clusters': self.list_redis_clusters(folder_id)
+            listers = {
+                'kubernetes_clusters': self.list_kubernetes_clusters,
+                'postgresql_clusters': self.list_postgresql_clusters,
+                'mysql_clusters': self.list_mysql_clusters,
+                'kafka_clusters': self.list_kafka_clusters,
+                'mongodb_clusters': self.list_mongodb_clusters,
+                'clickhouse_clusters': self.list_clickhouse_clusters,
+                'redis_clusters': self.list_redis_clusters
             }
             
+            # Each service API is independent; list them concurrently
+            with ThreadPoolExecutor(max_workers=min(self.max_in_flight, len(listers)),
+                                    thread_name_prefix='yandex-api') as pool:
+                futures = {key: pool.submit(lister, folder_id) for key, lister in listers.items()}
+                services = {key: future.result() for key, future in futures.items()}
+            
             # Calculate totals
             total_clusters = sum(len(clusters) for clusters in services.values())
             logger.info(f"Found {total_clusters} managed service clusters in folder {folder_id}")
@@ -0,0 +1,116 @@
+"""
+Batched CPU statistics collection for Yandex Cloud VMs
+"""
+import logging
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core.models.resource import Resource
+from app.core.services.metrics_service import MetricsService
+from app.providers.yandex.client import YandexClient
+
+CPU_METRIC = 'cpu_usage'
+
+
+class YandexMonitoringCollector:
+    """
+    Collect VM CPU usage into the metrics store
+
+    Instances are grouped by folder and collection window, and each group is
+    read with multi-series Monitoring queries of up to `batch_size` instances.
+    The window starts at the newest stored point of each VM (at most
+    `history_days` back), so steady-state syncs only download the hours since
+    the previous one. Queries run concurrently on the client's request pool.
+    """
+
+    def __init__(self, client: YandexClient, batch_size: int = 50, history_days: int = 30,
+                 interval_seconds: int = 3600):
+        self.client = client
+        self.batch_size = max(1, int(batch_size))
+        self.history_days = history_days
+        self.interval_seconds = interval_seconds
+        self.logger = logging.getLogger(f"{__name__}.{self.__class__.__name__}")
+
+    def collect_cpu(self, vm_resources: List[Resource], default_folder_id: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Fetch new CPU points for VMs, store them and refresh the cpu_* summary tags
+
+        Args:
+            vm_resources: VM resources (resource_id is the Yandex instance ID)
+            default_folder_id: Folder used when a VM has no folder_id in its config
+
+        Returns:
+            Dict with request / point / resource counts
+        """
+        now = datetime.utcnow()
+        history_start = now - timedelta(days=self.history_days)
+        by_instance = {r.resource_id: r for r in vm_resources if r.id and r.resource_id}
+        latest = MetricsService.latest_timestamps([r.id for r in by_instance.values()], CPU_METRIC)
+
+        # (folder_id, window start) -> instance ids
+        groups: Dict[Tuple[str, datetime], List[str]] = defaultdict(list)
+        for instance_id, resource in by_instance.items():
+            folder_id = resource.get_provider_config().get('folder_id') or default_folder_id
+            if not folder_id:
+                self.logger.warning(f"No folder for VM {resource.resource_name}; skipping CPU statistics")
+                continue
+            start = max(latest.get(resource.id, history_start), history_start)
+            # Re-read the newest stored interval: it may have been partial last time
+            start = start.replace(minute=0, second=0, microsecond=0)
+            groups[(folder_id, start)].append(instance_id)
+
+        batches = [
+            (folder_id, start, ids[i:i + self.batch_size])
+            for (folder_id, start), ids in groups.items()
+            for i in range(0, len(ids), self.batch_size)
+        ]
+        stats = {'vms': len(by_instance), 'requests': len(batches), 'failed_requests': 0, 'points': 0}
+        if not batches:
+            return stats
+
+        points: Dict[int, List[Tuple[datetime, float]]] = {}
+        workers = min(self.client.max_in_flight, len(batches))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='yandex-monitoring') as pool:
+            futures = [
+                (pool.submit(self.client.get_cpu_usage_series, ids, folder_id, start, now, self.interval_seconds), ids)
+                for folder_id, start, ids in batches
+            ]
+            for future, ids in futures:
+                try:
+                    for instance_id, series in future.result().items():
+                        points[by_instance[instance_id].id] = series
+                except Exception as e:
+                    stats['failed_requests'] += 1
+                    self.logger.error(f"CPU statistics query failed for {len(ids)} VMs: {e}")
+
+        ingest_stats = MetricsService.ingest(points, CPU_METRIC, '%')
+        stats['points'] = sum(len(series) for series in points.values())
+        stats.update(ingest_stats)
+
+        summary = MetricsService.summarize([r.id for r in by_instance.values()], CPU_METRIC, history_start)
+        for resource in by_instance.values():
+            usage = summary.get(resource.id)
+            if not usage:
+                self.logger.warning(f"   ⚠️  {resource.resource_name}: No CPU data available")
+                continue
+            resource.set_tags({
+                'cpu_avg_usage': str(round(usage['avg'], 2)),
+                'cpu_max_usage': str(round(usage['max'], 2)),
+                'cpu_min_usage': str(round(usage['min'], 2)),
+                'cpu_performance_tier': self._performance_tier(usage['avg']),
+            })
+            self.logger.info(f"   ✅ {resource.resource_name}: CPU avg={round(usage['avg'], 2)}%")
+
+        stats['resources_with_data'] = len(summary)
+        return stats
+
+    @staticmethod
+    def _performance_tier(avg_cpu: float) -> str:
+        # Same thresholds as YandexClient.get_instance_cpu_statistics
+        if avg_cpu < 20:
+            return 'low'
+        if avg_cpu < 60:
+            return 'medium'
+        return 'high'
@@ -2,7 +2,9 @@
 Yandex Cloud provider service implementation
 """
 from typing import Dict, List, Any, Optional
+from flask import current_app
 from app.providers.yandex.client import YandexClient
+from app.providers.yandex.monitoring import YandexMonitoringCollector
 from app.providers.yandex.pricing import YandexPricing
 from app.providers.yandex.sku_pricing import YandexSKUPricing
 from app.core.models.provider import CloudProvider
@@ -411,37 +413,20 @@ class YandexService:
             if vm_resources and collect_stats:
                 logger.info(f"Collecting CPU statistics for {len(vm_resources)} standalone VMs...")
                 
-                for vm_resource in vm_resources:
-                    try:
-                        cpu_stats = self.client.get_instance_cpu_statistics(
-                            instance_id=vm_resource.resource_id,
-                            folder_id=folder_id,
-                            days=30
-                        )
-                        
-                        if cpu_stats and not cpu_stats.get('no_data'):
-                            vm_resource.add_tag('cpu_avg_usage', str(cpu_stats.get('avg_cpu_usage', 0)))
-                            vm_resource.add_tag('cpu_max_usage', str(cpu_stats.get('max_cpu_usage', 0)))
-                            vm_resource.add_tag('cpu_min_usage', str(cpu_stats.get('min_cpu_usage', 0)))
-                            vm_resource.add_tag('cpu_performance_tier', cpu_stats.get('performance_tier', 'unknown'))
-                            
-                            if cpu_stats.get('daily_aggregated'):
-                                daily_data = cpu_stats['daily_aggregated']
-                                raw_data = {
-                                    'dates': [d['date'] for d in daily_data],
-                                    'values': [d['value'] for d in daily_data]
-                                }
-                                vm_resource.add_tag('cpu_raw_data', json.dumps(raw_data))
-                            
-                            logger.info(f"   ✅ {vm_resource.resource_name}: CPU avg={cpu_stats.get('avg_cpu_usage')}%")
-                        else:
-                            logger.warning(f"   ⚠️  {vm_resource.resource_name}: No CPU data available")
-                    
-                    except Exception as stats_error:
-                        logger.error(f"   ❌ Error getting CPU stats for {vm_resource.resource_name}: {stats_error}")
+                try:
+                    collector = YandexMonitoringCollector(
+                        self.client,
+                        batch_size=current_app.config.get('YANDEX_MONITORING_BATCH_SIZE', 50),
+                    )
+                    stats_result = collector.collect_cpu(vm_resources, default_folder_id=folder_id)
+                    logger.info(
+                        f"Performance statistics collection completed: {stats_result.get('requests', 0)} queries, "
+                        f"{stats_result.get('points', 0)} points for {stats_result.get('resources_with_data', 0)} VMs"
+                    )
+                except Exception as stats_error:
+                    logger.error(f"   ❌ Error collecting CPU statistics: {stats_error}")
                 
                 db.session.commit()
-                logger.info(f"Performance statistics collection completed")
             
             # Update provider metadata with organization and folder info
             try:
@@ -8,6 +8,7 @@ class ChatUI {
     this.container = container;
     this.messages = [];
     this.isTyping = false;
+    this.streaming = null; // Assistant message being streamed (assistant_delta frames)
     this.wsClient = null;
     this.uploadedImages = []; // Track uploaded images for this session
     
@@ -365,9 +366,75 @@ class ChatUI {
     this.isTyping = false;
   }
   
-  receiveMessage(text) {
+  receiveDelta(messageId, text) {
     this.hideTyping();
     
+    let stream = this.streaming;
+    if (!stream || stream.id !== messageId) {
+      const emptyState = this.messagesContainer.querySelector('.chat-empty');
+      if (emptyState) {
+        emptyState.remove();
+      }
+      
+      const messageEl = document.createElement('div');
+      messageEl.className = 'chat-message assistant streaming';
+      messageEl.innerHTML = `
+        <div class="chat-message-content"></div>
+        <div class="chat-message-timestamp">${this.formatTimestamp(new Date())}</div>
+      `;
+      this.messagesContainer.appendChild(messageEl);
+      
+      stream = this.streaming = { id: messageId, el: messageEl, text: '', frame: null };
+    }
+    
+    stream.text += text;
+    
+    // Re-render at most once per frame: chunks arrive faster than the screen refreshes
+    if (!stream.frame) {
+      stream.frame = requestAnimationFrame(() => {
+        stream.frame = null;
+        stream.el.querySelector('.chat-message-content').innerHTML = this.formatMarkdown(stream.text);
+        this.scrollToBottom();
+      });
+    }
+  }
+  
+  resetDelta(messageId) {
+    const stream = this.streaming;
+    if (!stream || stream.id !== messageId) {
+      return;
+    }
+    
+    // Drop the streamed bubble; the answer streams into a new one after the tool calls
+    this.streaming = null;
+    if (stream.frame) {
+      cancelAnimationFrame(stream.frame);
+    }
+    stream.el.remove();
+    this.showTyping();
+  }
+  
+  receiveMessage(text, messageId) {
+    this.hideTyping();
+    
+    const stream = this.streaming;
+    if (stream && messageId && stream.id === messageId) {
+      // Finalize the streamed message with the complete text
+      this.streaming = null;
+      if (stream.frame) {
+        cancelAnimationFrame(stream.frame);
+      }
+      stream.el.classList.remove('streaming');
+      stream.el.querySelector('.chat-message-content').innerHTML = this.formatMarkdown(text);
+      this.messages.push({
+        role: 'assistant',
+        content: text,
+        timestamp: new Date()
+      });
+      this.scrollToBottom();
+      return;
+    }
+    
     this.addMessage({
       role: 'assistant',
       content: text,
@@ -451,6 +518,7 @@ class ChatUI {
   
   clear() {
     this.messages = [];
+    this.streaming = null;
     this.messagesContainer.innerHTML = `
       <div class="chat-empty">
         <div class="chat-empty-icon">💬</div>
@@ -113,8 +113,15 @@ class RealWebSocketClient {
       
       if (data.type === 'system') {
         this.chatUI?.addSystemMessage(data.content);
+      } else if (data.type === 'assistant_delta') {
+        // Streamed chunk of the answer in progress
+        this.chatUI?.receiveDelta(data.message_id, data.content);
+      } else if (data.type === 'assistant_reset') {
+        // Tools are running: the chunks streamed so far are replaced by the final answer
+        this.chatUI?.resetDelta(data.message_id);
       } else if (data.type === 'assistant') {
-        this.chatUI?.receiveMessage(data.content);
+        // Complete answer (replaces the streamed chunks with the same message_id)
+        this.chatUI?.receiveMessage(data.content, data.message_id);
       } else if (data.type === 'user') {
         // Show user messages from history (when reconnecting to existing session)
         if (data.content) {
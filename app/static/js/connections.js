@@ -318,6 +318,7 @@ function showRecoSummary() {
                 ['Подавлено (внедрены)', s.suppressed_implemented],
                 ['Подавлено (отложены)', s.suppressed_snoozed],
                 ['Пропущено (правило отключено)', s.skipped_rules_disabled],
+                ['Правил в секунду', s.rules_evaluated_per_second],
             ];
             let html = '';
             html += '<div class="provider-info-card">';
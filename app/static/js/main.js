@@ -292,11 +292,12 @@ function startCompleteSync(button) {
     button.innerHTML = '<i class="fa-solid fa-spinner fa-spin"></i><span>Синхронизация всех...</span>';
     button.disabled = true;
     
-    // Create AbortController for timeout (180 seconds for multiple providers with stats)
-    const controller = new AbortController();
-    const timeoutId = setTimeout(() => controller.abort(), 180000); // 180 second timeout
+    const resetButton = () => {
+        button.innerHTML = originalText;
+        button.disabled = false;
+    };
     
-    // Make complete sync request with extended timeout
+    // The sync runs as a background job: queue it, then follow its progress stream
     fetch('/api/complete-sync', {
         method: 'POST',
         headers: {
@@ -304,14 +305,56 @@ function startCompleteSync(button) {
         },
         body: JSON.stringify({
             sync_type: 'manual'
-        }),
-        signal: controller.signal
+        })
     })
-    .then(response => {
-        clearTimeout(timeoutId); // Clear timeout on response
-        return response.json();
+    .then(response => response.json().then(data => ({ status: response.status, data })))
+    .then(({ status, data }) => {
+        if (data.success || (status === 409 && data.events_url)) {
+            // 409: a sync is already running for this user - follow it instead of starting another
+            if (status === 409) {
+                showFlashMessage('ℹ️ Синхронизация уже выполняется, показываем её прогресс', 'info');
+            }
+            followCompleteSyncJob(data.events_url, button, resetButton);
+        } else {
+            showFlashMessage('❌ Ошибка полной синхронизации: ' + (data.error || data.message), 'error');
+            resetButton();
+        }
     })
-    .then(data => {
+    .catch(error => {
+        showFlashMessage('❌ Ошибка полной синхронизации: ' + (error.message || 'Неизвестная ошибка'), 'error');
+        console.error('Complete sync error:', error);
+        resetButton();
+    });
+}
+
+/**
+ * Show a sync job's per-provider progress on the button until it finishes
+ * @param {string} eventsUrl - Server-sent events URL of the job
+ * @param {HTMLElement} button - Sync button
+ * @param {Function} resetButton - Restores the button after a failure
+ */
+function followCompleteSyncJob(eventsUrl, button, resetButton) {
+    const source = new EventSource(eventsUrl);
+    
+    source.addEventListener('progress', event => {
+        const progress = JSON.parse(event.data).progress || {};
+        let label = 'Синхронизация всех...';
+        if (progress.stage === 'queued') {
+            label = 'В очереди...';
+        } else if (progress.stage === 'analytics' || progress.stage === 'recommendations') {
+            label = 'Анализ и рекомендации...';
+        } else if (progress.total) {
+            const running = (progress.providers || []).filter(p => p.status === 'running').map(p => p.name);
+            label = `Провайдеры ${progress.completed}/${progress.total}` + (running.length ? `: ${running.join(', ')}` : '');
+        }
+        button.innerHTML = `<i class="fa-solid fa-spinner fa-spin"></i><span>${label}</span>`;
+    });
+    
+    source.addEventListener('done', event => {
+        source.close();
+        const job = JSON.parse(event.data);
+        const data = job.result || {};
+        
         if (data.success) {
             // Show success message with aggregated results
             let message = `✅ Полная синхронизация завершена!<br>`;
@@ -332,24 +375,22 @@ function startCompleteSync(button) {
             setTimeout(() => {
                 location.reload();
             }, 2000);
+        } else if (job.status === 'cancelled') {
+            showFlashMessage('⚠️ Синхронизация отменена', 'warning');
+            resetButton();
         } else {
-            showFlashMessage('❌ Ошибка полной синхронизации: ' + (data.error || data.message), 'error');
-            button.innerHTML = originalText;
-            button.disabled = false;
+            showFlashMessage('❌ Ошибка полной синхронизации: ' + (job.error_message || data.error || data.message), 'error');
+            resetButton();
+        }
+    });
+    
+    source.addEventListener('error', event => {
+        // Network errors reconnect automatically; an error event with data comes from the server
+        if (event.data) {
+            source.close();
+            showFlashMessage('❌ Ошибка полной синхронизации: ' + JSON.parse(event.data).error, 'error');
+            resetButton();
         }
-    })
-    .catch(error => {
-        clearTimeout(timeoutId); // Clear timeout on error
-        
-        const isTimeout = error.name === 'AbortError';
-        const errorMessage = isTimeout
-            ? 'Превышено время ожидания (>180 сек) - синхронизация может продолжаться на сервере'
-            : error.message || 'Неизвестная ошибка';
-        
-        showFlashMessage('❌ Ошибка полной синхронизации: ' + errorMessage, 'error');
-        console.error('Complete sync error:', error);
-        button.innerHTML = originalText;
-        button.disabled = false;
     });
 }
 
@@ -15,9 +15,9 @@ const qsa = (s, el=document) => Array.from(el.querySelectorAll(s));
 // ============================================================================
 
 const state = { 
-    page: 1, 
     page_size: 25, 
     order_by: '-estimated_monthly_savings',
+    next_cursor: null,
     allRecommendations: []
 };
 
@@ -31,16 +31,20 @@ if (window.INFRAZEN_DATA && window.INFRAZEN_DATA.isDemoUser) {
 // Query Building
 // ============================================================================
 
-function buildQuery(){
+function buildQuery(cursor){
     const params = new URLSearchParams();
-    ['q','provider','status','severity','type','resource_type'].forEach(k=>{
+    ['provider','status','severity','type','resource_type'].forEach(k=>{
         const v = qs('#'+k)?.value?.trim(); 
         if(v) params.set(k, v);
     });
-    params.set('page', state.page); 
+    // Search runs on the server (case-folded, Cyrillic-aware)
+    const searchTerm = qs('#search')?.value?.trim();
+    if (searchTerm) params.set('q', searchTerm);
     params.set('page_size', state.page_size); 
     params.set('order_by', state.order_by);
     history.replaceState(null, '', '?'+params.toString());
+    // Keyset pagination: empty cursor = first page
+    params.set('cursor', cursor || '');
     return params.toString();
 }
 
@@ -182,9 +186,9 @@ function cardTemplate(rec){
 // Data Loading
 // ============================================================================
 
-async function load(){
+async function load(append = false){
     try {
-        const queryString = buildQuery();
+        const queryString = buildQuery(append ? state.next_cursor : '');
         const res = await fetch('/api/recommendations?'+queryString);
         
         if (!res.ok) {
@@ -198,26 +202,19 @@ async function load(){
             return;
         }
         
-        // Store all recommendations for client-side filtering
-        state.allRecommendations = data.items || [];
-        
-        // Apply client-side search filter if search term exists
-        let items = data.items || [];
-        const searchTerm = qs('#search')?.value?.trim();
-        if (searchTerm) {
-            const searchLower = searchTerm.toLowerCase();
-            items = items.filter(rec => 
-                (rec.title || '').toLowerCase().includes(searchLower) ||
-                (rec.description || '').toLowerCase().includes(searchLower) ||
-                (rec.resource_name || '').toLowerCase().includes(searchLower)
-            );
-        }
+        // Filtering and search are applied by the API
+        const items = data.items || [];
+        state.next_cursor = data.next_cursor || null;
+        state.allRecommendations = append ? state.allRecommendations.concat(items) : items;
         
-        if (items.length === 0) {
+        if (state.allRecommendations.length === 0) {
             list.innerHTML = '<div style="padding: 2rem; text-align: center; color: #666;">Рекомендации не найдены. Попробуйте изменить фильтры или обновить страницу.</div>';
+        } else if (append) {
+            list.insertAdjacentHTML('beforeend', items.map(cardTemplate).join(''));
         } else {
             list.innerHTML = items.map(cardTemplate).join('');
         }
+        renderLoadMore();
         
         enableBulkButtons();
     } catch (error) {
@@ -229,33 +226,20 @@ async function load(){
     }
 }
 
-// ============================================================================
-// Filtering
-// ============================================================================
-
-function filterRecommendations() {
-    const list = qs('#recsList');
-    if (!list || !state.allRecommendations) return;
-    
-    const searchTerm = qs('#search')?.value?.trim();
-    let items = state.allRecommendations;
-    
-    if (searchTerm) {
-        const searchLower = searchTerm.toLowerCase();
-        items = items.filter(rec => 
-            (rec.title || '').toLowerCase().includes(searchLower) ||
-            (rec.description || '').toLowerCase().includes(searchLower) ||
-            (rec.resource_name || '').toLowerCase().includes(searchLower)
-        );
+function renderLoadMore() {
+    let button = qs('#recsLoadMore');
+    if (!state.next_cursor) {
+        if (button) button.remove();
+        return;
     }
-    
-    if (items.length === 0) {
-        list.innerHTML = '<div style="padding: 2rem; text-align: center; color: #666;">Рекомендации не найдены. Попробуйте изменить фильтры или обновить страницу.</div>';
-    } else {
-        list.innerHTML = items.map(cardTemplate).join('');
+    if (!button) {
+        button = document.createElement('button');
+        button.id = 'recsLoadMore';
+        button.className = 'btn btn-secondary';
+        button.textContent = 'Показать ещё';
+        button.addEventListener('click', ()=>load(true));
+        qs('#recsList').after(button);
     }
-    
-    enableBulkButtons();
 }
 
 // ============================================================================
@@ -324,8 +308,11 @@ async function toggleDetails(id){
         // Fallback to original insights/metrics display
         const insights = rec.insights || '';
         const metrics = rec.metrics_snapshot || '';
+        // AI text is generated in the background after sync
+        const aiPending = window.INFRAZEN_DATA?.enableAIRecommendations && !rec.ai_generated_at;
         
         box.innerHTML = `
+            ${aiPending ? '<div style="font-size:13px;color:#6b7280;margin-bottom:8px;">⏳ Описание от FinOps-ассистента готовится…</div>' : ''}
             <div class="rec-split">
                 <div>
                     <div style="font-weight:600; margin-bottom:4px;">Пояснения</div>
@@ -352,17 +339,8 @@ function exportToCSV() {
         return;
     }
     
-    // Apply current filters to get the filtered data
+    // Apply current filters to get the filtered data (search is already applied by the API)
     let items = state.allRecommendations;
-    const searchTerm = qs('#search')?.value?.trim();
-    if (searchTerm) {
-        const searchLower = searchTerm.toLowerCase();
-        items = items.filter(rec => 
-            (rec.title || '').toLowerCase().includes(searchLower) ||
-            (rec.description || '').toLowerCase().includes(searchLower) ||
-            (rec.resource_name || '').toLowerCase().includes(searchLower)
-        );
-    }
     
     // Apply other filters
     const provider = qs('#provider')?.value;
@@ -447,7 +425,7 @@ function initializeEventListeners() {
     ['#provider','#status','#severity','#type','#resource_type'].forEach(sel=>{
         const element = qs(sel);
         if (element) {
-            element.addEventListener('change', ()=>{state.page=1; load();});
+            element.addEventListener('change', ()=>load());
         }
     });
     
@@ -465,12 +443,9 @@ function initializeEventListeners() {
         searchInput.addEventListener('input', ()=>{
             clearTimeout(searchTimeout);
             searchTimeout = setTimeout(()=>{
-                filterRecommendations();
+                load();
             }, 300);
         });
-        searchInput.addEventListener('change', ()=>{
-            filterRecommendations();
-        });
     }
     
     // Select all checkbox
@@ -514,7 +489,7 @@ function initializeEventListeners() {
         const urlp = new URLSearchParams(location.search);
         ['q','provider','status','severity','type','resource_type'].forEach(k=>{ 
             if(urlp.get(k)) {
-                const el = qs('#'+k);
+                const el = qs(k === 'q' ? '#search' : '#'+k);
                 if (el) el.value = urlp.get(k);
             }
         });
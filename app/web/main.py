@@ -13,10 +13,10 @@ from app.core.utils.mock_data import get_overview
 from app.core.database import db
 from app.core.models.provider import CloudProvider
 from app.core.models.resource import Resource
-from app.core.models.sync import SyncSnapshot
 from app.core.models.user import User
 from app.core.models.provider_catalog import ProviderCatalog
 from app.core.services import report_service
+from app.core.services.page_data_service import UserPageData
 
 main_bp = Blueprint('main', __name__)
 
@@ -136,136 +136,9 @@ def connections():
     user = session['user']
     is_demo_user = user.get('email') == 'demo@infrazen.com'
     
-    if is_demo_user:
-        # Demo user: show real database data (seeded data)
-        # Get real providers from database (exclude soft-deleted)
-        all_providers = CloudProvider.query.filter_by(is_deleted=False).all()
-        user_id_int = int(float(user['id']))
-        cloud_providers = [p for p in all_providers if int(float(p.user_id)) == user_id_int]
-        
-        # Convert to provider format
-        providers = []
-        for provider in cloud_providers:
-            # Get resource counts for this provider
-            resource_count = Resource.query.filter_by(provider_id=provider.id).count()
-            
-            # Get resource count from last successful sync snapshot
-            last_snapshot = SyncSnapshot.query.filter_by(
-                provider_id=provider.id, 
-                sync_status='success'
-            ).order_by(SyncSnapshot.sync_completed_at.desc()).first()
-            last_snapshot_resources = last_snapshot.total_resources_found if last_snapshot else 0
-            
-            # Calculate provider costs from latest sync snapshot (billing-first approach)
-            total_daily_cost = 0.0
-            total_monthly_cost = 0.0
-            
-            if last_snapshot:
-                # Use cost from sync snapshot if available (billing-first approach)
-                if last_snapshot.total_monthly_cost and last_snapshot.total_monthly_cost > 0:
-                    # Use validated cost from sync snapshot (stored as daily cost)
-                    total_daily_cost = last_snapshot.total_monthly_cost
-                    total_monthly_cost = total_daily_cost * 30  # Convert daily to monthly
-                else:
-                    # Fallback to resource-based calculation for old syncs
-                    provider_resources = Resource.query.filter_by(provider_id=provider.id, is_active=True).all()
-                    total_daily_cost = sum(resource.daily_cost or 0 for resource in provider_resources)
-                    total_monthly_cost = sum((resource.daily_cost or 0) * 30 for resource in provider_resources)
-            else:
-                # No sync snapshot - use resource table
-                provider_resources = Resource.query.filter_by(provider_id=provider.id, is_active=True).all()
-                total_daily_cost = sum(resource.daily_cost or 0 for resource in provider_resources)
-                total_monthly_cost = sum((resource.daily_cost or 0) * 30 for resource in provider_resources)
-            
-            providers.append({
-                'id': f"{provider.provider_type}-{provider.id}",
-                'code': provider.provider_type,
-                'name': provider.provider_type.title(),
-                'provider_type': provider.provider_type,
-                'connection_name': provider.connection_name,
-                'status': 'connected' if provider.is_active else 'disconnected',
-                'last_sync': provider.last_sync,
-                'sync_status': provider.sync_status,
-                'sync_error': provider.sync_error,
-                'auto_sync': provider.auto_sync,
-                'added_at': provider.created_at.strftime('%d.%m.%Y в %H:%M') if provider.created_at else '01.01.2024 в 00:00',
-                'provider_metadata': provider.provider_metadata,
-                'total_daily_cost': round(total_daily_cost, 2),
-                'total_monthly_cost': round(total_monthly_cost, 2),
-                'last_snapshot_resources': last_snapshot_resources,
-                'resource_count': resource_count,
-                'sync_interval': provider.sync_interval,
-                'details': {
-                    'connection_name': provider.connection_name,
-                    'account_id': provider.account_id,
-                    'resource_count': resource_count,
-                    'last_sync': provider.last_sync.isoformat() if provider.last_sync else None
-                }
-            })
-    else:
-        # Real user: show only real database connections using unified models
-        
-        # Get real providers from database (exclude soft-deleted)
-        all_providers = CloudProvider.query.filter_by(is_deleted=False).all()
-        user_id_int = int(float(user['id']))
-        cloud_providers = [p for p in all_providers if int(float(p.user_id)) == user_id_int]
-        
-        # Convert to provider format
-        providers = []
-        for provider in cloud_providers:
-            # Get resource counts for this provider
-            resource_count = Resource.query.filter_by(provider_id=provider.id).count()
-            
-            # Get resource count from last successful sync snapshot
-            last_snapshot = SyncSnapshot.query.filter_by(
-                provider_id=provider.id, 
-                sync_status='success'
-            ).order_by(SyncSnapshot.sync_completed_at.desc()).first()
-            last_snapshot_resources = last_snapshot.total_resources_found if last_snapshot else 0
-            
-            # Calculate provider costs from latest sync snapshot (billing-first approach)
-            total_daily_cost = 0.0
-            total_monthly_cost = 0.0
-            
-            if last_snapshot:
-                # Use cost from sync snapshot if available (billing-first approach)
-                if last_snapshot.total_monthly_cost and last_snapshot.total_monthly_cost > 0:
-                    # Use validated cost from sync snapshot (stored as daily cost)
-                    total_daily_cost = last_snapshot.total_monthly_cost
-                    total_monthly_cost = total_daily_cost * 30  # Convert daily to monthly
-                else:
-                    # Fallback to resource-based calculation for old syncs
-                    provider_resources = Resource.query.filter_by(provider_id=provider.id, is_active=True).all()
-                    total_daily_cost = sum(resource.daily_cost or 0 for resource in provider_resources)
-                    total_monthly_cost = sum((resource.daily_cost or 0) * 30 for resource in provider_resources)
-            else:
-                # No sync snapshot - use resource table
-                provider_resources = Resource.query.filter_by(provider_id=provider.id, is_active=True).all()
-                total_daily_cost = sum(resource.daily_cost or 0 for resource in provider_resources)
-                total_monthly_cost = sum((resource.daily_cost or 0) * 30 for resource in provider_resources)
-            
-            providers.append({
-                'id': f"{provider.provider_type}-{provider.id}",
-                'code': provider.provider_type,
-                'name': provider.provider_type.title(),
-                'provider_type': provider.provider_type,  # Add this field for template
-                'connection_name': provider.connection_name,
-                'status': 'connected' if provider.is_active else 'disconnected',
-                'last_sync': provider.last_sync,
-                'sync_error': provider.sync_error,  # Add sync_error for partial sync warnings
-                'auto_sync': provider.auto_sync,  # Add auto_sync field for template
-                'added_at': provider.created_at.strftime('%d.%m.%Y в %H:%M') if provider.created_at else '01.01.2024 в 00:00',
-                'provider_metadata': provider.provider_metadata,  # Add this line
-                'total_daily_cost': round(total_daily_cost, 2),
-                'total_monthly_cost': round(total_monthly_cost, 2),
-                'last_snapshot_resources': last_snapshot_resources,  # Add resource count from last snapshot
-                'details': {
-                    'connection_name': provider.connection_name,
-                    'account_id': provider.account_id,
-                    'resource_count': resource_count,
-                    'last_sync': provider.last_sync.isoformat() if provider.last_sync else None
-                }
-            })
+    # Demo and real users both see their database connections (seeded data for demo)
+    user_id_int = int(float(user['id']))
+    providers = get_connection_cards(UserPageData(user_id_int))
     
     # Get enabled providers from catalog for "Available Providers" section
     enabled_providers = ProviderCatalog.query.filter_by(is_enabled=True).all()
@@ -319,14 +192,15 @@ def resources():
         try:
             # Use the string user_id directly
             user_id_str = user['id']
-            resources = get_real_user_resources(user_id_str)
-            providers = get_real_user_providers(user_id_str)
+            page_data = UserPageData(user_id_str)
+            resources = get_real_user_resources(user_id_str, page_data)
+            providers = get_real_user_providers(user_id_str, page_data)
             # Get latest snapshot metadata for performance data
-            snapshot_metadata = get_latest_snapshot_metadata(user_id_str)
+            snapshot_metadata = get_latest_snapshot_metadata(user_id_str, page_data)
             # Group resources by provider
             resources_by_provider = {}
             for resource in resources:
-                provider_id = resource.provider.id
+                provider_id = resource.provider_id
                 if provider_id not in resources_by_provider:
                     resources_by_provider[provider_id] = []
                 resources_by_provider[provider_id].append(resource)
@@ -343,14 +217,15 @@ def resources():
         try:
             # Use the string user_id directly
             user_id_str = user['id']
-            resources = get_real_user_resources(user_id_str)
-            providers = get_real_user_providers(user_id_str)
+            page_data = UserPageData(user_id_str)
+            resources = get_real_user_resources(user_id_str, page_data)
+            providers = get_real_user_providers(user_id_str, page_data)
             # Get latest snapshot metadata for performance data
-            snapshot_metadata = get_latest_snapshot_metadata(user_id_str)
+            snapshot_metadata = get_latest_snapshot_metadata(user_id_str, page_data)
             # Group resources by provider
             resources_by_provider = {}
             for resource in resources:
-                provider_id = resource.provider.id
+                provider_id = resource.provider_id
                 if provider_id not in resources_by_provider:
                     resources_by_provider[provider_id] = []
                 resources_by_provider[provider_id].append(resource)
@@ -368,6 +243,12 @@ def resources():
     user_id_int = int(float(user['id']))
     last_complete_sync = CompleteSync.query.filter_by(user_id=user_id_int).order_by(CompleteSync.sync_completed_at.desc()).first()
     
+    # Daily CPU/memory chart data and CPU percentiles from the metric rollups
+    from app.core.services.metrics_service import MetricsService
+    resource_ids = [r.id for r in resources]
+    metric_series = MetricsService.daily_series(resource_ids, ['cpu_usage', 'memory_usage'])
+    cpu_profiles = MetricsService.usage_profiles(resource_ids, 'cpu_usage')
+    
     return render_template('resources.html', 
                         user=user,
                         active_page='resources',
@@ -378,6 +259,8 @@ def resources():
                         resources_by_provider=resources_by_provider,
                         snapshot_metadata=snapshot_metadata,
                         last_complete_sync=last_complete_sync,
+                        metric_series=metric_series,
+                        cpu_profiles=cpu_profiles,
                         is_demo_user=is_demo_user)
 
 @main_bp.route('/analytics')
@@ -522,11 +405,62 @@ def agent_test():
     return render_template('agent_test.html')
 
 # Helper functions for real user data
-def get_real_user_overview(user_id):
+def get_connection_cards(page_data):
+    """Provider cards for the connections page, built from batched page data"""
+    resource_counts = page_data.resource_counts()
+    last_snapshots = page_data.latest_snapshots('sync_completed_at')
+    active_daily_costs = page_data.active_daily_costs()
+    
+    providers = []
+    for provider in page_data.providers:
+        resource_count = resource_counts.get(provider.id, 0)
+        
+        # Resource count from last successful sync snapshot
+        last_snapshot = last_snapshots.get(provider.id)
+        last_snapshot_resources = last_snapshot.total_resources_found if last_snapshot else 0
+        
+        # Calculate provider costs from latest sync snapshot (billing-first approach)
+        if last_snapshot and last_snapshot.total_monthly_cost and last_snapshot.total_monthly_cost > 0:
+            # Use validated cost from sync snapshot (stored as daily cost)
+            total_daily_cost = last_snapshot.total_monthly_cost
+        else:
+            # Old syncs or no snapshot - use resource table
+            total_daily_cost = active_daily_costs.get(provider.id, 0.0)
+        total_monthly_cost = total_daily_cost * 30  # Convert daily to monthly
+        
+        providers.append({
+            'id': f"{provider.provider_type}-{provider.id}",
+            'code': provider.provider_type,
+            'name': provider.provider_type.title(),
+            'provider_type': provider.provider_type,
+            'connection_name': provider.connection_name,
+            'status': 'connected' if provider.is_active else 'disconnected',
+            'last_sync': provider.last_sync,
+            'sync_status': provider.sync_status,
+            'sync_error': provider.sync_error,
+            'auto_sync': provider.auto_sync,
+            'added_at': provider.created_at.strftime('%d.%m.%Y в %H:%M') if provider.created_at else '01.01.2024 в 00:00',
+            'provider_metadata': provider.provider_metadata,
+            'total_daily_cost': round(total_daily_cost, 2),
+            'total_monthly_cost': round(total_monthly_cost, 2),
+            'last_snapshot_resources': last_snapshot_resources,
+            'resource_count': resource_count,
+            'sync_interval': provider.sync_interval,
+            'details': {
+                'connection_name': provider.connection_name,
+                'account_id': provider.account_id,
+                'resource_count': resource_count,
+                'last_sync': provider.last_sync.isoformat() if provider.last_sync else None
+            }
+        })
+    return providers
+
+def get_real_user_overview(user_id, page_data=None):
     """Get overview data for a real user from database using unified models"""
     
     # Get user's unified cloud providers (exclude soft-deleted)
-    providers = CloudProvider.query.filter_by(user_id=user_id, is_deleted=False).all()
+    page_data = page_data or UserPageData(user_id)
+    providers = page_data.providers
     
     # Calculate totals
     total_connections = len(providers)
@@ -544,16 +478,13 @@ def get_real_user_overview(user_id):
     else:
         # Fallback to provider metadata calculation
         total_expenses_rub = 0
-        active_resources = 0
+        active_resources = sum(page_data.resource_counts(status='active').values())
         
         for provider in providers:
             # Assuming provider_metadata contains billing_info and recommendations
             if provider.provider_metadata:
                 metadata = json.loads(provider.provider_metadata)
                 total_expenses_rub += metadata.get('total_monthly_cost', 0)
-            
-            # Count active resources for this provider
-            active_resources += Resource.query.filter_by(provider_id=provider.id, status='active').count()
     
     # Calculate potential savings from optimization recommendations
     from app.core.models.recommendations import OptimizationRecommendation
@@ -586,15 +517,24 @@ def get_real_user_overview(user_id):
         'network': {'used_tb': 2, 'limit_tb': 10, 'percent': 20}
     }
     
+    # CPU load across servers from the 30-day metric rollups (when metrics were collected)
+    from app.core.services.metrics_service import MetricsService
+    server_ids = [rid for (rid,) in Resource.query.with_entities(Resource.id).filter(
+        Resource.provider_id.in_(provider_ids),
+        Resource.is_active == True,
+        Resource.resource_type.in_(['server', 'vm'])
+    ).all()] if provider_ids else []
+    cpu_profiles = MetricsService.usage_profiles(server_ids, 'cpu_usage')
+    if cpu_profiles:
+        usage['cpu']['percent'] = round(sum(p['avg'] for p in cpu_profiles.values()) / len(cpu_profiles), 1)
+        usage['cpu']['p95'] = round(sum(p['p95'] for p in cpu_profiles.values()) / len(cpu_profiles), 1)
+    
     # Format providers for dashboard display
     formatted_providers = []
-    from app.core.models.sync import SyncSnapshot
+    latest_snapshots = page_data.latest_snapshots('created_at')
     for provider in providers:
-        # Find latest successful snapshot to get the most accurate monthly cost
-        latest_snapshot = SyncSnapshot.query.filter_by(
-            provider_id=provider.id,
-            sync_status='success'
-        ).order_by(SyncSnapshot.created_at.desc()).first()
+        # Latest successful snapshot has the most accurate monthly cost
+        latest_snapshot = latest_snapshots.get(provider.id)
 
         monthly_cost = 0.0
         if latest_snapshot:
@@ -603,8 +543,7 @@ def get_real_user_overview(user_id):
                 monthly_cost = float(latest_snapshot.total_monthly_cost) * 30.0
             else:
                 # Fallback: sum resource daily costs and convert to monthly
-                provider_resources = Resource.query.filter_by(provider_id=provider.id, is_active=True).all()
-                monthly_cost = sum((r.daily_cost or 0) * 30 for r in provider_resources)
+                monthly_cost = page_data.active_daily_costs().get(provider.id, 0.0) * 30
         elif provider.provider_metadata:
             try:
                 metadata = json.loads(provider.provider_metadata)
@@ -643,128 +582,14 @@ def get_real_user_overview(user_id):
         'usage': usage
     }
 
-def get_real_user_resources(user_id):
+def get_real_user_resources(user_id, page_data=None):
     """Get resources for a real user from database - show resources from latest snapshot for each provider"""
-    from app.core.models.sync import SyncSnapshot, ResourceState
-    
-    # Get all providers and filter by user_id in Python to avoid floating point precision issues (exclude soft-deleted)
-    all_providers = CloudProvider.query.filter_by(is_deleted=False).all()
-    # Convert scientific notation to integer string for comparison
-    user_id_int = int(float(user_id))
-    providers = [p for p in all_providers if int(float(p.user_id)) == user_id_int]
-    all_resources = []
-    
-    for provider in providers:
-        # Get the latest successful sync snapshot for this provider that has ResourceState entries
-        # This ensures we use the snapshot created by YandexService (with ResourceState), not the orchestrator's
-        latest_snapshot = SyncSnapshot.query.filter_by(
-            provider_id=provider.id, 
-            sync_status='success'
-        ).order_by(SyncSnapshot.created_at.desc()).first()
-        
-        if latest_snapshot:
-            # Get resources from the snapshot WITH ResourceState entries (correct architecture)
-            resource_states = ResourceState.query.filter_by(
-                sync_snapshot_id=latest_snapshot.id
-            ).all()
-            
-            # If no ResourceState entries, try to find another snapshot from same time with entries
-            if len(resource_states) == 0 and latest_snapshot.created_at:
-                # Look for snapshots created within 5 seconds of this one (YandexService creates a second snapshot)
-                from datetime import timedelta
-                time_window_start = latest_snapshot.created_at - timedelta(seconds=5)
-                time_window_end = latest_snapshot.created_at + timedelta(seconds=5)
-                
-                alternate_snapshots = SyncSnapshot.query.filter(
-                    SyncSnapshot.provider_id == provider.id,
-                    SyncSnapshot.sync_status == 'success',
-                    SyncSnapshot.created_at >= time_window_start,
-                    SyncSnapshot.created_at <= time_window_end,
-                    SyncSnapshot.id != latest_snapshot.id
-                ).order_by(SyncSnapshot.created_at.desc()).all()
-                
-                # Find the one with ResourceState entries
-                for alt_snapshot in alternate_snapshots:
-                    alt_resource_states = ResourceState.query.filter_by(
-                        sync_snapshot_id=alt_snapshot.id
-                    ).all()
-                    if len(alt_resource_states) > 0:
-                        latest_snapshot = alt_snapshot
-                        resource_states = alt_resource_states
-                        break
-            
-            # Get the actual Resource objects
-            resource_ids = [rs.resource_id for rs in resource_states if rs.resource_id]
-            if resource_ids:
-                provider_resources = Resource.query.filter(Resource.id.in_(resource_ids)).all()
-                
-                # Separate resources with and without performance data
-                resources_with_performance = []
-                resources_without_performance = []
-                
-                for resource in provider_resources:
-                    tags = resource.get_all_tags()
-                    has_performance = 'cpu_avg_usage' in tags or 'memory_avg_usage_mb' in tags
-                    
-                    if has_performance:
-                        resources_with_performance.append(resource)
-                    else:
-                        resources_without_performance.append(resource)
-                
-                # Add performance resources first, then others
-                all_resources.extend(resources_with_performance)
-                all_resources.extend(resources_without_performance)
-            else:
-                # Snapshot exists but has no resource states - fall back to direct resources
-                provider_resources = Resource.query.filter_by(provider_id=provider.id).all()
-                
-                # Separate resources with and without performance data
-                resources_with_performance = []
-                resources_without_performance = []
-                
-                for resource in provider_resources:
-                    tags = resource.get_all_tags()
-                    has_performance = 'cpu_avg_usage' in tags or 'memory_avg_usage_mb' in tags
-                    
-                    if has_performance:
-                        resources_with_performance.append(resource)
-                    else:
-                        resources_without_performance.append(resource)
-                
-                # Add performance resources first, then others
-                all_resources.extend(resources_with_performance)
-                all_resources.extend(resources_without_performance)
-        else:
-            # Fallback: if no snapshots, show all resources (for backward compatibility)
-            provider_resources = Resource.query.filter_by(provider_id=provider.id).all()
-            
-            # Separate resources with and without performance data
-            resources_with_performance = []
-            resources_without_performance = []
-            
-            for resource in provider_resources:
-                tags = resource.get_all_tags()
-                has_performance = 'cpu_avg_usage' in tags or 'memory_avg_usage_mb' in tags
-                
-                if has_performance:
-                    resources_with_performance.append(resource)
-                else:
-                    resources_without_performance.append(resource)
-            
-            # Add performance resources first, then others
-            all_resources.extend(resources_with_performance)
-            all_resources.extend(resources_without_performance)
-    
-    return all_resources
+    page_data = page_data or UserPageData(user_id)
+    return page_data.snapshot_resources()
 
-def get_real_user_providers(user_id):
+def get_real_user_providers(user_id, page_data=None):
     """Get providers for a real user from database using unified models"""
-    
-    # Get all providers and filter by user_id in Python to avoid floating point precision issues (exclude soft-deleted)
-    all_providers = CloudProvider.query.filter_by(is_deleted=False).all()
-    # Convert scientific notation to integer string for comparison
-    user_id_int = int(float(user_id))
-    providers = [p for p in all_providers if int(float(p.user_id)) == user_id_int]
+    page_data = page_data or UserPageData(user_id)
     
     return [{
         'id': provider.id,  # Use the actual database ID
@@ -779,27 +604,20 @@ def get_real_user_providers(user_id):
             'account_id': provider.account_id,
             'last_sync': provider.last_sync.isoformat() if provider.last_sync else None
         }
-    } for provider in providers]
+    } for provider in page_data.providers]
 
-def get_latest_snapshot_metadata(user_id):
+def get_latest_snapshot_metadata(user_id, page_data=None):
     """Get the latest snapshot metadata for performance data"""
-    from app.core.models.sync import SyncSnapshot
     import json
     
-    # Get all providers and filter by user_id in Python to avoid floating point precision issues (exclude soft-deleted)
-    all_providers = CloudProvider.query.filter_by(is_deleted=False).all()
-    # Convert scientific notation to integer string for comparison
-    user_id_int = int(float(user_id))
-    providers = [p for p in all_providers if int(float(p.user_id)) == user_id_int]
+    page_data = page_data or UserPageData(user_id)
     metadata = {}
+    latest_snapshots = page_data.latest_snapshots('sync_completed_at')
     
-    for provider in providers:
+    for provider in page_data.providers:
         if provider.last_sync:
-            # Get the latest successful sync snapshot for this provider
-            latest_snapshot = SyncSnapshot.query.filter(
-                SyncSnapshot.provider_id == provider.id,
-                SyncSnapshot.sync_status == 'success'
-            ).order_by(SyncSnapshot.sync_completed_at.desc()).first()
+            # Latest successful sync snapshot for this provider
+            latest_snapshot = latest_snapshots.get(provider.id)
             
             if latest_snapshot and latest_snapshot.metadata:
                 # Ensure metadata is JSON serializable by converting to dict
@@ -0,0 +1,87 @@
+"""add recommendation search text and keyset indexes
+
+Revision ID: 5d0a3f7e9b14
+Revises: e4b8a19c3d52
+Create Date: 2026-10-16 19:00:00.000000
+
+"""
+import re
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d0a3f7e9b14'
+down_revision: Union[str, Sequence[str], None] = 'e4b8a19c3d52'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 1000
+
+
+def _fold(text):
+    # Same folding as OptimizationRecommendation.normalize_search
+    if not text:
+        return ''
+    return re.sub(r'\s+', ' ', str(text).casefold().replace('ё', 'е')).strip()
+
+
+def upgrade() -> None:
+    """Normalized search column for server-side search and composite indexes for keyset pages."""
+    op.add_column('optimization_recommendations', sa.Column('search_text', sa.Text(), nullable=True))
+
+    bind = op.get_bind()
+    recs = sa.table(
+        'optimization_recommendations',
+        sa.column('id', sa.Integer),
+        sa.column('title', sa.String),
+        sa.column('description', sa.Text),
+        sa.column('resource_name', sa.String),
+        sa.column('search_text', sa.Text),
+        sa.column('estimated_monthly_savings', sa.Float),
+    )
+    bind.execute(
+        recs.update().where(recs.c.estimated_monthly_savings.is_(None)).values(estimated_monthly_savings=0.0)
+    )
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(recs.c.id, recs.c.title, recs.c.description, recs.c.resource_name)
+            .where(recs.c.id > last_id).order_by(recs.c.id).limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        bind.execute(
+            recs.update().where(recs.c.id == sa.bindparam('rec_id')).values(search_text=sa.bindparam('text')),
+            [{'rec_id': row.id, 'text': '\n'.join(_fold(p) for p in (row.title, row.description, row.resource_name) if p)}
+             for row in rows]
+        )
+        last_id = rows[-1].id
+
+    op.create_index(
+        'ix_recommendations_provider_status_savings',
+        'optimization_recommendations',
+        ['provider_id', 'status', 'estimated_monthly_savings', 'id'],
+        unique=False,
+    )
+    op.create_index(
+        'ix_recommendations_provider_status_created',
+        'optimization_recommendations',
+        ['provider_id', 'status', 'created_at', 'id'],
+        unique=False,
+    )
+    op.create_index(
+        'ix_recommendations_provider_type_severity',
+        'optimization_recommendations',
+        ['provider_id', 'recommendation_type', 'severity'],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_recommendations_provider_type_severity', table_name='optimization_recommendations')
+    op.drop_index('ix_recommendations_provider_status_created', table_name='optimization_recommendations')
+    op.drop_index('ix_recommendations_provider_status_savings', table_name='optimization_recommendations')
+    op.drop_column('optimization_recommendations', 'search_text')
@@ -0,0 +1,58 @@
+"""add sync jobs table
+
+Revision ID: 9e2c4b7a1f35
+Revises: 5d0a3f7e9b14
+Create Date: 2026-10-16 21:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9e2c4b7a1f35'
+down_revision: Union[str, Sequence[str], None] = '5d0a3f7e9b14'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Background complete sync jobs (one active job per user via the unique active_user_id)."""
+    op.create_table(
+        'sync_jobs',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('active_user_id', sa.Integer(), nullable=True),
+        sa.Column('job_type', sa.String(length=30), nullable=False),
+        sa.Column('sync_type', sa.String(length=20), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=False),
+        sa.Column('cancel_requested', sa.Boolean(), nullable=False),
+        sa.Column('complete_sync_id', sa.Integer(), nullable=True),
+        sa.Column('worker_id', sa.String(length=100), nullable=True),
+        sa.Column('progress', sa.Text(), nullable=True),
+        sa.Column('progress_version', sa.Integer(), nullable=False),
+        sa.Column('result', sa.Text(), nullable=True),
+        sa.Column('error_message', sa.Text(), nullable=True),
+        sa.Column('queued_at', sa.DateTime(), nullable=False),
+        sa.Column('started_at', sa.DateTime(), nullable=True),
+        sa.Column('finished_at', sa.DateTime(), nullable=True),
+        sa.Column('heartbeat_at', sa.DateTime(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.ForeignKeyConstraint(['complete_sync_id'], ['complete_syncs.id']),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('active_user_id'),
+    )
+    op.create_index(op.f('ix_sync_jobs_user_id'), 'sync_jobs', ['user_id'], unique=False)
+    op.create_index(op.f('ix_sync_jobs_status'), 'sync_jobs', ['status'], unique=False)
+    op.create_index('ix_sync_jobs_status_queued', 'sync_jobs', ['status', 'queued_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_sync_jobs_status_queued', table_name='sync_jobs')
+    op.drop_index(op.f('ix_sync_jobs_status'), table_name='sync_jobs')
+    op.drop_index(op.f('ix_sync_jobs_user_id'), table_name='sync_jobs')
+    op.drop_table('sync_jobs')
@@ -0,0 +1,39 @@
+"""add analytics aggregate scope
+
+Revision ID: a3c6e1d8f047
+Revises: 9e2c4b7a1f35
+Create Date: 2026-10-17 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3c6e1d8f047'
+down_revision: Union[str, Sequence[str], None] = '9e2c4b7a1f35'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Keep each day's latest successful aggregates next to the latest-any ones."""
+    # Existing rows only hold the latest sync of each day, whatever its status; drop
+    # them so AnalyticsService rebuilds both scopes from complete_syncs on first read.
+    op.execute('DELETE FROM analytics_daily_aggregates')
+    op.add_column('analytics_daily_aggregates',
+                  sa.Column('scope', sa.String(length=10), nullable=False, server_default='latest'))
+    op.drop_constraint('uq_analytics_daily_aggregate', 'analytics_daily_aggregates', type_='unique')
+    op.create_unique_constraint('uq_analytics_daily_aggregate', 'analytics_daily_aggregates',
+                                ['user_id', 'day', 'scope', 'dimension', 'dimension_key'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DELETE FROM analytics_daily_aggregates WHERE scope = 'success'")
+    op.drop_constraint('uq_analytics_daily_aggregate', 'analytics_daily_aggregates', type_='unique')
+    op.create_unique_constraint('uq_analytics_daily_aggregate', 'analytics_daily_aggregates',
+                                ['user_id', 'day', 'dimension', 'dimension_key'])
+    op.drop_column('analytics_daily_aggregates', 'scope')
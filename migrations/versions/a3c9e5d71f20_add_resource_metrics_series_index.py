@@ -0,0 +1,32 @@
+"""add resource_metrics series index
+
+Revision ID: a3c9e5d71f20
+Revises: 8139f6939d1c
+Create Date: 2026-10-16 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3c9e5d71f20'
+down_revision: Union[str, Sequence[str], None] = '8139f6939d1c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Index series reads (resource, metric, time range) and high-water mark lookups."""
+    op.create_index(
+        'ix_resource_metrics_series',
+        'resource_metrics',
+        ['resource_id', 'metric_name', 'timestamp'],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_resource_metrics_series', table_name='resource_metrics')
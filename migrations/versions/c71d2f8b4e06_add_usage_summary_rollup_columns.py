@@ -0,0 +1,41 @@
+"""add usage summary rollup columns
+
+Revision ID: c71d2f8b4e06
+Revises: a3c9e5d71f20
+Create Date: 2026-10-16 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c71d2f8b4e06'
+down_revision: Union[str, Sequence[str], None] = 'a3c9e5d71f20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Hour/day/month metric rollups with percentiles in resource_usage_summary."""
+    op.add_column('resource_usage_summary', sa.Column('metric_name', sa.String(length=100), nullable=True))
+    op.add_column('resource_usage_summary', sa.Column('granularity', sa.String(length=10), nullable=True))
+    op.add_column('resource_usage_summary', sa.Column('sample_count', sa.Integer(), nullable=True))
+    op.add_column('resource_usage_summary', sa.Column('min_usage', sa.Float(), nullable=True))
+    op.add_column('resource_usage_summary', sa.Column('p50_usage', sa.Float(), nullable=True))
+    op.add_column('resource_usage_summary', sa.Column('p95_usage', sa.Float(), nullable=True))
+    op.add_column('resource_usage_summary', sa.Column('p99_usage', sa.Float(), nullable=True))
+    op.create_index(
+        'ix_resource_usage_summary_rollup',
+        'resource_usage_summary',
+        ['resource_id', 'metric_name', 'granularity', 'period_start'],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_resource_usage_summary_rollup', table_name='resource_usage_summary')
+    for column in ('p99_usage', 'p95_usage', 'p50_usage', 'min_usage', 'sample_count', 'granularity', 'metric_name'):
+        op.drop_column('resource_usage_summary', column)
@@ -0,0 +1,53 @@
+"""add analytics daily aggregates
+
+Revision ID: e4b8a19c3d52
+Revises: c71d2f8b4e06
+Create Date: 2026-10-16 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4b8a19c3d52'
+down_revision: Union[str, Sequence[str], None] = 'c71d2f8b4e06'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Per-user daily cost/count aggregates written at the end of each complete sync."""
+    op.create_table(
+        'analytics_daily_aggregates',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('dimension', sa.String(length=20), nullable=False),
+        sa.Column('dimension_key', sa.String(length=255), nullable=False),
+        sa.Column('provider_id', sa.Integer(), nullable=True),
+        sa.Column('complete_sync_id', sa.Integer(), nullable=False),
+        sa.Column('sync_status', sa.String(length=20), nullable=False),
+        sa.Column('synced_at', sa.DateTime(), nullable=False),
+        sa.Column('daily_cost', sa.Float(), nullable=True),
+        sa.Column('monthly_cost', sa.Float(), nullable=True),
+        sa.Column('resource_count', sa.Integer(), nullable=True),
+        sa.Column('provider_count', sa.Integer(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.ForeignKeyConstraint(['provider_id'], ['cloud_providers.id']),
+        sa.ForeignKeyConstraint(['complete_sync_id'], ['complete_syncs.id']),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('user_id', 'day', 'dimension', 'dimension_key', name='uq_analytics_daily_aggregate'),
+    )
+    op.create_index('idx_analytics_user_dimension_day', 'analytics_daily_aggregates', ['user_id', 'dimension', 'day'], unique=False)
+    op.create_index('ix_analytics_daily_aggregates_complete_sync_id', 'analytics_daily_aggregates', ['complete_sync_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_analytics_daily_aggregates_complete_sync_id', table_name='analytics_daily_aggregates')
+    op.drop_index('idx_analytics_user_dimension_day', table_name='analytics_daily_aggregates')
+    op.drop_table('analytics_daily_aggregates')
@@ -22,6 +22,7 @@ from app import create_app
 from app.core.models.pricing import ProviderPrice
 from app.core.models.provider_admin_credentials import ProviderAdminCredentials
 from app.core.database import db
+from app.core.recommendations.price_catalog import price_catalog
 from app.providers.beget.beget_client import BegetAPIClient
 
 import requests
@@ -243,6 +244,7 @@ def sync_dbaas_prices():
             inserted_count += 1
         
         db.session.commit()
+        price_catalog.bump_version()
         print(f"✅ Successfully inserted {inserted_count} managed DB pricing records")
         
         # Print summary by type
@@ -358,6 +360,7 @@ def main():
                 inserted_count += 1
             
             db.session.commit()
+            price_catalog.bump_version()
             print(f"✅ Successfully inserted {inserted_count} managed DB pricing records")
             
             # Print summary by type
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Recommendations Benchmark - serial vs process-pool rule evaluation
+
+Seeds a synthetic inventory (servers, snapshots, reserved IPs across three
+providers plus a server price catalog) into a scratch SQLite database, then
+runs RecommendationOrchestrator.run_for_sync once in-process and once with
+RECOMMENDATION_EVALUATION_WORKERS worker processes. Both runs start from the
+same state; the script reports timings and checks that they produced the same
+recommendations and price comparisons.
+
+Usage:
+    python scripts/benchmark_recommendations.py [--resources N] [--prices N] [--workers N] [--database-url URL]
+
+Arguments:
+    --resources N       Resources in the synthetic inventory (default: 10000)
+    --prices N          Server prices in the catalog (default: 3000)
+    --workers N         Worker processes for the parallel run (default: CPU count)
+    --database-url URL  Database to seed (default: a temporary SQLite file).
+                        The schema is dropped and recreated - never point this at real data.
+
+Example:
+    python scripts/benchmark_recommendations.py --resources 10000 --workers 4
+"""
+
+import os
+import sys
+import argparse
+import json
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+
+def seed(db, resources: int, prices: int) -> int:
+    """Create the synthetic inventory; returns the complete sync id."""
+    from app.core.models.user import User
+    from app.core.models.provider import CloudProvider
+    from app.core.models.resource import Resource
+    from app.core.models.tags import ResourceTag
+    from app.core.models.pricing import ProviderPrice
+    from app.core.models.sync import SyncSnapshot
+    from app.core.models.complete_sync import CompleteSync, ProviderSyncReference
+    from app.core.models.user_provider_preference import UserProviderPreference
+
+    rnd = random.Random(42)
+    db.drop_all()
+    db.create_all()
+
+    user = User(email='benchmark@infrazen.local', google_id='benchmark', first_name='Bench', last_name='Mark')
+    db.session.add(user)
+    db.session.flush()
+    provider_types = ['beget', 'selectel', 'yandex']
+    providers = [
+        CloudProvider(user_id=user.id, provider_type=t, connection_name=f'{t}-bench', credentials='{}', account_id=t)
+        for t in provider_types
+    ]
+    db.session.add_all(providers)
+    db.session.add_all([UserProviderPreference(user_id=user.id, provider_type=t, is_enabled=True) for t in provider_types])
+
+    regions = ['ru-1', 'ru-2', 'ru-central1', 'ru-3']
+    db.session.add_all([
+        ProviderPrice(
+            provider=rnd.choice(provider_types), resource_type='server', provider_sku=f'sku-{i}',
+            region=rnd.choice(regions), cpu_cores=rnd.choice([1, 2, 4, 8, 16]), ram_gb=rnd.choice([1, 2, 4, 8, 16, 32]),
+            storage_gb=rnd.choice([10, 20, 40, 80]), storage_type='SSD', monthly_cost=round(rnd.uniform(200, 20000), 2),
+        )
+        for i in range(prices)
+    ])
+
+    complete_sync = CompleteSync(user_id=user.id, sync_status='success', sync_completed_at=datetime.now())
+    db.session.add(complete_sync)
+    db.session.flush()
+    for order, provider in enumerate(providers):
+        snapshot = SyncSnapshot(provider_id=provider.id, sync_status='success')
+        db.session.add(snapshot)
+        db.session.flush()
+        db.session.add(ProviderSyncReference(
+            complete_sync_id=complete_sync.id, provider_id=provider.id, sync_snapshot_id=snapshot.id,
+            sync_order=order, sync_status='success',
+        ))
+
+    old = (datetime.utcnow() - timedelta(days=400)).isoformat()
+    rows = []
+    for i in range(resources):
+        kind = rnd.random()
+        provider = providers[i % len(providers)]
+        if kind < 0.8:
+            cpu, ram = rnd.choice([1, 2, 4, 8]), rnd.choice([1, 2, 4, 8, 16])
+            rows.append(Resource(
+                provider_id=provider.id, resource_id=f'vm-{i}', resource_name=f'vm-{i}', resource_type='server',
+                service_name='Compute', region=rnd.choice(regions), status='stopped' if rnd.random() < 0.1 else 'active',
+                daily_cost=round(rnd.uniform(20, 800), 2), provider_config=json.dumps({'cpu': cpu, 'ram_gb': ram, 'disk_gb': 20}),
+            ))
+        elif kind < 0.9:
+            rows.append(Resource(
+                provider_id=provider.id, resource_id=f'snap-{i}', resource_name=f'snap-{i}', resource_type='snapshot',
+                service_name='Storage', region='ru-1', daily_cost=1.5, provider_config=json.dumps({'created_at': old, 'size_gb': 50}),
+            ))
+        else:
+            rows.append(Resource(
+                provider_id=provider.id, resource_id=f'ip-{i}', resource_name=f'ip-{i}', resource_type='reserved_ip',
+                service_name='Network', region='ru-1', daily_cost=4.0, provider_config=json.dumps({'created_at': old, 'used': False}),
+            ))
+    db.session.add_all(rows)
+    db.session.flush()
+    db.session.add_all([
+        ResourceTag(resource_id=r.id, tag_key='cpu_avg_usage', tag_value=str(round(rnd.uniform(1, 90), 1)))
+        for r in rows if r.resource_type == 'server'
+    ])
+    db.session.commit()
+    return complete_sync.id
+
+
+def fingerprint(db):
+    """Recommendations and price comparisons of the last run, in id order."""
+    from app.core.models.recommendations import OptimizationRecommendation
+    from app.core.models.pricing import PriceComparisonRecommendation
+
+    recs = [
+        (r.resource_id, r.source, r.recommendation_type, r.target_provider, r.target_sku, round(r.estimated_monthly_savings or 0, 2))
+        for r in OptimizationRecommendation.query.order_by(OptimizationRecommendation.id)
+    ]
+    comparisons = [
+        (p.current_resource_id, p.recommended_price_id, float(p.monthly_savings or 0))
+        for p in PriceComparisonRecommendation.query.order_by(PriceComparisonRecommendation.id)
+    ]
+    return recs, comparisons
+
+
+def reset(db):
+    from app.core.models.recommendations import OptimizationRecommendation
+    from app.core.models.pricing import PriceComparisonRecommendation
+
+    OptimizationRecommendation.query.delete()
+    PriceComparisonRecommendation.query.delete()
+    db.session.commit()
+    db.session.expunge_all()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark serial vs parallel recommendation rule evaluation')
+    parser.add_argument('--resources', type=int, default=10000)
+    parser.add_argument('--prices', type=int, default=3000)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 2)
+    parser.add_argument('--database-url', default=None)
+    args = parser.parse_args()
+
+    scratch = None
+    if not args.database_url:
+        scratch = tempfile.NamedTemporaryFile(prefix='infrazen-bench-', suffix='.db', delete=False)
+        args.database_url = f'sqlite:///{scratch.name}'
+    # Worker processes build their app from the same URL; production config keeps SQL echo off
+    os.environ['DATABASE_URL'] = args.database_url
+    os.environ.setdefault('FLASK_ENV', 'production')
+
+    from app import create_app
+    from app.core.database import db
+    from app.core.recommendations.orchestrator import RecommendationOrchestrator
+
+    app = create_app()
+    app.config['ENABLE_AI_RECOMMENDATIONS'] = False
+    app.config['RECOMMENDATION_PARALLEL_MIN_RESOURCES'] = 0
+
+    results = {}
+    try:
+        with app.app_context():
+            print(f"Seeding {args.resources} resources and {args.prices} prices into {args.database_url}")
+            complete_sync_id = seed(db, args.resources, args.prices)
+
+            for mode, workers in (('serial', 1), ('parallel', args.workers)):
+                reset(db)
+                app.config['RECOMMENDATION_EVALUATION_WORKERS'] = workers
+                started = time.perf_counter()
+                summary = RecommendationOrchestrator().run_for_sync(complete_sync_id)
+                elapsed = time.perf_counter() - started
+                results[mode] = fingerprint(db)
+                print(
+                    f"{mode:>8}: workers={summary.get('evaluation_workers')} total={elapsed:.2f}s "
+                    f"resource_pass={summary.get('resource_pass_seconds')}s "
+                    f"rules/s={summary.get('rules_evaluated_per_second')} "
+                    f"created={summary.get('recommendations_created')} "
+                    f"price_comparisons={len(results[mode][1])}"
+                )
+    finally:
+        if scratch is not None:
+            os.unlink(scratch.name)
+
+    identical = results['serial'] == results['parallel']
+    print(f"Deterministic: {'yes' if identical else 'NO - serial and parallel results differ'}")
+    return 0 if identical else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
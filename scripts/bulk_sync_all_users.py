@@ -6,10 +6,11 @@ This script triggers a complete synchronization for all active users in the syst
 excluding demo users. It's designed to be run as a cron job or manually.
 
 Usage:
-    python scripts/bulk_sync_all_users.py [--sync-type TYPE] [--dry-run] [--verbose]
+    python scripts/bulk_sync_all_users.py [--sync-type TYPE] [--workers N] [--dry-run] [--verbose]
 
 Arguments:
     --sync-type TYPE    Type of sync: scheduled (default), manual, or api
+    --workers N        Number of users synced concurrently (default: BULK_SYNC_MAX_WORKERS)
     --dry-run          Show which users would be synced without executing
     --verbose          Show detailed output during sync
     --quiet            Minimal output (only errors and summary)
@@ -21,6 +22,9 @@ Examples:
     # Run manual sync with verbose output
     python scripts/bulk_sync_all_users.py --sync-type manual --verbose
 
+    # Sync 8 users at a time
+    python scripts/bulk_sync_all_users.py --workers 8
+
     # Dry run to see which users would be synced
     python scripts/bulk_sync_all_users.py --dry-run
 
@@ -132,7 +136,7 @@ def run_dry_run():
     ).count() > 0)
     print(f"Summary: {users_with_providers} users with providers, {len(users) - users_with_providers} would be skipped")
 
-def run_bulk_sync(sync_type='scheduled', verbose=False, quiet=False):
+def run_bulk_sync(sync_type='scheduled', verbose=False, quiet=False, workers=None):
     """Execute bulk sync for all users"""
     if not quiet:
         print_header(f"Bulk Sync - {sync_type.upper()}", '=')
@@ -140,7 +144,14 @@ def run_bulk_sync(sync_type='scheduled', verbose=False, quiet=False):
     
     # Create service and execute sync
     service = BulkSyncService()
-    result = service.sync_all_users(sync_type=sync_type)
+    result = service.sync_all_users(sync_type=sync_type, max_workers=workers)
+    
+    # AI recommendation texts are generated in the background; give queued batches
+    # a chance to finish before the process exits (leftovers are picked up later)
+    from app.core.services.ai_text_generator import ai_text_queue
+    if ai_text_queue.pending() and not quiet:
+        print(f"Waiting for {ai_text_queue.pending()} queued AI text batches...")
+    ai_text_queue.drain(timeout=300)
     
     # Print results
     if not quiet:
@@ -158,6 +169,16 @@ def run_bulk_sync(sync_type='scheduled', verbose=False, quiet=False):
     print(f"Failed:            {result.get('failed_users', 0)}")
     print(f"Skipped:           {result.get('skipped_users', 0)}")
     print(f"Duration:          {result.get('duration_seconds', 0):.1f} seconds")
+    
+    throughput = result.get('throughput')
+    if throughput:
+        print(f"Workers:           {throughput['max_workers']} ({throughput['mode']})")
+        print(f"Throughput:        {throughput['users_per_minute']} users/min")
+        print(f"User sync time:    {throughput['cumulative_user_seconds']:.1f} seconds "
+              f"(x{throughput['parallel_speedup']} speedup)")
+        if throughput.get('provider_wait_seconds'):
+            waits = ', '.join(f"{k}: {v:.1f}s" for k, v in throughput['provider_wait_seconds'].items())
+            print(f"Provider waits:    {waits}")
     print(f"Completed at:      {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     print('=' * 70)
     
@@ -189,6 +210,13 @@ Examples:
         help='Type of sync to execute (default: scheduled)'
     )
     
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=None,
+        help='Number of users synced concurrently (default: BULK_SYNC_MAX_WORKERS, 1 = sequential)'
+    )
+    
     parser.add_argument(
         '--dry-run',
         action='store_true',
@@ -223,7 +251,8 @@ Examples:
                 run_bulk_sync(
                     sync_type=args.sync_type,
                     verbose=args.verbose,
-                    quiet=args.quiet
+                    quiet=args.quiet,
+                    workers=args.workers
                 )
         except KeyboardInterrupt:
             print("\n\nSync interrupted by user.")
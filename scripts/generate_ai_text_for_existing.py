@@ -1,46 +1,41 @@
 #!/usr/bin/env python3
 """
 Generate AI text for existing recommendations
-Run this once to populate AI fields for already-created recommendations
+Run this to populate AI fields for recommendations created without AI text
+(e.g. created before AI text existed, or still queued when the server restarted).
+Texts are generated by the agent service in batches and stored by the agent.
 """
 from app import create_app
-from app.core.models import db
 from app.core.models.recommendations import OptimizationRecommendation
-from app.core.services.ai_text_generator import generate_recommendation_text
-from datetime import datetime
+from app.core.services.ai_text_generator import generate_recommendation_texts_batch
 
 app = create_app()
 
 with app.app_context():
     # Get all pending recommendations without AI text
-    recs = OptimizationRecommendation.query.filter_by(
-        ai_short_description=None,
-        status='pending'
-    ).limit(50).all()
+    recs = OptimizationRecommendation.query.filter(
+        OptimizationRecommendation.ai_generated_at.is_(None),
+        OptimizationRecommendation.status == 'pending'
+    ).limit(200).all()
     
     print(f"Found {len(recs)} recommendations without AI text")
     
+    batch_size = app.config.get('AI_TEXT_BATCH_SIZE', 20)
+    rec_ids = [rec.id for rec in recs]
     success = 0
     failed = 0
     
-    for rec in recs:
-        try:
-            print(f"Generating AI text for recommendation {rec.id} ({rec.resource_name})...", end=" ")
-            ai_text = generate_recommendation_text(rec.id)
-            
-            if ai_text:
-                rec.ai_short_description = ai_text['short_description_html']
-                rec.ai_detailed_description = ai_text['detailed_description_html']
-                rec.ai_generated_at = datetime.utcnow()
-                success += 1
-                print("✓")
-            else:
-                failed += 1
-                print("✗ (no text returned)")
-        except Exception as e:
-            failed += 1
-            print(f"✗ ({e})")
+    for start in range(0, len(rec_ids), batch_size):
+        batch = rec_ids[start:start + batch_size]
+        print(f"Generating AI text for recommendations {batch[0]}..{batch[-1]} ({len(batch)})...", end=" ")
+        result = generate_recommendation_texts_batch(batch)
+        
+        if result:
+            success += result.get('generated', 0)
+            failed += result.get('failed', 0)
+            print(f"✓ {result.get('generated', 0)} generated, {result.get('failed', 0)} failed")
+        else:
+            failed += len(batch)
+            print("✗ (batch request failed)")
     
-    db.session.commit()
     print(f"\nDone! Success: {success}, Failed: {failed}")
-
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Agent Chat Load Test - concurrent WebSocket chat sessions against a running agent
+
+Opens N analytics chat sessions at once for each concurrency level, sends the
+same question in every session and waits for the assistant's answer,
+recording the time to the first streamed chunk and to the full answer. With a
+blocking chat loop, wall time grows with N (sessions are answered one after
+another); with the async loop it should stay close to a single session's
+latency until the LLM provider or the worker thread pool becomes the limit.
+
+The sessions are real: each message goes through the LLM and is stored in
+the user's chat history, so use a test user.
+
+Usage:
+    python scripts/load_test_agent_chat.py --user-id ID [--url URL] [--sessions 1,5,10,20] [--messages N]
+
+Arguments:
+    --user-id ID         User the chat tokens are issued for (required)
+    --url URL            Agent base WebSocket URL (default: ws://127.0.0.1:8001)
+    --sessions LIST      Comma-separated concurrency levels (default: 1,5,10,20)
+    --messages N         Messages per session (default: 1)
+    --question TEXT      Message sent in every session
+    --timeout SECONDS    Per-answer timeout (default: 120)
+
+Example:
+    python scripts/load_test_agent_chat.py --user-id 42 --sessions 1,10,25
+"""
+
+import os
+import sys
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import websockets
+
+from agent_service.auth import create_jwt_token
+
+DEFAULT_QUESTION = 'Кратко: какие три сервиса дают основную часть расходов?'
+
+
+async def run_session(url: str, user_id: int, index: int, messages: int, question: str, timeout: float):
+    """One chat session; returns (time to first token, total) per message in seconds (None for failures)."""
+    token = create_jwt_token(user_id, None, scenario='analytics', context={'time_range_days': 30, 'load_test': index})
+    latencies = []
+    async with websockets.connect(f"{url}/v1/chat/analytics?token={token}", max_size=None) as ws:
+        for _ in range(messages):
+            started = time.monotonic()
+            first_token = None
+            await ws.send(json.dumps({'content': question}))
+            try:
+                while True:
+                    frame = json.loads(await asyncio.wait_for(ws.recv(), timeout))
+                    if frame.get('type') == 'assistant_delta' and first_token is None:
+                        first_token = time.monotonic() - started
+                    elif frame.get('type') == 'assistant':
+                        latencies.append((first_token, time.monotonic() - started))
+                        break
+            except asyncio.TimeoutError:
+                latencies.append(None)
+    return latencies
+
+
+async def run_level(args, sessions: int):
+    started = time.monotonic()
+    results = await asyncio.gather(
+        *(run_session(args.url, args.user_id, i, args.messages, args.question, args.timeout) for i in range(sessions)),
+        return_exceptions=True
+    )
+    wall = time.monotonic() - started
+
+    latencies, first_tokens, failures = [], [], 0
+    for result in results:
+        if isinstance(result, Exception):
+            failures += args.messages
+            continue
+        for latency in result:
+            if latency is None:
+                failures += 1
+                continue
+            latencies.append(latency[1])
+            if latency[0] is not None:
+                first_tokens.append(latency[0])
+    return wall, latencies, first_tokens, failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load test agent chat WebSocket sessions')
+    parser.add_argument('--user-id', type=int, required=True, help='User the chat tokens are issued for')
+    parser.add_argument('--url', default='ws://127.0.0.1:8001', help='Agent base WebSocket URL')
+    parser.add_argument('--sessions', default='1,5,10,20', help='Comma-separated concurrency levels')
+    parser.add_argument('--messages', type=int, default=1, help='Messages per session')
+    parser.add_argument('--question', default=DEFAULT_QUESTION, help='Message sent in every session')
+    parser.add_argument('--timeout', type=float, default=120, help='Per-answer timeout in seconds')
+    args = parser.parse_args()
+
+    levels = [int(level) for level in args.sessions.split(',') if level.strip()]
+
+    print(f"{'sessions':>8} {'answers':>8} {'failed':>7} {'wall s':>8} {'ttft p50':>9} {'p50 s':>7} {'p95 s':>7} {'answers/s':>10} {'scaling':>8}")
+    baseline = None
+    for sessions in levels:
+        wall, latencies, first_tokens, failures = asyncio.run(run_level(args, sessions))
+        ttft = statistics.median(first_tokens) if first_tokens else float('nan')
+        if latencies:
+            ordered = sorted(latencies)
+            p50 = statistics.median(ordered)
+            p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+        else:
+            p50 = p95 = float('nan')
+        throughput = len(latencies) / wall if wall else 0.0
+        if baseline is None and throughput:
+            baseline = throughput
+        # Throughput relative to the first level: ~sessions ratio when sessions run concurrently, ~1 when serialized
+        scaling = throughput / baseline if baseline else float('nan')
+        print(f"{sessions:>8} {len(latencies):>8} {failures:>7} {wall:>8.2f} {ttft:>9.2f} {p50:>7.2f} {p95:>7.2f} {throughput:>10.2f} {scaling:>7.1f}x")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
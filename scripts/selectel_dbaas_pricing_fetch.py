@@ -22,6 +22,7 @@ from app import create_app
 from app.core.models.pricing import ProviderPrice
 from app.core.models.provider_admin_credentials import ProviderAdminCredentials
 from app.core.database import db
+from app.core.recommendations.price_catalog import price_catalog
 
 import requests
 
@@ -281,6 +282,7 @@ def sync_dbaas_prices(api_key: str):
             inserted_count += 1
         
         db.session.commit()
+        price_catalog.bump_version()
         print(f"✅ Successfully inserted {inserted_count} DBaaS pricing records")
         
         return inserted_count
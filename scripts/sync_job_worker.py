@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Sync Job Worker - run queued complete syncs outside the web process
+
+POST /api/complete-sync only queues a job in the sync_jobs table. By default the
+web process runs queued jobs in its own worker threads; with
+SYNC_JOB_INPROCESS_WORKERS=false the web process only queues and this script
+runs them. Several worker processes (on one or more hosts) can share the table:
+each job is claimed by exactly one of them.
+
+Usage:
+    python scripts/sync_job_worker.py [--workers N] [--verbose]
+
+Arguments:
+    --workers N    Jobs run concurrently by this process (default: SYNC_JOB_WORKERS)
+    --verbose      Show detailed output
+
+Systemd unit (ExecStart):
+    /path/to/infrazen/venv/bin/python scripts/sync_job_worker.py --workers 2
+"""
+
+import os
+import sys
+import argparse
+import logging
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import create_app
+from app.core.services.ai_text_generator import ai_text_queue
+from app.core.services.sync_job_service import sync_job_runner
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run queued complete sync jobs')
+    parser.add_argument('--workers', type=int, default=None, help='Jobs run concurrently (default: SYNC_JOB_WORKERS)')
+    parser.add_argument('--verbose', action='store_true', help='Show detailed output')
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.DEBUG if args.verbose else logging.INFO,
+        format='%(asctime)s [%(levelname)s] %(name)s: %(message)s',
+        datefmt='%Y-%m-%d %H:%M:%S'
+    )
+    logging.getLogger('urllib3').setLevel(logging.WARNING)
+
+    app = create_app()
+    sync_job_runner.run_forever(app, args.workers)
+
+    # Let queued AI recommendation texts finish; leftovers are handled by generate_ai_text_for_existing.py
+    if not ai_text_queue.drain(timeout=120):
+        logging.warning('AI text generation still pending at shutdown')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Test script for the materialized analytics aggregates
+Verifies that a partial sync later in the day keeps the day's successful data
+readable for the success-only charts, and that the response cache version only
+moves once a sync has finished
+"""
+
+import sys
+import os
+import tempfile
+from datetime import datetime, timedelta
+sys.path.insert(0, os.path.dirname(__file__))
+
+
+def _make_app():
+    """Testing app on a throwaway SQLite database"""
+    from app import create_app
+    from app.config import TestingConfig
+    from app.core.database import db
+
+    TestingConfig.SQLALCHEMY_DATABASE_URI = f"sqlite:///{tempfile.mkstemp(suffix='.db')[1]}"
+    app = create_app('testing')
+    with app.app_context():
+        db.create_all()
+    return app
+
+
+def _seed_sync(user, providers, status, when):
+    """One complete sync; in a non-successful one only the first provider succeeded"""
+    from app.core.database import db
+    from app.core.models.sync import SyncSnapshot, ResourceState
+    from app.core.models.complete_sync import CompleteSync, ProviderSyncReference
+
+    successful = len(providers) if status == 'success' else 1
+    complete_sync = CompleteSync(user_id=user.id, sync_status=status, sync_started_at=when, sync_completed_at=when,
+                                 total_daily_cost=10.0 * successful, total_monthly_cost=300.0 * successful,
+                                 total_resources_found=successful, successful_providers=successful)
+    db.session.add(complete_sync)
+    db.session.flush()
+    for order, provider in enumerate(providers):
+        provider_status = 'success' if order < successful else 'error'
+        snapshot = SyncSnapshot(provider_id=provider.id, sync_type='manual', sync_status=provider_status,
+                                sync_completed_at=when, total_monthly_cost=300.0)
+        db.session.add(snapshot)
+        db.session.flush()
+        db.session.add(ProviderSyncReference(complete_sync_id=complete_sync.id, provider_id=provider.id,
+                                             sync_snapshot_id=snapshot.id, sync_order=order,
+                                             sync_status=provider_status, provider_cost=10.0, resources_synced=1))
+        db.session.add(ResourceState(sync_snapshot_id=snapshot.id, provider_resource_id=f'vm-{order}',
+                                     resource_type='server', resource_name=f'vm-{order}', state_action='created',
+                                     service_name=f'Service {order}', effective_cost=10.0))
+    db.session.commit()
+    return complete_sync
+
+
+def test_partial_sync_keeps_successful_day():
+    """Test that success followed by partial on the same day keeps both views"""
+    print("Testing success then partial sync on the same day...")
+
+    from app.core.database import db
+    from app.core.models.user import User
+    from app.core.models.provider import CloudProvider
+    from app.core.services.analytics_service import AnalyticsService
+
+    app = _make_app()
+    with app.app_context():
+        user = User(email='aggregates@example.com', google_id='aggregates', first_name='Test', last_name='User')
+        db.session.add(user)
+        db.session.commit()
+        providers = [
+            CloudProvider(user_id=user.id, provider_type=provider_type, connection_name=f'{provider_type}-conn',
+                          credentials='{}', account_id=provider_type)
+            for provider_type in ('beget', 'selectel')
+        ]
+        db.session.add_all(providers)
+        db.session.commit()
+
+        service = AnalyticsService(user.id)
+        morning = datetime.now().replace(hour=9, minute=0, second=0, microsecond=0)
+        for status, when in (('success', morning), ('partial', morning + timedelta(hours=3))):
+            service.materialize(_seed_sync(user, providers, status, when))
+
+        services = service.get_service_analysis()
+        assert [s['name'] for s in services['services']] == ['Service 0', 'Service 1'], services
+
+        trends = service.get_main_spending_trends(days=7)
+        assert len(trends) == 1, trends
+        assert trends[0]['successful_providers'] == 2, trends
+        assert set(trends[0]['cost_by_provider']) == {'beget-conn', 'selectel-conn'}, trends
+
+        breakdown = service.get_provider_breakdown()
+        assert len(breakdown['providers']) == 1, "Provider breakdown should show the later partial sync"
+
+    print("✓ Successful aggregates survive a later partial sync")
+
+
+def test_data_version_ignores_running_sync():
+    """Test that the cache version only moves once a sync has finished and materialized"""
+    print("Testing analytics data version...")
+
+    from app.core.database import db
+    from app.core.models.user import User
+    from app.core.models.provider import CloudProvider
+    from app.core.models.complete_sync import CompleteSync
+    from app.core.services.analytics_service import AnalyticsService
+
+    app = _make_app()
+    with app.app_context():
+        user = User(email='version@example.com', google_id='version', first_name='Test', last_name='User')
+        db.session.add(user)
+        db.session.commit()
+        provider = CloudProvider(user_id=user.id, provider_type='beget', connection_name='beget-conn',
+                                 credentials='{}', account_id='beget')
+        db.session.add(provider)
+        db.session.commit()
+
+        service = AnalyticsService(user.id)
+        first = _seed_sync(user, [provider], 'success', datetime.now() - timedelta(days=1))
+        service.materialize(first)
+        version = service.data_version()
+
+        running = CompleteSync(user_id=user.id, sync_status='running', sync_started_at=datetime.now())
+        db.session.add(running)
+        db.session.commit()
+        assert service.data_version() == version, "A running sync must not change the data version"
+
+        db.session.delete(running)
+        db.session.commit()
+        finished = _seed_sync(user, [provider], 'success', datetime.now())
+        unmaterialized = service.data_version()
+        assert unmaterialized != version, "A finished sync should change the data version"
+
+        service.materialize(finished)
+        assert service.data_version() != unmaterialized, "Materialized aggregates should change the data version"
+
+    print("✓ Data version follows finished, materialized syncs")
+
+
+def main():
+    """Run all tests"""
+    print("=" * 60)
+    print("Testing analytics aggregates")
+    print("=" * 60)
+
+    try:
+        test_partial_sync_keeps_successful_day()
+        test_data_version_ignores_running_sync()
+        print("=" * 60)
+        print("🎉 All tests passed!")
+        print("=" * 60)
+        return 0
+    except Exception as e:
+        print(f"\n❌ Test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
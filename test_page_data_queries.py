@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Test script for the batched page data reads
+Verifies that the dashboard, resources and connections helpers run the same
+number of queries however many providers the user has
+"""
+
+import sys
+import os
+import tempfile
+from datetime import datetime, timedelta
+sys.path.insert(0, os.path.dirname(__file__))
+
+PROVIDER_COUNTS = (1, 3, 9)
+
+
+def _make_app():
+    """Testing app on a throwaway SQLite database"""
+    from app import create_app
+    from app.config import TestingConfig
+
+    TestingConfig.SQLALCHEMY_DATABASE_URI = f"sqlite:///{tempfile.mkstemp(suffix='.db')[1]}"
+    return create_app('testing')
+
+
+def _seed(provider_count):
+    """A user with `provider_count` providers, their resources, snapshots and a complete sync"""
+    from app.core.database import db
+    from app.core.models.user import User
+    from app.core.models.provider import CloudProvider
+    from app.core.models.resource import Resource
+    from app.core.models.tags import ResourceTag
+    from app.core.models.sync import SyncSnapshot, ResourceState
+    from app.core.models.complete_sync import CompleteSync
+
+    db.drop_all()
+    db.create_all()
+    user = User(email='pages@example.com', google_id='pages', first_name='Test', last_name='User')
+    db.session.add(user)
+    db.session.commit()
+
+    synced_at = datetime.now() - timedelta(hours=1)
+    for index in range(provider_count):
+        provider = CloudProvider(user_id=user.id, provider_type=('beget', 'selectel', 'yandex')[index % 3],
+                                 connection_name=f'connection-{index}', credentials='{}',
+                                 account_id=f'account-{index}', last_sync=synced_at)
+        db.session.add(provider)
+        db.session.flush()
+        resources = [
+            Resource(provider_id=provider.id, resource_id=f'vm-{index}-{k}', resource_name=f'vm-{k}',
+                     resource_type='server', service_name='VPS', region='ru-1', daily_cost=1.5 * k, status='active')
+            for k in range(3)
+        ]
+        db.session.add_all(resources)
+        db.session.flush()
+        db.session.add(ResourceTag(resource_id=resources[0].id, tag_key='cpu_avg_usage', tag_value='12'))
+
+        snapshot = SyncSnapshot(provider_id=provider.id, sync_status='success', sync_completed_at=synced_at,
+                                created_at=synced_at, total_resources_found=len(resources), total_monthly_cost=3.0)
+        db.session.add(snapshot)
+        db.session.flush()
+        for resource in resources:
+            db.session.add(ResourceState(sync_snapshot_id=snapshot.id, resource_id=resource.id,
+                                         provider_resource_id=resource.resource_id, resource_type='server',
+                                         resource_name=resource.resource_name, state_action='created',
+                                         service_name='VPS', effective_cost=resource.daily_cost))
+
+    db.session.add(CompleteSync(user_id=user.id, sync_status='success', sync_started_at=synced_at,
+                                sync_completed_at=synced_at, total_providers_synced=provider_count,
+                                successful_providers=provider_count, total_daily_cost=3.0 * provider_count,
+                                total_monthly_cost=90.0 * provider_count))
+    db.session.commit()
+    return user.id
+
+
+def _query_counts(user_id):
+    """Number of SQL statements each page helper issues with a fresh loader"""
+    from sqlalchemy import event
+    from app.core.database import db
+    from app.core.services.page_data_service import UserPageData
+    from app.web.main import get_connection_cards, get_real_user_overview, get_real_user_resources
+
+    helpers = {
+        'get_real_user_overview': lambda: get_real_user_overview(str(user_id), UserPageData(user_id)),
+        'get_real_user_resources': lambda: get_real_user_resources(str(user_id), UserPageData(user_id)),
+        'get_connection_cards': lambda: get_connection_cards(UserPageData(user_id)),
+    }
+    executed = [0]
+
+    def count(*args, **kwargs):
+        executed[0] += 1
+
+    counts = {}
+    event.listen(db.engine, 'before_cursor_execute', count)
+    try:
+        for name, helper in helpers.items():
+            db.session.expire_all()
+            executed[0] = 0
+            assert helper(), f"{name} returned no data"
+            counts[name] = executed[0]
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', count)
+    return counts
+
+
+def test_page_queries_do_not_grow_with_providers():
+    """Test that page helpers issue a constant number of queries"""
+    print("Testing page data query counts...")
+
+    app = _make_app()
+    with app.app_context():
+        counts = {}
+        for provider_count in PROVIDER_COUNTS:
+            counts[provider_count] = _query_counts(_seed(provider_count))
+            print(f"  {provider_count} providers: {counts[provider_count]}")
+
+    baseline = counts[PROVIDER_COUNTS[0]]
+    for provider_count in PROVIDER_COUNTS[1:]:
+        assert counts[provider_count] == baseline, \
+            f"Query counts grew with {provider_count} providers: {counts[provider_count]} vs {baseline}"
+
+    print("✓ Page data queries are independent of the provider count")
+
+
+def main():
+    """Run all tests"""
+    print("=" * 60)
+    print("Testing page data queries")
+    print("=" * 60)
+
+    try:
+        test_page_queries_do_not_grow_with_providers()
+        print("=" * 60)
+        print("🎉 All tests passed!")
+        print("=" * 60)
+        return 0
+    except Exception as e:
+        print(f"\n❌ Test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())